@@ -0,0 +1,96 @@
+// @vitest-environment node
+import { bench, describe, afterAll } from 'vitest';
+import crypto from 'crypto';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { analyzeExcelFile, processExcelJob, ProcessOptions } from '../electron/services/excel-processor';
+import { workbookCache } from '../electron/services/workbook-cache';
+import { benchSizes, writeSyntheticJob, customerName, SyntheticJob, MASTER_TICKET_COL, MASTER_RESULT_COL, TARGET_TICKET_COL } from './synthetic-workbooks';
+
+/**
+ * Electron-side Excel pipeline on synthetic workbooks: analyzeExcelFile on
+ * the master, and processExcelJob for every row count x target count, both
+ * cold (parsed from disk, new session) and as a re-run in a warm match
+ * session. Runs inline on the calling thread, as in tests.
+ *
+ * Sizes come from BENCH_ROWS / BENCH_TARGETS (see benchSizes).
+ */
+
+const root = fs.mkdtempSync(path.join(os.tmpdir(), 'excel-bench-'));
+const sizes = benchSizes();
+const jobs = new Map<string, SyntheticJob>();
+
+function job(rows: number, targets: number): SyntheticJob {
+    const key = `${rows}x${targets}`;
+    let existing = jobs.get(key);
+    if (!existing) {
+        existing = writeSyntheticJob(path.join(root, key), rows, targets);
+        jobs.set(key, existing);
+    }
+    return existing;
+}
+
+function options(synthetic: SyntheticJob, rows: number, sessionId?: string): ProcessOptions {
+    const { masterPath, targetPaths } = synthetic;
+    return {
+        sessionId,
+        masterPath,
+        targetPaths,
+        masterColIndices: [MASTER_TICKET_COL],
+        masterResultColIndex: MASTER_RESULT_COL,
+        targetMatchColIndices: Object.fromEntries(targetPaths.map(p => [p, [TARGET_TICKET_COL]])),
+        targetMatchStrings: Object.fromEntries(targetPaths.map((p, i) => [p, customerName(i)])),
+        matchSentence: '',
+        noMatchSentence: 'Not Matched',
+        outputPath: path.join(path.dirname(masterPath), 'out', 'master_updated.xlsx'),
+        masterRowRange: { start: 5, end: 4 + rows }
+    };
+}
+
+function forget(synthetic: SyntheticJob) {
+    workbookCache.invalidate(synthetic.masterPath);
+    synthetic.targetPaths.forEach(p => workbookCache.invalidate(p));
+}
+
+afterAll(() => {
+    fs.rmSync(root, { recursive: true, force: true });
+});
+
+describe('analyzeExcelFile', () => {
+    for (const rows of sizes.rows) {
+        const synthetic = job(rows, 1);
+        bench(`master, ${rows.toLocaleString('en-US')} rows`, () => {
+            forget(synthetic);
+            analyzeExcelFile(synthetic.masterPath);
+        }, { iterations: rows >= 50_000 ? 2 : 5, time: 0, warmupIterations: 1 });
+    }
+});
+
+describe('processExcelJob', () => {
+    for (const rows of sizes.rows) {
+        for (const targets of sizes.targets) {
+            if (targets > rows) continue;
+            const synthetic = job(rows, targets);
+            const label = `${rows.toLocaleString('en-US')} rows, ${targets} target(s)`;
+            const iterations = rows >= 50_000 ? 2 : 5;
+
+            bench(`${label}, cold`, async () => {
+                forget(synthetic);
+                const result = await processExcelJob(options(synthetic, rows));
+                if (!result.success) throw new Error(result.error);
+            }, { iterations, time: 0, warmupIterations: 1 });
+
+            const sessionId = crypto.randomUUID();
+            bench(`${label}, warm session`, async () => {
+                const result = await processExcelJob(options(synthetic, rows, sessionId));
+                if (!result.success) throw new Error(result.error);
+            }, {
+                iterations,
+                time: 0,
+                warmupIterations: 1,
+                setup: async () => { await processExcelJob(options(synthetic, rows, sessionId)); }
+            });
+        }
+    }
+});
@@ -0,0 +1,86 @@
+// @vitest-environment node
+import { bench, describe, afterAll, vi } from 'vitest';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { AppDatabase, COLLECTIONS } from '../electron/db';
+import { saveGeneratedInvoices, type GeneratedInvoice } from '../electron/services/batch-save';
+import { calculateReconciliationStats } from '../src/utils/reconciliation-engine';
+import { generateInvoicesFromReconciliation } from '../src/utils/invoice-generation-utils';
+import { buildOutputDataset } from '../src/utils/output-dataset';
+import { benchSizes, customerName, syntheticCustomers, syntheticOutput, MASTER_MATERIAL_COL, MASTER_RESULT_COL, MASTER_WEIGHT_COL } from './synthetic-workbooks';
+
+vi.mock('electron', () => ({ app: { getPath: () => '' } }));
+
+/**
+ * The invoice save path behind "Generate invoices": the entries that
+ * generateInvoicesFromReconciliation produces for a synthetic 1k-row job,
+ * saved the way invoice:generateBatch does (invoices, number block and
+ * customer totals in one transaction), into a store that already holds 10k
+ * invoices. One batch per target count.
+ */
+
+const HISTORY = 10_000;
+const ROWS = 1_000;
+const NO_MATCH = 'Not Matched';
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'invoice-save-bench-'));
+
+function seededStore(name: string, customers: any[]): AppDatabase {
+    const db = new AppDatabase(path.join(dir, `${name}.db`), { collections: COLLECTIONS }).open();
+    db.replaceAll({
+        invoices: Array.from({ length: HISTORY }, (_, i) => ({
+            id: `inv-${i}`,
+            number: String(614 + i),
+            status: 'issued',
+            to: { customerId: `cust-${i % 50}`, name: customerName(i % 50) },
+            items: [],
+            total: 0,
+            createdAt: '2026-01-01T00:00:00.000Z',
+            updatedAt: '2026-01-01T00:00:00.000Z'
+        })),
+        customers,
+        products: []
+    });
+    db.compact();
+    return db;
+}
+
+// Entries as generateInvoicesFromReconciliation hands them to invoice:generateBatch
+async function generatedEntries(customers: any[]): Promise<GeneratedInvoice[]> {
+    const { outputFileHeaders, outputFileData } = syntheticOutput(ROWS, customers.length, NO_MATCH);
+    const fileGenConfigs: Record<string, any> = {
+        output: { customerId: null, descriptionColIdx: MASTER_MATERIAL_COL, quantityColIdx: MASTER_WEIGHT_COL, resultColIdx: MASTER_RESULT_COL }
+    };
+    customers.forEach((customer, i) => {
+        fileGenConfigs[customerName(i)] = { customerId: customer.id, descriptionColIdx: -1, quantityColIdx: -1 };
+    });
+    const params = { outputFileHeaders, outputDataset: buildOutputDataset(outputFileData), fileGenConfigs, noMatchLabel: NO_MATCH, customers };
+    const reconciliationResult = calculateReconciliationStats(params);
+
+    let entries: GeneratedInvoice[] = [];
+    await generateInvoicesFromReconciliation(
+        { ...params, reconciliationResult, matchValues: Object.keys(reconciliationResult.groupStats) },
+        async items => {
+            entries = items;
+            return { success: true, results: items.map(() => ({ success: true })) };
+        }
+    );
+    return entries;
+}
+
+afterAll(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+});
+
+describe('invoice save path', async () => {
+    for (const targets of benchSizes().targets) {
+        const customers = syntheticCustomers(targets);
+        const db = seededStore(`targets-${targets}`, customers);
+        const entries = await generatedEntries(customers);
+
+        bench(`${targets} customer(s), ${HISTORY.toLocaleString('en-US')} invoices in history`, () => {
+            // Fresh copies: saving stamps ids and numbers onto the documents
+            saveGeneratedInvoices(db, entries.map(entry => ({ ...entry, invoice: { ...entry.invoice, id: undefined, number: 'DRAFT' } })));
+        });
+    }
+});
@@ -0,0 +1,100 @@
+// @vitest-environment node
+import { bench, describe } from 'vitest';
+import { calculateReconciliationStats } from '../src/utils/reconciliation-engine';
+import { generateInvoicesFromReconciliation } from '../src/utils/invoice-generation-utils';
+import { buildOutputDataset } from '../src/utils/output-dataset';
+import { guessCustomer } from '../src/utils/customer-matching';
+import { getCustomerIndex, guessCustomers } from '../src/utils/customer-index';
+import type { GenerateInvoicesResult } from '../src/types.d';
+import {
+    benchSizes,
+    customerName,
+    syntheticCustomers,
+    syntheticOutput,
+    targetFileName,
+    MASTER_MATERIAL_COL,
+    MASTER_RESULT_COL,
+    MASTER_WEIGHT_COL
+} from './synthetic-workbooks';
+
+/**
+ * Renderer-side stages after matching: the output dataset build,
+ * reconciliation stats and invoice generation over a synthetic matcher
+ * output (every row count x target count), and customer guessing from file
+ * names. Invoice generation saves
+ * into stubs that accept everything, so only the renderer work is timed;
+ * the store side is in invoice-save.bench.ts.
+ */
+
+const NO_MATCH = 'Not Matched';
+const sizes = benchSizes();
+
+const acceptAll = async (items: any[]): Promise<GenerateInvoicesResult> => ({
+    success: true,
+    results: items.map((_, i) => ({ success: true, id: `id-${i}`, number: String(1000 + i) }))
+});
+
+function reconciliationParams(rows: number, targets: number) {
+    const customers = syntheticCustomers(targets);
+    const { outputFileHeaders, outputFileData } = syntheticOutput(rows, targets, NO_MATCH);
+    const fileGenConfigs: Record<string, any> = {
+        output: { customerId: null, descriptionColIdx: MASTER_MATERIAL_COL, quantityColIdx: MASTER_WEIGHT_COL, resultColIdx: MASTER_RESULT_COL }
+    };
+    customers.forEach((customer, i) => {
+        fileGenConfigs[customerName(i)] = { customerId: customer.id, descriptionColIdx: -1, quantityColIdx: -1 };
+    });
+    return { outputFileHeaders, outputDataset: buildOutputDataset(outputFileData), fileGenConfigs, noMatchLabel: NO_MATCH, customers };
+}
+
+describe('buildOutputDataset', () => {
+    for (const rows of sizes.rows) {
+        const { outputFileData } = syntheticOutput(rows, 1, NO_MATCH);
+        bench(`${rows.toLocaleString('en-US')} rows`, () => {
+            buildOutputDataset(outputFileData);
+        });
+    }
+});
+
+describe('calculateReconciliationStats', () => {
+    for (const rows of sizes.rows) {
+        for (const targets of sizes.targets) {
+            const params = reconciliationParams(rows, targets);
+            bench(`${rows.toLocaleString('en-US')} rows, ${targets} customer(s)`, () => {
+                calculateReconciliationStats(params);
+            });
+        }
+    }
+});
+
+describe('generateInvoicesFromReconciliation', () => {
+    for (const rows of sizes.rows) {
+        for (const targets of sizes.targets) {
+            const params = reconciliationParams(rows, targets);
+            const reconciliationResult = calculateReconciliationStats(params);
+            const matchValues = Object.keys(reconciliationResult.groupStats);
+            bench(`${rows.toLocaleString('en-US')} rows, ${targets} customer(s)`, async () => {
+                await generateInvoicesFromReconciliation({ ...params, reconciliationResult, matchValues }, acceptAll);
+            });
+        }
+    }
+});
+
+describe('guessCustomer', () => {
+    const fileNames = Array.from({ length: 50 }, (_, i) => targetFileName(i * 7));
+
+    for (const count of [100, 3_000]) {
+        const customers = syntheticCustomers(count);
+
+        bench(`50 files, ${count.toLocaleString('en-US')} customers, one by one`, () => {
+            for (const fileName of fileNames) guessCustomer(fileName, customers);
+        });
+
+        bench(`50 files, ${count.toLocaleString('en-US')} customers, batch`, () => {
+            guessCustomers(fileNames, customers);
+        });
+
+        bench(`index build, ${count.toLocaleString('en-US')} customers`, () => {
+            getCustomerIndex([...customers]);
+        });
+    }
+});
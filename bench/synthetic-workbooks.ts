@@ -0,0 +1,215 @@
+import fs from 'fs';
+import path from 'path';
+import * as XLSX from 'xlsx';
+import type { Customer } from '../src/types.d';
+
+/**
+ * Deterministic master and customer workbooks for the benchmarks.
+ *
+ * The shapes follow e2e/test-data: a master with a title row, a header on
+ * row 4, 10-digit QPMC tickets in column C, 10mm/20mm material rows, a few
+ * duplicate tickets and a weight total below the data; customer files with
+ * their own title and header, the ticket in column C, a TOTAL row and a
+ * size summary block as footer noise. Each customer file holds a slice of
+ * the master tickets plus tickets the master does not have.
+ *
+ * The same seed always gives the same rows, so timings are comparable
+ * between runs and machines.
+ */
+
+export const MASTER_TICKET_COL = 2;
+export const MASTER_MATERIAL_COL = 4;
+export const MASTER_WEIGHT_COL = 5;
+export const MASTER_RESULT_COL = 10;
+export const TARGET_TICKET_COL = 2;
+
+const FIRST_TICKET = 9002073000;
+const DUPLICATE_EVERY = 200; // One duplicated ticket per 200 master rows
+const UNKNOWN_SHARE = 0.02; // Customer rows whose ticket is not in the master
+const CUSTOMER_WORDS = ['Gulf', 'Readymix', 'Spartan', 'Bin Sraiya', 'Al Kaabi', 'Qatar', 'Stone', 'Trading', 'Falcon', 'Pearl', 'Desert', 'Contracting'];
+
+// Row counts and target counts to run, overridable as BENCH_ROWS=1000,50000,500000 and BENCH_TARGETS=1,10,50
+export function benchSizes(): { rows: number[]; targets: number[] } {
+    const list = (value: string | undefined, fallback: number[]) =>
+        value ? value.split(',').map(Number).filter(n => Number.isFinite(n) && n > 0) : fallback;
+    return {
+        rows: list(process.env.BENCH_ROWS, [1_000, 50_000]),
+        targets: list(process.env.BENCH_TARGETS, [1, 10, 50])
+    };
+}
+
+// mulberry32: small, fast and identical on every platform
+export function seededRandom(seed: number): () => number {
+    let state = seed >>> 0;
+    return () => {
+        state = (state + 0x6d2b79f5) >>> 0;
+        let t = state;
+        t = Math.imul(t ^ (t >>> 15), t | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+}
+
+export function customerName(index: number): string {
+    const first = CUSTOMER_WORDS[index % CUSTOMER_WORDS.length];
+    const second = CUSTOMER_WORDS[Math.floor(index / CUSTOMER_WORDS.length) % CUSTOMER_WORDS.length];
+    return first === second ? `${first} ${index}` : `${first} ${second} ${index}`;
+}
+
+export function syntheticCustomers(count: number): Customer[] {
+    return Array.from({ length: count }, (_, i) => ({
+        id: `cust-${i}`,
+        name: customerName(i),
+        address: 'Industrial Area, Doha',
+        total20mm: 0,
+        total10mm: 0,
+        createdAt: '2026-01-01T00:00:00.000Z',
+        updatedAt: '2026-01-01T00:00:00.000Z'
+    }));
+}
+
+export interface MasterSheet {
+    rows: any[][];
+    tickets: string[]; // In row order, duplicates included
+}
+
+export function generateMasterRows(rowCount: number, seed: number = 1): MasterSheet {
+    const random = seededRandom(seed);
+    const rows: any[][] = [
+        [],
+        ['', '', '', '', 'BLKHADEM -Reconciled -Deliveries for ALSHAM Period -(11-18) -Jan-2026'],
+        [],
+        ['Serial No', 'Truck No', 'Yard Ticket No', 'Receipts', 'Material Description', 'Net Weight', 'Date Format', 'Client', 'ALSHAM CUSTOMER', 'Vessel Name', 'Result']
+    ];
+    const tickets: string[] = [];
+    let ticket = FIRST_TICKET;
+    let totalWeight = 0;
+
+    for (let i = 0; i < rowCount; i++) {
+        ticket += 1 + Math.floor(random() * 20);
+        const value = i > 0 && i % DUPLICATE_EVERY === 0 ? tickets[i - 1] : String(ticket);
+        const weight = Math.round((27 + random() * 2.5) * 100) / 100;
+        totalWeight += weight;
+        tickets.push(value);
+        rows.push([
+            i + 1,
+            String(10000 + Math.floor(random() * 280000)),
+            value,
+            String(150000 + Math.floor(random() * 10000)),
+            random() < 0.4 ? '10mm' : '20mm',
+            weight,
+            46033 + Math.floor(i / Math.max(1, rowCount / 8)),
+            'ALSHAM',
+            '',
+            'MV LEYA'
+        ]);
+    }
+    rows.push([], ['', '', '', '', '', Math.round(totalWeight * 100) / 100]);
+    return { rows, tickets };
+}
+
+// One customer file per target: a contiguous share of the master tickets plus unknown ones
+export function generateTargetRows(tickets: string[], targetCount: number, targetIndex: number, seed: number = 1): any[][] {
+    const random = seededRandom(seed * 7919 + targetIndex);
+    const share = Math.ceil(tickets.length / targetCount);
+    const own = tickets.slice(targetIndex * share, (targetIndex + 1) * share);
+    const name = customerName(targetIndex).toUpperCase();
+    const rows: any[][] = [
+        [],
+        ['', '', name, `${own.length} TRIP`],
+        [],
+        ['SL NO', 'DATE RECEIVED', 'QPMC TICKET ', 'VEHICLE NO', 'MATERIALS', 'TON', 'UOM', 'SUPPLIER', 'TRANSPORT CO']
+    ];
+
+    let total10 = 0;
+    let total20 = 0;
+    let trips10 = 0;
+    own.forEach((masterTicket, i) => {
+        const unknown = random() < UNKNOWN_SHARE;
+        const material = random() < 0.4 ? '10mm' : '20mm';
+        const weight = Math.round((27 + random() * 2.5) * 100) / 100;
+        if (material === '10mm') {
+            total10 += weight;
+            trips10++;
+        } else {
+            total20 += weight;
+        }
+        rows.push([
+            i + 1,
+            46033,
+            unknown ? String(8000000000 + Math.floor(random() * 999999999)) : masterTicket,
+            String(10000 + Math.floor(random() * 280000)),
+            material,
+            weight,
+            'TON',
+            'AL SHAM',
+            'MJK TRANSPORT CO'
+        ]);
+    });
+
+    const total = total10 + total20;
+    rows.push(
+        ['', '', 'TOTAL', '', 'Total', Math.round(total * 100) / 100],
+        [],
+        ['', '', '', name],
+        ['', '', 'Size', 'Qty', 'Percentage', 'No of Trip'],
+        ['', '', '10 mm', Math.round(total10 * 100) / 100, total > 0 ? total10 / total : 0, trips10],
+        ['', '', '20 mm', Math.round(total20 * 100) / 100, total > 0 ? total20 / total : 0, own.length - trips10],
+        ['', '', '', Math.round(total * 100) / 100, '', own.length]
+    );
+    return rows;
+}
+
+// File name shaped like the real ones, with the customer name somewhere in the middle
+export function targetFileName(targetIndex: number): string {
+    return `${targetIndex + 1}-${customerName(targetIndex)} - ${100 + targetIndex} Trip Grand Total - Jan 2026.xlsx`;
+}
+
+export interface SyntheticJob {
+    dir: string;
+    masterPath: string;
+    targetPaths: string[];
+    tickets: string[];
+}
+
+function writeRows(filePath: string, rows: any[][]) {
+    const workbook = XLSX.utils.book_new();
+    XLSX.utils.book_append_sheet(workbook, XLSX.utils.aoa_to_sheet(rows), 'Sheet1');
+    XLSX.writeFile(workbook, filePath);
+}
+
+// Write a master and its customer files into `dir` (created if needed)
+export function writeSyntheticJob(dir: string, rowCount: number, targetCount: number, seed: number = 1): SyntheticJob {
+    fs.mkdirSync(dir, { recursive: true });
+    const master = generateMasterRows(rowCount, seed);
+    const masterPath = path.join(dir, `master-${rowCount}.xlsx`);
+    writeRows(masterPath, master.rows);
+
+    const targetPaths = Array.from({ length: targetCount }, (_, i) => {
+        const targetPath = path.join(dir, targetFileName(i));
+        writeRows(targetPath, generateTargetRows(master.tickets, targetCount, i, seed));
+        return targetPath;
+    });
+    return { dir, masterPath, targetPaths, tickets: master.tickets };
+}
+
+/**
+ * The matcher output a processed job would show: master rows with the result
+ * column filled with the customer of each target (or the no-match label).
+ */
+export function syntheticOutput(rowCount: number, targetCount: number, noMatchLabel: string, seed: number = 1) {
+    const random = seededRandom(seed * 31);
+    const { rows } = generateMasterRows(rowCount, seed);
+    const header = rows[3];
+    const data = [header, ...rows.slice(4, 4 + rowCount).map((row, i) => {
+        const copy = row.slice();
+        copy[MASTER_RESULT_COL] = random() < 0.05
+            ? noMatchLabel
+            : customerName(Math.min(targetCount - 1, Math.floor(i / Math.ceil(rowCount / targetCount))));
+        return copy;
+    })];
+    return {
+        outputFileHeaders: header.map((name: string, index: number) => ({ name, index })),
+        outputFileData: data
+    };
+}
@@ -0,0 +1,98 @@
+import path from 'path';
+import { loadJobSpec } from './services/batch-spec';
+import { BatchJobRunner, BatchQueue, BatchRunSummary, DEFAULT_WATCH_DEBOUNCE_MS, watchBatchJob } from './services/batch-runner';
+import { shutdownExcelPool } from './services/excel-pool';
+
+/**
+ * Headless batch matching, without a window.
+ *
+ *   npm run batch -- <spec.json...> [--watch] [--concurrency 1] [--debounce 2000]
+ *
+ * Runs every job spec once (see services/batch-spec.ts for the format). With
+ * --watch it keeps running and re-runs a job whenever its master or one of its
+ * target files is added or changed. Each run writes its outputs and a
+ * `<master>_summary.json` to a new run folder under the spec's outputDir.
+ * Exits with 1 when a run failed, 2 on bad arguments or specs.
+ */
+
+const USAGE = 'Usage: batch <spec.json...> [--watch] [--concurrency 1] [--debounce 2000]';
+
+function parseArgs(argv: string[]) {
+    const specs: string[] = [];
+    let watch = false;
+    let concurrency = 1;
+    let debounceMs = DEFAULT_WATCH_DEBOUNCE_MS;
+    for (let i = 0; i < argv.length; i++) {
+        const arg = argv[i];
+        if (arg === '--watch') {
+            watch = true;
+        } else if (arg === '--concurrency' || arg === '--debounce') {
+            const value = Number(argv[++i]);
+            if (!Number.isInteger(value) || value < (arg === '--concurrency' ? 1 : 0)) throw new Error(`${arg} needs a whole number`);
+            if (arg === '--concurrency') concurrency = value;
+            else debounceMs = value;
+        } else if (arg.startsWith('--')) {
+            throw new Error(`Unknown option ${arg}`);
+        } else {
+            specs.push(arg);
+        }
+    }
+    if (specs.length === 0) throw new Error('No job spec given');
+    return { specs, watch, concurrency, debounceMs };
+}
+
+function report(summary: BatchRunSummary): void {
+    const label = `[Batch] ${summary.job} run-${summary.runId} (${summary.trigger})`;
+    if (!summary.success) {
+        console.error(`${label} failed: ${summary.error}`);
+        return;
+    }
+    const { stats, session, timings } = summary;
+    const reused = session && session.targetsReused > 0 ? `, ${session.targetsReused} reused` : '';
+    console.log(`${label} ${stats!.matchedMasterRows}/${stats!.totalMasterRows} rows matched (${stats!.matchPercentage}%) ` +
+        `from ${summary.perFile.length} files${reused} in ${(timings.totalMs / 1000).toFixed(1)}s -> ${path.relative(process.cwd(), summary.outputs.dir) || '.'}`);
+    for (const warning of summary.warnings) console.warn(`[Batch]   ${warning}`);
+}
+
+async function main(): Promise<number> {
+    let args: ReturnType<typeof parseArgs>;
+    let runners: BatchJobRunner[];
+    try {
+        args = parseArgs(process.argv.slice(2));
+        runners = args.specs.map(specPath => new BatchJobRunner(loadJobSpec(specPath)));
+    } catch (e: any) {
+        console.error(e.message);
+        console.error(USAGE);
+        return 2;
+    }
+
+    const queue = new BatchQueue(args.concurrency);
+    let failed = false;
+    const onRun = (summary: BatchRunSummary) => {
+        if (!summary.success) failed = true;
+        report(summary);
+    };
+    const onError = (error: Error) => console.error(`[Batch] ${error.message}`);
+
+    await Promise.all(runners.map(runner => queue.submit(runner, { trigger: 'initial' }).then(onRun, onError)));
+    if (!args.watch) {
+        await shutdownExcelPool();
+        return failed ? 1 : 0;
+    }
+
+    const stops = runners.map(runner => watchBatchJob(runner, queue, { debounceMs: args.debounceMs, onRun, onError }));
+    console.log(`[Batch] Watching ${runners.length} job(s), Ctrl+C to stop`);
+    await new Promise<void>(resolve => {
+        process.once('SIGINT', resolve);
+        process.once('SIGTERM', resolve);
+    });
+    stops.forEach(stop => stop());
+    await queue.onIdle();
+    await shutdownExcelPool();
+    return 0;
+}
+
+main().then(code => { process.exitCode = code; }, error => {
+    console.error(error);
+    process.exitCode = 1;
+});
@@ -0,0 +1,71 @@
+import { app } from 'electron';
+import crypto from 'crypto';
+import fs from 'fs';
+import Module, { createRequire } from 'module';
+import path from 'path';
+import vm from 'vm';
+
+/**
+ * Entry point of the main process (package.json "main"): loads main.js.
+ *
+ * With FATOORA_CODE_CACHE=1, main.js is compiled with a V8 code cache kept
+ * in the user data folder, so later starts skip parsing and compiling most of
+ * the bundle. The cache is written once the app has been up for a while
+ * (so it includes the functions startup actually ran) and is keyed by the
+ * bundle contents and the Electron/V8 version; a stale or rejected cache is
+ * simply replaced.
+ */
+
+// Written this long after the app is ready, once the first window and the deferred startup work have run
+const CACHE_WRITE_DELAY_MS = 10_000;
+
+const mainPath = path.join(__dirname, 'main.js');
+
+function loadWithCodeCache(): void {
+    const source = fs.readFileSync(mainPath, 'utf-8');
+    const key = crypto.createHash('sha1')
+        .update(source)
+        .update(process.versions.electron || '')
+        .update(process.versions.v8)
+        .digest('hex')
+        .slice(0, 16);
+    const cacheDir = path.join(app.getPath('userData'), 'code-cache');
+    const cachePath = path.join(cacheDir, `main-${key}.bin`);
+
+    let cachedData: Buffer | undefined;
+    try {
+        cachedData = fs.readFileSync(cachePath);
+    } catch {
+        // First start with this bundle
+    }
+
+    const script = new vm.Script(Module.wrap(source), { filename: mainPath, cachedData });
+    const hit = !!cachedData && !script.cachedDataRejected;
+    console.log(`[Startup] code cache ${hit ? 'used' : cachedData ? 'rejected' : 'missing'}`);
+
+    if (!hit) {
+        app.whenReady().then(() => setTimeout(() => {
+            try {
+                fs.mkdirSync(cacheDir, { recursive: true });
+                // Older caches belong to previous builds
+                for (const name of fs.readdirSync(cacheDir)) {
+                    if (name.startsWith('main-') && name !== path.basename(cachePath)) fs.rmSync(path.join(cacheDir, name), { force: true });
+                }
+                fs.writeFileSync(cachePath, script.createCachedData());
+            } catch (e) {
+                console.error('[Startup] Could not write code cache:', e);
+            }
+        }, CACHE_WRITE_DELAY_MS));
+    }
+
+    const mainModule = new Module(mainPath, module);
+    mainModule.filename = mainPath;
+    const compiled = script.runInThisContext();
+    compiled.call(mainModule.exports, mainModule.exports, createRequire(mainPath), mainModule, mainPath, __dirname);
+}
+
+if (process.env.FATOORA_CODE_CACHE === '1') {
+    loadWithCodeCache();
+} else {
+    require(mainPath);
+}
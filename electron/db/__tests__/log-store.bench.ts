@@ -0,0 +1,58 @@
+// @vitest-environment node
+import { bench, describe, afterAll } from 'vitest';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { AppDatabase, COLLECTIONS } from '../index';
+
+/**
+ * Save latency against history size: one invoice:save-shaped transaction
+ * (number bump + invoice put, fdatasync on) with 1k, 10k and 50k invoices
+ * already in the store. Run with `npm run bench`.
+ */
+
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'log-store-bench-'));
+
+function invoice(i: number) {
+    return {
+        id: `inv-${i}`,
+        number: String(614 + i),
+        status: i % 3 === 0 ? 'paid' : 'issued',
+        date: '2026-01-01T00:00:00.000Z',
+        dueDate: '2026-02-01',
+        to: { customerId: `cust-${i % 200}`, name: `Customer ${i % 200}` },
+        items: [{ id: `item-${i}`, description: 'Gabbro 20mm', quantity: 25.5, unitPrice: 30, amount: 765, type: '20mm' }],
+        subtotal: 765,
+        tax: 0,
+        total: 765,
+        currency: 'QAR',
+        createdAt: '2026-01-01T00:00:00.000Z',
+        updatedAt: '2026-01-01T00:00:00.000Z',
+    };
+}
+
+function seededStore(history: number): AppDatabase {
+    const db = new AppDatabase(path.join(dir, `history-${history}.db`), { collections: COLLECTIONS }).open();
+    db.replaceAll({ invoices: Array.from({ length: history }, (_, i) => invoice(i)), customers: [], products: [] });
+    db.compact();
+    return db;
+}
+
+afterAll(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+});
+
+describe('invoice save latency', () => {
+    for (const history of [1_000, 10_000, 50_000]) {
+        const db = seededStore(history);
+        let next = history;
+
+        bench(`save with ${history.toLocaleString('en-US')} invoices in history`, () => {
+            const doc = invoice(next++);
+            db.transaction(tx => {
+                tx.setMeta('lastInvoiceNumber', db.lastInvoiceNumber + 1);
+                tx.put('invoices', doc);
+            });
+        });
+    }
+});
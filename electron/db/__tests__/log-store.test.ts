@@ -0,0 +1,141 @@
+// @vitest-environment node
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { LogStore } from '../log-store';
+import { openDatabase } from '../index';
+
+vi.mock('electron', () => ({ app: { getPath: () => '' } }));
+
+const collections = [
+    { name: 'invoices', indexes: [{ name: 'status', key: (inv: any) => inv.status || null }] },
+    { name: 'customers' },
+];
+
+describe('LogStore', () => {
+    let dir: string;
+    let file: string;
+
+    beforeEach(() => {
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'log-store-'));
+        file = path.join(dir, 'test.db');
+    });
+
+    afterEach(() => {
+        fs.rmSync(dir, { recursive: true, force: true });
+    });
+
+    it('persists transactions and maintains secondary indexes', () => {
+        const store = new LogStore(file, { collections, durable: false }).open();
+        store.transaction(tx => {
+            tx.put('invoices', { id: 'a', status: 'issued' });
+            tx.put('invoices', { id: 'b', status: 'issued' });
+            tx.setMeta('lastInvoiceNumber', 615);
+        });
+        store.transaction(tx => tx.put('invoices', { id: 'a', status: 'paid' }));
+        store.transaction(tx => tx.delete('invoices', 'b'));
+        store.close();
+
+        const reopened = new LogStore(file, { collections, durable: false }).open();
+        const invoices = reopened.collection('invoices');
+        expect(invoices.size).toBe(1);
+        expect(invoices.find('status', 'paid').map(i => i.id)).toEqual(['a']);
+        expect(invoices.count('status', 'issued')).toBe(0);
+        expect(reopened.getMeta('lastInvoiceNumber')).toBe(615);
+        reopened.close();
+    });
+
+    it('applies nothing when a transaction throws', () => {
+        const store = new LogStore(file, { collections, durable: false }).open();
+        expect(() => store.transaction(tx => {
+            tx.put('customers', { id: 'c' });
+            throw new Error('boom');
+        })).toThrow('boom');
+        expect(() => store.transaction(tx => tx.put('unknown', { id: 'x' }))).toThrow();
+        expect(store.collection('customers').size).toBe(0);
+        store.close();
+    });
+
+    it('drops a torn last record on open', () => {
+        const store = new LogStore(file, { collections, durable: false }).open();
+        store.transaction(tx => tx.put('customers', { id: 'c1' }));
+        store.close();
+        fs.appendFileSync(file, '{"ops":[["put","customers",{"id":"c2"');
+
+        const reopened = new LogStore(file, { collections, durable: false }).open();
+        expect(reopened.collection('customers').all().map(c => c.id)).toEqual(['c1']);
+        reopened.transaction(tx => tx.put('customers', { id: 'c3' }));
+        reopened.close();
+
+        const again = new LogStore(file, { collections, durable: false }).open();
+        expect(again.collection('customers').size).toBe(2);
+        again.close();
+    });
+
+    it('finishes short writes and cuts off a failed append', () => {
+        const store = new LogStore(file, { collections, durable: false }).open();
+        const realWrite = fs.writeSync;
+        const halfWrite = (fd: number, buffer: Buffer, offset: number, length: number) => realWrite(fd, buffer, offset, Math.ceil(length / 2));
+        const write = vi.spyOn(fs, 'writeSync') as any;
+
+        write.mockImplementationOnce(halfWrite);
+        store.transaction(tx => tx.put('customers', { id: 'c1' }));
+
+        write.mockImplementationOnce(halfWrite).mockImplementationOnce(() => {
+            throw Object.assign(new Error('ENOSPC: no space left on device, write'), { code: 'ENOSPC' });
+        });
+        expect(() => store.transaction(tx => tx.put('customers', { id: 'c2' }))).toThrow('ENOSPC');
+        expect(store.collection('customers').has('c2')).toBe(false);
+        write.mockRestore();
+
+        store.transaction(tx => tx.put('customers', { id: 'c3' }));
+        store.close();
+
+        const reopened = new LogStore(file, { collections, durable: false }).open();
+        expect(reopened.collection('customers').all().map(c => c.id)).toEqual(['c1', 'c3']);
+        reopened.close();
+    });
+
+    it('compacts the log to the live state', () => {
+        const store = new LogStore(file, { collections, durable: false }).open();
+        for (let i = 0; i < 50; i++) {
+            store.transaction(tx => tx.put('customers', { id: 'same', revision: i }));
+        }
+        const before = fs.statSync(file).size;
+        store.compact();
+        expect(fs.statSync(file).size).toBeLessThan(before / 10);
+        store.close();
+
+        const reopened = new LogStore(file, { collections, durable: false }).open();
+        expect(reopened.collection('customers').get('same')).toEqual({ id: 'same', revision: 49 });
+        reopened.close();
+    });
+});
+
+describe('openDatabase', () => {
+    it('migrates an existing db.json once and keeps it as a backup', () => {
+        const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'app-db-'));
+        const legacy = path.join(dir, 'db.json');
+        fs.writeFileSync(legacy, JSON.stringify({
+            customers: [{ id: 'c1', name: 'Acme' }],
+            invoices: [{ id: 'i1', number: '700', status: 'issued', dueDate: '2026-01-31T00:00:00.000Z', to: { customerId: 'c1' } }],
+            products: [],
+            bankingDetails: { bankName: 'QNB' },
+            lastInvoiceNumber: 700,
+        }));
+
+        try {
+            const db = openDatabase(path.join(dir, 'fatoora.db'), legacy);
+            expect(fs.existsSync(`${legacy}.migrated`)).toBe(true);
+            expect(db.invoices.find('number', '700')).toHaveLength(1);
+            expect(db.invoices.find('dueDate', '2026-01-31')).toHaveLength(1);
+            expect(db.invoices.count('customer', 'c1')).toBe(1);
+            expect(db.lastInvoiceNumber).toBe(700);
+            expect(db.bankingDetails).toEqual({ bankName: 'QNB' });
+            db.close();
+        } finally {
+            fs.rmSync(dir, { recursive: true, force: true });
+        }
+    });
+});
@@ -2,70 +2,154 @@ import { app } from 'electron';
 import path from 'path';
 import fs from 'fs';
 import crypto from 'crypto';
+import { LogStore, CollectionDefinition } from './log-store';
+import { extractDateString } from '../utils/invoice-utils';
 
-let dbInstance: any = null;
+export const DEFAULT_LAST_INVOICE_NUMBER = 613; // Start from 613 so next is 614
 
-export async function getDB() {
-    // Dynamic import for ESM-only package
-    // @ts-ignore
-    const { JSONFilePreset } = (await import('lowdb/node')) as any;
-    const dbPath = path.join(app.getPath('userData'), 'db.json');
+const STORE_FILE = 'fatoora.db';
+const LEGACY_DB_FILE = 'db.json';
 
-    // Always re-initialize to ensure fresh read from disk, or call read()
-    // Using JSONFilePreset will read from disk.
-    // Electron main process is single threaded, so memory should be consistent.
+export const COLLECTIONS: CollectionDefinition[] = [
+    {
+        name: 'invoices',
+        indexes: [
+            { name: 'number', key: (inv: any) => inv.number !== undefined && inv.number !== null ? String(inv.number) : null },
+            { name: 'status', key: (inv: any) => inv.status || null },
+            { name: 'dueDate', key: (inv: any) => inv.dueDate ? extractDateString(String(inv.dueDate)) : null },
+            { name: 'customer', key: (inv: any) => inv.to?.customerId || null }
+        ]
+    },
+    { name: 'customers' },
+    { name: 'products' }
+];
 
-    if (!dbInstance) {
-        dbInstance = await JSONFilePreset(dbPath, {
-            customers: [],
-            invoices: [],
-            products: [],
-            bankingDetails: null,
-            lastInvoiceNumber: 613 // Start from 613 so next is 614
-        });
+// Shape of db.json and of backup files
+export interface DatabaseSnapshot {
+    customers: any[];
+    invoices: any[];
+    products: any[];
+    bankingDetails: any;
+    lastInvoiceNumber: number;
+}
+
+export class AppDatabase extends LogStore {
+    get invoices() {
+        return this.collection('invoices');
+    }
+
+    get customers() {
+        return this.collection('customers');
+    }
+
+    get products() {
+        return this.collection('products');
+    }
 
-        // ONE-TIME CLEANUP (Deleting old JSON files and folders)
-        try {
-            const oldCustomersDir = path.join(app.getPath('userData'), 'customers');
-            const oldInvoicesDir = path.join(app.getPath('userData'), 'invoices');
+    get bankingDetails(): any {
+        return this.getMeta('bankingDetails', null);
+    }
+
+    get lastInvoiceNumber(): number {
+        const last = this.getMeta<number>('lastInvoiceNumber');
+        return typeof last === 'number' ? last : DEFAULT_LAST_INVOICE_NUMBER;
+    }
+
+    exportData(): DatabaseSnapshot {
+        return {
+            customers: this.customers.all(),
+            invoices: this.invoices.all(),
+            products: this.products.all(),
+            bankingDetails: this.bankingDetails,
+            lastInvoiceNumber: this.lastInvoiceNumber
+        };
+    }
 
-            if (fs.existsSync(oldCustomersDir)) {
-                fs.rmSync(oldCustomersDir, { recursive: true, force: true });
+    // Replace everything in one transaction (restore, migration)
+    replaceAll(data: Partial<DatabaseSnapshot>) {
+        this.transaction(tx => {
+            for (const name of ['customers', 'invoices', 'products'] as const) {
+                tx.clear(name);
+                for (const doc of data[name] ?? []) {
+                    if (doc && doc.id) tx.put(name, doc);
+                }
             }
-            if (fs.existsSync(oldInvoicesDir)) {
-                fs.rmSync(oldInvoicesDir, { recursive: true, force: true });
+            tx.setMeta('bankingDetails', data.bankingDetails ?? null);
+            if (typeof data.lastInvoiceNumber === 'number') {
+                tx.setMeta('lastInvoiceNumber', data.lastInvoiceNumber);
             }
-        } catch (e) {
-            console.error("Cleanup error:", e);
-        }
-    } else {
-        await dbInstance.read();
+        });
     }
+}
 
-    // Ensure baseline products exist (UI removed, but domain types rely on these)
-    if (!Array.isArray(dbInstance.data.products) || dbInstance.data.products.length === 0) {
-        dbInstance.data.products = [
-            {
-                id: crypto.randomUUID(),
-                name: '20mm Gabbro',
-                description: 'Gabbro aggregate 20mm',
-                rate: 0,
-                type: '20mm',
-                createdAt: new Date().toISOString(),
-                updatedAt: new Date().toISOString(),
-            },
-            {
-                id: crypto.randomUUID(),
-                name: '10mm Gabbro',
-                description: 'Gabbro aggregate 10mm',
-                rate: 0,
-                type: '10mm',
-                createdAt: new Date().toISOString(),
-                updatedAt: new Date().toISOString(),
-            }
-        ];
-        await dbInstance.write();
+let dbInstance: AppDatabase | null = null;
+
+export function openDatabase(filePath: string, legacyPath?: string): AppDatabase {
+    const db = new AppDatabase(filePath, { collections: COLLECTIONS }).open();
+
+    // ONE-TIME MIGRATION from the lowdb db.json; the old file is kept alongside as a backup
+    if (db.isNew && legacyPath && fs.existsSync(legacyPath)) {
+        const data = JSON.parse(fs.readFileSync(legacyPath, 'utf-8'));
+        db.replaceAll(data);
+        db.compact();
+        fs.renameSync(legacyPath, `${legacyPath}.migrated`);
+        console.log(`[DB] Migrated ${db.invoices.size} invoices and ${db.customers.size} customers from ${LEGACY_DB_FILE}`);
     }
 
+    return db;
+}
+
+export async function getDB(): Promise<AppDatabase> {
+    if (!dbInstance) {
+        const userData = app.getPath('userData');
+        dbInstance = openDatabase(path.join(userData, STORE_FILE), path.join(userData, LEGACY_DB_FILE));
+    }
+
+    ensureBaselineProducts(dbInstance);
     return dbInstance;
 }
+
+// ONE-TIME CLEANUP (Deleting old JSON files and folders). Nothing reads them, so it runs after the window is shown
+export function cleanupLegacyData() {
+    try {
+        const userData = app.getPath('userData');
+        const oldCustomersDir = path.join(userData, 'customers');
+        const oldInvoicesDir = path.join(userData, 'invoices');
+
+        if (fs.existsSync(oldCustomersDir)) {
+            fs.rmSync(oldCustomersDir, { recursive: true, force: true });
+        }
+        if (fs.existsSync(oldInvoicesDir)) {
+            fs.rmSync(oldInvoicesDir, { recursive: true, force: true });
+        }
+    } catch (e) {
+        console.error("Cleanup error:", e);
+    }
+}
+
+// Ensure baseline products exist (UI removed, but domain types rely on these)
+function ensureBaselineProducts(db: AppDatabase) {
+    if (db.products.size > 0) return;
+
+    const now = new Date().toISOString();
+    db.transaction(tx => {
+        tx.put('products', {
+            id: crypto.randomUUID(),
+            name: '20mm Gabbro',
+            description: 'Gabbro aggregate 20mm',
+            rate: 0,
+            type: '20mm',
+            createdAt: now,
+            updatedAt: now,
+        });
+        tx.put('products', {
+            id: crypto.randomUUID(),
+            name: '10mm Gabbro',
+            description: 'Gabbro aggregate 10mm',
+            rate: 0,
+            type: '10mm',
+            createdAt: now,
+            updatedAt: now,
+        });
+    });
+}
@@ -0,0 +1,387 @@
+import fs from 'fs';
+import path from 'path';
+
+/**
+ * Embedded document store backed by an append-only log.
+ *
+ * Every transaction is appended to the log as one JSON line and applied to
+ * in-memory collections, so a save costs one small append no matter how much
+ * history the store holds. Collections keep a primary index on id plus any
+ * secondary indexes declared for them.
+ *
+ * A torn last line (crash mid-append) is dropped on open, which makes each
+ * transaction all-or-nothing. When the log has grown well past the live data
+ * it is compacted: the current state is written to a temp file that replaces
+ * the log with a rename.
+ */
+
+export interface IndexDefinition {
+    name: string;
+    key: (doc: any) => string | null | undefined;
+}
+
+export interface CollectionDefinition {
+    name: string;
+    indexes?: IndexDefinition[];
+}
+
+export interface LogStoreOptions {
+    collections: CollectionDefinition[];
+    // fdatasync after every transaction (default true)
+    durable?: boolean;
+    // Compact once the log exceeds this size and twice its size after the last compaction
+    compactMinBytes?: number;
+}
+
+// Called after a document is added/replaced (next set) or removed (next undefined)
+export type CollectionObserver<T> = (previous: T | undefined, next: T | undefined) => void;
+
+type LogOp =
+    | ['put', string, any]
+    | ['del', string, string]
+    | ['clear', string]
+    | ['meta', string, any];
+
+const DEFAULT_COMPACT_MIN_BYTES = 4 * 1024 * 1024;
+const SNAPSHOT_CHUNK = 500; // Documents per line when compacting
+
+// fs.writeSync may write fewer bytes than asked; keep going until the whole record is out
+function writeFully(fd: number, data: string): number {
+    const buffer = Buffer.from(data);
+    let written = 0;
+    while (written < buffer.length) {
+        written += fs.writeSync(fd, buffer, written, buffer.length - written);
+    }
+    return buffer.length;
+}
+
+export class Collection<T extends { id: string } = any> {
+    readonly name: string;
+    private docs = new Map<string, T>();
+    private indexes = new Map<string, { key: IndexDefinition['key']; postings: Map<string, Set<string>> }>();
+    private observers: CollectionObserver<T>[] = [];
+
+    constructor(definition: CollectionDefinition) {
+        this.name = definition.name;
+        for (const index of definition.indexes ?? []) {
+            this.indexes.set(index.name, { key: index.key, postings: new Map() });
+        }
+    }
+
+    get size(): number {
+        return this.docs.size;
+    }
+
+    get(id: string): T | undefined {
+        return this.docs.get(id);
+    }
+
+    has(id: string): boolean {
+        return this.docs.has(id);
+    }
+
+    // Documents in insertion order. Treat them as read-only; change them through a transaction.
+    all(): T[] {
+        return Array.from(this.docs.values());
+    }
+
+    find(indexName: string, value: string): T[] {
+        const ids = this.postings(indexName).get(value);
+        if (!ids) return [];
+        const docs: T[] = [];
+        for (const id of ids) docs.push(this.docs.get(id)!);
+        return docs;
+    }
+
+    // Ids with the given index value; do not mutate the returned set
+    ids(indexName: string, value: string): ReadonlySet<string> | undefined {
+        return this.postings(indexName).get(value);
+    }
+
+    count(indexName: string, value: string): number {
+        return this.postings(indexName).get(value)?.size ?? 0;
+    }
+
+    // Distinct values of a secondary index
+    values(indexName: string): string[] {
+        return Array.from(this.postings(indexName).keys());
+    }
+
+    // Derived indexes living outside the store (query orders, aggregates) follow changes through observers
+    observe(observer: CollectionObserver<T>): () => void {
+        this.observers.push(observer);
+        return () => {
+            this.observers = this.observers.filter(o => o !== observer);
+        };
+    }
+
+    applyPut(doc: T) {
+        const previous = this.docs.get(doc.id);
+        if (previous) this.unindex(previous);
+        this.docs.set(doc.id, doc);
+        for (const { key, postings } of this.indexes.values()) {
+            const value = key(doc);
+            if (value === null || value === undefined) continue;
+            let ids = postings.get(value);
+            if (!ids) {
+                ids = new Set();
+                postings.set(value, ids);
+            }
+            ids.add(doc.id);
+        }
+        for (const observer of this.observers) observer(previous, doc);
+    }
+
+    applyDelete(id: string): boolean {
+        const previous = this.docs.get(id);
+        if (!previous) return false;
+        this.unindex(previous);
+        this.docs.delete(id);
+        for (const observer of this.observers) observer(previous, undefined);
+        return true;
+    }
+
+    applyClear() {
+        const removed = this.observers.length > 0 ? this.all() : [];
+        this.docs.clear();
+        for (const index of this.indexes.values()) index.postings.clear();
+        for (const doc of removed) {
+            for (const observer of this.observers) observer(doc, undefined);
+        }
+    }
+
+    private unindex(doc: T) {
+        for (const { key, postings } of this.indexes.values()) {
+            const value = key(doc);
+            if (value === null || value === undefined) continue;
+            const ids = postings.get(value);
+            if (!ids) continue;
+            ids.delete(doc.id);
+            if (ids.size === 0) postings.delete(value);
+        }
+    }
+
+    private postings(indexName: string) {
+        const index = this.indexes.get(indexName);
+        if (!index) throw new Error(`Unknown index ${this.name}.${indexName}`);
+        return index.postings;
+    }
+}
+
+export class Transaction {
+    readonly ops: LogOp[] = [];
+
+    put(collection: string, doc: { id: string }) {
+        if (!doc || typeof doc.id !== 'string' || !doc.id) throw new Error(`Document in ${collection} needs an id`);
+        this.ops.push(['put', collection, doc]);
+    }
+
+    delete(collection: string, id: string) {
+        this.ops.push(['del', collection, id]);
+    }
+
+    clear(collection: string) {
+        this.ops.push(['clear', collection]);
+    }
+
+    setMeta(key: string, value: any) {
+        this.ops.push(['meta', key, value ?? null]);
+    }
+}
+
+export class LogStore {
+    readonly filePath: string;
+    private collections = new Map<string, Collection>();
+    private meta = new Map<string, any>();
+    private fd: number | null = null;
+    private durable: boolean;
+    private compactMinBytes: number;
+    private logBytes = 0;
+    private compactedBytes = 0;
+    private compactionScheduled = false;
+
+    constructor(filePath: string, options: LogStoreOptions) {
+        this.filePath = filePath;
+        this.durable = options.durable ?? true;
+        this.compactMinBytes = options.compactMinBytes ?? DEFAULT_COMPACT_MIN_BYTES;
+        for (const definition of options.collections) {
+            this.collections.set(definition.name, new Collection(definition));
+        }
+    }
+
+    get isNew(): boolean {
+        return this.logBytes === 0;
+    }
+
+    open(): this {
+        fs.mkdirSync(path.dirname(this.filePath), { recursive: true });
+        if (fs.existsSync(this.filePath)) this.load();
+        this.fd = fs.openSync(this.filePath, 'a');
+        this.compactedBytes = this.logBytes;
+        return this;
+    }
+
+    close() {
+        if (this.fd !== null) {
+            fs.closeSync(this.fd);
+            this.fd = null;
+        }
+    }
+
+    collection<T extends { id: string } = any>(name: string): Collection<T> {
+        const collection = this.collections.get(name);
+        if (!collection) throw new Error(`Unknown collection ${name}`);
+        return collection as Collection<T>;
+    }
+
+    getMeta<T = any>(key: string, fallback?: T): T {
+        return this.meta.has(key) ? this.meta.get(key) : fallback as T;
+    }
+
+    /**
+     * Run fn, then persist its operations as one log record and apply them.
+     * fn must be synchronous; reads inside it see the state before the
+     * transaction. If fn throws or the append fails, nothing is applied.
+     */
+    transaction<R>(fn: (tx: Transaction) => R): R {
+        if (this.fd === null) throw new Error('Store is not open');
+        const tx = new Transaction();
+        const result = fn(tx);
+        if (tx.ops.length === 0) return result;
+
+        for (const op of tx.ops) {
+            if (op[0] !== 'meta') this.collection(op[1]); // Unknown collections fail before anything is written
+        }
+
+        const line = JSON.stringify({ ops: tx.ops }) + '\n';
+        let bytes: number;
+        try {
+            bytes = writeFully(this.fd, line);
+            if (this.durable) fs.fdatasyncSync(this.fd);
+        } catch (error) {
+            // A partial line would be glued to the next append and corrupt the log: cut it off
+            fs.ftruncateSync(this.fd, this.logBytes);
+            throw error;
+        }
+        this.logBytes += bytes;
+
+        for (const op of tx.ops) this.apply(op);
+        this.maybeScheduleCompaction();
+        return result;
+    }
+
+    // Rewrite the log as a snapshot of the current state
+    compact() {
+        if (this.fd === null) throw new Error('Store is not open');
+        const tempPath = `${this.filePath}.compact`;
+        const tempFd = fs.openSync(tempPath, 'w');
+        let bytes = 0;
+        const writeRecord = (ops: LogOp[]) => {
+            bytes += writeFully(tempFd, JSON.stringify({ ops }) + '\n');
+        };
+
+        try {
+            const metaOps: LogOp[] = Array.from(this.meta, ([key, value]) => ['meta', key, value] as LogOp);
+            if (metaOps.length > 0) writeRecord(metaOps);
+
+            for (const collection of this.collections.values()) {
+                let chunk: LogOp[] = [];
+                for (const doc of collection.all()) {
+                    chunk.push(['put', collection.name, doc]);
+                    if (chunk.length === SNAPSHOT_CHUNK) {
+                        writeRecord(chunk);
+                        chunk = [];
+                    }
+                }
+                if (chunk.length > 0) writeRecord(chunk);
+            }
+            fs.fsyncSync(tempFd);
+        } catch (error) {
+            fs.closeSync(tempFd);
+            fs.rmSync(tempPath, { force: true });
+            throw error;
+        }
+        fs.closeSync(tempFd);
+
+        fs.closeSync(this.fd);
+        fs.renameSync(tempPath, this.filePath);
+        this.fd = fs.openSync(this.filePath, 'a');
+        this.logBytes = bytes;
+        this.compactedBytes = bytes;
+    }
+
+    getStats() {
+        const stats: Record<string, number> = {};
+        for (const collection of this.collections.values()) stats[collection.name] = collection.size;
+        return { logBytes: this.logBytes, compactedBytes: this.compactedBytes, documents: stats };
+    }
+
+    private apply(op: LogOp) {
+        switch (op[0]) {
+            case 'put':
+                this.collection(op[1]).applyPut(op[2]);
+                break;
+            case 'del':
+                this.collection(op[1]).applyDelete(op[2]);
+                break;
+            case 'clear':
+                this.collection(op[1]).applyClear();
+                break;
+            case 'meta':
+                this.meta.set(op[1], op[2]);
+                break;
+        }
+    }
+
+    private load() {
+        const content = fs.readFileSync(this.filePath, 'utf-8');
+        let offset = 0;
+
+        while (offset < content.length) {
+            const end = content.indexOf('\n', offset);
+            const line = end === -1 ? content.slice(offset) : content.slice(offset, end);
+
+            let record: { ops: LogOp[] } | null = null;
+            try {
+                record = line.trim() ? JSON.parse(line) : null;
+            } catch {
+                if (end !== -1) throw new Error(`Corrupt record in ${this.filePath} at byte ${Buffer.byteLength(content.slice(0, offset))}`);
+            }
+
+            if (end === -1) {
+                // Last append never completed: drop it so the log ends on a record boundary
+                const validBytes = Buffer.byteLength(content.slice(0, offset));
+                fs.truncateSync(this.filePath, validBytes);
+                console.warn(`[Store] Dropped incomplete record at the end of ${this.filePath}`);
+                this.logBytes = validBytes;
+                return;
+            }
+
+            if (record) {
+                for (const op of record.ops) {
+                    if (op[0] === 'meta' || this.collections.has(op[1])) this.apply(op);
+                }
+            }
+            offset = end + 1;
+        }
+
+        this.logBytes = Buffer.byteLength(content);
+    }
+
+    private maybeScheduleCompaction() {
+        if (this.compactionScheduled) return;
+        if (this.logBytes < this.compactMinBytes || this.logBytes < this.compactedBytes * 2) return;
+
+        // Off the save path: the transaction that crossed the threshold returns first
+        this.compactionScheduled = true;
+        setImmediate(() => {
+            this.compactionScheduled = false;
+            if (this.fd === null) return;
+            try {
+                this.compact();
+            } catch (error) {
+                console.error('[Store] Compaction failed:', error);
+            }
+        });
+    }
+}
@@ -1,39 +1,47 @@
-import { ipcMain } from 'electron';
-import crypto from 'crypto';
+import { ipcMain, BrowserWindow } from 'electron';
 import { getDB } from '../db';
+import { prepareCustomer, saveCustomerBatch } from '../services/batch-save';
+
+// Renderer caches built from the customer list (the customer-name index) are dropped on this
+export function notifyCustomersChanged() {
+    for (const win of BrowserWindow.getAllWindows()) {
+        if (!win.isDestroyed()) win.webContents.send('customer:changed');
+    }
+}
 
 export function registerCustomerHandlers() {
     // Save Customer
     ipcMain.handle('customer:save', async (_, customer: any) => {
         try {
             const db = await getDB();
-            if (!customer.id) {
-                customer.id = crypto.randomUUID();
-                customer.createdAt = new Date().toISOString();
-            }
-            customer.updatedAt = new Date().toISOString();
-            // Ensure ratio fields exist
-            customer.total20mm = customer.total20mm || 0;
-            customer.total10mm = customer.total10mm || 0;
+            prepareCustomer(customer);
 
-            const idx = db.data.customers.findIndex((c: any) => c.id === customer.id);
-            if (idx >= 0) {
-                db.data.customers[idx] = customer;
-            } else {
-                db.data.customers.push(customer);
-            }
-            await db.write(); // Persist
+            db.transaction(tx => tx.put('customers', customer)); // Persist
+            notifyCustomersChanged();
             return { success: true, id: customer.id };
         } catch (e: any) {
             return { success: false, error: e.message };
         }
     });
 
+    // Save Customers in one transaction
+    ipcMain.handle('customer:saveBatch', async (_, customers: any[]) => {
+        try {
+            if (!Array.isArray(customers)) throw new Error('Expected a list of customers');
+            const db = await getDB();
+            const results = saveCustomerBatch(db, customers);
+            notifyCustomersChanged();
+            return { success: true, results };
+        } catch (e: any) {
+            return { success: false, error: e.message };
+        }
+    });
+
     // Get All Customers
     ipcMain.handle('customer:list', async () => {
         try {
             const db = await getDB();
-            return { success: true, customers: db.data.customers };
+            return { success: true, customers: db.customers.all() };
         } catch (e: any) {
             return { success: false, error: e.message };
         }
@@ -45,18 +53,17 @@ export function registerCustomerHandlers() {
             const db = await getDB();
 
             // Check for linked invoices before deletion
-            const linkedInvoices = db.data.invoices.filter((inv: any) => inv.to?.customerId === id);
-            if (linkedInvoices.length > 0) {
+            const linkedInvoices = db.invoices.count('customer', id);
+            if (linkedInvoices > 0) {
                 return {
                     success: false,
-                    error: `Cannot delete: ${linkedInvoices.length} invoice(s) are linked to this customer. Clear them first or reassign.`
+                    error: `Cannot delete: ${linkedInvoices} invoice(s) are linked to this customer. Clear them first or reassign.`
                 };
             }
 
-            const initialLen = db.data.customers.length;
-            db.data.customers = db.data.customers.filter((c: any) => c.id !== id);
-            if (db.data.customers.length !== initialLen) {
-                await db.write();
+            if (db.customers.has(id)) {
+                db.transaction(tx => tx.delete('customers', id));
+                notifyCustomersChanged();
                 return { success: true };
             }
             return { success: false, error: 'Customer not found' };
@@ -0,0 +1,23 @@
+import { ipcMain } from 'electron';
+import { getDB } from '../db';
+import { getInvoiceAggregates } from '../services/invoice-aggregates';
+import { getInvoiceQueryIndex } from '../services/invoice-query';
+
+const RECENT_INVOICE_COUNT = 5;
+
+export function registerDashboardHandlers() {
+    // Dashboard Summary: maintained totals plus the latest invoices, in one small payload
+    ipcMain.handle('dashboard:summary', async () => {
+        try {
+            const db = await getDB();
+            const summary = getInvoiceAggregates(db.invoices).summary();
+            const { invoices: recentInvoices } = getInvoiceQueryIndex(db.invoices).query({ limit: RECENT_INVOICE_COUNT });
+            return {
+                success: true,
+                summary: { ...summary, customerCount: db.customers.size, recentInvoices }
+            };
+        } catch (e: any) {
+            return { success: false, error: e.message };
+        }
+    });
+}
@@ -0,0 +1,47 @@
+import { ipcMain, dialog } from 'electron';
+import fs from 'fs';
+import {
+    isTracingEnabled,
+    setTracingEnabled,
+    recordedSpans,
+    clearRecordedSpans,
+    toChromeTrace
+} from '../services/tracing';
+import { startupPhases } from '../services/startup-timing';
+
+export function registerDiagnosticsHandlers() {
+    // Recorded spans, whether tracing is on and the startup phases of this run
+    ipcMain.handle('diagnostics:getTrace', async () => {
+        return { success: true, enabled: isTracingEnabled(), spans: recordedSpans(), startup: startupPhases() };
+    });
+
+    // Switch tracing on or off (until the app restarts)
+    ipcMain.handle('diagnostics:setTracing', async (_, enabled: boolean) => {
+        setTracingEnabled(!!enabled);
+        return { success: true, enabled: isTracingEnabled() };
+    });
+
+    ipcMain.handle('diagnostics:clearTrace', async () => {
+        clearRecordedSpans();
+        return { success: true };
+    });
+
+    // Save the recorded spans as a Chrome trace (chrome://tracing, ui.perfetto.dev)
+    ipcMain.handle('diagnostics:exportTrace', async () => {
+        try {
+            const { filePath } = await dialog.showSaveDialog({
+                title: 'Export Trace',
+                defaultPath: `fatoora-trace-${new Date().toISOString().replace(/[:.]/g, '-')}.json`,
+                filters: [{ name: 'JSON', extensions: ['json'] }]
+            });
+
+            if (filePath) {
+                fs.writeFileSync(filePath, JSON.stringify(toChromeTrace(recordedSpans())));
+                return { success: true, filePath };
+            }
+            return { success: false, error: 'Cancelled' };
+        } catch (e: any) {
+            return { success: false, error: e.message };
+        }
+    });
+}
@@ -1,20 +1,38 @@
 import { ipcMain, dialog, shell } from 'electron';
 import fs from 'fs';
 import * as XLSX from 'xlsx';
-import { getSheet, findHeaderRow, findFooterStartRow } from '../utils/excel-utils';
+import {
+    findHeaderRow,
+    findFooterStartRow,
+    findColumnFuzzy,
+    ID_COLUMN_PATTERNS,
+    WORKBOOK_READ_OPTIONS
+} from '../utils/excel-utils';
+import { workbookCache } from '../services/workbook-cache';
+import { readRowWindow, getColumnCount } from '../services/row-index';
 import {
     analyzeExcelFile,
+    analyzeManyExcelFiles,
     processExcelJob,
-    ProcessOptions
+    ProcessOptions,
+    AnalyzeOptions,
+    AnalyzeManyOptions
 } from '../services/excel-processor';
+import { cancelJob } from '../services/excel-jobs';
+import { jobRowStore } from '../services/job-row-store';
+import { recordSpans } from '../services/tracing';
+import { shutdownExcelPool } from '../services/excel-pool';
+import type { HandlerRegistry } from '../utils/lazy-module';
+
+// Rows returned by excel:readPreview unless the caller asks for a different amount
+const PREVIEW_ROW_LIMIT = 100;
 
-export function registerExcelHandlers() {
+export function registerExcelHandlers(ipc: HandlerRegistry = ipcMain) {
     // Read Headers from Excel
-    ipcMain.handle('excel:readHeaders', async (_, filePath: string, sheetName?: string) => {
+    ipc.handle('excel:readHeaders', async (_, filePath: string, sheetName?: string) => {
         try {
-            const fileBuffer = fs.readFileSync(filePath);
-            const workbook = XLSX.read(fileBuffer, { type: 'buffer' });
-            const { sheet } = getSheet(workbook, sheetName);
+            const { sheet } = workbookCache.getScopedSheet(filePath, sheetName, WORKBOOK_READ_OPTIONS);
+            if (!sheet) return { success: true, headers: [] };
 
             // Get range
             const range = XLSX.utils.decode_range(sheet['!ref'] || 'A1');
@@ -34,13 +52,9 @@ export function registerExcelHandlers() {
     });
 
     // Read Column Data
-    ipcMain.handle('excel:readColumn', async (_, filePath, colIndex, sheetName?: string) => {
+    ipc.handle('excel:readColumn', async (_, filePath, colIndex, sheetName?: string) => {
         try {
-            const fileBuffer = fs.readFileSync(filePath);
-            const workbook = XLSX.read(fileBuffer, { type: 'buffer' });
-            const { sheet } = getSheet(workbook, sheetName);
-
-            const jsonData = XLSX.utils.sheet_to_json(sheet, { header: 1 });
+            const { rows: jsonData } = workbookCache.getScopedSheetRows(filePath, sheetName, WORKBOOK_READ_OPTIONS);
             const columnData = jsonData.map((row: any) => row[colIndex]);
 
             return { success: true, data: columnData };
@@ -51,7 +65,7 @@ export function registerExcelHandlers() {
 
     // Generate Executive Summary
     // Note: detailed generation logic kept here or could be moved to a report service
-    ipcMain.handle('reports:executive-summary', async (_, { data, filename }) => {
+    ipc.handle('reports:executive-summary', async (_, { data, filename }) => {
         try {
             // 1. Prepare Data for Sheet
             // Expected data structure: matches user request columns
@@ -155,56 +169,96 @@ export function registerExcelHandlers() {
     });
 
     // Comprehensive file analysis with smart defaults
-    ipcMain.handle('excel:analyze', async (_, filePath: string, sheetName?: string) => {
-        return await analyzeExcelFile(filePath, sheetName);
+    ipc.handle('excel:analyze', async (_, filePath: string, sheetName?: string, options?: AnalyzeOptions) => {
+        const result = await analyzeExcelFile(filePath, sheetName, options);
+        if ('trace' in result) recordSpans(result.trace);
+        return result;
     });
 
-    // Read Preview (All rows)
-    ipcMain.handle('excel:readPreview', async (_, filePath, sheetName?: string) => {
+    // Analyze several files at once; each result is also pushed on excel:analysisResult as it completes
+    ipc.handle('excel:analyzeMany', async (event, filePaths: string[], options: AnalyzeManyOptions & { batchId?: string } = {}) => {
+        const sender = event.sender;
+        const { batchId, ...analyzeOptions } = options;
         try {
-            const workbook = XLSX.readFile(filePath);
-            const { sheet } = getSheet(workbook, sheetName);
-
-            // Read as array of arrays - ALL ROWS
-            const data = XLSX.utils.sheet_to_json(sheet, { header: 1 }) as any[][];
-
-            // Auto-detect header row
-            // Note: findHeaderRow is not exported from excel-processor, but from excel-utils
-            // We need to import it if we use it here.
-            // But wait, findHeaderRow was imported from ../utils/excel-utils in the original file.
-            // I should ensure I imported it. Yes I did in the imports above?
-            // Wait, I replaced lines 1-605, so I need to check my new imports.
-            // I removed findHeaderRow from imports in the replacement content I prepared?
-            // No, I only imported getSheet. I should import findHeaderRow and findFooterStartRow if used here.
-            // Let's re-read the code I'm replacing.
-
-            // logic below uses FindHeaderRow, FindFooterStartRow.
-            // I should import them.
-            // OR I should move readPreview to service too? 
-            // readPreview is simple enough to stay or move.
-            // Let's keep it here but fix imports.
-
-            // Wait, looking at my ReplacementContent... I forgot to import findHeaderRow etc.
-            // I will fix the imports in the ReplacementContent before submitting.
-
-            // ... (rest of logic) ...
+            const results = await analyzeManyExcelFiles(filePaths, analyzeOptions, (index, result) => {
+                if (!sender.isDestroyed()) {
+                    sender.send('excel:analysisResult', { batchId, index, filePath: filePaths[index], result });
+                }
+            });
+            return { success: true, results };
+        } catch (e: any) {
+            return { success: false, error: e.message };
+        }
+    });
 
-            // But actually, why not move readPreview to service? It's analysis logic.
-            // Let's assume I keep it here for now to minimize changes, but I need those utility imports.
+    // Read Preview: sheet layout hints plus the first `limit` rows (use excel:readRows for the rest)
+    ipc.handle('excel:readPreview', async (_, filePath, sheetName?: string, limit: number = PREVIEW_ROW_LIMIT) => {
+        try {
+            const { rows: data } = workbookCache.getScopedSheetRows(filePath, sheetName, WORKBOOK_READ_OPTIONS);
 
-            // ...
+            const headerRowIndex = findHeaderRow(data);
+            const footerStartRow = findFooterStartRow(data);
+            const idColumn = findColumnFuzzy(data[headerRowIndex] || [], ID_COLUMN_PATTERNS);
 
             return {
-                // ...
+                success: true,
+                data: data.slice(0, Math.max(0, limit)),
+                rowCount: data.length,
+                colCount: getColumnCount(data),
+                headerRow: headerRowIndex + 1, // 1-indexed
+                footerStartRow: footerStartRow + 1, // 1-indexed
+                suggestedColumn: idColumn?.index,
+                suggestedRowRange: {
+                    start: headerRowIndex + 2,
+                    end: footerStartRow
+                }
             };
         } catch (error: any) {
             return { success: false, error: error.message };
         }
     });
 
-    // Process Files
-    ipcMain.handle('excel:process', async (_, options: ProcessOptions) => {
-        return await processExcelJob(options);
+    // Read a window of rows; totals let the renderer size its scroll area up front
+    ipc.handle('excel:readRows', async (_, filePath: string, sheetName: string | undefined, start: number, count: number) => {
+        try {
+            return { success: true, ...readRowWindow(filePath, sheetName, start, count) };
+        } catch (e: any) {
+            return { success: false, error: e.message };
+        }
+    });
+
+    // Workbook cache diagnostics
+    ipc.handle('excel:cacheStats', async () => {
+        return { success: true, stats: workbookCache.getStats() };
+    });
+
+    // Process Files (progress is pushed on excel:progress, tagged with options.jobId)
+    ipc.handle('excel:process', async (event, options: ProcessOptions) => {
+        const sender = event.sender;
+        return await processExcelJob(options, {
+            onProgress: progress => {
+                if (!sender.isDestroyed()) sender.send('excel:progress', progress);
+            }
+        });
+    });
+
+    // Cancel a running excel:process job; it stops at the next row boundary
+    ipc.handle('excel:cancel', async (_, jobId: string) => {
+        return { success: cancelJob(jobId) };
+    });
+
+    // Rows of a finished job's updated master, kept by excel:process when keepOutput is set
+    ipc.handle('excel:jobRows', async (_, storeId: string, start: number, count: number) => {
+        const window = jobRowStore.getRows(storeId, start, count);
+        if (!window) return { success: false, error: 'Job output is no longer available' };
+        return { success: true, ...window };
+    });
+
+    ipc.handle('excel:releaseJobRows', async (_, storeId: string) => {
+        return { success: jobRowStore.release(storeId) };
     });
 }
 
+export function shutdownExcelHandlers() {
+    return shutdownExcelPool();
+}
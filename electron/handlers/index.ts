@@ -1,14 +1,46 @@
-import { BrowserWindow } from 'electron';
+import { BrowserWindow, ipcMain } from 'electron';
 import { registerCustomerHandlers } from './customer';
-import { registerInvoiceHandlers } from './invoice';
+import { registerInvoiceHandlers, shutdownInvoiceHandlers } from './invoice';
 import { registerProductHandlers } from './product';
 import { registerSettingsHandlers } from './settings';
-import { registerExcelHandlers } from './excel';
+import { registerDashboardHandlers } from './dashboard';
+import { registerDiagnosticsHandlers } from './diagnostics';
+import { traceIpcHandlers } from '../services/tracing';
+import { lazyModule, registerLazyHandlers } from '../utils/lazy-module';
+
+// The excel handlers pull in xlsx and the matcher services: loaded on the first call to one of their channels
+const excelHandlers = lazyModule(() => import('./excel'));
+
+export const EXCEL_CHANNELS = [
+    'excel:readHeaders',
+    'excel:readColumn',
+    'reports:executive-summary',
+    'excel:analyze',
+    'excel:analyzeMany',
+    'excel:readPreview',
+    'excel:readRows',
+    'excel:cacheStats',
+    'excel:process',
+    'excel:cancel',
+    'excel:jobRows',
+    'excel:releaseJobRows',
+] as const;
 
 export function registerAllHandlers(mainWindowGetter: () => BrowserWindow | null) {
+    // Every handler below records its latency and payload sizes while tracing is on
+    traceIpcHandlers(ipcMain, ['diagnostics:']);
+
     registerCustomerHandlers();
     registerInvoiceHandlers(mainWindowGetter);
     registerProductHandlers();
     registerSettingsHandlers();
-    registerExcelHandlers();
+    registerLazyHandlers(ipcMain, EXCEL_CHANNELS, excelHandlers, (mod, registry) => mod.registerExcelHandlers(registry));
+    registerDashboardHandlers();
+    registerDiagnosticsHandlers();
+}
+
+// Stop the worker and print pools of whichever handler modules were loaded
+export function shutdownHandlers() {
+    excelHandlers.loaded()?.shutdownExcelHandlers();
+    shutdownInvoiceHandlers();
 }
@@ -1,47 +1,57 @@
 import { ipcMain, BrowserWindow } from 'electron';
-import crypto from 'crypto';
 import { getDB } from '../db';
-import { getTodayString, extractDateString, isInvoiceOverdue } from '../utils/invoice-utils';
-import { generateInvoicePDF, generateSecureInvoicePDF } from '../services/pdf-service';
+import type { ExportBatchOptions } from '../services/pdf-service';
+import { getInvoiceQueryIndex, InvoiceQuery } from '../services/invoice-query';
+import { prepareInvoice, assignInvoiceNumber, saveInvoiceBatch, saveGeneratedInvoices, GeneratedInvoice } from '../services/batch-save';
+import { notifyCustomersChanged } from './customer';
 import path from 'path';
+import { lazyModule } from '../utils/lazy-module';
+
+// pdf-lib and the print pool are only loaded once a PDF is generated
+const pdfService = lazyModule(() => import('../services/pdf-service'));
 
 export function registerInvoiceHandlers(mainWindowGetter: () => BrowserWindow | null) {
     // Save Invoice
     ipcMain.handle('invoice:save', async (_, invoice: any) => {
         try {
             const db = await getDB();
+            const needsNumber = prepareInvoice(invoice);
+
+            // Number assignment and the invoice are written in one transaction
+            db.transaction(tx => {
+                if (needsNumber) {
+                    const nextNum = db.lastInvoiceNumber + 1;
+                    tx.setMeta('lastInvoiceNumber', nextNum);
+                    assignInvoiceNumber(invoice, nextNum);
+                }
 
-            // Ensure lastInvoiceNumber exists (migration-like safety)
-            if (typeof db.data.lastInvoiceNumber !== 'number') {
-                db.data.lastInvoiceNumber = 613;
-            }
-
-            const isNew = !invoice.id;
-            if (isNew) {
-                invoice.id = crypto.randomUUID();
-                invoice.createdAt = new Date().toISOString();
-            }
-            invoice.updatedAt = new Date().toISOString();
-
-            // 1. Check if we need to assign a number
-            const currentNum = String(invoice.number || '');
-            const needsNumber = isNew || currentNum === 'DRAFT' || currentNum.startsWith('INV-');
+                tx.put('invoices', invoice);
+            });
+            return { success: true, id: invoice.id, number: invoice.number };
+        } catch (e: any) {
+            return { success: false, error: e.message };
+        }
+    });
 
-            if (needsNumber) {
-                db.data.lastInvoiceNumber += 1;
-                const nextNum = db.data.lastInvoiceNumber;
-                invoice.number = String(nextNum);
-                invoice.invoiceNumber = String(nextNum); // Legacy support if needed
-            }
+    // Save Invoices in one transaction, numbered from one contiguous block
+    ipcMain.handle('invoice:saveBatch', async (_, invoices: any[]) => {
+        try {
+            if (!Array.isArray(invoices)) throw new Error('Expected a list of invoices');
+            const db = await getDB();
+            return { success: true, results: saveInvoiceBatch(db, invoices) };
+        } catch (e: any) {
+            return { success: false, error: e.message };
+        }
+    });
 
-            const idx = db.data.invoices.findIndex((inv: any) => inv.id === invoice.id);
-            if (idx >= 0) {
-                db.data.invoices[idx] = invoice;
-            } else {
-                db.data.invoices.push(invoice);
-            }
-            await db.write();
-            return { success: true, id: invoice.id, number: invoice.number };
+    // Save invoices generated from a reconciliation together with their customers' new totals
+    ipcMain.handle('invoice:generateBatch', async (_, entries: GeneratedInvoice[]) => {
+        try {
+            if (!Array.isArray(entries)) throw new Error('Expected a list of invoices');
+            const db = await getDB();
+            const { results, customers } = saveGeneratedInvoices(db, entries);
+            if (customers.length > 0) notifyCustomersChanged();
+            return { success: true, results, customers };
         } catch (e: any) {
             return { success: false, error: e.message };
         }
@@ -52,34 +62,20 @@ export function registerInvoiceHandlers(mainWindowGetter: () => BrowserWindow |
         try {
             const db = await getDB();
 
-            // Auto-Check Overdue Status using date strings to avoid timezone issues
-            const todayStr = getTodayString();
-            let hasUpdates = false;
-
-            db.data.invoices.forEach((inv: any) => {
-                if (inv.status === 'issued' && inv.dueDate) {
-                    // Extract date portion only (handles both ISO strings and YYYY-MM-DD)
-                    const dueDateStr = extractDateString(String(inv.dueDate));
-
-                    // Overdue if today is strictly after the due date (string comparison works for YYYY-MM-DD format)
-                    if (isInvoiceOverdue(dueDateStr, todayStr)) {
-                        console.log(`[Auto-Overdue] !!! Marking invoice ${inv.number} as OVERDUE !!!`);
-                        inv.status = 'overdue';
-                        inv.updatedAt = new Date().toISOString();
-                        hasUpdates = true;
-                    }
-                }
-            });
-
-            if (hasUpdates) {
-                await db.write();
-            }
+            // Newest first, straight from the maintained createdAt order
+            const { invoices } = getInvoiceQueryIndex(db.invoices).query({ limit: Infinity });
+            return { success: true, invoices };
+        } catch (e: any) {
+            return { success: false, error: e.message };
+        }
+    });
 
-            // Sort DESC
-            const sorted = [...db.data.invoices].sort((a: any, b: any) =>
-                new Date(b.createdAt).getTime() - new Date(a.createdAt).getTime()
-            );
-            return { success: true, invoices: sorted };
+    // Query Invoices: one filtered, sorted page plus the total match count
+    ipcMain.handle('invoice:query', async (_, query: InvoiceQuery = {}) => {
+        try {
+            const db = await getDB();
+            const index = getInvoiceQueryIndex(db.invoices);
+            return { success: true, ...index.query(query), overview: index.overview() };
         } catch (e: any) {
             return { success: false, error: e.message };
         }
@@ -89,10 +85,8 @@ export function registerInvoiceHandlers(mainWindowGetter: () => BrowserWindow |
     ipcMain.handle('invoice:delete', async (_, id: string) => {
         try {
             const db = await getDB();
-            const initialLen = db.data.invoices.length;
-            db.data.invoices = db.data.invoices.filter((inv: any) => inv.id !== id);
-            if (db.data.invoices.length !== initialLen) {
-                await db.write();
+            if (db.invoices.has(id)) {
+                db.transaction(tx => tx.delete('invoices', id));
                 return { success: true };
             }
             return { success: false, error: 'Invoice not found' };
@@ -105,8 +99,7 @@ export function registerInvoiceHandlers(mainWindowGetter: () => BrowserWindow |
     ipcMain.handle('invoice:nextNumber', async () => {
         try {
             const db = await getDB();
-            const last = typeof db.data.lastInvoiceNumber === 'number' ? db.data.lastInvoiceNumber : 613;
-            return { success: true, nextNumber: last + 1 };
+            return { success: true, nextNumber: db.lastInvoiceNumber + 1 };
         } catch (e: any) {
             return { success: false, error: e.message };
         }
@@ -114,11 +107,44 @@ export function registerInvoiceHandlers(mainWindowGetter: () => BrowserWindow |
 
     // Generate PDF
     ipcMain.handle('invoice:pdf', async (_, invoice: any) => {
+        const { generateInvoicePDF } = await pdfService.get();
         return await generateInvoicePDF(invoice);
     });
 
     // Secure PDF Generation (HTML-to-PDF + Encryption)
     ipcMain.handle('invoice:generate-secure', async (_, invoice: any, appUrl?: string) => {
+        const { generateSecureInvoicePDF } = await pdfService.get();
         return await generateSecureInvoicePDF(invoice, appUrl, __dirname);
     });
+
+    // Export Invoices to a folder on pooled print windows; progress on invoice:exportProgress
+    ipcMain.handle('invoice:exportBatch', async (event, ids: string[], directory: string, options: ExportBatchOptions & { exportId?: string } = {}) => {
+        const sender = event.sender;
+        const { exportId, ...exportOptions } = options;
+        try {
+            if (!Array.isArray(ids)) throw new Error('Expected a list of invoice ids');
+            if (!directory) throw new Error('No export folder selected');
+            const db = await getDB();
+            const { exportInvoicesBatch } = await pdfService.get();
+
+            const invoices = ids.filter(id => db.invoices.has(id)).map(id => db.invoices.get(id));
+            const { results, statements } = await exportInvoicesBatch(invoices, directory, exportOptions, __dirname, progress => {
+                if (!sender.isDestroyed()) sender.send('invoice:exportProgress', { exportId, ...progress });
+            });
+
+            // One result per requested id, in request order
+            const byId = new Map(results.map(result => [result.id, result]));
+            return {
+                success: true,
+                results: ids.map(id => byId.get(id) ?? { id, success: false, error: 'Invoice not found' }),
+                statements
+            };
+        } catch (e: any) {
+            return { success: false, error: e.message };
+        }
+    });
+}
+
+export function shutdownInvoiceHandlers() {
+    pdfService.loaded()?.shutdownPrintPool();
 }
@@ -13,13 +13,7 @@ export function registerProductHandlers() {
             }
             product.updatedAt = new Date().toISOString();
 
-            const idx = db.data.products.findIndex((p: any) => p.id === product.id);
-            if (idx >= 0) {
-                db.data.products[idx] = product;
-            } else {
-                db.data.products.push(product);
-            }
-            await db.write();
+            db.transaction(tx => tx.put('products', product));
             return { success: true, id: product.id };
         } catch (e: any) {
             return { success: false, error: e.message };
@@ -30,7 +24,7 @@ export function registerProductHandlers() {
     ipcMain.handle('product:list', async () => {
         try {
             const db = await getDB();
-            return { success: true, products: db.data.products || [] };
+            return { success: true, products: db.products.all() };
         } catch (e: any) {
             return { success: false, error: e.message };
         }
@@ -40,10 +34,8 @@ export function registerProductHandlers() {
     ipcMain.handle('product:delete', async (_, id: string) => {
         try {
             const db = await getDB();
-            const initialLen = db.data.products.length;
-            db.data.products = db.data.products.filter((p: any) => p.id !== id);
-            if (db.data.products.length !== initialLen) {
-                await db.write();
+            if (db.products.has(id)) {
+                db.transaction(tx => tx.delete('products', id));
                 return { success: true };
             }
             return { success: false, error: 'Product not found' };
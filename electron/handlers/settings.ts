@@ -1,14 +1,17 @@
 import { ipcMain, dialog, shell } from 'electron';
 import fs from 'fs';
 import { getDB } from '../db';
+import { getInvoiceAggregates } from '../services/invoice-aggregates';
+import { invalidateBankingDetails } from '../services/banking-details';
+import { notifyCustomersChanged } from './customer';
 
 export function registerSettingsHandlers() {
     // Save Banking Details
     ipcMain.handle('settings:saveBanking', async (_, details: any) => {
         try {
             const db = await getDB();
-            db.data.bankingDetails = details;
-            await db.write();
+            db.transaction(tx => tx.setMeta('bankingDetails', details));
+            invalidateBankingDetails();
             return { success: true };
         } catch (e: any) {
             return { success: false, error: e.message };
@@ -19,7 +22,7 @@ export function registerSettingsHandlers() {
     ipcMain.handle('settings:getBanking', async () => {
         try {
             const db = await getDB();
-            return { success: true, data: db.data.bankingDetails || null };
+            return { success: true, data: db.bankingDetails || null };
         } catch (e: any) {
             return { success: false, error: e.message };
         }
@@ -29,7 +32,7 @@ export function registerSettingsHandlers() {
     ipcMain.handle('app:backup', async () => {
         try {
             const db = await getDB();
-            const data = JSON.stringify(db.data, null, 2);
+            const data = JSON.stringify(db.exportData(), null, 2);
 
             const { filePath } = await dialog.showSaveDialog({
                 title: 'Export Backup',
@@ -76,8 +79,10 @@ export function registerSettingsHandlers() {
             }
 
             const db = await getDB();
-            db.data = data;
-            await db.write();
+            db.replaceAll(data);
+            getInvoiceAggregates(db.invoices).rebuild();
+            invalidateBankingDetails();
+            notifyCustomersChanged();
 
             return { success: true };
         } catch (e: any) {
@@ -89,11 +94,13 @@ export function registerSettingsHandlers() {
     ipcMain.handle('app:clearData', async () => {
         try {
             const db = await getDB();
-            db.data.customers = [];
-            db.data.invoices = [];
             // Optional: clear products too? User said "Clear All Data". 
             // Usually product catalog is persistent configuration. Let's keep products for now unless requested.
-            await db.write();
+            db.transaction(tx => {
+                tx.clear('customers');
+                tx.clear('invoices');
+            });
+            notifyCustomersChanged();
             return { success: true };
         } catch (e: any) {
             return { success: false, error: e.message };
@@ -104,15 +111,15 @@ export function registerSettingsHandlers() {
     ipcMain.handle('app:clearInvoices', async () => {
         try {
             const db = await getDB();
-            // Clear all invoices
-            db.data.invoices = [];
-            // Reset customer totals
-            db.data.customers = db.data.customers.map((c: any) => ({
-                ...c,
-                total10mm: 0,
-                total20mm: 0
-            }));
-            await db.write();
+            db.transaction(tx => {
+                // Clear all invoices
+                tx.clear('invoices');
+                // Reset customer totals
+                for (const c of db.customers.all()) {
+                    tx.put('customers', { ...c, total10mm: 0, total20mm: 0 });
+                }
+            });
+            notifyCustomersChanged();
             return { success: true };
         } catch (e: any) {
             return { success: false, error: e.message };
@@ -1,10 +1,40 @@
 import { app, BrowserWindow, nativeImage } from 'electron';
 import path from 'path';
 import fs from 'fs';
-import { registerAllHandlers } from './handlers';
+import { registerAllHandlers, shutdownHandlers } from './handlers';
+import { shutdownInvoiceHandlers } from './handlers/invoice';
 import { startOverdueCheckService, stopOverdueCheckService } from './services/scheduler';
+import { cleanupLegacyData } from './db';
+import { markStartup, reportStartup } from './services/startup-timing';
+
+markStartup('main loaded');
+
+// Startup work nothing on screen depends on waits this long after the first window is shown
+const DEFERRED_STARTUP_DELAY_MS = 500;
 
 let mainWindow: BrowserWindow | null = null;
+let deferredStartupScheduled = false;
+
+// The overdue scan loads and indexes every invoice; run it (and the legacy cleanup) once the first window is up
+function scheduleDeferredStartup() {
+    if (deferredStartupScheduled) return;
+    deferredStartupScheduled = true;
+    setTimeout(async () => {
+        // Each step is best effort; a failure is logged and startup is still reported
+        try {
+            cleanupLegacyData();
+        } catch (error) {
+            console.error('Legacy data cleanup failed:', error);
+        }
+        try {
+            await startOverdueCheckService(() => mainWindow);
+        } catch (error) {
+            console.error('Failed to start the overdue check service:', error);
+        }
+        markStartup('deferred work done');
+        reportStartup();
+    }, DEFERRED_STARTUP_DELAY_MS);
+}
 
 function createWindow() {
     // Set dock icon on macOS
@@ -56,18 +86,29 @@ function createWindow() {
         loadDevServer();
     }
 
+    // Hidden print windows would otherwise keep the app alive (window-all-closed never fires)
+    // until their idle timeout after the user closed the app
+    mainWindow.on('closed', () => {
+        mainWindow = null;
+        shutdownInvoiceHandlers();
+    });
+
     mainWindow.once('ready-to-show', () => {
         mainWindow?.maximize();
         mainWindow?.show();
+        if (!deferredStartupScheduled) markStartup('window shown');
+        scheduleDeferredStartup();
     });
 }
 
-// IPC Handlers
+// IPC Handlers (heavy modules load on first use, see handlers/index)
 registerAllHandlers(() => mainWindow);
+markStartup('handlers registered');
 
 app.whenReady().then(() => {
+    markStartup('app ready');
     createWindow();
-    startOverdueCheckService(mainWindow);
+    markStartup('window created');
 });
 
 app.on('window-all-closed', () => {
@@ -78,11 +119,13 @@ app.on('window-all-closed', () => {
 });
 
 app.on('activate', () => {
-    if (BrowserWindow.getAllWindows().length === 0) {
+    // Pooled print windows may still be open: only the main window counts
+    if (!mainWindow) {
         createWindow();
     }
 });
 
 app.on('before-quit', () => {
     stopOverdueCheckService();
+    shutdownHandlers();
 });
@@ -9,13 +9,23 @@ contextBridge.exposeInMainWorld('electron', {
     readExcelHeaders: (filePath: string) =>
         ipcRenderer.invoke('excel:readHeaders', filePath),
 
-    readExcelPreview: (filePath: string) =>
-        ipcRenderer.invoke('excel:readPreview', filePath),
+    readExcelPreview: (filePath: string, sheetName?: string, limit?: number) =>
+        ipcRenderer.invoke('excel:readPreview', filePath, sheetName, limit),
 
-    analyzeExcelFile: (filePath: string) =>
-        ipcRenderer.invoke('excel:analyze', filePath),
+    readExcelRows: (filePath: string, sheetName: string | undefined, start: number, count: number) =>
+        ipcRenderer.invoke('excel:readRows', filePath, sheetName, start, count),
+
+    analyzeExcelFile: (filePath: string, sheetName?: string, options?: { fullScan?: boolean }) =>
+        ipcRenderer.invoke('excel:analyze', filePath, sheetName, options),
+
+    analyzeExcelFiles: (filePaths: string[], options?: { batchId?: string; concurrency?: number; fullScan?: boolean }) =>
+        ipcRenderer.invoke('excel:analyzeMany', filePaths, options),
+
+    getWorkbookCacheStats: () => ipcRenderer.invoke('excel:cacheStats'),
 
     processExcelFiles: (options: {
+        jobId?: string;
+        sessionId?: string;
         masterPath: string;
         targetPaths: string[];
         masterColIndices: number[];
@@ -29,15 +39,24 @@ contextBridge.exposeInMainWorld('electron', {
         targetRowRanges?: Record<string, { start: number; end: number }>;
         masterSheetName?: string;
         targetSheetNames?: Record<string, string>;
+        nearMatch?: { maxDistance?: number; label?: string };
     }) => ipcRenderer.invoke('excel:process', options),
 
+    cancelExcelJob: (jobId: string) => ipcRenderer.invoke('excel:cancel', jobId),
+    readJobRows: (storeId: string, start: number, count: number) =>
+        ipcRenderer.invoke('excel:jobRows', storeId, start, count),
+    releaseJobRows: (storeId: string) => ipcRenderer.invoke('excel:releaseJobRows', storeId),
+
     openFile: (filePath: string) => ipcRenderer.invoke('app:openFile', filePath),
     showInFolder: (filePath: string) => ipcRenderer.invoke('app:showInFolder', filePath),
     saveFileDialog: (defaultPath: string) => ipcRenderer.invoke('dialog:saveFile', defaultPath),
 
     // Invoicing
     saveInvoice: (invoice: any) => ipcRenderer.invoke('invoice:save', invoice),
+    saveInvoiceBatch: (invoices: any[]) => ipcRenderer.invoke('invoice:saveBatch', invoices),
+    generateInvoiceBatch: (entries: any[]) => ipcRenderer.invoke('invoice:generateBatch', entries),
     getInvoices: () => ipcRenderer.invoke('invoice:list'),
+    queryInvoices: (query: any) => ipcRenderer.invoke('invoice:query', query),
     deleteInvoice: (id: string) => ipcRenderer.invoke('invoice:delete', id),
     generateInvoicePDF: (invoice: any) => ipcRenderer.invoke('invoice:pdf', invoice),
     clearData: () => ipcRenderer.invoke('app:clearData'),
@@ -47,6 +66,7 @@ contextBridge.exposeInMainWorld('electron', {
 
     // Customers
     saveCustomer: (customer: any) => ipcRenderer.invoke('customer:save', customer),
+    saveCustomerBatch: (customers: any[]) => ipcRenderer.invoke('customer:saveBatch', customers),
     getCustomers: () => ipcRenderer.invoke('customer:list'),
     deleteCustomer: (id: string) => ipcRenderer.invoke('customer:delete', id),
 
@@ -59,6 +79,15 @@ contextBridge.exposeInMainWorld('electron', {
     saveBankingDetails: (details: any) => ipcRenderer.invoke('settings:saveBanking', details),
     getBankingDetails: () => ipcRenderer.invoke('settings:getBanking'),
 
+    // Dashboard
+    getDashboardSummary: () => ipcRenderer.invoke('dashboard:summary'),
+
+    // Diagnostics
+    getTrace: () => ipcRenderer.invoke('diagnostics:getTrace'),
+    setTracing: (enabled: boolean) => ipcRenderer.invoke('diagnostics:setTracing', enabled),
+    clearTrace: () => ipcRenderer.invoke('diagnostics:clearTrace'),
+    exportTrace: () => ipcRenderer.invoke('diagnostics:exportTrace'),
+
     // Reports
     generateExecutiveSummary: (payload: any) => ipcRenderer.invoke('reports:executive-summary', payload),
 
@@ -67,8 +96,10 @@ contextBridge.exposeInMainWorld('electron', {
 
     // Secure Printing
     generateSecureInvoice: (invoice: any, appUrl?: string) => ipcRenderer.invoke('invoice:generate-secure', invoice, appUrl),
+    exportInvoices: (ids: string[], directory: string, options?: { concurrency?: number; statement?: boolean; appUrl?: string; exportId?: string }) =>
+        ipcRenderer.invoke('invoice:exportBatch', ids, directory, options),
     onInvoiceData: (callback: (event: any, data: any) => void) => ipcRenderer.on('print-data', callback),
-    sendPrintReady: () => ipcRenderer.send('print-ready'),
+    sendPrintReady: (printId?: number) => ipcRenderer.send('print-ready', printId),
     sendPrintWindowReady: () => ipcRenderer.send('print-window-ready'),
 
     // Event listeners for background services
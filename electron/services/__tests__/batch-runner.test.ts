@@ -0,0 +1,161 @@
+// @vitest-environment node
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import * as XLSX from 'xlsx';
+import { BatchSpecError, expandGlobs, globToRegExp, parseJobSpec, targetOverrideFor } from '../batch-spec';
+import { BatchJobRunner, BatchQueue, BatchRunSummary } from '../batch-runner';
+import { releaseMatchSession } from '../match-session';
+
+function writeSheet(filePath: string, rows: any[][]) {
+    fs.mkdirSync(path.dirname(filePath), { recursive: true });
+    const wb = XLSX.utils.book_new();
+    XLSX.utils.book_append_sheet(wb, XLSX.utils.aoa_to_sheet(rows), 'Sheet1');
+    XLSX.writeFile(wb, filePath);
+}
+
+describe('job specs', () => {
+    it('resolves paths against the spec folder and parses column letters', () => {
+        const spec = parseJobSpec({
+            master: 'master.xlsx',
+            masterColumn: 'C',
+            targets: 'incoming/*.xlsx',
+            targetOverrides: { '*Readymix*': { column: 'AA', label: 'READYMIX' } },
+            outputDir: 'out'
+        }, '/jobs');
+
+        expect(spec).toMatchObject({
+            name: 'master',
+            master: path.resolve('/jobs/master.xlsx'),
+            masterColumn: 2,
+            targets: [path.resolve('/jobs/incoming/*.xlsx')],
+            noMatchLabel: 'Not Matched',
+            outputDir: path.resolve('/jobs/out')
+        });
+        expect(targetOverrideFor(spec, '/jobs/incoming/Al Readymix.xlsx')).toMatchObject({ column: 26, label: 'READYMIX' });
+        expect(targetOverrideFor(spec, '/jobs/incoming/other.xlsx')).toEqual({});
+    });
+
+    it('rejects specs it cannot run', () => {
+        expect(() => parseJobSpec({ targets: '*.xlsx', outputDir: 'out' }, '/jobs')).toThrow(BatchSpecError);
+        expect(() => parseJobSpec({ master: 'm.xlsx', targets: [], outputDir: 'out' }, '/jobs')).toThrow('targets');
+        expect(() => parseJobSpec({ master: 'm.xlsx', targets: '*.xlsx', outputDir: 'out', masterRowRange: { start: 5, end: 2 } }, '/jobs')).toThrow('masterRowRange');
+    });
+
+    it('matches globs the way a shell would', () => {
+        expect(globToRegExp('*.xlsx').test('a.xlsx')).toBe(true);
+        expect(globToRegExp('*.xlsx').test('sub/a.xlsx')).toBe(false);
+        expect(globToRegExp('*.xlsx').test('.hidden.xlsx')).toBe(false);
+        expect(globToRegExp('**/*.{xlsx,xls}').test('a.xls')).toBe(true);
+        expect(globToRegExp('**/*.{xlsx,xls}').test('2026/10/a.xlsx')).toBe(true);
+        expect(globToRegExp('day-??.xlsx').test('day-07.xlsx')).toBe(true);
+    });
+});
+
+describe('batch runs', () => {
+    let dir: string;
+    let runner: BatchJobRunner;
+
+    beforeEach(() => {
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'batch-runner-'));
+        writeSheet(path.join(dir, 'master.xlsx'), [
+            ['Ticket No', 'Qty', 'Status'],
+            ['1000000001', 1], ['1000000002', 2], ['1000000003', 3]
+        ]);
+        writeSheet(path.join(dir, 'incoming', 'alpha.xlsx'), [['Ticket No', 'Ref'], ['1000000001', 'x'], ['9999999999', 'y']]);
+        writeSheet(path.join(dir, 'incoming', 'beta.xlsx'), [['Ref', 'Ticket'], ['z', '1000000003']]);
+        fs.writeFileSync(path.join(dir, 'incoming', '~$alpha.xlsx'), '');
+        runner = new BatchJobRunner(parseJobSpec({
+            master: 'master.xlsx',
+            masterColumn: 0,
+            masterResultColumn: 2,
+            targets: 'incoming/*.xlsx',
+            targetOverrides: { 'beta.xlsx': { column: 1, label: 'BETA' } },
+            noMatchLabel: 'Not Found',
+            outputDir: 'out'
+        }, dir));
+    });
+
+    afterEach(() => {
+        releaseMatchSession(runner.sessionId);
+        fs.rmSync(dir, { recursive: true, force: true });
+    });
+
+    it('finds targets, skips lock files and ignores its own outputs', () => {
+        expect(expandGlobs([path.join(dir, 'incoming', '*.xlsx')]).map(p => path.basename(p))).toEqual(['alpha.xlsx', 'beta.xlsx', '~$alpha.xlsx']);
+        expect(runner.listTargets()).toMatchObject({ skipped: [{ reason: 'Excel lock file' }] });
+        expect(runner.isRelevant(path.join(dir, 'incoming', 'gamma.xlsx'))).toBe(true);
+        expect(runner.isRelevant(path.join(dir, 'master.xlsx'))).toBe(true);
+        expect(runner.isRelevant(path.join(dir, 'out', 'run-1', 'master_updated.xlsx'))).toBe(false);
+        expect(runner.isRelevant(path.join(dir, 'notes.txt'))).toBe(false);
+    });
+
+    it('writes the outputs and a summary to a run folder', async () => {
+        const summary = await runner.run({ trigger: 'initial' });
+
+        expect(summary).toMatchObject({
+            success: true,
+            stats: { totalMasterRows: 3, matchedMasterRows: 2 },
+            master: { columns: [0], resultColumn: 2, detected: ['rowRange'] }
+        });
+        expect(summary.perFile).toEqual([
+            expect.objectContaining({ fileName: 'alpha.xlsx', column: 0, label: 'Alpha', matched: 1, total: 2, detected: ['column', 'rowRange', 'label'] }),
+            expect.objectContaining({ fileName: 'beta.xlsx', column: 1, label: 'BETA', matched: 1, detected: ['rowRange'] })
+        ]);
+        expect(path.dirname(summary.outputs.updated!)).toBe(summary.outputs.dir);
+        expect(fs.existsSync(summary.outputs.unmatched!)).toBe(true);
+
+        const written: BatchRunSummary = JSON.parse(fs.readFileSync(summary.outputs.summary, 'utf-8'));
+        expect(written.runId).toBe(summary.runId);
+        const rows = XLSX.utils.sheet_to_json<any[]>(XLSX.readFile(summary.outputs.updated!).Sheets['Sheet1'], { header: 1 });
+        expect(rows.slice(1).map(row => row[2])).toEqual(['Alpha', 'Not Found', 'BETA']);
+    });
+
+    it('re-matches only the changed target on the next run', async () => {
+        await runner.run({ trigger: 'initial' });
+        writeSheet(path.join(dir, 'incoming', 'beta.xlsx'), [['Ref', 'Ticket'], ['z', '1000000002']]);
+        const summary = await runner.run({ trigger: 'watch', changedFiles: [path.join(dir, 'incoming', 'beta.xlsx')] });
+
+        expect(summary.session).toEqual({ masterReused: true, targetsReused: 1, targetsMatched: 1 });
+        expect(summary.perFile.map(file => file.status)).toEqual(['reused', 'matched']);
+        expect(fs.readdirSync(path.join(dir, 'out'))).toHaveLength(2);
+    });
+
+    it('reports a run without targets as failed', async () => {
+        fs.rmSync(path.join(dir, 'incoming'), { recursive: true });
+        const summary = await runner.run();
+
+        expect(summary.success).toBe(false);
+        expect(summary.error).toContain('No target files');
+        expect(fs.existsSync(summary.outputs.summary)).toBe(true);
+    });
+});
+
+describe('BatchQueue', () => {
+    function fakeRunner(log: string[], name: string) {
+        const runner = Object.create(BatchJobRunner.prototype) as BatchJobRunner;
+        runner.run = async request => {
+            log.push(`start ${name} ${(request.changedFiles ?? []).join(',')}`);
+            await new Promise(resolve => setTimeout(resolve, 10));
+            log.push(`end ${name}`);
+            return { job: name, success: true } as BatchRunSummary;
+        };
+        return runner;
+    }
+
+    it('runs up to the limit at once and folds repeated requests into the waiting run', async () => {
+        const log: string[] = [];
+        const queue = new BatchQueue(2);
+        const a = fakeRunner(log, 'a');
+        const b = fakeRunner(log, 'b');
+
+        queue.submit(a, { trigger: 'initial' });
+        queue.submit(a, { trigger: 'watch', changedFiles: ['x'] });
+        queue.submit(a, { trigger: 'watch', changedFiles: ['y'] });
+        queue.submit(b, { trigger: 'initial' });
+        await queue.onIdle();
+
+        expect(log).toEqual(['start a ', 'start b ', 'end a', 'start a x,y', 'end b', 'end a']);
+    });
+});
@@ -0,0 +1,79 @@
+// @vitest-environment node
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { openDatabase, AppDatabase, DEFAULT_LAST_INVOICE_NUMBER } from '../../db';
+import { saveInvoiceBatch, saveCustomerBatch, saveGeneratedInvoices } from '../batch-save';
+
+vi.mock('electron', () => ({ app: { getPath: () => '' } }));
+
+describe('batch save', () => {
+    let dir: string;
+    let file: string;
+    let db: AppDatabase;
+
+    beforeEach(() => {
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'batch-save-'));
+        file = path.join(dir, 'test.db');
+        db = openDatabase(file);
+    });
+
+    afterEach(() => {
+        db.close();
+        fs.rmSync(dir, { recursive: true, force: true });
+    });
+
+    it('numbers a batch from one contiguous block in a single record', () => {
+        const before = fs.statSync(file).size;
+        const results = saveInvoiceBatch(db, [
+            { number: 'DRAFT', status: 'draft', total: 1 },
+            { id: 'kept', number: '42', status: 'issued', total: 2 },
+            null,
+            { id: 'legacy', number: 'INV-7', status: 'draft', total: 3 },
+        ]);
+
+        const first = DEFAULT_LAST_INVOICE_NUMBER + 1;
+        expect(results.map(r => r.success)).toEqual([true, true, false, true]);
+        expect(results[0].number).toBe(String(first));
+        expect(results[1].number).toBe('42');
+        expect(results[3].number).toBe(String(first + 1));
+        expect(db.lastInvoiceNumber).toBe(first + 1);
+        expect(db.invoices.size).toBe(3);
+
+        const appended = fs.readFileSync(file, 'utf-8').slice(before).trim().split('\n');
+        expect(appended).toHaveLength(1);
+    });
+
+    it('survives a reopen with numbering intact', () => {
+        saveInvoiceBatch(db, [{ number: 'DRAFT' }, { number: 'DRAFT' }]);
+        db.close();
+        db = openDatabase(file);
+        expect(db.invoices.find('number', String(DEFAULT_LAST_INVOICE_NUMBER + 2))).toHaveLength(1);
+        expect(db.lastInvoiceNumber).toBe(DEFAULT_LAST_INVOICE_NUMBER + 2);
+    });
+
+    it('saves generated invoices and their customer totals in one record', () => {
+        saveCustomerBatch(db, [{ id: 'c1', name: 'A', total10mm: 5 }, { id: 'c2', name: 'B' }]);
+        const before = fs.statSync(file).size;
+        const { results, customers } = saveGeneratedInvoices(db, [
+            { invoice: { number: 'DRAFT', to: { customerId: 'c1' } }, totals: { total10mm: 2, total20mm: 3 } },
+            { invoice: null, totals: { total10mm: 100, total20mm: 100 } },
+            { invoice: { number: 'DRAFT', to: { customerId: 'c2' } } },
+        ]);
+
+        expect(results.map(r => r.success)).toEqual([true, false, true]);
+        expect(customers.map(c => c.id)).toEqual(['c1']);
+        expect(db.customers.get('c1')).toMatchObject({ total10mm: 7, total20mm: 3 });
+        expect(db.customers.get('c2')).toMatchObject({ total10mm: 0, total20mm: 0 });
+        expect(db.invoices.size).toBe(2);
+        expect(fs.readFileSync(file, 'utf-8').slice(before).trim().split('\n')).toHaveLength(1);
+    });
+
+    it('saves customers with defaulted totals', () => {
+        const results = saveCustomerBatch(db, [{ name: 'A' }, { id: 'b', name: 'B', total10mm: 5 }]);
+        expect(results.every(r => r.success)).toBe(true);
+        expect(db.customers.get('b')).toMatchObject({ total10mm: 5, total20mm: 0 });
+        expect(db.customers.get(results[0].id!)).toMatchObject({ name: 'A', total10mm: 0, total20mm: 0 });
+    });
+});
@@ -0,0 +1,47 @@
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import { registerJob, unregisterJob, cancelJob, isCancelled, throttleProgress, JobProgress } from '../excel-jobs';
+
+const progress = (rowsScanned: number): JobProgress => ({
+    jobId: 'job',
+    stage: 'matching',
+    filesDone: 0,
+    filesTotal: 1,
+    rowsScanned,
+    rowsMatched: 0,
+    bytesWritten: 0
+});
+
+describe('job cancellation', () => {
+    it('flips the shared flag of a registered job only', () => {
+        const flag = registerJob('a');
+        expect(isCancelled(flag)).toBe(false);
+        expect(cancelJob('a')).toBe(true);
+        expect(isCancelled(flag)).toBe(true);
+
+        unregisterJob('a');
+        expect(cancelJob('a')).toBe(false);
+    });
+});
+
+describe('throttleProgress', () => {
+    afterEach(() => {
+        vi.useRealTimers();
+    });
+
+    it('coalesces updates and delivers the latest after the interval', () => {
+        vi.useFakeTimers();
+        const sent: number[] = [];
+        const emit = throttleProgress(p => sent.push(p.rowsScanned), 100);
+
+        emit(progress(1));
+        emit(progress(2));
+        emit(progress(3));
+        expect(sent).toEqual([1]);
+
+        vi.advanceTimersByTime(100);
+        expect(sent).toEqual([1, 3]);
+
+        emit(progress(4), true);
+        expect(sent).toEqual([1, 3, 4]);
+    });
+});
@@ -0,0 +1,96 @@
+import { describe, it, expect } from 'vitest';
+import {
+    buildMasterIndex,
+    matchTargetRows,
+    computeResultColumn,
+    computeResultColumnFromIndex,
+    isInvalidTargetKey,
+} from '../excel-matching';
+import { JobCancelledError } from '../excel-jobs';
+
+const master = [
+    ['QPMC Ticket', 'Qty', 'Result'],
+    ['1234567890', 10, ''],
+    ['1234567891', 12, ''],
+    ['1234567890', 8, ''],
+    ['ABC', 5, ''],
+];
+
+describe('buildMasterIndex', () => {
+    it('collects keys, format warnings and duplicates in row order', () => {
+        const { lookup, warnings } = buildMasterIndex(master, [0]);
+
+        expect(Array.from(lookup)).toEqual(['1234567890', '1234567891', 'abc']);
+        expect(warnings.map(w => w.type)).toEqual(['invalid_format', 'duplicate']);
+        expect(warnings[1].message).toContain('rows: 4');
+    });
+
+    it('honours the 1-indexed row range', () => {
+        const { lookup } = buildMasterIndex(master, [0], { start: 3, end: 3 });
+        expect(Array.from(lookup)).toEqual(['1234567891']);
+    });
+});
+
+describe('matchTargetRows', () => {
+    it('splits rows into matched and unmatched and skips footer rows', () => {
+        const target = [
+            ['Ticket No', 'Qty'],
+            ['1234567891', 12],
+            ['9999999999', 3],
+            ['Grand Total', 15],
+        ];
+        const { lookup } = buildMasterIndex(master, [0]);
+        const result = matchTargetRows(target, [0], undefined, lookup, 'cust.xlsx');
+
+        expect(result.stats).toEqual({ total: 2, matched: 1, nearMatched: 0 });
+        expect(result.matchedKeys).toEqual(['1234567891']);
+        expect(result.matchedRows[0].rowNumber).toBe(2);
+        expect(result.unmatchedRows).toEqual([['9999999999', 3, 'cust.xlsx']]);
+        expect(result.header).toEqual(['Ticket No', 'Qty']);
+    });
+});
+
+describe('row control', () => {
+    it('stops at a row boundary once cancelled', () => {
+        const { lookup } = buildMasterIndex(master, [0]);
+        const target = Array.from({ length: 50 }, (_, i) => [String(1234567000 + i)]);
+        let checks = 0;
+        const control = { shouldStop: () => ++checks > 10 };
+
+        expect(() => matchTargetRows(target, [0], undefined, lookup, 't.xlsx', control))
+            .toThrow(JobCancelledError);
+        expect(checks).toBe(11);
+    });
+});
+
+describe('computeResultColumn', () => {
+    it('joins labels for matched keys and fills the no-match sentence', () => {
+        const lookup = new Map([['1234567890', new Set(['A', 'B'])]]);
+        const { cells, matchCount } = computeResultColumn(master, [0], undefined, lookup, 'Not Matched');
+
+        expect(matchCount).toBe(2);
+        expect(cells).toEqual([
+            [1, 'A, B'],
+            [2, 'Not Matched'],
+            [3, 'A, B'],
+            [4, 'Not Matched'],
+        ]);
+    });
+
+    it('gives the same cells from the master index', () => {
+        const lookup = new Map([['1234567890', new Set(['A', 'B'])]]);
+        const { keyRows } = buildMasterIndex(master, [0]);
+
+        expect(computeResultColumnFromIndex(keyRows, lookup, 'Not Matched'))
+            .toMatchObject(computeResultColumn(master, [0], undefined, lookup, 'Not Matched'));
+        expect(computeResultColumnFromIndex(keyRows, lookup, '').cells).toEqual([[1, 'A, B'], [3, 'A, B']]);
+    });
+});
+
+describe('isInvalidTargetKey', () => {
+    it('rejects short non-ticket keys and footer labels', () => {
+        expect(isInvalidTargetKey('12345')).toBe(true);
+        expect(isInvalidTargetKey('total qty 20mm')).toBe(true);
+        expect(isInvalidTargetKey('1234567890')).toBe(false);
+    });
+});
@@ -0,0 +1,119 @@
+// @vitest-environment node
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import * as XLSX from 'xlsx';
+import { streamUnsupported, writeWorkbookStream, UnmatchedRowWriter } from '../excel-writer';
+import { WORKBOOK_WRITE_OPTIONS } from '../../utils/excel-utils';
+
+describe('excel-writer', () => {
+    let dir: string;
+
+    beforeEach(() => {
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'excel-writer-'));
+    });
+
+    afterEach(() => {
+        fs.rmSync(dir, { recursive: true, force: true });
+    });
+
+    function readBack(file: string, sheetName?: string): XLSX.WorkSheet {
+        const wb = XLSX.readFile(file, WORKBOOK_WRITE_OPTIONS);
+        return wb.Sheets[sheetName ?? wb.SheetNames[0]];
+    }
+
+    it('streams the master with its result column and keeps number formats', async () => {
+        const sheet = XLSX.utils.aoa_to_sheet([
+            ['Ticket No', 'Date', 'Amount', 'Status'],
+            ['T1', 45292, 1234.5],
+            ['T2', 45293, 99]
+        ]);
+        sheet['B2'].z = 'dd/mm/yyyy';
+        sheet['B3'].z = 'dd/mm/yyyy';
+        sheet['C2'].z = '#,##0.00';
+        sheet['!cols'] = [{ wch: 18 }];
+        const source = XLSX.utils.book_new();
+        XLSX.utils.book_append_sheet(source, sheet, 'Master');
+        XLSX.utils.book_append_sheet(source, XLSX.utils.aoa_to_sheet([['notes']]), 'Notes');
+        const masterFile = path.join(dir, 'master.xlsx');
+        XLSX.writeFile(source, masterFile);
+
+        const workbook = XLSX.readFile(masterFile, WORKBOOK_WRITE_OPTIONS);
+        const out = path.join(dir, 'out.xlsx');
+        await writeWorkbookStream(workbook, out, { sheetName: 'Master', colIndex: 3, cells: [[1, 'Paid'], [2, 'Not Found']] });
+
+        const written = readBack(out, 'Master');
+        expect(XLSX.utils.sheet_to_json(written, { header: 1, raw: true })).toEqual([
+            ['Ticket No', 'Date', 'Amount', 'Status'],
+            ['T1', 45292, 1234.5, 'Paid'],
+            ['T2', 45293, 99, 'Not Found']
+        ]);
+        expect(written['B2'].z).toBe('dd/mm/yyyy');
+        expect(written['C2'].w).toBe('1,234.50');
+        expect(XLSX.utils.sheet_to_json(readBack(out, 'Notes'), { header: 1 })).toEqual([['notes']]);
+        // The parsed (cached) workbook is left untouched
+        expect(workbook.Sheets['Master']['D2']).toBeUndefined();
+    });
+
+    it('keeps hidden rows, sheet visibility and the autofilter', async () => {
+        const sheet = XLSX.utils.aoa_to_sheet([['Ticket No', 'Qty'], ['T1', 1], ['T2', 2]]);
+        sheet['!rows'] = [undefined as any, { hidden: true }];
+        sheet['!autofilter'] = { ref: 'A1:B3' };
+        const workbook = XLSX.utils.book_new();
+        XLSX.utils.book_append_sheet(workbook, sheet, 'Master');
+        XLSX.utils.book_append_sheet(workbook, XLSX.utils.aoa_to_sheet([['lookup']]), 'Lists');
+        workbook.Workbook = { Sheets: [{ Hidden: 0 }, { Hidden: 1 }] };
+        expect(streamUnsupported(workbook)).toBeNull();
+
+        const out = path.join(dir, 'out.xlsx');
+        await writeWorkbookStream(workbook, out, { sheetName: 'Master', colIndex: 2, cells: [[1, 'Paid']] });
+
+        const written = XLSX.readFile(out, WORKBOOK_WRITE_OPTIONS);
+        expect(written.Sheets['Master']['!rows']?.[1]?.hidden).toBe(true);
+        expect(written.Sheets['Master']['!autofilter']?.ref).toBe('A1:B3');
+        expect(written.Workbook?.Sheets?.[1]?.Hidden).toBe(1);
+    });
+
+    it('leaves workbooks with names, comments or 1904 dates to SheetJS', () => {
+        const sheet = XLSX.utils.aoa_to_sheet([['Ticket No'], ['T1']]);
+        const workbook = XLSX.utils.book_new();
+        XLSX.utils.book_append_sheet(workbook, sheet, 'Master');
+        expect(streamUnsupported(workbook)).toBeNull();
+
+        sheet['A2'].c = [{ a: 'Ops', t: 'Check this ticket' }];
+        expect(streamUnsupported(workbook)).toBe('cell comments');
+        workbook.Workbook = { Names: [{ Name: 'Tickets', Ref: 'Master!$A$1:$A$2' }] };
+        expect(streamUnsupported(workbook)).toBe('defined names');
+        workbook.Workbook = { WBProps: { date1904: true } };
+        expect(streamUnsupported(workbook)).toBe('1904 date system');
+    });
+
+    it('writes unmatched rows under the header as they are appended', async () => {
+        const file = path.join(dir, 'unmatched.xlsx');
+        const writer = new UnmatchedRowWriter(file, ['Ticket No', 'Source File']);
+        await writer.append([['T9', 'a.xlsx']]);
+        await writer.append([['T10', 'b.xlsx'], ['T11', 'b.xlsx']]);
+
+        expect(await writer.finish()).toBe(true);
+        expect(writer.rowCount).toBe(3);
+        expect(XLSX.utils.sheet_to_json(readBack(file), { header: 1 })).toEqual([
+            ['Ticket No', 'Source File'],
+            ['T9', 'a.xlsx'],
+            ['T10', 'b.xlsx'],
+            ['T11', 'b.xlsx']
+        ]);
+    });
+
+    it('creates no file without rows and removes it on abort', async () => {
+        const empty = new UnmatchedRowWriter(path.join(dir, 'empty.xlsx'), ['Ticket No']);
+        expect(await empty.finish()).toBe(false);
+        expect(fs.existsSync(path.join(dir, 'empty.xlsx'))).toBe(false);
+
+        const file = path.join(dir, 'aborted.xlsx');
+        const aborted = new UnmatchedRowWriter(file, ['Ticket No']);
+        await aborted.append([['T1']]);
+        await aborted.abort();
+        expect(fs.existsSync(file)).toBe(false);
+    });
+});
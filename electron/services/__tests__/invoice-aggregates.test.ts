@@ -0,0 +1,78 @@
+// @vitest-environment node
+import { describe, it, expect, beforeEach } from 'vitest';
+import { Collection } from '../../db/log-store';
+import { InvoiceAggregates, agingBucket } from '../invoice-aggregates';
+
+function invoice(id: string, status: string, total: number, date: string, customerId = 'c-1') {
+    return { id, status, total, date, createdAt: `${date}T09:00:00.000Z`, to: { customerId, name: customerId.toUpperCase() } };
+}
+
+describe('InvoiceAggregates', () => {
+    let collection: Collection;
+    let aggregates: InvoiceAggregates;
+
+    beforeEach(() => {
+        collection = new Collection({ name: 'invoices' });
+        collection.applyPut(invoice('a', 'paid', 1000, '2024-03-02'));
+        collection.applyPut(invoice('b', 'issued', 500, '2024-03-20', 'c-2'));
+        collection.applyPut(invoice('c', 'overdue', 300, '2024-01-05', 'c-2'));
+        collection.applyPut(invoice('d', 'draft', 999, '2024-03-25'));
+        aggregates = new InvoiceAggregates(collection);
+    });
+
+    it('buckets ages like the dashboard did', () => {
+        expect(agingBucket(-2)).toBe('0-30');
+        expect(agingBucket(30)).toBe('0-30');
+        expect(agingBucket(31)).toBe('31-60');
+        expect(agingBucket(90)).toBe('61-90');
+        expect(agingBucket(91)).toBe('90+');
+        expect(agingBucket(NaN)).toBe('90+');
+    });
+
+    it('summarises revenue, outstanding, months and aging', () => {
+        const summary = aggregates.summary('2024-03-31');
+        expect(summary.invoiceCount).toBe(4);
+        expect(summary.revenue).toBe(1800);
+        expect(summary.outstanding).toBe(800);
+        expect(summary.activeInvoices).toBe(2);
+        expect(summary.currentMonthRevenue).toBe(1500);
+        expect(summary.lastMonthRevenue).toBe(0);
+        expect(summary.revenueTrend).toBe(100);
+        expect(summary.byStatus.draft).toEqual({ count: 1, amount: 999 });
+        expect(summary.aging['0-30']).toEqual({ count: 1, amount: 500 });
+        expect(summary.aging['61-90']).toEqual({ count: 1, amount: 300 });
+        expect(summary.months).toHaveLength(12);
+        expect(summary.months[11]).toEqual({ month: '2024-03', count: 2, amount: 1500 });
+        expect(summary.topCustomers[0]).toMatchObject({ customerId: 'c-1', revenue: 1000, outstanding: 0 });
+    });
+
+    it('follows saves, status changes and deletes', () => {
+        aggregates.summary('2024-03-31');
+        collection.applyPut({ ...invoice('b', 'paid', 500, '2024-03-20', 'c-2') });
+        collection.applyDelete('c');
+        collection.applyPut(invoice('e', 'issued', 250, '2024-02-10'));
+
+        const summary = aggregates.summary('2024-03-31');
+        expect(summary.outstanding).toBe(250);
+        expect(summary.activeInvoices).toBe(1);
+        expect(summary.aging['31-60']).toEqual({ count: 1, amount: 250 });
+        expect(summary.aging['0-30']).toEqual({ count: 0, amount: 0 });
+        expect(summary.aging['61-90']).toEqual({ count: 0, amount: 0 });
+        expect(aggregates.customer('c-2')).toMatchObject({ count: 1, revenue: 500, outstanding: 0 });
+    });
+
+    it('re-buckets outstanding amounts when the day moves on', () => {
+        expect(aggregates.summary('2024-04-25').aging['31-60']).toEqual({ count: 1, amount: 500 });
+        expect(aggregates.summary('2024-04-25').aging['90+']).toEqual({ count: 1, amount: 300 });
+    });
+
+    it('matches a fresh build after many changes', () => {
+        for (let i = 0; i < 50; i++) {
+            collection.applyPut(invoice(`x${i}`, i % 3 === 0 ? 'paid' : 'issued', i * 10, `2024-0${1 + (i % 3)}-1${i % 10}`, `c-${i % 4}`));
+        }
+        for (let i = 0; i < 50; i += 2) collection.applyDelete(`x${i}`);
+
+        const fresh = new InvoiceAggregates(collection);
+        expect(aggregates.summary('2024-03-31')).toEqual(fresh.summary('2024-03-31'));
+    });
+});
@@ -0,0 +1,74 @@
+// @vitest-environment node
+import { bench, describe, afterAll } from 'vitest';
+import { Writable } from 'stream';
+import { writeInvoicePdf } from '../invoice-pdf';
+
+/**
+ * Sequential invoice PDF generation on the shared printer: 1, 100 and 1,000
+ * invoices per run, streamed into a sink that only counts bytes. Per-invoice
+ * latency is the run time divided by the batch size; heap growth per batch is
+ * printed after the run. Run with `npm run bench`.
+ */
+
+const banking = {
+    beneficiaryName: 'Fatoora Trading WLL',
+    beneficiaryBank: 'Qatar National Bank',
+    branch: 'Doha',
+    ibanNo: 'QA00QNBA000000000000000000000',
+    swiftCode: 'QNBAQAQA'
+};
+
+function invoice(i: number) {
+    return {
+        id: `inv-${i}`,
+        number: String(614 + i),
+        status: 'issued',
+        date: '2026-01-01T00:00:00.000Z',
+        dueDate: '2026-02-01',
+        createdAt: '2026-01-01T00:00:00.000Z',
+        to: { customerId: `cust-${i % 50}`, name: `Customer ${i % 50}`, address: 'Industrial Area, Doha' },
+        items: [
+            { description: 'Gabbro 20mm', quantity: 25.5, unitPrice: 30, amount: 765, type: '20mm' },
+            { description: 'Gabbro 10mm', quantity: 12.25, unitPrice: 32, amount: 392, type: '10mm' }
+        ],
+        total: 1157,
+        currency: 'QAR'
+    };
+}
+
+function byteSink() {
+    let bytes = 0;
+    const sink = new Writable({
+        write(chunk, _encoding, callback) {
+            bytes += chunk.length;
+            callback();
+        }
+    });
+    return { sink, bytes: () => bytes };
+}
+
+const heapGrowth = new Map<number, number[]>();
+
+async function generate(count: number) {
+    const before = process.memoryUsage().heapUsed;
+    for (let i = 0; i < count; i++) {
+        const { sink } = byteSink();
+        await writeInvoicePdf(invoice(i), banking, sink);
+    }
+    const samples = heapGrowth.get(count) ?? [];
+    samples.push(process.memoryUsage().heapUsed - before);
+    heapGrowth.set(count, samples);
+}
+
+afterAll(() => {
+    for (const [count, samples] of heapGrowth) {
+        const worst = Math.max(...samples);
+        console.log(`[invoice-pdf] ${count} invoice(s): max heap growth ${(worst / 1024 / 1024).toFixed(1)} MB over ${samples.length} runs`);
+    }
+});
+
+describe('invoice PDF generation', () => {
+    bench('1 invoice', () => generate(1), { time: 2000 });
+    bench('100 invoices', () => generate(100), { iterations: 5, time: 0 });
+    bench('1,000 invoices', () => generate(1_000), { iterations: 2, time: 0 });
+});
@@ -0,0 +1,85 @@
+// @vitest-environment node
+import { describe, it, expect, beforeEach } from 'vitest';
+import { Collection } from '../../db/log-store';
+import { InvoiceQueryIndex } from '../invoice-query';
+
+const definition = {
+    name: 'invoices',
+    indexes: [
+        { name: 'status', key: (inv: any) => inv.status || null },
+        { name: 'customer', key: (inv: any) => inv.to?.customerId || null }
+    ]
+};
+
+function invoice(n: number, overrides: any = {}) {
+    return {
+        id: `inv-${n}`,
+        number: String(600 + n),
+        date: `2024-01-${String(n).padStart(2, '0')}`,
+        createdAt: `2024-01-${String(n).padStart(2, '0')}T10:00:00.000Z`,
+        status: n % 2 === 0 ? 'paid' : 'issued',
+        total: n * 100,
+        to: { customerId: n % 3 === 0 ? 'c-1' : 'c-2', name: n % 3 === 0 ? 'Al Noor Trading' : 'Gulf Contracting' },
+        ...overrides
+    };
+}
+
+describe('InvoiceQueryIndex', () => {
+    let collection: Collection;
+    let index: InvoiceQueryIndex;
+
+    beforeEach(() => {
+        collection = new Collection(definition);
+        for (let n = 1; n <= 20; n++) collection.applyPut(invoice(n));
+        index = new InvoiceQueryIndex(collection);
+    });
+
+    it('pages the default order newest first', () => {
+        const first = index.query({ limit: 5 });
+        expect(first.total).toBe(20);
+        expect(first.invoices.map(inv => inv.id)).toEqual(['inv-20', 'inv-19', 'inv-18', 'inv-17', 'inv-16']);
+
+        const last = index.query({ offset: 18, limit: 5 });
+        expect(last.invoices.map(inv => inv.id)).toEqual(['inv-2', 'inv-1']);
+    });
+
+    it('sorts ascending on the requested field', () => {
+        const page = index.query({ sort: { field: 'total', direction: 'asc' }, limit: 3 });
+        expect(page.invoices.map(inv => inv.total)).toEqual([100, 200, 300]);
+    });
+
+    it('filters by status and customer through the indexes', () => {
+        const paid = index.query({ status: 'paid', limit: 100 });
+        expect(paid.total).toBe(10);
+        expect(paid.invoices.every(inv => inv.status === 'paid')).toBe(true);
+
+        const paidForC1 = index.query({ status: 'paid', customerId: 'c-1', limit: 100 });
+        expect(paidForC1.invoices.map(inv => inv.id)).toEqual(['inv-18', 'inv-12', 'inv-6']);
+
+        expect(index.query({ status: 'cancelled' }).total).toBe(0);
+    });
+
+    it('searches number and client name, and filters by date range', () => {
+        expect(index.query({ search: '605' }).invoices.map(inv => inv.id)).toEqual(['inv-5']);
+        expect(index.query({ search: 'al noor', limit: 100 }).total).toBe(6);
+
+        const range = index.query({ dateRange: { from: '2024-01-03', to: '2024-01-05' }, limit: 100 });
+        expect(range.invoices.map(inv => inv.id)).toEqual(['inv-5', 'inv-4', 'inv-3']);
+    });
+
+    it('keeps orders and overview in step with the collection', () => {
+        collection.applyPut(invoice(21, { total: 50 }));
+        collection.applyPut({ ...invoice(20), status: 'issued', total: 1 });
+        collection.applyDelete('inv-19');
+
+        expect(index.query({ limit: 2 }).invoices.map(inv => inv.id)).toEqual(['inv-21', 'inv-20']);
+        expect(index.query({ sort: { field: 'total', direction: 'asc' }, limit: 2 }).invoices.map(inv => inv.id))
+            .toEqual(['inv-20', 'inv-21']);
+
+        const overview = index.overview();
+        expect(overview.count).toBe(20);
+        expect(overview.byStatus.paid.count).toBe(9);
+        expect(overview.byStatus.issued.count).toBe(11);
+        expect(overview.totalAmount).toBe(21000 - 2000 - 1900 + 1 + 50);
+    });
+});
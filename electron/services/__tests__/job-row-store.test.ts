@@ -0,0 +1,37 @@
+import { describe, it, expect } from 'vitest';
+import { JobRowStore, buildOutputModel } from '../job-row-store';
+
+describe('JobRowStore', () => {
+    it('serves clamped row windows', () => {
+        const store = new JobRowStore();
+        const rows = [['Ticket', 'Qty'], ['A', 1], ['B', 2], ['C', 3]];
+        const id = store.put(rows);
+
+        expect(store.getRows(id, 1, 2)).toEqual({ rows: [['A', 1], ['B', 2]], start: 1, totalRows: 4 });
+        expect(store.getRows(id, 3, 100)?.rows).toEqual([['C', 3]]);
+        expect(store.getRows(id, -5, 1)?.start).toBe(0);
+    });
+
+    it('drops released and oldest stores', () => {
+        const store = new JobRowStore();
+        const first = store.put([]);
+        const ids = [store.put([]), store.put([]), store.put([])];
+
+        expect(store.getRows(first, 0, 1)).toBeNull();
+        expect(store.release(ids[0])).toBe(true);
+        expect(store.getRows(ids[0], 0, 1)).toBeNull();
+        expect(store.getRows(ids[2], 0, 1)).not.toBeNull();
+    });
+});
+
+describe('buildOutputModel', () => {
+    it('reports the layout of the written rows', () => {
+        const rows = [['Ticket', 'Qty', 'Result'], ['A', 1, 'X'], ['B', 2], ['Total', 3]];
+        const model = buildOutputModel('s', rows, 2);
+
+        expect(model.headers.map(h => h.name)).toEqual(['Ticket', 'Qty', 'Result']);
+        expect(model.headerRowIndex).toBe(1);
+        expect(model.footerStartRow).toBe(4);
+        expect(model).toMatchObject({ rowCount: 4, colCount: 3, matchedRowCount: 2 });
+    });
+});
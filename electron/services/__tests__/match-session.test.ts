@@ -0,0 +1,91 @@
+// @vitest-environment node
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import crypto from 'crypto';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import * as XLSX from 'xlsx';
+import { processExcelJob, ProcessOptions } from '../excel-processor';
+import { acquireMatchSession, releaseMatchSession } from '../match-session';
+
+function writeSheet(filePath: string, rows: any[][]) {
+    const wb = XLSX.utils.book_new();
+    XLSX.utils.book_append_sheet(wb, XLSX.utils.aoa_to_sheet(rows), 'Sheet1');
+    XLSX.writeFile(wb, filePath);
+}
+
+describe('match sessions', () => {
+    let dir: string;
+    let sessionId: string;
+
+    beforeEach(() => {
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'match-session-'));
+        sessionId = crypto.randomUUID();
+        writeSheet(path.join(dir, 'master.xlsx'), [
+            ['Ticket', 'Qty', 'Status'],
+            ['1000000001', 1], ['1000000002', 2], ['1000000003', 3]
+        ]);
+        writeSheet(path.join(dir, 'a.xlsx'), [['Ticket', 'Ref'], ['1000000001', 'x'], ['9999999999', 'y']]);
+        writeSheet(path.join(dir, 'b.xlsx'), [['Ref', 'Ticket'], ['z', '1000000003']]);
+    });
+
+    afterEach(() => {
+        releaseMatchSession(sessionId);
+        fs.rmSync(dir, { recursive: true, force: true });
+    });
+
+    function options(targets: Record<string, number>): ProcessOptions {
+        const targetPaths = Object.keys(targets).map(name => path.join(dir, name));
+        return {
+            sessionId,
+            masterPath: path.join(dir, 'master.xlsx'),
+            targetPaths,
+            masterColIndices: [0],
+            masterResultColIndex: 2,
+            targetMatchColIndices: Object.fromEntries(targetPaths.map(p => [p, [targets[path.basename(p)]]])),
+            targetMatchStrings: Object.fromEntries(targetPaths.map(p => [p, path.basename(p, '.xlsx').toUpperCase()])),
+            matchSentence: '',
+            noMatchSentence: 'Not Found',
+            outputPath: path.join(dir, 'out.xlsx')
+        };
+    }
+
+    function resultColumn(): any[] {
+        const rows = XLSX.utils.sheet_to_json<any[]>(XLSX.readFile(path.join(dir, 'out.xlsx')).Sheets['Sheet1'], { header: 1 });
+        return rows.slice(1).map(row => row[2]);
+    }
+
+    it('re-matches only the targets that were added or remapped', async () => {
+        const first = await processExcelJob(options({ 'a.xlsx': 0 }));
+        expect(first).toMatchObject({ session: { masterReused: false, targetsReused: 0, targetsMatched: 1 } });
+        expect(resultColumn()).toEqual(['A', 'Not Found', 'Not Found']);
+
+        const added = await processExcelJob(options({ 'a.xlsx': 0, 'b.xlsx': 1 }));
+        expect(added).toMatchObject({ session: { masterReused: true, targetsReused: 1, targetsMatched: 1 } });
+        expect(added).toMatchObject({ stats: { matchedMasterRows: 2 } });
+        expect(resultColumn()).toEqual(['A', 'Not Found', 'B']);
+
+        const remapped = await processExcelJob(options({ 'a.xlsx': 1, 'b.xlsx': 1 }));
+        expect(remapped).toMatchObject({ session: { masterReused: true, targetsReused: 1, targetsMatched: 1 } });
+        expect(resultColumn()).toEqual(['Not Found', 'Not Found', 'B']);
+    });
+
+    it('re-indexes when the master content changes', async () => {
+        await processExcelJob(options({ 'a.xlsx': 0 }));
+        writeSheet(path.join(dir, 'master.xlsx'), [['Ticket', 'Qty', 'Status'], ['1000000002', 2]]);
+
+        const again = await processExcelJob(options({ 'a.xlsx': 0 }));
+        expect(again).toMatchObject({ session: { masterReused: false, targetsReused: 0, targetsMatched: 1 } });
+        expect(resultColumn()).toEqual(['Not Found']);
+    });
+
+    it('evicts the least recently used session', () => {
+        const ids = [crypto.randomUUID(), crypto.randomUUID(), crypto.randomUUID()];
+        acquireMatchSession(ids[0]);
+        acquireMatchSession(ids[1]);
+        const { evicted } = acquireMatchSession(ids[2]);
+
+        expect(evicted.map(session => session.id)).toContain(ids[0]);
+        ids.forEach(releaseMatchSession);
+    });
+});
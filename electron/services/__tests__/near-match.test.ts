@@ -0,0 +1,62 @@
+import { describe, it, expect } from 'vitest';
+import { editDistance, NearMatchIndex } from '../near-match';
+import { buildMasterIndex, matchTargetRows } from '../excel-matching';
+
+describe('editDistance', () => {
+    it('counts substitutions, insertions, deletions and transpositions', () => {
+        expect(editDistance('1234567890', '1234567890')).toBe(0);
+        expect(editDistance('1234567890', '1234567891')).toBe(1);
+        expect(editDistance('1234567890', '123456789')).toBe(1);
+        expect(editDistance('1234567890', '12345678900')).toBe(1);
+        expect(editDistance('1234567890', '1234567809')).toBe(1);
+        expect(editDistance('1234567890', '0987654321', 2)).toBe(3);
+    });
+});
+
+describe('NearMatchIndex', () => {
+    const master = Array.from({ length: 2000 }, (_, i) => String(1000000000 + (i * 2654435761) % 9000000000));
+    // A swapped pair, a dropped digit, a wrong digit and an extra digit
+    const typo = (key: string, i: number) => [
+        key.slice(0, 3) + key[4] + key[3] + key.slice(5), key.slice(1), key.slice(0, 6) + '7' + key.slice(7), key + '1'
+    ][i % 4];
+
+    it('finds the same keys as a brute-force scan', () => {
+        const index = new NearMatchIndex(master, 1);
+        const queries = [...master.slice(0, 40).map(typo), '9999999999'];
+        let found = 0;
+
+        for (const query of queries) {
+            const close = master
+                .map(key => ({ key, distance: editDistance(query, key, 1) }))
+                .filter(m => m.distance > 0 && m.distance <= 1);
+            const match = index.find(query);
+            expect(match, query).toEqual(close.length === 1 ? close[0] : null);
+            if (match) found++;
+        }
+        expect(found).toBeGreaterThan(30);
+    });
+
+    it('reports distance 2 only when asked for it', () => {
+        expect(new NearMatchIndex(['1234567890'], 1).find('1234567000')).toBeNull();
+        expect(new NearMatchIndex(['1234567890'], 2).find('1234567000')).toEqual({ key: '1234567890', distance: 2 });
+    });
+
+    it('does not pick between equally close keys', () => {
+        const index = new NearMatchIndex(['1234567890', '1234567892'], 1);
+        expect(index.find('1234567891')).toBeNull();
+    });
+});
+
+describe('matchTargetRows with a near-match index', () => {
+    it('reports typo tickets as near matches instead of unmatched rows', () => {
+        const { lookup } = buildMasterIndex([['Ticket'], ['1234567890'], ['5555555555']], [0]);
+        const target = [['Ticket'], ['1234567890'], ['1234567809'], ['9999999999']];
+        const result = matchTargetRows(target, [0], undefined, lookup, 't.xlsx', undefined, new NearMatchIndex(lookup));
+
+        expect(result.stats).toEqual({ total: 3, matched: 1, nearMatched: 1 });
+        expect(result.nearMatches).toEqual([
+            { data: ['1234567809'], rowNumber: 3, key: '1234567809', masterKey: '1234567890', distance: 1 }
+        ]);
+        expect(result.unmatchedRows).toEqual([['9999999999', 't.xlsx']]);
+    });
+});
@@ -0,0 +1,103 @@
+// @vitest-environment node
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
+
+// Stand-ins for ipcMain and hidden windows: the "renderer" reports ready after
+// loading and answers print-data with print-ready a few ms later.
+const electron = vi.hoisted(() => {
+    const listeners = new Map<string, Set<(...args: any[]) => void>>();
+    const ipcMain = {
+        on: (channel: string, fn: (...args: any[]) => void) => {
+            if (!listeners.has(channel)) listeners.set(channel, new Set());
+            listeners.get(channel)!.add(fn);
+        },
+        removeListener: (channel: string, fn: (...args: any[]) => void) => listeners.get(channel)?.delete(fn),
+        emit: (channel: string, ...args: any[]) => listeners.get(channel)?.forEach(fn => fn(...args)),
+    };
+
+    const state = { created: [] as any[], inFlight: 0, maxInFlight: 0, nextId: 1 };
+
+    class BrowserWindow {
+        url = '';
+        destroyed = false;
+        webContents: any;
+
+        constructor() {
+            const contents: any = {
+                id: state.nextId++,
+                on: () => { },
+                send: (_channel: string, invoice: any, printId: number) => {
+                    state.inFlight++;
+                    state.maxInFlight = Math.max(state.maxInFlight, state.inFlight);
+                    contents.current = invoice;
+                    setTimeout(() => {
+                        state.inFlight--;
+                        ipcMain.emit('print-ready', { sender: contents }, printId);
+                    }, 5);
+                },
+                printToPDF: async () => Buffer.from(`pdf:${contents.current.id}`),
+            };
+            this.webContents = contents;
+            state.created.push(this);
+        }
+
+        loadURL(url: string) {
+            this.url = url;
+            setTimeout(() => ipcMain.emit('print-window-ready', { sender: this.webContents }), 1);
+            return Promise.resolve();
+        }
+
+        on() { }
+
+        isDestroyed() {
+            return this.destroyed;
+        }
+
+        destroy() {
+            this.destroyed = true;
+        }
+    }
+
+    return { ipcMain, BrowserWindow, state };
+});
+
+vi.mock('electron', () => ({ ipcMain: electron.ipcMain, BrowserWindow: electron.BrowserWindow }));
+
+import { PrintWindowPool } from '../print-pool';
+
+describe('PrintWindowPool', () => {
+    let pool: PrintWindowPool;
+
+    beforeEach(() => {
+        electron.state.created = [];
+        electron.state.inFlight = 0;
+        electron.state.maxInFlight = 0;
+        pool = new PrintWindowPool('/preload.js', 2);
+    });
+
+    afterEach(() => {
+        pool.destroy();
+    });
+
+    it('renders a batch on at most `size` reused windows', async () => {
+        const invoices = Array.from({ length: 6 }, (_, i) => ({ id: `inv-${i}` }));
+        const pdfs = await Promise.all(invoices.map(inv => pool.render(inv, 'app://print')));
+
+        expect(pdfs.map(pdf => pdf.toString())).toEqual(invoices.map(inv => `pdf:${inv.id}`));
+        expect(electron.state.created).toHaveLength(2);
+        expect(electron.state.maxInFlight).toBe(2);
+    });
+
+    it('keeps windows loaded between calls', async () => {
+        await pool.render({ id: 'a' }, 'app://print');
+        await pool.render({ id: 'b' }, 'app://print');
+        expect(electron.state.created).toHaveLength(1);
+    });
+
+    it('replaces idle windows loaded from another URL', async () => {
+        await pool.render({ id: 'a' }, 'app://one');
+        await pool.render({ id: 'b' }, 'app://two');
+        expect(electron.state.created).toHaveLength(2);
+        expect(electron.state.created[0].destroyed).toBe(true);
+        expect(electron.state.created[1].url).toBe('app://two');
+    });
+});
@@ -0,0 +1,88 @@
+// @vitest-environment node
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { openDatabase, AppDatabase } from '../../db';
+import { DueDateHeap, OverdueScheduler } from '../scheduler';
+
+vi.mock('electron', () => ({ app: { getPath: () => '' } }));
+
+function issued(id: string, dueDate: string) {
+    return { id, number: id, status: 'issued', dueDate, total: 100, to: { name: 'Client' } };
+}
+
+describe('DueDateHeap', () => {
+    it('pops entries in due date order', () => {
+        const heap = new DueDateHeap();
+        for (const [dueDate, id] of [['2024-03-05', 'c'], ['2024-01-01', 'a'], ['2024-03-05', 'b'], ['2024-02-01', 'd']]) {
+            heap.push({ dueDate, id });
+        }
+        const order: string[] = [];
+        while (heap.size > 0) order.push(heap.pop()!.id);
+        expect(order).toEqual(['a', 'd', 'b', 'c']);
+    });
+});
+
+describe('OverdueScheduler', () => {
+    let dir: string;
+    let db: AppDatabase;
+    let scheduler: OverdueScheduler;
+    let updates: string[][];
+
+    beforeEach(() => {
+        vi.useFakeTimers();
+        vi.setSystemTime(new Date('2024-03-10T12:00:00Z'));
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'scheduler-'));
+        db = openDatabase(path.join(dir, 'test.db'));
+        updates = [];
+        db.transaction(tx => {
+            tx.put('invoices', issued('past', '2024-03-01'));
+            tx.put('invoices', issued('today', '2024-03-10'));
+            tx.put('invoices', issued('later', '2024-03-12'));
+            tx.put('invoices', { ...issued('paid', '2024-01-01'), status: 'paid' });
+        });
+        scheduler = new OverdueScheduler(db, { onUpdated: ids => updates.push(ids) });
+    });
+
+    afterEach(() => {
+        scheduler.stop();
+        db.close();
+        fs.rmSync(dir, { recursive: true, force: true });
+        vi.useRealTimers();
+    });
+
+    it('flips invoices past due on start in one batch', () => {
+        scheduler.start();
+        expect(db.invoices.get('past').status).toBe('overdue');
+        expect(db.invoices.get('today').status).toBe('issued');
+        expect(db.invoices.get('paid').status).toBe('paid');
+        expect(updates).toEqual([['past']]);
+    });
+
+    it('sleeps until the next due date boundary', () => {
+        scheduler.start();
+        vi.setSystemTime(new Date('2024-03-11T00:00:00Z'));
+        vi.advanceTimersByTime(12 * 60 * 60 * 1000);
+        expect(db.invoices.get('today').status).toBe('overdue');
+        expect(db.invoices.get('later').status).toBe('issued');
+        expect(updates).toEqual([['past'], ['today']]);
+    });
+
+    it('follows saves made after start', () => {
+        scheduler.start();
+        db.transaction(tx => {
+            tx.put('invoices', { ...issued('today', '2024-03-10'), status: 'paid' });
+            tx.put('invoices', issued('new', '2024-03-09'));
+            tx.put('invoices', issued('later', '2024-04-30'));
+        });
+        vi.advanceTimersByTime(0);
+        expect(db.invoices.get('new').status).toBe('overdue');
+
+        vi.setSystemTime(new Date('2024-03-14T00:00:00Z'));
+        vi.advanceTimersByTime(4 * 24 * 60 * 60 * 1000);
+        expect(db.invoices.get('today').status).toBe('paid');
+        expect(db.invoices.get('later').status).toBe('issued');
+        expect(updates).toEqual([['past'], ['new']]);
+    });
+});
@@ -0,0 +1,150 @@
+// @vitest-environment node
+import { describe, it, expect, afterEach } from 'vitest';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import * as XLSX from 'xlsx';
+import {
+    Tracer,
+    activeTracer,
+    withTracer,
+    traceIpcHandlers,
+    payloadBytes,
+    recordedSpans,
+    clearRecordedSpans,
+    setTracingEnabled,
+    toChromeTrace
+} from '../tracing';
+import { processExcelJob } from '../excel-processor';
+
+describe('Tracer', () => {
+    afterEach(() => {
+        setTracingEnabled(false);
+        clearRecordedSpans();
+    });
+
+    it('records nothing while disabled but still runs the work', () => {
+        const tracer = new Tracer('excel', false);
+        expect(tracer.span('parse', args => {
+            args.rows = 10;
+            return 42;
+        })).toBe(42);
+        tracer.begin('write')();
+        expect(tracer.spans).toEqual([]);
+    });
+
+    it('records duration, attributes and heap delta of a span', async () => {
+        const tracer = new Tracer('excel', true);
+        tracer.span('index', args => {
+            args.rows = 3;
+        }, { file: 'master.xlsx' });
+        await tracer.spanAsync('write', async () => { });
+
+        expect(tracer.spans.map(span => span.name)).toEqual(['index', 'write']);
+        expect(tracer.spans[0]).toMatchObject({ cat: 'excel', tid: 0, args: { file: 'master.xlsx', rows: 3 } });
+        expect(tracer.spans[0].dur).toBeGreaterThanOrEqual(0);
+        expect(typeof tracer.spans[0].args?.heapDelta).toBe('number');
+    });
+
+    it('exposes the tracer to nested code only inside withTracer', () => {
+        const tracer = new Tracer('excel', true);
+        withTracer(tracer, () => activeTracer().span('nested', () => { }));
+        activeTracer().span('outside', () => { });
+
+        expect(tracer.spans.map(span => span.name)).toEqual(['nested']);
+    });
+
+    it('wraps ipc handlers with latency and payload sizes', async () => {
+        const handlers = new Map<string, (...args: any[]) => any>();
+        const ipc = { handle: (channel: string, listener: (...args: any[]) => any) => { handlers.set(channel, listener); } };
+        traceIpcHandlers(ipc, ['diagnostics:']);
+        ipc.handle('customer:list', async (_event: unknown, filter: string) => ({ success: true, filter }));
+        const diagnostics = async () => 'untouched';
+        ipc.handle('diagnostics:getTrace', diagnostics);
+
+        await handlers.get('customer:list')!({}, 'gulf');
+        expect(recordedSpans()).toEqual([]);
+
+        setTracingEnabled(true);
+        expect(await handlers.get('customer:list')!({}, 'gulf')).toEqual({ success: true, filter: 'gulf' });
+
+        expect(handlers.get('diagnostics:getTrace')).toBe(diagnostics);
+        expect(recordedSpans()).toHaveLength(1);
+        expect(recordedSpans()[0]).toMatchObject({
+            name: 'customer:list',
+            cat: 'ipc',
+            args: { argBytes: JSON.stringify(['gulf']).length, resultBytes: JSON.stringify({ success: true, filter: 'gulf' }).length, ok: true }
+        });
+    });
+
+    it('sizes payloads without serializing binary data or whole row sets', () => {
+        const small = { success: true, headers: [{ name: 'Ticket No', index: 0 }], total: null };
+        expect(payloadBytes(small)).toBe(JSON.stringify(small).length);
+        expect(payloadBytes({ data: Buffer.alloc(4096) })).toBe(JSON.stringify({ data: 0 }).length - 1 + 4096);
+
+        const rows = Array.from({ length: 10000 }, () => ['T1000000001', 12.5, 'Alpha']);
+        expect(payloadBytes(rows)).toBe(JSON.stringify(rows).length);
+
+        const cyclic: any = { a: 1 };
+        cyclic.self = cyclic;
+        expect(payloadBytes(cyclic)).toBe(-1);
+    });
+
+    it('exports complete events with thread names', () => {
+        const trace = toChromeTrace([{ name: 'index', cat: 'excel', ts: 1000, dur: 250, tid: 0, args: { rows: 3 } }]);
+
+        expect(trace.traceEvents).toEqual([
+            expect.objectContaining({ ph: 'M', name: 'thread_name', tid: 0, args: { name: 'main' } }),
+            expect.objectContaining({ ph: 'X', name: 'index', cat: 'excel', ts: 1000, dur: 250, args: { rows: 3 } })
+        ]);
+    });
+});
+
+describe('traced excel jobs', () => {
+    afterEach(() => {
+        setTracingEnabled(false);
+        clearRecordedSpans();
+    });
+
+    function writeSheet(filePath: string, rows: any[][]) {
+        const wb = XLSX.utils.book_new();
+        XLSX.utils.book_append_sheet(wb, XLSX.utils.aoa_to_sheet(rows), 'Sheet1');
+        XLSX.writeFile(wb, filePath);
+    }
+
+    it('returns the spans of every stage with the job result', async () => {
+        const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'tracing-'));
+        try {
+            const masterPath = path.join(dir, 'master.xlsx');
+            const targetPath = path.join(dir, 'a.xlsx');
+            writeSheet(masterPath, [['Ticket', 'Status'], ['1000000001'], ['1000000002']]);
+            writeSheet(targetPath, [['Ticket'], ['1000000001']]);
+            const options = {
+                masterPath,
+                targetPaths: [targetPath],
+                masterColIndices: [0],
+                masterResultColIndex: 1,
+                targetMatchColIndices: { [targetPath]: [0] },
+                targetMatchStrings: { [targetPath]: 'A' },
+                matchSentence: '',
+                noMatchSentence: 'Not Found',
+                outputPath: path.join(dir, 'out.xlsx')
+            };
+
+            const untraced = await processExcelJob(options);
+            expect(untraced).not.toHaveProperty('trace', expect.anything());
+
+            setTracingEnabled(true);
+            const traced: any = await processExcelJob(options);
+            const names = traced.trace.map((span: any) => span.name);
+
+            expect(names).toEqual(expect.arrayContaining([
+                'process job', 'index master', 'build master index', 'match target', 'match target rows', 'write outputs', 'write master'
+            ]));
+            expect(traced.trace.find((span: any) => span.name === 'match target rows').args).toMatchObject({ rows: 1, matched: 1 });
+            expect(recordedSpans()).toHaveLength(traced.trace.length);
+        } finally {
+            fs.rmSync(dir, { recursive: true, force: true });
+        }
+    });
+});
@@ -0,0 +1,98 @@
+// @vitest-environment node
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import * as XLSX from 'xlsx';
+import { WorkbookCache } from '../workbook-cache';
+
+function writeWorkbook(filePath: string, rows: any[][], extraSheets: string[] = []) {
+    const wb = XLSX.utils.book_new();
+    XLSX.utils.book_append_sheet(wb, XLSX.utils.aoa_to_sheet(rows), 'Sheet1');
+    extraSheets.forEach(name => XLSX.utils.book_append_sheet(wb, XLSX.utils.aoa_to_sheet([[name]]), name));
+    XLSX.writeFile(wb, filePath);
+}
+
+describe('WorkbookCache', () => {
+    let dir: string;
+
+    beforeEach(() => {
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'wb-cache-'));
+    });
+
+    afterEach(() => {
+        fs.rmSync(dir, { recursive: true, force: true });
+    });
+
+    it('parses a file once and serves later reads from cache', () => {
+        const file = path.join(dir, 'a.xlsx');
+        writeWorkbook(file, [['Ticket No'], ['1234567890']]);
+        const cache = new WorkbookCache(64 * 1024 * 1024);
+
+        const first = cache.getWorkbook(file);
+        const second = cache.getWorkbook(file);
+
+        expect(second).toBe(first);
+        expect(cache.getStats()).toMatchObject({ hits: 1, misses: 1, entries: 1 });
+    });
+
+    it('memoizes sheet rows per json options', () => {
+        const file = path.join(dir, 'a.xlsx');
+        writeWorkbook(file, [['Ticket No'], ['1234567890']]);
+        const cache = new WorkbookCache(64 * 1024 * 1024);
+
+        const a = cache.getSheetRows(file, undefined);
+        const b = cache.getSheetRows(file, 'Sheet1');
+        const c = cache.getSheetRows(file, undefined, undefined, { defval: '' });
+
+        expect(b.rows).toBe(a.rows);
+        expect(c.rows).not.toBe(a.rows);
+        expect(cache.getStats()).toMatchObject({ rowHits: 1, rowMisses: 2 });
+    });
+
+    it('re-parses when the file changes on disk', () => {
+        const file = path.join(dir, 'a.xlsx');
+        writeWorkbook(file, [['Ticket No'], ['1']]);
+        const cache = new WorkbookCache(64 * 1024 * 1024);
+        cache.getSheetRows(file, undefined);
+
+        writeWorkbook(file, [['Ticket No'], ['1'], ['2'], ['3']]);
+        const future = new Date(Date.now() + 5000);
+        fs.utimesSync(file, future, future);
+
+        const { rows } = cache.getSheetRows(file, undefined);
+        expect(rows).toHaveLength(4);
+        expect(cache.getStats().invalidations).toBe(1);
+    });
+
+    it('evicts least recently used entries beyond the byte budget', () => {
+        const a = path.join(dir, 'a.xlsx');
+        const b = path.join(dir, 'b.xlsx');
+        writeWorkbook(a, [['x']]);
+        writeWorkbook(b, [['y']]);
+        const largest = Math.max(fs.statSync(a).size, fs.statSync(b).size) * 8;
+        const cache = new WorkbookCache(largest + 10);
+
+        cache.getWorkbook(a);
+        cache.getWorkbook(b);
+
+        expect(cache.getStats().entries).toBe(1);
+        expect(cache.getStats().evictions).toBe(1);
+        cache.getWorkbook(b);
+        expect(cache.getStats().hits).toBe(1);
+    });
+
+    it('lists sheets and parses only the requested sheet', () => {
+        const file = path.join(dir, 'multi.xlsx');
+        writeWorkbook(file, [['Ticket No'], ['1']], ['Second', 'Third']);
+        const cache = new WorkbookCache(64 * 1024 * 1024);
+
+        expect(cache.getSheetNames(file)).toEqual(['Sheet1', 'Second', 'Third']);
+
+        const scoped = cache.getScopedSheet(file, 'Second');
+        expect(scoped.sheetName).toBe('Second');
+        expect(scoped.sheetNames).toEqual(['Sheet1', 'Second', 'Third']);
+        expect(XLSX.utils.sheet_to_json(scoped.sheet!, { header: 1 })).toEqual([['Second']]);
+        expect(cache.getWorkbook(file, { sheets: 'Second' }).Sheets['Third']).toBeUndefined();
+    });
+});
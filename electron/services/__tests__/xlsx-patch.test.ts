@@ -0,0 +1,98 @@
+// @vitest-environment node
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import * as XLSX from 'xlsx';
+import { patchResultColumn, readZipEntries, readZipEntry, XlsxPatchUnsupportedError, ZipEntry } from '../xlsx-patch';
+
+const MASTER_DIR = path.resolve(__dirname, '../../../e2e/test-data/master-file');
+const masters = fs.existsSync(MASTER_DIR)
+    ? fs.readdirSync(MASTER_DIR).filter(name => name.endsWith('.xlsx')).map(name => path.join(MASTER_DIR, name))
+    : [];
+
+function zipContents(filePath: string): Map<string, { entry: ZipEntry; data: Buffer }> {
+    const fd = fs.openSync(filePath, 'r');
+    try {
+        return new Map(readZipEntries(fd).map(entry => [entry.name, { entry, data: readZipEntry(fd, entry) }]));
+    } finally {
+        fs.closeSync(fd);
+    }
+}
+
+describe('patchResultColumn', () => {
+    let dir: string;
+
+    beforeEach(() => {
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'xlsx-patch-'));
+    });
+
+    afterEach(() => {
+        fs.rmSync(dir, { recursive: true, force: true });
+    });
+
+    it.each(masters.map(file => [path.basename(file), file]))('leaves everything but the result column of %s untouched', (_, masterPath) => {
+        const original = XLSX.readFile(masterPath, { cellStyles: true, cellNF: true });
+        const sheetName = original.SheetNames[0];
+        const range = XLSX.utils.decode_range(original.Sheets[sheetName]['!ref']!);
+        const colIndex = range.e.c + 1;
+        const cells: Array<[number, string]> = [];
+        for (let r = range.s.r + 1; r <= range.e.r; r++) cells.push([r, r % 3 === 0 ? 'Not Found' : 'Matched']);
+
+        const output = path.join(dir, 'patched.xlsx');
+        const result = patchResultColumn(masterPath, output, { sheetName, colIndex, cells });
+
+        // Every other zip entry is a byte-for-byte copy
+        const before = zipContents(masterPath);
+        const after = zipContents(output);
+        expect(Array.from(after.keys())).toEqual(Array.from(before.keys()));
+        for (const [name, { entry, data }] of before) {
+            if (result.patchedEntries.includes(name)) continue;
+            expect(after.get(name)!.entry.crc, name).toBe(entry.crc);
+            expect(after.get(name)!.entry.compressedSize, name).toBe(entry.compressedSize);
+            expect(after.get(name)!.data.equals(data), name).toBe(true);
+        }
+
+        // Cell by cell, only the result column differs
+        const patched = XLSX.readFile(output, { cellStyles: true, cellNF: true });
+        const sheet = patched.Sheets[sheetName];
+        const source = original.Sheets[sheetName];
+        for (let r = range.s.r; r <= range.e.r; r++) {
+            for (let c = range.s.c; c <= range.e.c; c++) {
+                const ref = XLSX.utils.encode_cell({ r, c });
+                expect(sheet[ref]?.v, ref).toEqual(source[ref]?.v);
+                expect(sheet[ref]?.f, ref).toEqual(source[ref]?.f);
+                expect(sheet[ref]?.z, ref).toEqual(source[ref]?.z);
+            }
+        }
+        for (const [r, value] of cells) {
+            expect(sheet[XLSX.utils.encode_cell({ r, c: colIndex })]?.v).toBe(value);
+        }
+        expect(XLSX.utils.decode_range(sheet['!ref']!).e.c).toBe(colIndex);
+    });
+
+    it('replaces existing cells and writes inline strings without a shared strings table', () => {
+        const source = path.join(dir, 'source.xlsx');
+        const wb = XLSX.utils.book_new();
+        XLSX.utils.book_append_sheet(wb, XLSX.utils.aoa_to_sheet([['Ticket', 'Status'], ['T1', 'old'], ['T2']]), 'Data');
+        XLSX.writeFile(wb, source);
+
+        const output = path.join(dir, 'out.xlsx');
+        patchResultColumn(source, output, { sheetName: 'Data', colIndex: 1, cells: [[1, 'Paid & done'], [2, 'Not Found'], [4, 'Extra']] });
+
+        const rows = XLSX.utils.sheet_to_json(XLSX.readFile(output).Sheets['Data'], { header: 1, defval: '' });
+        expect(rows).toEqual([['Ticket', 'Status'], ['T1', 'Paid & done'], ['T2', 'Not Found'], ['', ''], ['', 'Extra']]);
+    });
+
+    it('refuses to overwrite a formula in the result column', () => {
+        const source = path.join(dir, 'formula.xlsx');
+        const sheet = XLSX.utils.aoa_to_sheet([['Amount', 'Total'], [1, 0]]);
+        sheet['B2'] = { t: 'n', v: 1, f: 'A2' };
+        const wb = XLSX.utils.book_new();
+        XLSX.utils.book_append_sheet(wb, sheet, 'Data');
+        XLSX.writeFile(wb, source);
+
+        expect(() => patchResultColumn(source, path.join(dir, 'out.xlsx'), { sheetName: 'Data', colIndex: 1, cells: [[1, 'x']] }))
+            .toThrow(XlsxPatchUnsupportedError);
+    });
+});
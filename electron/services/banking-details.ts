@@ -0,0 +1,16 @@
+import { getDB } from '../db';
+
+// Banking details read by every PDF render; dropped whenever settings:saveBanking or a restore changes them
+let cached: { details: any } | null = null;
+
+export async function getBankingDetails(): Promise<any> {
+    if (!cached) {
+        const db = await getDB();
+        cached = { details: db.bankingDetails ?? null };
+    }
+    return cached.details;
+}
+
+export function invalidateBankingDetails() {
+    cached = null;
+}
@@ -0,0 +1,465 @@
+import crypto from 'crypto';
+import fs from 'fs';
+import path from 'path';
+import { performance } from 'perf_hooks';
+import { getExcelPool } from './excel-pool';
+import { processExcelJob, ProcessOptions } from './excel-processor';
+import type { RowRange, ValidationWarning } from './excel-matching';
+import { mapConcurrent } from '../utils/concurrency';
+import { BatchJobSpec, expandGlobs, matchesGlobs, splitGlob, targetOverrideFor } from './batch-spec';
+
+/**
+ * Headless matching runs of a job spec (electron/batch.ts).
+ *
+ * Each run matches the master against every target the spec's globs find and
+ * writes the updated master, the unmatched rows and a JSON summary to a new
+ * `run-<timestamp>` folder under the spec's output folder. Column, row range
+ * and label settings not given in the spec are detected with the same
+ * analysis the matcher UI uses, and kept per file until the file changes.
+ * Runs of one spec share a match session, so a run triggered by a changed
+ * file re-matches only that file and reuses the results of the others.
+ */
+
+export type BatchTrigger = 'initial' | 'watch' | 'manual';
+
+export interface BatchRunRequest {
+    trigger: BatchTrigger;
+    changedFiles?: string[];
+}
+
+interface FileSettings {
+    sheet?: string;
+    column?: number;
+    rowRange?: RowRange;
+    label?: string;
+    detected: string[]; // Settings that came from the analysis
+}
+
+export interface BatchFileSummary {
+    fileName: string;
+    filePath: string;
+    status: 'matched' | 'reused' | 'failed';
+    sheet?: string;
+    column: number;
+    rowRange?: RowRange;
+    label: string;
+    detected: string[];
+    total: number;
+    matched: number;
+    nearMatched: number;
+    percentage: number;
+}
+
+export interface BatchRunSummary {
+    job: string;
+    spec?: string;
+    runId: string;
+    trigger: BatchTrigger;
+    changedFiles: string[];
+    startedAt: string;
+    finishedAt: string;
+    success: boolean;
+    error?: string;
+    master: {
+        path: string;
+        sheet?: string;
+        columns: number[];
+        resultColumn?: number;
+        rowRange?: RowRange;
+        detected: string[];
+    };
+    outputs: {
+        dir: string;
+        updated?: string;
+        unmatched?: string;
+        summary: string;
+    };
+    stats?: {
+        totalMasterRows: number;
+        matchedMasterRows: number;
+        unmatchedMasterRows: number;
+        nearMatchedMasterRows: number;
+        matchPercentage: number;
+    };
+    perFile: BatchFileSummary[];
+    skipped: Array<{ filePath: string; reason: string }>;
+    warnings: string[];
+    session?: { masterReused: boolean; targetsReused: number; targetsMatched: number };
+    timings: { detectMs: number; processMs: number; totalMs: number };
+}
+
+// Excel's lock files for open workbooks ("~$Book1.xlsx")
+function isLockFile(filePath: string): boolean {
+    return path.basename(filePath).startsWith('~$');
+}
+
+function isInside(dir: string, filePath: string): boolean {
+    const relative = path.relative(dir, filePath);
+    return !!relative && !relative.startsWith('..') && !path.isAbsolute(relative);
+}
+
+function fingerprint(filePath: string, sheet: string | undefined): string | null {
+    try {
+        const stat = fs.statSync(filePath);
+        return `${stat.size}:${stat.mtimeMs}:${sheet ?? ''}`;
+    } catch {
+        return null;
+    }
+}
+
+// 2026-10-17T08:30:00.123Z -> 20261017-083000-123
+function runIdFor(date: Date): string {
+    return date.toISOString().replace(/[-:]/g, '').replace('T', '-').replace('.', '-').replace('Z', '');
+}
+
+function elapsed(since: number): number {
+    return Math.round(performance.now() - since);
+}
+
+export class BatchJobRunner {
+    readonly spec: BatchJobSpec;
+    // One session per spec so consecutive runs reuse the master index and unchanged targets
+    readonly sessionId: string;
+    private analyses = new Map<string, { fingerprint: string; analysis: any }>();
+
+    constructor(spec: BatchJobSpec) {
+        this.spec = spec;
+        this.sessionId = `batch:${crypto.createHash('sha1').update(spec.specPath ?? spec.name).digest('hex').slice(0, 12)}`;
+    }
+
+    /** Whether a change to `filePath` affects the next run. */
+    isRelevant(filePath: string): boolean {
+        const resolved = path.resolve(filePath);
+        if (isLockFile(resolved) || isInside(this.spec.outputDir, resolved)) return false;
+        return resolved === this.spec.master || matchesGlobs(this.spec.targets, resolved);
+    }
+
+    /** Folders to watch: the master's and the base folder of each target glob. */
+    watchTargets(): Array<{ dir: string; recursive: boolean }> {
+        const dirs = new Map<string, boolean>([[path.dirname(this.spec.master), false]]);
+        for (const glob of this.spec.targets) {
+            const { baseDir, pattern } = splitGlob(glob);
+            dirs.set(baseDir, (dirs.get(baseDir) ?? false) || pattern.includes('/') || pattern.includes('**'));
+        }
+        return Array.from(dirs, ([dir, recursive]) => ({ dir, recursive }));
+    }
+
+    listTargets(): { targets: string[]; skipped: Array<{ filePath: string; reason: string }> } {
+        const targets: string[] = [];
+        const skipped: Array<{ filePath: string; reason: string }> = [];
+        for (const filePath of expandGlobs(this.spec.targets)) {
+            if (filePath === this.spec.master || isInside(this.spec.outputDir, filePath)) continue;
+            if (isLockFile(filePath)) {
+                skipped.push({ filePath, reason: 'Excel lock file' });
+                continue;
+            }
+            targets.push(filePath);
+        }
+        return { targets, skipped };
+    }
+
+    // Analysis of each file that needs one, re-run only when the file (or its sheet) changed
+    private async analyze(files: Array<{ filePath: string; sheet?: string }>): Promise<Map<string, any>> {
+        const pool = getExcelPool();
+        const results = new Map<string, any>();
+        await mapConcurrent(files, pool.size, async ({ filePath, sheet }) => {
+            const key = fingerprint(filePath, sheet);
+            const cached = this.analyses.get(filePath);
+            if (key && cached?.fingerprint === key) {
+                results.set(filePath, cached.analysis);
+                return;
+            }
+            const analysis = await pool.run<any>('analyzeFile', { filePath, sheetName: sheet, options: { trace: false } })
+                .catch((error: any) => ({ success: false, error: error.message }));
+            if (key && analysis.success) this.analyses.set(filePath, { fingerprint: key, analysis });
+            results.set(filePath, analysis);
+        });
+        for (const filePath of this.analyses.keys()) {
+            if (!fs.existsSync(filePath)) this.analyses.delete(filePath);
+        }
+        return results;
+    }
+
+    async run(request: BatchRunRequest = { trigger: 'manual' }): Promise<BatchRunSummary> {
+        const { spec } = this;
+        const started = performance.now();
+        const startedAt = new Date();
+        let runId = runIdFor(startedAt);
+        for (let n = 2; fs.existsSync(path.join(spec.outputDir, `run-${runId}`)); n++) runId = `${runIdFor(startedAt)}-${n}`;
+        const runDir = path.join(spec.outputDir, `run-${runId}`);
+        const masterExt = path.extname(spec.master);
+        const masterName = path.basename(spec.master, masterExt);
+        const summaryPath = path.join(runDir, `${masterName}_summary.json`);
+
+        const { targets, skipped } = this.listTargets();
+        const warnings: string[] = [];
+        const summary: BatchRunSummary = {
+            job: spec.name,
+            spec: spec.specPath,
+            runId,
+            trigger: request.trigger,
+            changedFiles: request.changedFiles ?? [],
+            startedAt: startedAt.toISOString(),
+            finishedAt: '',
+            success: false,
+            master: { path: spec.master, sheet: spec.masterSheet, columns: [], detected: [] },
+            outputs: { dir: runDir, summary: summaryPath },
+            perFile: [],
+            skipped,
+            warnings,
+            timings: { detectMs: 0, processMs: 0, totalMs: 0 }
+        };
+
+        try {
+            if (!fs.existsSync(spec.master)) throw new Error(`Master file not found: ${spec.master}`);
+            if (targets.length === 0) throw new Error(`No target files match ${spec.targets.join(', ')}`);
+
+            // Settings left out of the spec are detected
+            const detectStarted = performance.now();
+            const needsMaster = spec.masterColumn === undefined || spec.masterResultColumn === undefined || !spec.masterRowRange;
+            const overrides = new Map(targets.map(filePath => [filePath, targetOverrideFor(spec, filePath)] as const));
+            const toAnalyze = targets
+                .filter(filePath => {
+                    const override = overrides.get(filePath)!;
+                    return override.column === undefined || !override.rowRange || !override.label;
+                })
+                .map(filePath => ({ filePath, sheet: overrides.get(filePath)!.sheet }));
+            if (needsMaster) toAnalyze.unshift({ filePath: spec.master, sheet: spec.masterSheet });
+            const analyses = await this.analyze(toAnalyze);
+            summary.timings.detectMs = elapsed(detectStarted);
+
+            const masterAnalysis = needsMaster ? analyses.get(spec.master) : undefined;
+            if (masterAnalysis && !masterAnalysis.success) throw new Error(`Cannot analyze master: ${masterAnalysis.error}`);
+            const masterColumn = spec.masterColumn ?? masterAnalysis?.idColumn?.index;
+            if (masterColumn === undefined) throw new Error('No ID column found in the master; set masterColumn in the job spec');
+            const master = summary.master;
+            master.sheet = spec.masterSheet ?? masterAnalysis?.selectedSheet;
+            master.columns = [masterColumn];
+            master.resultColumn = spec.masterResultColumn ?? masterAnalysis.resultColumn.index;
+            master.rowRange = spec.masterRowRange ?? masterAnalysis.suggestedRowRange;
+            if (spec.masterColumn === undefined) master.detected.push('column');
+            if (spec.masterResultColumn === undefined) master.detected.push('resultColumn');
+            if (!spec.masterRowRange) master.detected.push('rowRange');
+            if (masterAnalysis?.idColumn && spec.masterColumn === undefined && masterAnalysis.idColumn.confidence === 'low') {
+                warnings.push(`${path.basename(spec.master)}: ID column "${masterAnalysis.idColumn.name}" was detected with low confidence`);
+            }
+
+            const settings = new Map<string, FileSettings>();
+            for (const filePath of targets) {
+                const override = overrides.get(filePath)!;
+                const analysis = analyses.get(filePath);
+                if (analysis && !analysis.success) {
+                    skipped.push({ filePath, reason: analysis.error || 'Could not be analyzed' });
+                    continue;
+                }
+                const file: FileSettings = {
+                    sheet: override.sheet ?? analysis?.selectedSheet,
+                    column: override.column ?? analysis?.idColumn?.index,
+                    rowRange: override.rowRange ?? analysis?.suggestedRowRange,
+                    label: override.label ?? analysis?.suggestedMatchLabel,
+                    detected: []
+                };
+                if (override.column === undefined) file.detected.push('column');
+                if (!override.rowRange) file.detected.push('rowRange');
+                if (!override.label) file.detected.push('label');
+                if (file.column === undefined) {
+                    skipped.push({ filePath, reason: 'No ID column found; set a column in targetOverrides' });
+                    continue;
+                }
+                if (override.column === undefined && analysis?.idColumn?.confidence === 'low') {
+                    warnings.push(`${path.basename(filePath)}: ID column "${analysis.idColumn.name}" was detected with low confidence`);
+                }
+                settings.set(filePath, file);
+            }
+            if (settings.size === 0) throw new Error('None of the target files could be matched');
+
+            const targetPaths = Array.from(settings.keys());
+            const options: ProcessOptions = {
+                sessionId: this.sessionId,
+                masterPath: spec.master,
+                targetPaths,
+                masterColIndices: master.columns,
+                masterResultColIndex: master.resultColumn!,
+                targetMatchColIndices: Object.fromEntries(targetPaths.map(p => [p, [settings.get(p)!.column!]])),
+                targetMatchStrings: Object.fromEntries(targetPaths.map(p => [p, settings.get(p)!.label || 'Matched'])),
+                matchSentence: '',
+                noMatchSentence: spec.noMatchLabel,
+                outputPath: path.join(runDir, `${masterName}_updated${masterExt}`),
+                unmatchedPath: path.join(runDir, `${masterName}_unmatched${masterExt}`),
+                masterRowRange: master.rowRange,
+                targetRowRanges: Object.fromEntries(targetPaths.flatMap(p => settings.get(p)!.rowRange ? [[p, settings.get(p)!.rowRange!]] : [])),
+                masterSheetName: master.sheet,
+                targetSheetNames: Object.fromEntries(targetPaths.flatMap(p => settings.get(p)!.sheet ? [[p, settings.get(p)!.sheet!]] : [])),
+                nearMatch: spec.nearMatch
+            };
+
+            fs.mkdirSync(runDir, { recursive: true });
+            const processStarted = performance.now();
+            const result: any = await processExcelJob(options);
+            summary.timings.processMs = elapsed(processStarted);
+            if (!result.success) throw new Error(result.error || 'Processing failed');
+
+            const stats = new Map<string, any>(result.perFileStats.map((file: any) => [file.filePath, file] as const));
+            summary.perFile = targetPaths.map(filePath => {
+                const file = settings.get(filePath)!;
+                const fileStats = stats.get(filePath);
+                return {
+                    fileName: path.basename(filePath),
+                    filePath,
+                    status: !fileStats ? 'failed' : fileStats.reused ? 'reused' : 'matched',
+                    sheet: file.sheet,
+                    column: file.column!,
+                    rowRange: file.rowRange,
+                    label: file.label || 'Matched',
+                    detected: file.detected,
+                    total: fileStats?.total ?? 0,
+                    matched: fileStats?.matched ?? 0,
+                    nearMatched: fileStats?.nearMatched ?? 0,
+                    percentage: fileStats?.percentage ?? 0
+                };
+            });
+            for (const file of summary.perFile) {
+                if (file.status === 'failed') warnings.push(`${file.fileName}: could not be read, its rows are not in the output`);
+                else if (file.total > 0 && file.matched === 0) warnings.push(`${file.fileName}: no rows matched the master`);
+            }
+            for (const warning of (result.warnings ?? []) as ValidationWarning[]) {
+                warnings.push(`${path.basename(spec.master)}: ${warning.message}`);
+            }
+
+            summary.outputs.updated = result.results[0].newPath;
+            summary.outputs.unmatched = result.unmatchedPath;
+            summary.stats = result.stats;
+            summary.session = result.session;
+            summary.success = true;
+        } catch (e: any) {
+            summary.error = e.message;
+        }
+
+        summary.finishedAt = new Date().toISOString();
+        summary.timings.totalMs = elapsed(started);
+        try {
+            fs.mkdirSync(runDir, { recursive: true });
+            fs.writeFileSync(summaryPath, JSON.stringify(summary, null, 2));
+        } catch (e: any) {
+            summary.success = false;
+            summary.error = summary.error ?? `Cannot write summary: ${e.message}`;
+        }
+        return summary;
+    }
+}
+
+interface QueuedRun {
+    runner: BatchJobRunner;
+    request: BatchRunRequest;
+    promise: Promise<BatchRunSummary>;
+    resolve: (summary: BatchRunSummary) => void;
+    reject: (error: unknown) => void;
+}
+
+/**
+ * Runs batch jobs with at most `concurrency` at once. A spec never runs twice
+ * at the same time (its runs share a match session); requests for a spec that
+ * is already waiting are folded into the waiting run.
+ */
+export class BatchQueue {
+    readonly concurrency: number;
+    private pending: QueuedRun[] = [];
+    private running = new Set<BatchJobRunner>();
+    private idleWaiters: Array<() => void> = [];
+
+    constructor(concurrency: number = 1) {
+        this.concurrency = Math.max(1, Math.floor(concurrency));
+    }
+
+    get size(): number {
+        return this.pending.length + this.running.size;
+    }
+
+    submit(runner: BatchJobRunner, request: BatchRunRequest): Promise<BatchRunSummary> {
+        const waiting = this.pending.find(run => run.runner === runner);
+        if (waiting) {
+            const files = new Set([...(waiting.request.changedFiles ?? []), ...(request.changedFiles ?? [])]);
+            waiting.request = { trigger: waiting.request.trigger, changedFiles: Array.from(files) };
+            return waiting.promise;
+        }
+
+        let resolve!: (summary: BatchRunSummary) => void;
+        let reject!: (error: unknown) => void;
+        const promise = new Promise<BatchRunSummary>((res, rej) => { resolve = res; reject = rej; });
+        this.pending.push({ runner, request, promise, resolve, reject });
+        this.pump();
+        return promise;
+    }
+
+    /** Resolves once nothing is running or waiting. */
+    onIdle(): Promise<void> {
+        if (this.size === 0) return Promise.resolve();
+        return new Promise(resolve => this.idleWaiters.push(resolve));
+    }
+
+    private pump(): void {
+        while (this.running.size < this.concurrency) {
+            const index = this.pending.findIndex(run => !this.running.has(run.runner));
+            if (index < 0) break;
+            const [next] = this.pending.splice(index, 1);
+            this.running.add(next.runner);
+            next.runner.run(next.request).then(next.resolve, next.reject).finally(() => {
+                this.running.delete(next.runner);
+                this.pump();
+            });
+        }
+        if (this.size === 0) this.idleWaiters.splice(0).forEach(resolve => resolve());
+    }
+}
+
+export interface WatchOptions {
+    debounceMs?: number;
+    onRun?: (summary: BatchRunSummary) => void;
+    onError?: (error: Error) => void;
+}
+
+// Long enough for a copy or an Excel save to finish writing
+export const DEFAULT_WATCH_DEBOUNCE_MS = 2000;
+
+/**
+ * Re-run a job when its master or a file matching its target globs is added,
+ * changed or removed. Changes are collected until the folder has been quiet
+ * for `debounceMs`, then queued as one run. Returns a function that stops
+ * watching.
+ */
+export function watchBatchJob(runner: BatchJobRunner, queue: BatchQueue, options: WatchOptions = {}): () => void {
+    const debounceMs = options.debounceMs ?? DEFAULT_WATCH_DEBOUNCE_MS;
+    const changed = new Set<string>();
+    let timer: NodeJS.Timeout | null = null;
+
+    const flush = () => {
+        timer = null;
+        const changedFiles = Array.from(changed).sort();
+        changed.clear();
+        queue.submit(runner, { trigger: 'watch', changedFiles }).then(options.onRun, options.onError);
+    };
+
+    const watchers = runner.watchTargets().flatMap(({ dir, recursive }) => {
+        try {
+            const watcher = fs.watch(dir, { recursive }, (_event, fileName) => {
+                if (!fileName) return;
+                const filePath = path.join(dir, fileName.toString());
+                if (!runner.isRelevant(filePath)) return;
+                changed.add(filePath);
+                if (timer) clearTimeout(timer);
+                timer = setTimeout(flush, debounceMs);
+            });
+            watcher.on('error', error => options.onError?.(error));
+            return [watcher];
+        } catch (e: any) {
+            options.onError?.(new Error(`Cannot watch ${dir}: ${e.message}`));
+            return [];
+        }
+    });
+
+    return () => {
+        if (timer) clearTimeout(timer);
+        timer = null;
+        watchers.forEach(watcher => watcher.close());
+    };
+}
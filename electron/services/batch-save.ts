@@ -0,0 +1,162 @@
+import crypto from 'crypto';
+import type { AppDatabase } from '../db';
+import type { Transaction } from '../db/log-store';
+
+/**
+ * Save many invoices or customers in one store transaction.
+ *
+ * Invoice numbers for the whole batch come from one contiguous block, and
+ * every document plus the new lastInvoiceNumber is appended as a single log
+ * record, so a batch is persisted completely or not at all and cannot leave
+ * gaps in the numbering.
+ */
+
+export interface BatchItemResult {
+    success: boolean;
+    id?: string;
+    number?: string;
+    error?: string;
+}
+
+// Stamp id and timestamps; true when the invoice still needs a real number
+export function prepareInvoice(invoice: any, now: string = new Date().toISOString()): boolean {
+    const isNew = !invoice.id;
+    if (isNew) {
+        invoice.id = crypto.randomUUID();
+        invoice.createdAt = now;
+    }
+    invoice.updatedAt = now;
+
+    const currentNum = String(invoice.number || '');
+    return isNew || currentNum === 'DRAFT' || currentNum.startsWith('INV-');
+}
+
+export function assignInvoiceNumber(invoice: any, num: number) {
+    invoice.number = String(num);
+    invoice.invoiceNumber = String(num); // Legacy support if needed
+}
+
+export function prepareCustomer(customer: any, now: string = new Date().toISOString()) {
+    if (!customer.id) {
+        customer.id = crypto.randomUUID();
+        customer.createdAt = now;
+    }
+    customer.updatedAt = now;
+    // Ensure ratio fields exist
+    customer.total20mm = customer.total20mm || 0;
+    customer.total10mm = customer.total10mm || 0;
+}
+
+function isDocument(value: any): boolean {
+    return !!value && typeof value === 'object' && !Array.isArray(value);
+}
+
+// Invoices generated from a reconciliation, with the quantities to add to their customer's totals
+export interface GeneratedInvoice {
+    invoice: any;
+    totals?: { total10mm: number; total20mm: number };
+}
+
+type AcceptedInvoice = { index: number; invoice: any; needsNumber: boolean };
+
+function acceptInvoices(invoices: any[], results: BatchItemResult[], now: string): AcceptedInvoice[] {
+    const accepted: AcceptedInvoice[] = [];
+    invoices.forEach((invoice, index) => {
+        if (!isDocument(invoice)) {
+            results[index] = { success: false, error: 'Invalid invoice' };
+            return;
+        }
+        accepted.push({ index, invoice, needsNumber: prepareInvoice(invoice, now) });
+    });
+    return accepted;
+}
+
+// Number and stage the invoices in tx, from the block after lastInvoiceNumber
+function putInvoices(db: AppDatabase, tx: Transaction, accepted: AcceptedInvoice[]) {
+    const last = db.lastInvoiceNumber;
+    let next = last;
+    for (const { invoice, needsNumber } of accepted) {
+        if (needsNumber) assignInvoiceNumber(invoice, ++next);
+        tx.put('invoices', invoice);
+    }
+    if (next !== last) tx.setMeta('lastInvoiceNumber', next);
+}
+
+export function saveInvoiceBatch(db: AppDatabase, invoices: any[]): BatchItemResult[] {
+    const now = new Date().toISOString();
+    const results: BatchItemResult[] = new Array(invoices.length);
+    const accepted = acceptInvoices(invoices, results, now);
+
+    db.transaction(tx => putInvoices(db, tx, accepted));
+
+    for (const { index, invoice } of accepted) {
+        results[index] = { success: true, id: invoice.id, number: invoice.number };
+    }
+    return results;
+}
+
+/**
+ * Save generated invoices and raise their customers' 10mm/20mm totals in the
+ * same transaction, so totals are only ever counted for invoices that exist.
+ * Totals are added to the stored customer, not to the renderer's copy.
+ */
+export function saveGeneratedInvoices(db: AppDatabase, entries: GeneratedInvoice[]): { results: BatchItemResult[]; customers: any[] } {
+    const now = new Date().toISOString();
+    const results: BatchItemResult[] = new Array(entries.length);
+    const accepted = acceptInvoices(entries.map(entry => entry?.invoice), results, now);
+
+    const deltas = new Map<string, { total10mm: number; total20mm: number }>();
+    for (const { index, invoice } of accepted) {
+        const totals = entries[index].totals;
+        const customerId = invoice.to?.customerId;
+        if (!totals || !customerId) continue;
+        const delta = deltas.get(customerId) ?? { total10mm: 0, total20mm: 0 };
+        delta.total10mm += Number(totals.total10mm) || 0;
+        delta.total20mm += Number(totals.total20mm) || 0;
+        deltas.set(customerId, delta);
+    }
+
+    const customers: any[] = [];
+    db.transaction(tx => {
+        putInvoices(db, tx, accepted);
+        for (const [customerId, delta] of deltas) {
+            const customer = db.customers.get(customerId);
+            if (!customer || (delta.total10mm === 0 && delta.total20mm === 0)) continue;
+            const updated = {
+                ...customer,
+                total10mm: (customer.total10mm || 0) + delta.total10mm,
+                total20mm: (customer.total20mm || 0) + delta.total20mm,
+                updatedAt: now
+            };
+            tx.put('customers', updated);
+            customers.push(updated);
+        }
+    });
+
+    for (const { index, invoice } of accepted) {
+        results[index] = { success: true, id: invoice.id, number: invoice.number };
+    }
+    return { results, customers };
+}
+
+export function saveCustomerBatch(db: AppDatabase, customers: any[]): BatchItemResult[] {
+    const now = new Date().toISOString();
+    const results: BatchItemResult[] = new Array(customers.length);
+    const accepted: Array<{ index: number; customer: any }> = [];
+
+    customers.forEach((customer, index) => {
+        if (!isDocument(customer)) {
+            results[index] = { success: false, error: 'Invalid customer' };
+            return;
+        }
+        prepareCustomer(customer, now);
+        accepted.push({ index, customer });
+    });
+
+    db.transaction(tx => accepted.forEach(({ customer }) => tx.put('customers', customer)));
+
+    for (const { index, customer } of accepted) {
+        results[index] = { success: true, id: customer.id };
+    }
+    return results;
+}
@@ -0,0 +1,231 @@
+import fs from 'fs';
+import path from 'path';
+import type { RowRange } from './excel-matching';
+import type { NearMatchOptions } from './near-match';
+
+/**
+ * Job specs for the headless batch runner (see electron/batch.ts).
+ *
+ * A spec is a JSON file naming a master workbook, globs for the customer
+ * files to match against it and an output folder. Column indices are
+ * 0-based numbers or column letters ("C"); row ranges are 1-based and
+ * inclusive, as in the matcher UI. Anything left out is detected the way
+ * the UI detects it (analyzeExcelFile). Relative paths and globs are
+ * resolved against the folder of the spec file.
+ *
+ *   {
+ *     "name": "alsham-daily",
+ *     "master": "master.xlsx",
+ *     "masterColumn": "C",
+ *     "targets": ["incoming/*.xlsx"],
+ *     "targetOverrides": { "*Readymix*": { "column": 2, "label": "READYMIX" } },
+ *     "noMatchLabel": "Not Matched",
+ *     "outputDir": "out"
+ *   }
+ */
+
+export interface BatchTargetOverride {
+    sheet?: string;
+    column?: number;
+    rowRange?: RowRange;
+    label?: string;
+}
+
+export interface BatchJobSpec {
+    name: string;
+    specPath?: string;
+    master: string;
+    masterSheet?: string;
+    masterColumn?: number; // ID column; detected when omitted
+    masterResultColumn?: number; // Column the result labels go to; detected when omitted
+    masterRowRange?: RowRange;
+    targets: string[]; // Absolute globs
+    targetOverrides: Array<{ pattern: string; override: BatchTargetOverride }>; // Matched against file names, first match wins
+    noMatchLabel: string;
+    nearMatch?: NearMatchOptions;
+    outputDir: string;
+}
+
+export const DEFAULT_NO_MATCH_LABEL = 'Not Matched';
+
+export class BatchSpecError extends Error {
+    constructor(message: string) {
+        super(message);
+        this.name = 'BatchSpecError';
+    }
+}
+
+// "C" -> 2, "AA" -> 26, 3 -> 3
+function parseColumn(value: unknown, field: string): number | undefined {
+    if (value === undefined || value === null) return undefined;
+    if (typeof value === 'number' && Number.isInteger(value) && value >= 0) return value;
+    if (typeof value === 'string' && /^[A-Za-z]{1,3}$/.test(value)) {
+        return value.toUpperCase().split('').reduce((n, c) => n * 26 + c.charCodeAt(0) - 64, 0) - 1;
+    }
+    throw new BatchSpecError(`${field} must be a 0-based column index or a column letter`);
+}
+
+function parseRowRange(value: unknown, field: string): RowRange | undefined {
+    if (value === undefined || value === null) return undefined;
+    const range = value as RowRange;
+    if (typeof range !== 'object' || !Number.isInteger(range.start) || !Number.isInteger(range.end) || range.start < 1 || range.end < range.start) {
+        throw new BatchSpecError(`${field} must be { "start": n, "end": m } with 1 <= start <= end`);
+    }
+    return { start: range.start, end: range.end };
+}
+
+function optionalString(value: unknown, field: string): string | undefined {
+    if (value === undefined || value === null) return undefined;
+    if (typeof value !== 'string' || !value) throw new BatchSpecError(`${field} must be a non-empty string`);
+    return value;
+}
+
+function requiredString(value: unknown, field: string): string {
+    const result = optionalString(value, field);
+    if (result === undefined) throw new BatchSpecError(`${field} is required`);
+    return result;
+}
+
+export function parseJobSpec(raw: unknown, baseDir: string, specPath?: string): BatchJobSpec {
+    if (!raw || typeof raw !== 'object' || Array.isArray(raw)) throw new BatchSpecError('A job spec must be a JSON object');
+    const spec = raw as Record<string, any>;
+    const resolve = (p: string) => path.resolve(baseDir, p);
+
+    const targets = typeof spec.targets === 'string' ? [spec.targets] : spec.targets;
+    if (!Array.isArray(targets) || targets.length === 0 || targets.some(t => typeof t !== 'string' || !t)) {
+        throw new BatchSpecError('targets must be a glob or a list of globs');
+    }
+
+    const overrides = spec.targetOverrides ?? {};
+    if (typeof overrides !== 'object' || Array.isArray(overrides)) throw new BatchSpecError('targetOverrides must be an object keyed by file name or glob');
+
+    const nearMatch = spec.nearMatch;
+    if (nearMatch !== undefined && (typeof nearMatch !== 'object' || Array.isArray(nearMatch))) {
+        throw new BatchSpecError('nearMatch must be an object such as { "maxDistance": 1 }');
+    }
+
+    const master = resolve(requiredString(spec.master, 'master'));
+    return {
+        name: optionalString(spec.name, 'name') ?? path.basename(master, path.extname(master)),
+        specPath,
+        master,
+        masterSheet: optionalString(spec.masterSheet, 'masterSheet'),
+        masterColumn: parseColumn(spec.masterColumn, 'masterColumn'),
+        masterResultColumn: parseColumn(spec.masterResultColumn, 'masterResultColumn'),
+        masterRowRange: parseRowRange(spec.masterRowRange, 'masterRowRange'),
+        targets: targets.map(resolve),
+        targetOverrides: Object.entries(overrides).map(([pattern, value]) => {
+            const field = `targetOverrides["${pattern}"]`;
+            const override = (value ?? {}) as Record<string, unknown>;
+            return {
+                pattern,
+                override: {
+                    sheet: optionalString(override.sheet, `${field}.sheet`),
+                    column: parseColumn(override.column, `${field}.column`),
+                    rowRange: parseRowRange(override.rowRange, `${field}.rowRange`),
+                    label: optionalString(override.label, `${field}.label`)
+                }
+            };
+        }),
+        noMatchLabel: optionalString(spec.noMatchLabel, 'noMatchLabel') ?? DEFAULT_NO_MATCH_LABEL,
+        nearMatch,
+        outputDir: resolve(requiredString(spec.outputDir, 'outputDir'))
+    };
+}
+
+export function loadJobSpec(specPath: string): BatchJobSpec {
+    const resolved = path.resolve(specPath);
+    let raw: unknown;
+    try {
+        raw = JSON.parse(fs.readFileSync(resolved, 'utf-8'));
+    } catch (e: any) {
+        throw new BatchSpecError(`Cannot read job spec ${specPath}: ${e.message}`);
+    }
+    return parseJobSpec(raw, path.dirname(resolved), resolved);
+}
+
+export function targetOverrideFor(spec: BatchJobSpec, filePath: string): BatchTargetOverride {
+    const fileName = path.basename(filePath);
+    const entry = spec.targetOverrides.find(({ pattern }) => pattern === fileName || globToRegExp(pattern).test(fileName));
+    return entry?.override ?? {};
+}
+
+/**
+ * `*` and `?` stay within a path segment and never match a leading dot,
+ * `**` spans segments, `{a,b}` is an alternation.
+ */
+export function globToRegExp(glob: string): RegExp {
+    let source = '';
+    for (let i = 0; i < glob.length; i++) {
+        const c = glob[i];
+        const segmentStart = i === 0 || glob[i - 1] === '/';
+        if (c === '*' && glob[i + 1] === '*') {
+            const slash = glob[i + 2] === '/';
+            source += slash ? '(?:[^/.][^/]*/)*' : '(?:[^/.][^/]*(?:/[^/.][^/]*)*)?';
+            i += slash ? 2 : 1;
+        } else if (c === '*') {
+            source += segmentStart ? '(?:[^/.][^/]*)?' : '[^/]*';
+        } else if (c === '?') {
+            source += segmentStart ? '[^/.]' : '[^/]';
+        } else if (c === '{') {
+            const close = glob.indexOf('}', i);
+            if (close < 0) {
+                source += '\\{';
+                continue;
+            }
+            source += `(?:${glob.slice(i + 1, close).split(',').map(part => part.replace(/[.+^${}()|[\]\\*?]/g, '\\$&')).join('|')})`;
+            i = close;
+        } else {
+            source += c.replace(/[.+^${}()|[\]\\]/g, '\\$&');
+        }
+    }
+    return new RegExp(`^${source}$`, process.platform === 'win32' ? 'i' : '');
+}
+
+// Directory part of a glob before its first wildcard, and the pattern below it
+export function splitGlob(glob: string): { baseDir: string; pattern: string } {
+    const segments = glob.split(/[\\/]/);
+    const firstWild = segments.findIndex(segment => /[*?{]/.test(segment));
+    if (firstWild < 0) return { baseDir: path.dirname(glob), pattern: path.basename(glob) };
+    return { baseDir: segments.slice(0, firstWild).join(path.sep) || path.sep, pattern: segments.slice(firstWild).join('/') };
+}
+
+function walk(dir: string, recursive: boolean, out: string[], prefix = ''): void {
+    let entries: fs.Dirent[];
+    try {
+        entries = fs.readdirSync(dir, { withFileTypes: true });
+    } catch {
+        return; // Missing folder: nothing to match
+    }
+    for (const entry of entries) {
+        const relative = prefix ? `${prefix}/${entry.name}` : entry.name;
+        if (entry.isDirectory()) {
+            if (recursive) walk(path.join(dir, entry.name), recursive, out, relative);
+        } else if (entry.isFile()) {
+            out.push(relative);
+        }
+    }
+}
+
+// Whether `filePath` is matched by one of the globs
+export function matchesGlobs(globs: string[], filePath: string): boolean {
+    return globs.some(glob => {
+        const { baseDir, pattern } = splitGlob(glob);
+        const relative = path.relative(baseDir, filePath);
+        if (!relative || relative.startsWith('..') || path.isAbsolute(relative)) return false;
+        return globToRegExp(pattern).test(relative.split(path.sep).join('/'));
+    });
+}
+
+/** Files matched by any of the globs, sorted, without duplicates. */
+export function expandGlobs(globs: string[]): string[] {
+    const files = new Set<string>();
+    for (const glob of globs) {
+        const { baseDir, pattern } = splitGlob(glob);
+        const regex = globToRegExp(pattern);
+        const relatives: string[] = [];
+        walk(baseDir, pattern.includes('/'), relatives);
+        relatives.filter(relative => regex.test(relative)).forEach(relative => files.add(path.join(baseDir, relative)));
+    }
+    return Array.from(files).sort();
+}
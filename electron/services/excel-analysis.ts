@@ -0,0 +1,176 @@
+import path from 'path';
+import { workbookCache } from './workbook-cache';
+import {
+    findHeaderRow,
+    findFooterStartRow,
+    detectFileIssues,
+    findColumnFuzzy,
+    ID_COLUMN_PATTERNS,
+    RESULT_COLUMN_PATTERNS,
+    findFirstEmptyColumn,
+    analyzeColumnQuality,
+    generateMatchLabel,
+    sampleSheetRows,
+    readSheetRows,
+    ANALYSIS_SAMPLE,
+    WORKBOOK_READ_OPTIONS
+} from '../utils/excel-utils';
+import { getColumnCount, type RowWindow } from './row-index';
+import { isTracingEnabled, Tracer, withTracer } from './tracing';
+
+/**
+ * Smart defaults for a workbook: header/footer rows, ID and result columns,
+ * data quality. Runs in the main process (excel:analyze) and in excel workers
+ * (excel:analyzeMany).
+ */
+
+// First rows of the analyzed sheet, returned as `rowWindow` in the shape of excel:readRows so the
+// renderer can show them without the main process parsing the file again. Matches its ROW_BLOCK_SIZE.
+const ROW_WINDOW_SIZE = 200;
+
+export interface AnalyzeOptions {
+    fullScan?: boolean; // Scan every row instead of a head/tail/strided sample
+    trace?: boolean; // Return the spans of this analysis as `trace` (defaults to isTracingEnabled())
+}
+
+export async function analyzeExcelFile(filePath: string, sheetName?: string, options: AnalyzeOptions = {}) {
+    const tracer = new Tracer('excel', options.trace ?? isTracingEnabled());
+    const result = tracer.span('analyze file', args => {
+        const analysis = withTracer(tracer, () => analyzeSheet(filePath, sheetName, options));
+        args.rows = 'rowCount' in analysis ? analysis.rowCount : 0;
+        return analysis;
+    }, { file: path.basename(filePath), fullScan: !!options.fullScan });
+    return tracer.enabled ? { ...result, trace: tracer.spans } : result;
+}
+
+function analyzeSheet(filePath: string, sheetName: string | undefined, options: AnalyzeOptions) {
+    try {
+        // Only the selected sheet is parsed; by default only a bounded sample of its rows is materialised
+        let data: any[][];
+        let allSheets: string[];
+        let selectedSheet: string;
+        let colCount: number;
+        let scanRanges: Array<[number, number]> | undefined;
+        let sampledIndices: number[] | null = null;
+        let rowWindow: RowWindow;
+
+        if (options.fullScan) {
+            const scoped = workbookCache.getScopedSheetRows(filePath, sheetName, WORKBOOK_READ_OPTIONS);
+            data = scoped.rows;
+            allSheets = scoped.workbook.SheetNames;
+            selectedSheet = scoped.sheetName;
+            colCount = findFirstEmptyColumn(data);
+            rowWindow = { rows: data.slice(0, ROW_WINDOW_SIZE), start: 0, totalRows: data.length, totalCols: getColumnCount(data), sheetName: selectedSheet };
+        } else {
+            const scoped = workbookCache.getScopedSheet(filePath, sheetName, WORKBOOK_READ_OPTIONS);
+            const sample = sampleSheetRows(scoped.sheet, ANALYSIS_SAMPLE);
+            data = sample.rows;
+            allSheets = scoped.sheetNames;
+            selectedSheet = scoped.sheetName;
+            colCount = sample.colCount;
+            scanRanges = sample.runs;
+            sampledIndices = sample.indices;
+            rowWindow = {
+                rows: readSheetRows(scoped.sheet, 0, ROW_WINDOW_SIZE),
+                start: 0,
+                totalRows: sample.rowCount,
+                totalCols: sample.colCount,
+                sheetName: selectedSheet
+            };
+        }
+
+        if (data.length === 0) {
+            return {
+                success: false,
+                error: 'Sheet is empty',
+                sheets: allSheets,
+                selectedSheet
+            };
+        }
+
+        // Find header row
+        const headerRowIndex = findHeaderRow(data);
+        const headers = data[headerRowIndex] || [];
+
+        // Find footer row
+        const footerStartRow = findFooterStartRow(data);
+        const dataRowCount = Math.max(0, footerStartRow - headerRowIndex - 1);
+        const startRow = headerRowIndex + 1; // 0-indexed start of data
+        const endRow = footerStartRow; // 0-indexed end of data (exclusive)
+
+        // Detect global file issues
+        const fileIssues = detectFileIssues(data, headerRowIndex, footerStartRow, scanRanges);
+
+        // Fuzzy match ID column
+        const idColumn = findColumnFuzzy(headers, ID_COLUMN_PATTERNS);
+
+        // Fuzzy match existing result column (or suggest new)
+        const existingResultColumn = findColumnFuzzy(headers, RESULT_COLUMN_PATTERNS);
+        const suggestedResultColumn = existingResultColumn
+            ? existingResultColumn.index
+            : colCount;
+
+        // Analyze column quality for important columns
+        let idColumnAnalysis = null;
+        if (idColumn) {
+            if (sampledIndices) {
+                const sampleRows = sampledIndices.filter(i => i >= startRow && i < endRow).map(i => data[i]);
+                idColumnAnalysis = analyzeColumnQuality(sampleRows, idColumn.index, 0, sampleRows.length);
+                idColumn.reasoning += ` (${idColumnAnalysis.uniqueCount} unique values in ${sampleRows.length} sampled rows, ${Math.round(idColumnAnalysis.score)}% quality)`;
+            } else {
+                idColumnAnalysis = analyzeColumnQuality(data, idColumn.index, startRow, endRow);
+                // Enhance reasoning with data quality stats
+                idColumn.reasoning += ` (${idColumnAnalysis.uniqueCount} unique values, ${Math.round(idColumnAnalysis.score)}% quality)`;
+            }
+        }
+
+        // Suggest row range
+        const suggestedRowRange = {
+            start: headerRowIndex + 2, // 1-indexed, skip header
+            end: footerStartRow // 1-indexed (based on length)
+        };
+
+        // Generate match label from filename
+        const suggestedMatchLabel = generateMatchLabel(filePath);
+
+        // Calculate overall data quality score
+        const overallScore = idColumnAnalysis ? idColumnAnalysis.score : (fileIssues.length > 0 ? 50 : 100);
+
+        return {
+            success: true,
+            fileName: path.basename(filePath),
+            filePath,
+            sheets: allSheets,
+            selectedSheet,
+            headers: headers.map((h, i) => ({ index: i, name: String(h || `Column ${i + 1}`) })),
+            rowCount: data.length,
+            dataRowCount,
+            headerRowIndex: headerRowIndex + 1, // 1-indexed
+            footerStartRow: footerStartRow + 1, // 1-indexed
+            idColumn: idColumn ? {
+                index: idColumn.index,
+                name: idColumn.columnName,
+                confidence: idColumn.confidence >= 80 ? 'high' : idColumn.confidence >= 60 ? 'medium' : 'low',
+                reasoning: idColumn.reasoning,
+                sampleValues: idColumnAnalysis?.sampleValues,
+                qualityScore: idColumnAnalysis?.score,
+                issues: idColumnAnalysis?.issues
+            } : null,
+            resultColumn: {
+                index: suggestedResultColumn,
+                name: existingResultColumn?.columnName || '(New Column)',
+                isNew: !existingResultColumn
+            },
+            suggestedRowRange,
+            suggestedMatchLabel,
+            sampled: sampledIndices !== null,
+            rowWindow,
+            analysisReport: {
+                qualityScore: overallScore,
+                issues: fileIssues
+            }
+        };
+    } catch (error: any) {
+        return { success: false, error: error.message };
+    }
+}
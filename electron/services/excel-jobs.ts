@@ -0,0 +1,106 @@
+/**
+ * Job control for excel:process runs: cancellation flags shared with the
+ * worker pool and throttled progress reporting.
+ *
+ * The cancel flag is a SharedArrayBuffer so workers see `excel:cancel` without
+ * a message round trip; the matching loops check it at every row boundary.
+ */
+
+export type JobStage = 'indexing' | 'matching' | 'writing' | 'done' | 'cancelled' | 'failed';
+
+export interface JobProgress {
+    jobId: string;
+    stage: JobStage;
+    currentFile?: string;
+    filesDone: number;
+    filesTotal: number;
+    rowsScanned: number;
+    rowsMatched: number;
+    bytesWritten: number;
+}
+
+// Per-row hooks threaded through the matching stages
+export interface RowControl {
+    shouldStop(): boolean;
+    onProgress?(rowsScanned: number, rowsMatched: number): void;
+}
+
+// Rows between two onProgress calls inside a matching loop
+export const PROGRESS_ROW_INTERVAL = 1000;
+// Minimum time between two progress events sent to the renderer
+export const PROGRESS_INTERVAL_MS = 100;
+
+export class JobCancelledError extends Error {
+    constructor() {
+        super('Processing cancelled');
+        this.name = 'JobCancelledError';
+    }
+}
+
+export function createCancelFlag(): SharedArrayBuffer {
+    return new SharedArrayBuffer(Int32Array.BYTES_PER_ELEMENT);
+}
+
+export function isCancelled(flag?: SharedArrayBuffer): boolean {
+    return !!flag && Atomics.load(new Int32Array(flag), 0) === 1;
+}
+
+const activeJobs = new Map<string, SharedArrayBuffer>();
+
+export function registerJob(jobId: string): SharedArrayBuffer {
+    const flag = createCancelFlag();
+    activeJobs.set(jobId, flag);
+    return flag;
+}
+
+export function unregisterJob(jobId: string): void {
+    activeJobs.delete(jobId);
+}
+
+// Request cancellation; returns false when the job is unknown or already finished
+export function cancelJob(jobId: string): boolean {
+    const flag = activeJobs.get(jobId);
+    if (!flag) return false;
+    Atomics.store(new Int32Array(flag), 0, 1);
+    return true;
+}
+
+/**
+ * Rate-limit progress events. Intermediate updates are coalesced and the latest
+ * one is delivered after the interval; `force` sends immediately (stage changes,
+ * completion).
+ */
+export function throttleProgress(
+    emit: (progress: JobProgress) => void,
+    intervalMs = PROGRESS_INTERVAL_MS
+): (progress: JobProgress, force?: boolean) => void {
+    let lastSent = 0;
+    let pending: JobProgress | null = null;
+    let timer: ReturnType<typeof setTimeout> | null = null;
+
+    const send = (progress: JobProgress) => {
+        lastSent = Date.now();
+        pending = null;
+        emit({ ...progress });
+    };
+
+    return (progress, force = false) => {
+        const elapsed = Date.now() - lastSent;
+        if (force || elapsed >= intervalMs) {
+            if (timer) {
+                clearTimeout(timer);
+                timer = null;
+            }
+            send(progress);
+            return;
+        }
+
+        pending = progress;
+        if (!timer) {
+            timer = setTimeout(() => {
+                timer = null;
+                if (pending) send(pending);
+            }, intervalMs - elapsed);
+        }
+    };
+}
@@ -0,0 +1,289 @@
+import { normalizeValue } from '../utils/excel-utils';
+import { JobCancelledError, PROGRESS_ROW_INTERVAL, RowControl } from './excel-jobs';
+import type { NearMatchIndex } from './near-match';
+
+/**
+ * Pure matching stages of processExcelJob.
+ *
+ * These work on already-parsed `sheet_to_json(..., { header: 1 })` arrays and never
+ * touch the file system, so the same code runs inline or inside a worker thread.
+ * An optional RowControl lets a caller cancel between rows and observe progress.
+ */
+
+export interface RowRange {
+    start: number;
+    end: number;
+}
+
+export interface ValidationWarning {
+    type: string;
+    file: string;
+    row: number;
+    message: string;
+}
+
+export interface MatchedTargetRow {
+    data: any[];
+    rowNumber: number;
+}
+
+export interface NearMatchedTargetRow extends MatchedTargetRow {
+    key: string; // Target key, as typed
+    masterKey: string; // Closest master key
+    distance: number;
+}
+
+export interface TargetMatchResult {
+    stats: { total: number; matched: number; nearMatched: number };
+    header: any[] | null; // First row of the sheet, used as header of the unmatched workbook
+    matchedKeys: string[]; // In row order
+    matchedRows: MatchedTargetRow[];
+    nearMatches: NearMatchedTargetRow[]; // Only filled when a near-match index is given
+    unmatchedRows: any[][]; // Already suffixed with the source file name
+}
+
+const FOOTER_KEYWORDS = [
+    'total', 'sum', 'size', 'qty', 'quantity', 'percentage',
+    'no of trip', 'trip', 'count', 'grand total',
+    '10 mm', '20 mm', '10mm', '20mm', '30 mm', '40 mm',
+    'aggregate', 'average', 'avg', 'subtotal', 'sub-total',
+    'qpmc ticket', 'ticket no', 'serial no', 'readymix',
+    'report', 'supply', 'material', 'vehicle type'
+];
+
+// Convert a 1-indexed inclusive UI range to 0-indexed [start, end) bounds, defaulting to "skip header"
+export function resolveRowBounds(range: RowRange | undefined, rowCount: number): { start: number; end: number } {
+    const start = range ? range.start - 1 : 1;
+    const end = range ? range.end : rowCount;
+    return { start, end: Math.min(end, rowCount) };
+}
+
+// Row-boundary hook: throw when the job was cancelled, report progress every PROGRESS_ROW_INTERVAL rows
+function checkRow(control: RowControl | undefined, scanned: number, matched: number): void {
+    if (!control) return;
+    if (control.shouldStop()) throw new JobCancelledError();
+    if (control.onProgress && scanned % PROGRESS_ROW_INTERVAL === 0) {
+        control.onProgress(scanned, matched);
+    }
+}
+
+// Build the normalized match key for a row, or '' when every key column is empty
+export function buildRowKey(row: any[], colIndices: number[]): string {
+    const values = colIndices
+        .map(colIdx => normalizeValue(row[colIdx]))
+        .filter(val => val !== '');
+    return values.length > 0 ? values.join('|') : ''; // Use pipe separator
+}
+
+// Target rows that are footers, labels or too short to be a ticket are not counted
+export function isInvalidTargetKey(key: string): boolean {
+    const lowerKey = key.toLowerCase();
+    const looksLikeTicket = /^\d{10}$/.test(key.trim());
+    const isFooterRow = FOOTER_KEYWORDS.some(kw => lowerKey.includes(kw));
+
+    return key.length === 0 ||
+        isFooterRow ||
+        (lowerKey.includes('date') && lowerKey.length < 15) ||
+        (!looksLikeTicket && key.length < 8);
+}
+
+/**
+ * STEP 1: Build the master lookup (what exists in the master file) and collect
+ * validation warnings for empty, malformed and duplicate tickets. `keyRows`
+ * maps every key to the (0-indexed) rows holding it, so the result column can
+ * later be filled without recomputing keys.
+ */
+export function buildMasterIndex(
+    masterData: any[][],
+    masterColIndices: number[],
+    masterRowRange?: RowRange,
+    control?: RowControl
+): { lookup: Set<string>; keyRows: Map<string, number[]>; warnings: ValidationWarning[] } {
+    const warnings: ValidationWarning[] = [];
+    const duplicates = new Map<string, number[]>(); // key -> row numbers
+    const lookup = new Set<string>();
+    const keyRows = new Map<string, number[]>();
+    const { start, end } = resolveRowBounds(masterRowRange, masterData.length);
+
+    for (let i = start; i < end; i++) {
+        checkRow(control, i - start, lookup.size);
+        const row = masterData[i];
+        if (!Array.isArray(row)) continue;
+
+        const key = buildRowKey(row, masterColIndices);
+        if (!key) continue;
+
+        // Check for empty QPMC ticket
+        const rawTicket = row[masterColIndices[0]];
+        if (!rawTicket || String(rawTicket).trim() === '') {
+            warnings.push({
+                type: 'empty_ticket',
+                file: 'Master',
+                row: i + 1,
+                message: `Row ${i + 1}: Empty QPMC ticket`
+            });
+        }
+
+        // Check for format (should be 10 digits)
+        const ticketStr = String(rawTicket).trim();
+        if (ticketStr && !/^\d{10}$/.test(ticketStr)) {
+            warnings.push({
+                type: 'invalid_format',
+                file: 'Master',
+                row: i + 1,
+                message: `Row ${i + 1}: QPMC ticket "${ticketStr}" is not 10 digits`
+            });
+        }
+
+        // Track duplicates
+        if (lookup.has(key)) {
+            if (!duplicates.has(key)) {
+                duplicates.set(key, []);
+            }
+            duplicates.get(key)!.push(i + 1);
+        }
+
+        lookup.add(key);
+        const rows = keyRows.get(key);
+        if (rows) rows.push(i);
+        else keyRows.set(key, [i]);
+    }
+
+    // Report duplicates
+    duplicates.forEach((rows, key) => {
+        warnings.push({
+            type: 'duplicate',
+            file: 'Master',
+            row: rows[0],
+            message: `Duplicate QPMC ticket "${key}" found in rows: ${rows.join(', ')}`
+        });
+    });
+
+    return { lookup, keyRows, warnings };
+}
+
+/**
+ * STEP 2: Match one target sheet against the master lookup. With a near-match
+ * index, rows that fail the exact lookup are checked against it, and a row
+ * with a single closest master key is reported as a near match instead of
+ * being left unmatched.
+ */
+export function matchTargetRows(
+    targetData: any[][],
+    colIndices: number[],
+    rowRange: RowRange | undefined,
+    masterLookup: Set<string>,
+    sourceFileName: string,
+    control?: RowControl,
+    nearIndex?: NearMatchIndex
+): TargetMatchResult {
+    const result: TargetMatchResult = {
+        stats: { total: 0, matched: 0, nearMatched: 0 },
+        header: targetData.length > 0 ? targetData[0] : null,
+        matchedKeys: [],
+        matchedRows: [],
+        nearMatches: [],
+        unmatchedRows: []
+    };
+    const { start, end } = resolveRowBounds(rowRange, targetData.length);
+
+    for (let rowIndex = start; rowIndex < end; rowIndex++) {
+        checkRow(control, rowIndex - start, result.stats.matched);
+        const row = targetData[rowIndex];
+        if (!Array.isArray(row)) continue;
+
+        const key = buildRowKey(row, colIndices);
+        if (!key || isInvalidTargetKey(key)) continue;
+
+        result.stats.total++;
+
+        if (masterLookup.has(key)) {
+            result.stats.matched++;
+            result.matchedKeys.push(key);
+            result.matchedRows.push({ data: row, rowNumber: rowIndex + 1 });
+            continue;
+        }
+
+        const near = nearIndex?.find(key);
+        if (near) {
+            result.stats.nearMatched++;
+            result.nearMatches.push({ data: row, rowNumber: rowIndex + 1, key, masterKey: near.key, distance: near.distance });
+        } else {
+            result.unmatchedRows.push([...row, sourceFileName]);
+        }
+    }
+
+    return result;
+}
+
+/**
+ * STEP 3: Compute the result column for the master rows in range.
+ * Returns [rowIndex, value] pairs for every cell that should be written.
+ */
+export function computeResultColumn(
+    masterData: any[][],
+    masterColIndices: number[],
+    masterRowRange: RowRange | undefined,
+    targetLookup: Map<string, Set<string> | string[]>,
+    noMatchSentence: string,
+    control?: RowControl
+): { cells: Array<[number, string]>; matchCount: number } {
+    const cells: Array<[number, string]> = [];
+    let matchCount = 0;
+    const { start, end } = resolveRowBounds(masterRowRange, masterData.length);
+
+    for (let i = start; i < end; i++) {
+        checkRow(control, i - start, matchCount);
+        const row = masterData[i];
+        if (!Array.isArray(row)) continue;
+
+        const key = buildRowKey(row, masterColIndices);
+        let resultValue = '';
+
+        if (key) {
+            const labels = targetLookup.get(key);
+            if (labels) {
+                resultValue = Array.from(labels).join(', ');
+                matchCount++;
+            } else if (noMatchSentence) {
+                resultValue = noMatchSentence;
+            }
+        }
+
+        if (resultValue) {
+            cells.push([i, resultValue]);
+        }
+    }
+
+    return { cells, matchCount };
+}
+
+/**
+ * STEP 3, from a master index: the same cells as computeResultColumn, in row
+ * order, without scanning or re-keying the master rows. Near-match labels
+ * only fill rows whose key has no exact match.
+ */
+export function computeResultColumnFromIndex(
+    keyRows: Map<string, number[]>,
+    targetLookup: Map<string, Set<string> | string[]>,
+    noMatchSentence: string,
+    nearLookup?: Map<string, Set<string> | string[]>
+): { cells: Array<[number, string]>; matchCount: number; nearMatchCount: number } {
+    const cells: Array<[number, string]> = [];
+    let matchCount = 0;
+    let nearMatchCount = 0;
+
+    keyRows.forEach((rows, key) => {
+        const labels = targetLookup.get(key);
+        const nearLabels = labels ? undefined : nearLookup?.get(key);
+        const shown = labels || nearLabels;
+        const resultValue = shown ? Array.from(shown).join(', ') : noMatchSentence;
+        if (labels) matchCount += rows.length;
+        else if (nearLabels) nearMatchCount += rows.length;
+        if (!resultValue) return;
+        for (const row of rows) cells.push([row, resultValue]);
+    });
+
+    cells.sort((a, b) => a[0] - b[0]);
+    return { cells, matchCount, nearMatchCount };
+}
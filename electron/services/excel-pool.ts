@@ -0,0 +1,43 @@
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { WorkerPool, InlinePool, TaskPool } from './worker-pool';
+import { excelTaskHandlers } from './excel-tasks';
+import { workbookCache } from './workbook-cache';
+
+const MAX_WORKERS = 6;
+
+let pool: TaskPool | null = null;
+
+// One worker per core (leaving one for the main thread), capped; FATOORA_EXCEL_WORKERS=0 disables workers
+function resolvePoolSize(): number {
+    const fromEnv = Number(process.env.FATOORA_EXCEL_WORKERS);
+    if (process.env.FATOORA_EXCEL_WORKERS !== undefined && Number.isFinite(fromEnv)) {
+        return Math.max(0, Math.floor(fromEnv));
+    }
+    return Math.max(1, Math.min(os.cpus().length - 1, MAX_WORKERS));
+}
+
+export function getExcelPool(): TaskPool {
+    if (pool) return pool;
+
+    // Bundled next to main.js by scripts/build-electron.mjs
+    const scriptPath = path.join(__dirname, 'workers', 'excel-worker.js');
+    const size = resolvePoolSize();
+
+    if (size > 0 && fs.existsSync(scriptPath)) {
+        // Workers split one cache budget between them; the main process keeps its own for previews (see excel-worker.ts)
+        const cacheBudgetBytes = Math.floor(workbookCache.getStats().budgetBytes / size);
+        pool = new WorkerPool(scriptPath, size, { cacheBudgetBytes });
+    } else {
+        pool = new InlinePool(excelTaskHandlers);
+    }
+    return pool;
+}
+
+export async function shutdownExcelPool(): Promise<void> {
+    if (!pool) return;
+    const current = pool;
+    pool = null;
+    await current.destroy();
+}
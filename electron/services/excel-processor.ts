@@ -1,21 +1,23 @@
-import fs from 'fs';
+import crypto from 'crypto';
 import path from 'path';
-import * as XLSX from 'xlsx';
-import {
-    getSheet,
-    findHeaderRow,
-    findFooterStartRow,
-    detectFileIssues,
-    findColumnFuzzy,
-    ID_COLUMN_PATTERNS,
-    RESULT_COLUMN_PATTERNS,
-    findFirstEmptyColumn,
-    analyzeColumnQuality,
-    generateMatchLabel,
-    normalizeValue
-} from '../utils/excel-utils';
+import { getExcelPool } from './excel-pool';
+import type { IndexMasterResult, MatchTargetResult, WriteOutputsResult, TaskProgress } from './excel-tasks';
+import { registerJob, unregisterJob, isCancelled, throttleProgress, JobProgress } from './excel-jobs';
+import type { TargetMatchResult } from './excel-matching';
+import { analyzeExcelFile, AnalyzeOptions } from './excel-analysis';
+import { mapConcurrent } from '../utils/concurrency';
+import { jobRowStore, buildOutputModel, JobOutputModel } from './job-row-store';
+import { acquireMatchSession, hashFile, masterKeyFor, targetKeyFor, MatchSession } from './match-session';
+import { clampNearMatchDistance, DEFAULT_NEAR_MATCH_LABEL, NearMatchOptions } from './near-match';
+import { isTracingEnabled, recordSpans, Tracer } from './tracing';
+
+export { analyzeExcelFile };
+export type { AnalyzeOptions };
 
 export interface ProcessOptions {
+    jobId?: string; // Caller-chosen id used by excel:cancel and progress events
+    // Reuse the master index and unchanged target results of earlier runs with the same session id
+    sessionId?: string;
     masterPath: string;
     targetPaths: string[];
     masterColIndices: number[];
@@ -25,363 +27,324 @@ export interface ProcessOptions {
     matchSentence: string;
     noMatchSentence: string;
     outputPath?: string;
+    unmatchedPath?: string; // Defaults to <master>_unmatched next to the master
     masterRowRange?: { start: number; end: number };
     targetRowRanges?: Record<string, { start: number; end: number }>;
     masterSheetName?: string;
     targetSheetNames?: Record<string, string>;
+    // Keep the updated master rows and matched target rows in a job row store and return
+    // an output model instead of the matchedRows array
+    keepOutput?: boolean;
+    // Check target rows without an exact match against the master keys for typos,
+    // and label the closest master row distinctly
+    nearMatch?: NearMatchOptions;
 }
 
-export async function analyzeExcelFile(filePath: string, sheetName?: string) {
-    try {
-        const workbook = XLSX.readFile(filePath);
-        const allSheets = workbook.SheetNames;
-        const { sheet, name: selectedSheet } = getSheet(workbook, sheetName);
-
-        const data = XLSX.utils.sheet_to_json(sheet, { header: 1 }) as any[][];
-
-        if (data.length === 0) {
-            return {
-                success: false,
-                error: 'Sheet is empty',
-                sheets: allSheets,
-                selectedSheet
-            };
-        }
-
-        // Find header row
-        const headerRowIndex = findHeaderRow(data);
-        const headers = data[headerRowIndex] || [];
-
-        // Find footer row
-        const footerStartRow = findFooterStartRow(data);
-        const dataRowCount = Math.max(0, footerStartRow - headerRowIndex - 1);
-        const startRow = headerRowIndex + 1; // 0-indexed start of data
-        const endRow = footerStartRow; // 0-indexed end of data (exclusive)
-
-        // Detect global file issues
-        const fileIssues = detectFileIssues(data, headerRowIndex, footerStartRow);
-
-        // Fuzzy match ID column
-        const idColumn = findColumnFuzzy(headers, ID_COLUMN_PATTERNS);
-
-        // Fuzzy match existing result column (or suggest new)
-        const existingResultColumn = findColumnFuzzy(headers, RESULT_COLUMN_PATTERNS);
-        const suggestedResultColumn = existingResultColumn
-            ? existingResultColumn.index
-            : findFirstEmptyColumn(data);
-
-        // Analyze column quality for important columns
-        let idColumnAnalysis = null;
-        if (idColumn) {
-            idColumnAnalysis = analyzeColumnQuality(data, idColumn.index, startRow, endRow);
-            // Enhance reasoning with data quality stats
-            idColumn.reasoning += ` (${idColumnAnalysis.uniqueCount} unique values, ${Math.round(idColumnAnalysis.score)}% quality)`;
-        }
-
-        // Suggest row range
-        const suggestedRowRange = {
-            start: headerRowIndex + 2, // 1-indexed, skip header
-            end: footerStartRow // 1-indexed (based on length)
-        };
-
-        // Generate match label from filename
-        const suggestedMatchLabel = generateMatchLabel(filePath);
+export interface ProcessHooks {
+    onProgress?: (progress: JobProgress) => void; // Throttled, see PROGRESS_INTERVAL_MS
+}
 
-        // Calculate overall data quality score
-        const overallScore = idColumnAnalysis ? idColumnAnalysis.score : (fileIssues.length > 0 ? 50 : 100);
+export interface MatchedRow {
+    sourceFile: string;
+    data: any[];
+    rowNumber: number;
+}
 
-        return {
-            success: true,
-            fileName: path.basename(filePath),
-            filePath,
-            sheets: allSheets,
-            selectedSheet,
-            headers: headers.map((h, i) => ({ index: i, name: String(h || `Column ${i + 1}`) })),
-            rowCount: data.length,
-            dataRowCount,
-            headerRowIndex: headerRowIndex + 1, // 1-indexed
-            footerStartRow: footerStartRow + 1, // 1-indexed
-            idColumn: idColumn ? {
-                index: idColumn.index,
-                name: idColumn.columnName,
-                confidence: idColumn.confidence >= 80 ? 'high' : idColumn.confidence >= 60 ? 'medium' : 'low',
-                reasoning: idColumn.reasoning,
-                sampleValues: idColumnAnalysis?.sampleValues,
-                qualityScore: idColumnAnalysis?.score,
-                issues: idColumnAnalysis?.issues
-            } : null,
-            resultColumn: {
-                index: suggestedResultColumn,
-                name: existingResultColumn?.columnName || '(New Column)',
-                isNew: !existingResultColumn
-            },
-            suggestedRowRange,
-            suggestedMatchLabel,
-            analysisReport: {
-                qualityScore: overallScore,
-                issues: fileIssues
-            }
-        };
-    } catch (error: any) {
-        return { success: false, error: error.message };
-    }
+export interface NearMatchedRow {
+    sourceFile: string;
+    rowNumber: number;
+    key: string; // Target key
+    masterKey: string;
+    distance: number;
 }
 
-export async function processExcelJob(options: ProcessOptions) {
-    try {
-        const { masterPath, targetPaths, masterColIndices, masterResultColIndex, targetMatchColIndices, targetMatchStrings, noMatchSentence, outputPath, masterRowRange, targetRowRanges, masterSheetName, targetSheetNames } = options;
+export interface AnalyzeManyOptions extends AnalyzeOptions {
+    concurrency?: number; // Files analyzed at once, defaults to the excel pool size
+}
 
-        // Validation tracking
-        const validationWarnings: Array<{ type: string; file: string; row: number; message: string }> = [];
-        const masterDuplicates = new Map<string, number[]>(); // key -> row numbers
+/**
+ * Analyze several files on the excel pool. `onResult` fires as each file
+ * finishes; the returned array keeps input order.
+ */
+export async function analyzeManyExcelFiles(
+    filePaths: string[],
+    options: AnalyzeManyOptions = {},
+    onResult?: (index: number, result: any) => void
+) {
+    const pool = getExcelPool();
+    const { concurrency, ...analyzeOptions } = options;
+    const payloadOptions: AnalyzeOptions = {
+        ...analyzeOptions,
+        trace: analyzeOptions.trace ?? isTracingEnabled()
+    };
+
+    return mapConcurrent(filePaths, concurrency ?? pool.size, async (filePath, index) => {
+        const result = await pool.run<any>('analyzeFile', { filePath, options: payloadOptions })
+            .catch((error: any) => ({ success: false, error: error.message, filePath }));
+        recordSpans(result.trace);
+        onResult?.(index, result);
+        return result;
+    });
+}
 
-        // Process Files
-        interface MatchedRow {
-            sourceFile: string;
-            data: any[];
-            rowNumber: number;
+export async function processExcelJob(options: ProcessOptions, hooks: ProcessHooks = {}) {
+    const pool = getExcelPool();
+    const jobId = options.jobId || crypto.randomUUID();
+    const cancelFlag = registerJob(jobId);
+    // The worker that indexes the master keeps its workbook for the final write
+    const MASTER_WORKER = 0;
+    // Spans of this job, worker spans included; returned as `trace` and kept for the diagnostics panel
+    const tracer = new Tracer('excel');
+    const trace = tracer.enabled;
+    const endJob = tracer.begin('process job', { targets: options.targetPaths.length });
+
+    // Without a session id the job gets a throwaway session of its own
+    let session: MatchSession;
+    if (options.sessionId) {
+        const acquired = acquireMatchSession(options.sessionId);
+        session = acquired.session;
+        for (const evicted of acquired.evicted) {
+            pool.broadcast('releaseSession', { sessionId: evicted.id }, { liveOnly: true }).catch(() => { });
         }
-
-        const matchedRows: MatchedRow[] = [];
-
-        // STEP 1: Build Master Lookup (what exists in master file)
-        // Read with cellNF:true and cellStyles:true to preserve formats (dates, colors)
-        const masterWb = XLSX.readFile(masterPath, { cellDates: false, cellNF: true, cellStyles: true });
-        const { sheet: masterSheet } = getSheet(masterWb, masterSheetName);
-
-        const masterData = XLSX.utils.sheet_to_json(masterSheet, { header: 1, raw: true, defval: '' }) as any[][];
-
-        const masterLookup = new Set<string>();
-
-        // Determine row range for master file
-        const masterStart = masterRowRange ? masterRowRange.start - 1 : 1; // Convert to 0-indexed, default skip header
-        const masterEnd = masterRowRange ? masterRowRange.end : masterData.length;
-
-        // Build lookup from master file (only from selected row range)
-        for (let i = masterStart; i < masterEnd && i < masterData.length; i++) {
-            const row = masterData[i];
-            if (Array.isArray(row)) {
-                const masterValues = masterColIndices
-                    .map(colIdx => normalizeValue(row[colIdx]))
-                    .filter(val => val !== '');
-
-                if (masterValues.length > 0) {
-                    const key = masterValues.join('|'); // Use pipe separator
-
-                    // Check for empty QPMC ticket
-                    const rawTicket = row[masterColIndices[0]];
-                    if (!rawTicket || String(rawTicket).trim() === '') {
-                        validationWarnings.push({
-                            type: 'empty_ticket',
-                            file: 'Master',
-                            row: i + 1,
-                            message: `Row ${i + 1}: Empty QPMC ticket`
-                        });
-                    }
-
-                    // Check for format (should be 10 digits)
-                    const ticketStr = String(rawTicket).trim();
-                    if (ticketStr && !/^\d{10}$/.test(ticketStr)) {
-                        validationWarnings.push({
-                            type: 'invalid_format',
-                            file: 'Master',
-                            row: i + 1,
-                            message: `Row ${i + 1}: QPMC ticket "${ticketStr}" is not 10 digits`
-                        });
-                    }
-
-                    // Track duplicates
-                    if (masterLookup.has(key)) {
-                        if (!masterDuplicates.has(key)) {
-                            masterDuplicates.set(key, []);
-                        }
-                        masterDuplicates.get(key)!.push(i + 1);
-                    }
-
-                    masterLookup.add(key);
-                }
-            }
+        if (session.busy) {
+            unregisterJob(jobId);
+            return { success: false, error: 'This matching session is already processing' };
+        }
+    } else {
+        session = new MatchSession(jobId);
+    }
+    const sessionId = session.id;
+    const keepSession = !!options.sessionId;
+    session.busy = true;
+
+    const { masterPath, targetPaths, masterColIndices, masterResultColIndex, targetMatchColIndices, targetMatchStrings, noMatchSentence, outputPath, masterRowRange, targetRowRanges, masterSheetName, targetSheetNames } = options;
+    const nearMatchDistance = options.nearMatch ? clampNearMatchDistance(options.nearMatch.maxDistance) : undefined;
+    const nearMatchLabel = options.nearMatch?.label || DEFAULT_NEAR_MATCH_LABEL;
+
+    const activeTargets = targetPaths.filter(targetPath => {
+        const cols = targetMatchColIndices[targetPath];
+        if (!cols || cols.length === 0) {
+            console.warn(`No columns selected for target file: ${targetPath}`);
+            return false;
+        }
+        return true;
+    });
+
+    // Progress is summed over tasks: each task reports its own running row counts
+    const progress: JobProgress = {
+        jobId,
+        stage: 'indexing',
+        currentFile: path.basename(masterPath),
+        filesDone: 0,
+        filesTotal: activeTargets.length,
+        rowsScanned: 0,
+        rowsMatched: 0,
+        bytesWritten: 0
+    };
+    const taskRows = new Map<string, { rowsScanned: number; rowsMatched: number }>();
+    const emit: (progress: JobProgress, force?: boolean) => void = hooks.onProgress
+        ? throttleProgress(hooks.onProgress)
+        : () => { };
+
+    const setStage = (stage: JobProgress['stage'], currentFile?: string) => {
+        progress.stage = stage;
+        progress.currentFile = currentFile;
+        emit(progress, true);
+    };
+    const trackRows = (taskKey: string, filePath: string) => (update: TaskProgress) => {
+        if (update.rowsScanned !== undefined) {
+            taskRows.set(taskKey, { rowsScanned: update.rowsScanned, rowsMatched: update.rowsMatched || 0 });
+            progress.rowsScanned = 0;
+            progress.rowsMatched = 0;
+            taskRows.forEach(rows => {
+                progress.rowsScanned += rows.rowsScanned;
+                progress.rowsMatched += rows.rowsMatched;
+            });
         }
+        if (update.bytesWritten !== undefined) progress.bytesWritten = update.bytesWritten;
+        progress.currentFile = path.basename(filePath);
+        emit(progress);
+    };
 
-        // Report duplicates
-        masterDuplicates.forEach((rows, key) => {
-            validationWarnings.push({
-                type: 'duplicate',
-                file: 'Master',
-                row: rows[0],
-                message: `Duplicate QPMC ticket "${key}" found in rows: ${rows.join(', ')}`
+    try {
+        // STEP 1: Build Master Lookup (what exists in master file), once per session and master, then share its keys
+        emit(progress, true);
+        const masterHash = await tracer.spanAsync('hash master', () => hashFile(masterPath));
+        const masterKey = masterKeyFor(masterHash, { masterPath, masterSheetName, masterColIndices, masterRowRange });
+        const masterReused = !!session.master && session.masterKey === masterKey;
+        if (!masterReused) {
+            if (session.master) await pool.broadcast('releaseSession', { sessionId }, { liveOnly: true });
+            session.reset();
+            const indexed = await tracer.spanAsync('index master', async args => {
+                const result = await pool.run<IndexMasterResult>('indexMaster', {
+                    sessionId,
+                    cancelFlag,
+                    masterPath,
+                    masterSheetName,
+                    masterColIndices,
+                    masterRowRange,
+                    trace
+                }, { worker: MASTER_WORKER, onProgress: trackRows('master', masterPath) });
+                args.rows = result.rowCount;
+                return result;
             });
-        });
+            tracer.add(indexed.trace);
 
-        // STEP 2: Process Target Files
-        const targetLookup = new Map<string, Set<string>>();
-        const unmatchedRows: any[][] = [];
-        let unmatchedHeader: any[] = [];
+            if (pool.size > 1) {
+                await tracer.spanAsync('share master keys', () => pool.broadcast('setMasterKeys', { sessionId, keys: indexed.keys }), { keys: indexed.keys.length });
+            }
+            // Workers keep the keys; the session only needs the warnings and row count
+            session.master = { ...indexed, keys: [], trace: undefined };
+            session.masterKey = masterKey;
+        }
+        const validationWarnings = session.master!.warnings;
 
-        const fileStats = new Map<string, { total: number; matched: number }>();
+        const masterDir = path.dirname(masterPath);
+        const masterExt = path.extname(masterPath);
+        const masterName = path.basename(masterPath, masterExt);
 
-        for (const targetPath of targetPaths) {
-            try {
-                const targetMatchColIndices_forFile = targetMatchColIndices[targetPath];
-                const matchString = targetMatchStrings[targetPath] || 'Matched';
-                const targetSheetName = targetSheetNames ? targetSheetNames[targetPath] : undefined;
+        // STEP 3 & 4: The master file is updated and saved by the master worker
+        const newPath = outputPath || path.join(masterDir, `${masterName}_updated${masterExt}`);
 
-                if (!targetMatchColIndices_forFile || targetMatchColIndices_forFile.length === 0) {
-                    console.warn(`No columns selected for target file: ${targetPath}`);
-                    continue;
-                }
+        // STEP 5: Unmatched rows are streamed to the master worker's writer as results are merged
+        const unmatchedTarget = options.unmatchedPath || path.join(masterDir, `${masterName}_unmatched${masterExt}`);
+        let unmatchedCount = 0;
+        let unmatchedHeader: any[] | null = null;
+        let unmatchedWrites: Promise<void> = Promise.resolve();
 
-                const targetWb = XLSX.readFile(targetPath, { cellDates: false, raw: true });
-                const { sheet: targetSheet } = getSheet(targetWb, targetSheetName);
-                const targetData = XLSX.utils.sheet_to_json(targetSheet, { header: 1, raw: true, defval: '' }) as any[][];
+        // Merge in selection order so output is identical to a sequential run
+        const targetLookup = new Map<string, Set<string>>();
+        const nearLookup = new Map<string, Set<string>>();
+        const matchedRows: MatchedRow[] = [];
+        const nearMatches: NearMatchedRow[] = [];
+        const fileStats = new Map<string, TargetMatchResult['stats']>();
 
-                fileStats.set(targetPath, { total: 0, matched: 0 });
+        const merge = (targetPath: string, result: TargetMatchResult) => tracer.span('merge target', () => {
+            const matchString = targetMatchStrings[targetPath] || 'Matched';
+            fileStats.set(targetPath, result.stats);
 
-                if (unmatchedRows.length === 0 && targetData.length > 0) {
-                    unmatchedHeader = [...targetData[0], 'Source File'];
-                    unmatchedRows.push(unmatchedHeader);
-                }
+            if (unmatchedCount === 0 && !unmatchedHeader && result.header) {
+                unmatchedHeader = [...result.header, 'Source File'];
+            }
 
-                const targetRange = targetRowRanges?.[targetPath];
-                const targetStart = targetRange ? targetRange.start - 1 : 1;
-                const targetEnd = targetRange ? targetRange.end : targetData.length;
-
-                for (let rowIndex = targetStart; rowIndex < targetEnd && rowIndex < targetData.length; rowIndex++) {
-                    const row = targetData[rowIndex];
-                    if (!Array.isArray(row)) continue;
-
-                    const values = targetMatchColIndices_forFile
-                        .map(colIdx => normalizeValue(row[colIdx]))
-                        .filter(val => val !== '');
-
-                    if (values.length > 0) {
-                        const key = values.join('|');
-
-                        const lowerKey = key.toLowerCase();
-                        const looksLikeTicket = /^\d{10}$/.test(key.trim());
-
-                        const footerKeywords = [
-                            'total', 'sum', 'size', 'qty', 'quantity', 'percentage',
-                            'no of trip', 'trip', 'count', 'grand total',
-                            '10 mm', '20 mm', '10mm', '20mm', '30 mm', '40 mm',
-                            'aggregate', 'average', 'avg', 'subtotal', 'sub-total',
-                            'qpmc ticket', 'ticket no', 'serial no', 'readymix',
-                            'report', 'supply', 'material', 'vehicle type'
-                        ];
-
-                        const isFooterRow = footerKeywords.some(kw => lowerKey.includes(kw));
-
-                        const isInvalidRow =
-                            key.length === 0 ||
-                            isFooterRow ||
-                            (lowerKey.includes('date') && lowerKey.length < 15) ||
-                            (!looksLikeTicket && key.length < 8);
-
-                        if (isInvalidRow) {
-                            continue;
-                        }
-
-                        const stats = fileStats.get(targetPath)!;
-                        stats.total++;
-
-                        if (masterLookup.has(key)) {
-                            if (!targetLookup.has(key)) {
-                                targetLookup.set(key, new Set());
-                            }
-                            targetLookup.get(key)!.add(matchString);
-                            stats.matched++;
-
-                            matchedRows.push({
-                                sourceFile: targetPath,
-                                data: row,
-                                rowNumber: rowIndex + 1
-                            });
-
-                        } else {
-                            unmatchedRows.push([...row, path.basename(targetPath)]);
-                        }
-                    }
+            for (const key of result.matchedKeys) {
+                if (!targetLookup.has(key)) {
+                    targetLookup.set(key, new Set());
                 }
-            } catch (err: any) {
-                console.error(`Error reading target ${targetPath}:`, err);
+                targetLookup.get(key)!.add(matchString);
             }
-        }
-
-        // STEP 3: Update Master File
-        let matchCount = 0;
-        const updateStart = masterRowRange ? masterRowRange.start - 1 : 1;
-        const updateEnd = masterRowRange ? masterRowRange.end : masterData.length;
-
-        if (masterSheet['!ref']) {
-            const range = XLSX.utils.decode_range(masterSheet['!ref']);
-            if (masterResultColIndex > range.e.c) {
-                range.e.c = masterResultColIndex;
-                masterSheet['!ref'] = XLSX.utils.encode_range(range);
+            for (const row of result.matchedRows) {
+                matchedRows.push({ sourceFile: targetPath, data: row.data, rowNumber: row.rowNumber });
             }
-        }
-
-        for (let i = updateStart; i < updateEnd && i < masterData.length; i++) {
-            const row = masterData[i];
-            if (!Array.isArray(row)) continue;
-
-            const values = masterColIndices
-                .map(colIdx => normalizeValue(row[colIdx]))
-                .filter(val => val !== '');
-
-            let resultValue = '';
-
-            if (values.length > 0) {
-                const key = values.join('|');
-
-                if (targetLookup.has(key)) {
-                    const matchStrings = Array.from(targetLookup.get(key)!);
-                    resultValue = matchStrings.join(', ');
-                    matchCount++;
-                } else {
-                    if (noMatchSentence) {
-                        resultValue = noMatchSentence;
-                    }
+            for (const near of result.nearMatches) {
+                if (!nearLookup.has(near.masterKey)) {
+                    nearLookup.set(near.masterKey, new Set());
                 }
+                nearLookup.get(near.masterKey)!.add(`${nearMatchLabel} (${matchString})`);
+                nearMatches.push({ sourceFile: targetPath, rowNumber: near.rowNumber, key: near.key, masterKey: near.masterKey, distance: near.distance });
             }
-
-            if (resultValue) {
-                const cellRef = XLSX.utils.encode_cell({ r: i, c: masterResultColIndex });
-                masterSheet[cellRef] = { t: 's', v: resultValue };
+            if (result.unmatchedRows.length > 0) {
+                unmatchedCount += result.unmatchedRows.length;
+                const payload = { jobId, unmatchedPath: unmatchedTarget, header: unmatchedHeader, rows: result.unmatchedRows };
+                unmatchedWrites = unmatchedWrites.then(() => pool.run('appendUnmatched', payload, { worker: MASTER_WORKER }));
+                unmatchedWrites.catch(() => { }); // Surfaced by the await below
             }
-        }
-
-        // STEP 4: Save Updated Master File
-        let newPath: string;
-        if (outputPath) {
-            newPath = outputPath;
-            fs.mkdirSync(path.dirname(newPath), { recursive: true });
-        } else {
-            const dir = path.dirname(masterPath);
-            const ext = path.extname(masterPath);
-            const name = path.basename(masterPath, ext);
-            newPath = path.join(dir, `${name}_updated${ext}`);
-        }
-
-        XLSX.writeFile(masterWb, newPath);
-
-        // STEP 5: Save Unmatched File
-        let unmatchedPath: string | undefined;
-        const unmatchedCount = unmatchedRows.length - 1;
+        }, { file: path.basename(targetPath), rows: result.stats.total });
+
+        // STEP 2: Process Target Files (parsed and matched in parallel, merged as soon as all earlier ones are).
+        // Targets whose content and column config are unchanged since the last run reuse their session result.
+        setStage('matching', activeTargets.length > 0 ? path.basename(activeTargets[0]) : undefined);
+        const settled: Array<TargetMatchResult | null | undefined> = new Array(activeTargets.length);
+        let nextToMerge = 0;
+        let targetsReused = 0;
+        const reusedTargets = new Set<string>();
+        const mergeSettled = () => {
+            for (; nextToMerge < activeTargets.length && settled[nextToMerge] !== undefined; nextToMerge++) {
+                const result = settled[nextToMerge];
+                settled[nextToMerge] = null; // Drop the rows once merged
+                if (result) merge(activeTargets[nextToMerge], result);
+            }
+        };
 
-        if (unmatchedCount > 0) {
-            const dir = path.dirname(masterPath);
-            const ext = path.extname(masterPath);
-            const name = path.basename(masterPath, ext);
-            unmatchedPath = path.join(dir, `${name}_unmatched${ext}`);
+        const targetKeys = await tracer.spanAsync('hash targets', () => Promise.all(activeTargets.map(targetPath =>
+            hashFile(targetPath).then(hash => targetKeyFor(hash, {
+                fileName: path.basename(targetPath),
+                sheetName: targetSheetNames ? targetSheetNames[targetPath] : undefined,
+                colIndices: targetMatchColIndices[targetPath],
+                rowRange: targetRowRanges?.[targetPath],
+                nearMatchDistance
+            }), () => '') // Unreadable: matchTarget reports it
+        )), { targets: activeTargets.length });
+
+        await Promise.all(activeTargets.map((targetPath, i) => {
+            const cached = keepSession && targetKeys[i] ? session.getTarget(targetKeys[i]) : undefined;
+            if (cached) {
+                targetsReused++;
+                reusedTargets.add(targetPath);
+            }
+            const endTarget = tracer.begin('match target', { file: path.basename(targetPath), reused: !!cached });
+            const matched: Promise<TargetMatchResult> = cached ? Promise.resolve(cached) : pool.run<MatchTargetResult>('matchTarget', {
+                sessionId,
+                cancelFlag,
+                targetPath,
+                sheetName: targetSheetNames ? targetSheetNames[targetPath] : undefined,
+                colIndices: targetMatchColIndices[targetPath],
+                rowRange: targetRowRanges?.[targetPath],
+                nearMatchDistance,
+                trace
+            }, { onProgress: trackRows(targetPath, targetPath) }).then(({ trace: spans, ...result }) => {
+                tracer.add(spans);
+                return result;
+            });
 
-            const unmatchedSheet = XLSX.utils.aoa_to_sheet(unmatchedRows);
-            const unmatchedWb = XLSX.utils.book_new();
-            XLSX.utils.book_append_sheet(unmatchedWb, unmatchedSheet, "Unmatched");
-            XLSX.writeFile(unmatchedWb, unmatchedPath);
+            return matched.then(result => {
+                endTarget({ rows: result.stats.total, matched: result.stats.matched });
+                if (keepSession && targetKeys[i] && !cached) session.setTarget(targetKeys[i], result);
+                progress.filesDone++;
+                emit(progress);
+                return result;
+            }, (err: any) => {
+                endTarget({ failed: true });
+                if (!isCancelled(cancelFlag)) console.error(`Error reading target ${targetPath}:`, err);
+                return null;
+            }).then(result => {
+                settled[i] = result;
+                mergeSettled();
+            });
+        }));
+        if (keepSession) session.retainTargets(new Set(targetKeys));
+        await tracer.spanAsync('wait for unmatched writes', () => unmatchedWrites, { rows: unmatchedCount });
+        if (isCancelled(cancelFlag)) throw new Error('Processing cancelled');
+
+        const unmatchedPath = unmatchedCount > 0 ? unmatchedTarget : undefined;
+
+        setStage('writing', path.basename(newPath));
+        const written = await tracer.spanAsync('write outputs', () => pool.run<WriteOutputsResult>('writeOutputs', {
+            sessionId,
+            jobId,
+            cancelFlag,
+            masterResultColIndex,
+            targetLookup: Array.from(targetLookup, ([key, labels]) => [key, Array.from(labels)]),
+            nearLookup: nearLookup.size > 0 ? Array.from(nearLookup, ([key, labels]) => [key, Array.from(labels)]) : undefined,
+            noMatchSentence,
+            outputPath: newPath,
+            unmatchedPath,
+            returnRows: !!options.keepOutput,
+            trace
+        }, { worker: MASTER_WORKER, onProgress: trackRows('output', newPath) }));
+        tracer.add(written.trace);
+        const matchCount = written.matchCount;
+
+        // The output model comes from the rows that were just written, not from re-reading the file
+        let output: JobOutputModel | undefined;
+        if (options.keepOutput && written.rows) {
+            const storeId = jobRowStore.put(written.rows);
+            output = buildOutputModel(storeId, written.rows, matchedRows.length);
         }
+        setStage('done');
 
         // Calculate Stats
-        const totalMasterRows = masterData.length - 1;
+        const totalMasterRows = written.masterRowCount - 1;
         const matchedMasterRows = matchCount;
         const unmatchedMasterRows = unmatchedCount;
         const matchPercentage = totalMasterRows > 0 ? (matchedMasterRows / totalMasterRows) * 100 : 0;
@@ -391,7 +354,9 @@ export async function processExcelJob(options: ProcessOptions) {
             filePath,
             total: stats.total,
             matched: stats.matched,
-            percentage: stats.total > 0 ? parseFloat(((stats.matched / stats.total) * 100).toFixed(2)) : 0
+            nearMatched: stats.nearMatched,
+            percentage: stats.total > 0 ? parseFloat(((stats.matched / stats.total) * 100).toFixed(2)) : 0,
+            reused: reusedTargets.has(filePath)
         }));
 
         return {
@@ -406,16 +371,40 @@ export async function processExcelJob(options: ProcessOptions) {
                 totalMasterRows,
                 matchedMasterRows,
                 unmatchedMasterRows,
+                nearMatchedMasterRows: written.nearMatchCount,
                 matchPercentage: parseFloat(matchPercentage.toFixed(2))
             },
             perFileStats,
             unmatchedPath,
+            nearMatches: nearMatchDistance ? nearMatches : undefined,
             warnings: validationWarnings.length > 0 ? validationWarnings : undefined,
-            matchedRows
+            session: { masterReused, targetsReused, targetsMatched: activeTargets.length - targetsReused },
+            // Same array the finally block adds the job span to, before the result reaches the caller
+            trace: trace ? tracer.spans : undefined,
+            ...(output
+                ? { output, matchedRowCount: matchedRows.length }
+                : { matchedRows })
         };
 
     } catch (error: any) {
+        // Workers report cancellation as a plain error, the shared flag is authoritative
+        if (isCancelled(cancelFlag)) {
+            setStage('cancelled');
+            return { success: false, cancelled: true, error: 'Processing cancelled' };
+        }
         console.error(error);
+        setStage('failed');
+        // Worker state may be gone (a crashed worker is replaced empty): start the session over
+        session.reset();
         return { success: false, error: error.message };
+    } finally {
+        endJob({ jobId });
+        recordSpans(tracer.spans);
+        unregisterJob(jobId);
+        session.busy = false;
+        pool.broadcast('releaseJob', { jobId }, { liveOnly: true }).catch(() => { });
+        if (!keepSession || !session.master) {
+            pool.broadcast('releaseSession', { sessionId }, { liveOnly: true }).catch(() => { });
+        }
     }
 }
@@ -0,0 +1,417 @@
+import fs from 'fs';
+import path from 'path';
+import * as XLSX from 'xlsx';
+import { workbookCache } from './workbook-cache';
+import {
+    buildMasterIndex,
+    matchTargetRows,
+    computeResultColumnFromIndex,
+    resolveRowBounds,
+    RowRange,
+    ValidationWarning,
+    TargetMatchResult
+} from './excel-matching';
+import { WORKBOOK_READ_OPTIONS, WORKBOOK_WRITE_OPTIONS } from '../utils/excel-utils';
+import { analyzeExcelFile, AnalyzeOptions } from './excel-analysis';
+import { isCancelled, JobCancelledError, PROGRESS_INTERVAL_MS, RowControl } from './excel-jobs';
+import { canStream, streamUnsupported, writeWorkbookStream, UnmatchedRowWriter } from './excel-writer';
+import { patchResultColumn, XlsxPatchUnsupportedError } from './xlsx-patch';
+import { NearMatchIndex } from './near-match';
+import { Tracer, TraceSpan, withTracer } from './tracing';
+import type { TaskHandler, TaskContext } from './worker-pool';
+
+/**
+ * Task handlers behind processExcelJob. They run inside the excel worker pool
+ * (or inline on the calling thread) and keep master state per match session:
+ * the worker that indexed the master holds on to its workbook and key index
+ * for as long as the session lives, every other worker only holds the master
+ * key set (and a near-match index over it, once a job asks for one).
+ * Sessions outlive jobs (see match-session), so reprocessing with the same
+ * master skips indexing. Per-job state is only the unmatched writer.
+ * Unmatched rows are streamed to their workbook by the master worker as each
+ * target's results are merged, and only completed by writeOutputs.
+ *
+ * An .xlsx master is written by patching its result column into a copy of
+ * the original zip (see xlsx-patch); the parsed workbook is only written out
+ * in full when the patcher cannot handle the file.
+ *
+ * Every payload may carry the job's shared cancel flag. Handlers report
+ * progress through their TaskContext as TaskProgress updates. With `trace`
+ * set, a handler returns the spans it recorded in the result's `trace`.
+ */
+
+interface MasterState {
+    workbook: XLSX.WorkBook;
+    sheetName: string;
+    data: any[][];
+    keyRows: Map<string, number[]>;
+    filePath: string;
+    fingerprint: string; // Size and mtime when indexed, to tell whether the file can still be patched
+}
+
+interface SessionState {
+    lookup?: Set<string>;
+    master?: MasterState;
+    near?: NearMatchIndex; // Built on first use by each worker, dropped with the lookup
+}
+
+interface JobState {
+    unmatched?: UnmatchedRowWriter;
+}
+
+const sessions = new Map<string, SessionState>();
+const jobs = new Map<string, JobState>();
+
+function getSession(sessionId: string): SessionState {
+    let session = sessions.get(sessionId);
+    if (!session) {
+        session = {};
+        sessions.set(sessionId, session);
+    }
+    return session;
+}
+
+function getJob(jobId: string): JobState {
+    let job = jobs.get(jobId);
+    if (!job) {
+        job = {};
+        jobs.set(jobId, job);
+    }
+    return job;
+}
+
+export interface TaskProgress {
+    rowsScanned?: number;
+    rowsMatched?: number;
+    bytesWritten?: number;
+}
+
+export interface IndexMasterPayload {
+    sessionId: string;
+    cancelFlag?: SharedArrayBuffer;
+    masterPath: string;
+    masterSheetName?: string;
+    masterColIndices: number[];
+    masterRowRange?: RowRange;
+    trace?: boolean;
+}
+
+export interface IndexMasterResult {
+    keys: string[];
+    warnings: ValidationWarning[];
+    rowCount: number;
+    trace?: TraceSpan[];
+}
+
+export interface MatchTargetPayload {
+    sessionId: string;
+    cancelFlag?: SharedArrayBuffer;
+    targetPath: string;
+    sheetName?: string;
+    colIndices: number[];
+    rowRange?: RowRange;
+    nearMatchDistance?: number; // Check rows without an exact match against the near-match index
+    trace?: boolean;
+}
+
+export type MatchTargetResult = TargetMatchResult & { trace?: TraceSpan[] };
+
+export interface WriteOutputsPayload {
+    sessionId: string;
+    jobId: string;
+    cancelFlag?: SharedArrayBuffer;
+    masterResultColIndex: number;
+    targetLookup: Array<[string, string[]]>;
+    nearLookup?: Array<[string, string[]]>; // Labels of master keys that only have near matches
+    noMatchSentence: string;
+    outputPath: string;
+    unmatchedPath?: string; // Set when rows were sent with appendUnmatched
+    returnRows?: boolean; // Send back the updated master rows (for the job row store)
+    trace?: boolean;
+}
+
+export interface AppendUnmatchedPayload {
+    jobId: string;
+    unmatchedPath: string;
+    header: any[] | null; // Written once, ahead of the first row
+    rows: any[][];
+}
+
+export interface WriteOutputsResult {
+    matchCount: number;
+    nearMatchCount: number;
+    masterRowCount: number;
+    rows?: any[][];
+    trace?: TraceSpan[];
+}
+
+// Write result cells into a (cached, shared) sheet and return a function restoring the original cells
+function applyResultCells(sheet: XLSX.WorkSheet, cells: Array<[number, string]>, colIndex: number): () => void {
+    const originalRef = sheet['!ref'];
+    const originalCells = new Map<string, XLSX.CellObject | undefined>();
+
+    if (sheet['!ref']) {
+        const range = XLSX.utils.decode_range(sheet['!ref']);
+        if (colIndex > range.e.c) {
+            range.e.c = colIndex;
+            sheet['!ref'] = XLSX.utils.encode_range(range);
+        }
+    }
+
+    for (const [rowIndex, value] of cells) {
+        const cellRef = XLSX.utils.encode_cell({ r: rowIndex, c: colIndex });
+        if (!originalCells.has(cellRef)) originalCells.set(cellRef, sheet[cellRef]);
+        sheet[cellRef] = { t: 's', v: value };
+    }
+
+    return () => {
+        originalCells.forEach((cell, ref) => {
+            if (cell) sheet[ref] = cell;
+            else delete sheet[ref];
+        });
+        if (originalRef === undefined) delete sheet['!ref'];
+        else sheet['!ref'] = originalRef;
+    };
+}
+
+// Row control for a task: checks the shared cancel flag and forwards row counts at most every PROGRESS_INTERVAL_MS
+function rowControl(cancelFlag: SharedArrayBuffer | undefined, context: TaskContext): RowControl {
+    let lastReport = 0;
+    return {
+        shouldStop: () => isCancelled(cancelFlag),
+        onProgress: (rowsScanned, rowsMatched) => {
+            const now = Date.now();
+            if (now - lastReport < PROGRESS_INTERVAL_MS) return;
+            lastReport = now;
+            context.progress({ rowsScanned, rowsMatched } as TaskProgress);
+        }
+    };
+}
+
+function throwIfCancelled(cancelFlag?: SharedArrayBuffer): void {
+    if (isCancelled(cancelFlag)) throw new JobCancelledError();
+}
+
+// Outputs are written next to their final path and renamed once complete, so a
+// cancelled or failed run never leaves a half-written workbook behind
+export function partialPathFor(finalPath: string, jobId: string): string {
+    const ext = path.extname(finalPath);
+    const name = path.basename(finalPath, ext);
+    return path.join(path.dirname(finalPath), `.${name}.${jobId.slice(0, 8)}.partial${ext}`);
+}
+
+function fileFingerprint(filePath: string): string {
+    try {
+        const stat = fs.statSync(filePath);
+        return `${stat.size}:${stat.mtimeMs}`;
+    } catch {
+        return '';
+    }
+}
+
+function isXlsx(filePath: string): boolean {
+    return path.extname(filePath).toLowerCase() === '.xlsx';
+}
+
+// Patch the result column into a copy of the master zip; false when the master has to be rewritten instead
+function tryPatchMaster(master: MasterState, outputPath: string, colIndex: number, cells: Array<[number, string]>): boolean {
+    if (!isXlsx(master.filePath) || !isXlsx(outputPath)) return false;
+    if (!master.fingerprint || fileFingerprint(master.filePath) !== master.fingerprint) return false;
+    try {
+        patchResultColumn(master.filePath, outputPath, { sheetName: master.sheetName, colIndex, cells });
+        return true;
+    } catch (e) {
+        if (!(e instanceof XlsxPatchUnsupportedError)) throw e;
+        console.warn(`Rewriting ${path.basename(master.filePath)} instead of patching it: ${e.message}`);
+        removeQuietly(outputPath);
+        return false;
+    }
+}
+
+// Write the whole parsed master with its result column
+async function writeMasterWorkbook(
+    master: MasterState,
+    outputPath: string,
+    payload: WriteOutputsPayload,
+    cells: Array<[number, string]>
+): Promise<void> {
+    // SheetJS keeps what the stream writer cannot (defined names, comments, 1904 dates)
+    if (canStream(outputPath) && !streamUnsupported(master.workbook)) {
+        await writeWorkbookStream(master.workbook, outputPath, {
+            sheetName: master.sheetName,
+            colIndex: payload.masterResultColIndex,
+            cells
+        }, () => isCancelled(payload.cancelFlag));
+        return;
+    }
+    const sheet = master.workbook.Sheets[master.sheetName];
+    const restore = applyResultCells(sheet, cells, payload.masterResultColIndex);
+    try {
+        XLSX.writeFile(master.workbook, outputPath);
+    } finally {
+        restore();
+    }
+}
+
+function removeQuietly(filePath: string): void {
+    try {
+        fs.rmSync(filePath, { force: true });
+    } catch {
+        // Best effort: a leftover partial file is harmless
+    }
+}
+
+export const excelTaskHandlers: Record<string, TaskHandler> = {
+    indexMaster(payload: IndexMasterPayload, context: TaskContext): IndexMasterResult {
+        const tracer = new Tracer('excel', !!payload.trace);
+        const { rows, workbook, sheetName } = withTracer(tracer, () => workbookCache.getSheetRows(
+            payload.masterPath, payload.masterSheetName, WORKBOOK_WRITE_OPTIONS, { raw: true, defval: '' }
+        ));
+        const { start, end } = resolveRowBounds(payload.masterRowRange, rows.length);
+        const { lookup, keyRows, warnings } = tracer.span('build master index', args => {
+            const index = buildMasterIndex(
+                rows, payload.masterColIndices, payload.masterRowRange, rowControl(payload.cancelFlag, context)
+            );
+            args.rows = Math.max(0, end - start);
+            args.keys = index.lookup.size;
+            return index;
+        });
+        context.progress({ rowsScanned: Math.max(0, end - start), rowsMatched: 0 } as TaskProgress);
+
+        // Re-indexing a session replaces its master
+        sessions.set(payload.sessionId, {
+            lookup,
+            master: { workbook, sheetName, data: rows, keyRows, filePath: payload.masterPath, fingerprint: fileFingerprint(payload.masterPath) }
+        });
+
+        return { keys: Array.from(lookup), warnings, rowCount: rows.length, trace: tracer.enabled ? tracer.spans : undefined };
+    },
+
+    setMasterKeys(payload: { sessionId: string; keys: string[] }): void {
+        const session = getSession(payload.sessionId);
+        if (!session.lookup) session.lookup = new Set(payload.keys);
+    },
+
+    matchTarget(payload: MatchTargetPayload, context: TaskContext): MatchTargetResult {
+        const session = sessions.get(payload.sessionId);
+        const lookup = session?.lookup;
+        if (!session || !lookup) throw new Error('Master index not loaded for session');
+        const tracer = new Tracer('excel', !!payload.trace);
+
+        if (payload.nearMatchDistance && session.near?.maxDistance !== payload.nearMatchDistance) {
+            session.near = tracer.span('build near-match index', args => {
+                args.keys = lookup.size;
+                return new NearMatchIndex(lookup, payload.nearMatchDistance!);
+            });
+        }
+
+        const { rows } = withTracer(tracer, () => workbookCache.getScopedSheetRows(
+            payload.targetPath, payload.sheetName, WORKBOOK_READ_OPTIONS, { raw: true, defval: '' }
+        ));
+        const { start, end } = resolveRowBounds(payload.rowRange, rows.length);
+        const result = tracer.span('match target rows', args => {
+            const matched = matchTargetRows(
+                rows, payload.colIndices, payload.rowRange, lookup, path.basename(payload.targetPath),
+                rowControl(payload.cancelFlag, context), payload.nearMatchDistance ? session.near : undefined
+            );
+            args.rows = Math.max(0, end - start);
+            args.matched = matched.stats.matched;
+            args.nearMatched = matched.stats.nearMatched;
+            return matched;
+        }, { file: path.basename(payload.targetPath) });
+        context.progress({ rowsScanned: Math.max(0, end - start), rowsMatched: result.stats.matched } as TaskProgress);
+        return tracer.enabled ? { ...result, trace: tracer.spans } : result;
+    },
+
+    async writeOutputs(payload: WriteOutputsPayload, context: TaskContext): Promise<WriteOutputsResult> {
+        const master = sessions.get(payload.sessionId)?.master;
+        if (!master) throw new Error('Master workbook not loaded for session');
+        const tracer = new Tracer('excel', !!payload.trace);
+
+        const targetLookup = new Map(payload.targetLookup);
+        const nearLookup = payload.nearLookup ? new Map(payload.nearLookup) : undefined;
+        const { cells, matchCount, nearMatchCount } = tracer.span('compute result column', args => {
+            const column = computeResultColumnFromIndex(master.keyRows, targetLookup, payload.noMatchSentence, nearLookup);
+            args.rows = master.data.length;
+            args.cells = column.cells.length;
+            return column;
+        });
+        throwIfCancelled(payload.cancelFlag);
+
+        const renames: Array<[string, string]> = [];
+        const unmatched = jobs.get(payload.jobId)?.unmatched;
+        if (unmatched && payload.unmatchedPath) renames.push([unmatched.filePath, payload.unmatchedPath]);
+        let bytesWritten = 0;
+
+        try {
+            // Save Updated Master File
+            fs.mkdirSync(path.dirname(payload.outputPath), { recursive: true });
+            const partialOutput = partialPathFor(payload.outputPath, payload.jobId);
+            renames.push([partialOutput, payload.outputPath]);
+            await tracer.spanAsync('write master', async args => {
+                args.mode = 'patch';
+                if (!tryPatchMaster(master, partialOutput, payload.masterResultColIndex, cells)) {
+                    args.mode = 'rewrite';
+                    await writeMasterWorkbook(master, partialOutput, payload, cells);
+                }
+                const size = fs.statSync(partialOutput).size;
+                args.bytes = size;
+                bytesWritten += size;
+            });
+            context.progress({ bytesWritten } as TaskProgress);
+            throwIfCancelled(payload.cancelFlag);
+
+            // Complete the Unmatched File
+            if (unmatched && payload.unmatchedPath && await tracer.spanAsync('finish unmatched', () => unmatched.finish())) {
+                bytesWritten += fs.statSync(unmatched.filePath).size;
+                context.progress({ bytesWritten } as TaskProgress);
+                throwIfCancelled(payload.cancelFlag);
+            }
+        } catch (e) {
+            renames.forEach(([partial]) => removeQuietly(partial));
+            throw e;
+        }
+
+        // Both files are complete: move them into place
+        for (const [partial, finalPath] of renames) {
+            fs.renameSync(partial, finalPath);
+            workbookCache.invalidate(finalPath);
+        }
+
+        let rows: any[][] | undefined;
+        if (payload.returnRows) {
+            // Cached rows are shared: copy only the rows that receive a result value
+            rows = master.data.slice();
+            for (const [rowIndex, value] of cells) {
+                const row = Array.isArray(rows[rowIndex]) ? rows[rowIndex].slice() : [];
+                row[payload.masterResultColIndex] = value;
+                rows[rowIndex] = row;
+            }
+        }
+
+        return { matchCount, nearMatchCount, masterRowCount: master.data.length, rows, trace: tracer.enabled ? tracer.spans : undefined };
+    },
+
+    async appendUnmatched(payload: AppendUnmatchedPayload): Promise<void> {
+        const job = getJob(payload.jobId);
+        if (!job.unmatched) {
+            job.unmatched = new UnmatchedRowWriter(partialPathFor(payload.unmatchedPath, payload.jobId), payload.header);
+        }
+        await job.unmatched.append(payload.rows);
+    },
+
+    analyzeFile(payload: { filePath: string; sheetName?: string; options?: AnalyzeOptions }) {
+        return analyzeExcelFile(payload.filePath, payload.sheetName, payload.options);
+    },
+
+    async releaseJob(payload: { jobId: string }): Promise<void> {
+        const job = jobs.get(payload.jobId);
+        jobs.delete(payload.jobId);
+        // A cancelled or failed job leaves its unmatched partial behind; a finished one was renamed
+        if (job?.unmatched && fs.existsSync(job.unmatched.filePath)) await job.unmatched.abort().catch(() => { });
+    },
+
+    releaseSession(payload: { sessionId: string }): void {
+        sessions.delete(payload.sessionId);
+    },
+};
@@ -0,0 +1,249 @@
+import fs from 'fs';
+import path from 'path';
+import ExcelJS from 'exceljs';
+import * as XLSX from 'xlsx';
+import { JobCancelledError } from './excel-jobs';
+
+/**
+ * Streaming xlsx output for processExcelJob.
+ *
+ * Both writers sit on the exceljs WorkbookWriter: rows are committed to the
+ * zip stream as they are produced, and shared strings are off so nothing
+ * grows with the row count. Other output formats (xls, csv) go through
+ * SheetJS as before, since exceljs only writes xlsx.
+ */
+
+// Rows committed between yields, so the zip stream can drain to disk
+const ROWS_PER_FLUSH = 1000;
+
+export function canStream(filePath: string): boolean {
+    return path.extname(filePath).toLowerCase() === '.xlsx';
+}
+
+/**
+ * What writeWorkbookStream would drop from this workbook, or null when it
+ * carries everything over. Defined names, cell comments and the 1904 date
+ * system have no streaming equivalent, so those workbooks go through SheetJS.
+ */
+export function streamUnsupported(workbook: XLSX.WorkBook): string | null {
+    if (workbook.Workbook?.Names?.length) return 'defined names';
+    if (workbook.Workbook?.WBProps?.date1904) return '1904 date system';
+    for (const sheetName of workbook.SheetNames) {
+        const sheet = workbook.Sheets[sheetName];
+        if (!sheet) continue;
+        for (const address in sheet) {
+            if (address[0] !== '!' && (sheet[address] as XLSX.CellObject).c?.length) return 'cell comments';
+        }
+    }
+    return null;
+}
+
+function flush(): Promise<void> {
+    return new Promise(resolve => setImmediate(resolve));
+}
+
+function createWorkbookWriter(filePath: string): ExcelJS.stream.xlsx.WorkbookWriter {
+    return new ExcelJS.stream.xlsx.WorkbookWriter({ filename: filePath, useStyles: true, useSharedStrings: false });
+}
+
+// Cell value and number format of a SheetJS cell, as exceljs expects them
+function toExcelCell(cell: XLSX.CellObject): { value: ExcelJS.CellValue; numFmt?: string } {
+    let value: ExcelJS.CellValue;
+    switch (cell.t) {
+        case 'n':
+        case 'b':
+            value = cell.v as number | boolean;
+            break;
+        case 'd':
+            value = cell.v instanceof Date ? cell.v : new Date(String(cell.v));
+            break;
+        case 'e':
+            value = { error: (cell.w || '#N/A') as ExcelJS.CellErrorValue['error'] };
+            break;
+        case 'z':
+            value = null;
+            break;
+        default:
+            value = cell.v === undefined || cell.v === null ? null : String(cell.v);
+    }
+
+    if (cell.f) {
+        value = { formula: cell.f, result: value as any };
+    } else if (cell.l?.Target && typeof value === 'string') {
+        value = { text: value, hyperlink: cell.l.Target };
+    }
+
+    const numFmt = typeof cell.z === 'string' && cell.z !== 'General' ? cell.z : undefined;
+    return { value, numFmt };
+}
+
+// Column widths, merges and the autofilter are set before any row is committed
+function copySheetLayout(source: XLSX.WorkSheet, target: ExcelJS.Worksheet) {
+    const cols = source['!cols'];
+    if (cols) {
+        target.columns = cols.map(col => {
+            const width = col?.wch ?? (col?.wpx ? col.wpx / 7 : col?.width);
+            return { width: width || undefined, hidden: !!col?.hidden } as Partial<ExcelJS.Column>;
+        });
+    }
+    for (const merge of source['!merges'] || []) {
+        target.mergeCells(merge.s.r + 1, merge.s.c + 1, merge.e.r + 1, merge.e.c + 1);
+    }
+    const autofilter = source['!autofilter'];
+    if (autofilter?.ref) target.autoFilter = autofilter.ref;
+}
+
+const SHEET_STATES: Record<number, ExcelJS.WorksheetState> = { 1: 'hidden', 2: 'veryHidden' };
+
+export interface ResultColumn {
+    sheetName: string;
+    colIndex: number;
+    cells: Array<[number, string]>; // [row index, value], as computed by computeResultColumn
+}
+
+/**
+ * Write a parsed workbook to filePath one row at a time, with the result
+ * column written into its sheet. Values, formulas, number formats, column
+ * widths, row heights, hidden rows and columns, merges, autofilters and sheet
+ * visibility are carried over. Check streamUnsupported first for the rest.
+ */
+export async function writeWorkbookStream(
+    workbook: XLSX.WorkBook,
+    filePath: string,
+    result: ResultColumn,
+    shouldStop: () => boolean = () => false
+): Promise<void> {
+    const writer = createWorkbookWriter(filePath);
+    let committed = false;
+    try {
+        for (const [i, sheetName] of workbook.SheetNames.entries()) {
+            const sheet = workbook.Sheets[sheetName];
+            const state = SHEET_STATES[workbook.Workbook?.Sheets?.[i]?.Hidden ?? 0] ?? 'visible';
+            const target = writer.addWorksheet(sheetName, { state });
+            if (sheet?.['!ref']) {
+                await writeSheetRows(sheet, target, sheetName === result.sheetName ? result : null, shouldStop);
+            }
+            target.commit();
+        }
+        committed = true;
+        await writer.commit();
+    } finally {
+        if (!committed) await writer.commit().catch(() => { });
+    }
+}
+
+async function writeSheetRows(
+    sheet: XLSX.WorkSheet,
+    target: ExcelJS.Worksheet,
+    result: ResultColumn | null,
+    shouldStop: () => boolean
+) {
+    copySheetLayout(sheet, target);
+
+    const range = XLSX.utils.decode_range(sheet['!ref']!);
+    const lastCol = result ? Math.max(range.e.c, result.colIndex) : range.e.c;
+    const resultCells = new Map(result?.cells);
+    const colNames: string[] = [];
+    for (let c = 0; c <= lastCol; c++) colNames.push(XLSX.utils.encode_col(c));
+    const rowProps = sheet['!rows'];
+
+    for (let r = range.s.r; r <= range.e.r; r++) {
+        const rowNumber = String(r + 1);
+        const row = target.getRow(r + 1);
+        let hasCells = false;
+
+        for (let c = range.s.c; c <= lastCol; c++) {
+            const cell = result && c === result.colIndex && resultCells.has(r)
+                ? { t: 's', v: resultCells.get(r) } as XLSX.CellObject
+                : sheet[colNames[c] + rowNumber] as XLSX.CellObject | undefined;
+            if (!cell) continue;
+            const { value, numFmt } = toExcelCell(cell);
+            if (value === null && !numFmt) continue;
+            const targetCell = row.getCell(c + 1);
+            targetCell.value = value;
+            if (numFmt) targetCell.numFmt = numFmt;
+            hasCells = true;
+        }
+
+        const props = rowProps?.[r];
+        const height = props?.hpt ?? (props?.hpx ? props.hpx * 0.75 : undefined);
+        if (height) row.height = height;
+        if (props?.hidden) row.hidden = true;
+        if (hasCells || height || props?.hidden) row.commit();
+
+        if ((r - range.s.r + 1) % ROWS_PER_FLUSH === 0) {
+            if (shouldStop()) throw new JobCancelledError();
+            await flush();
+        }
+    }
+}
+
+/**
+ * Append-only writer for the unmatched rows workbook. The header is written
+ * with the first row; nothing touches the disk until then.
+ */
+export class UnmatchedRowWriter {
+    readonly filePath: string;
+    private header: any[] | null;
+    private writer: ExcelJS.stream.xlsx.WorkbookWriter | null = null;
+    private sheet: ExcelJS.Worksheet | null = null;
+    private buffered: any[][] | null = null; // SheetJS fallback for formats exceljs cannot write
+    private closed = false;
+    rowCount = 0;
+
+    constructor(filePath: string, header: any[] | null) {
+        this.filePath = filePath;
+        this.header = header;
+    }
+
+    async append(rows: any[][]): Promise<void> {
+        if (this.closed) throw new Error('Unmatched writer is closed');
+        if (rows.length === 0) return;
+
+        if (!canStream(this.filePath)) {
+            if (!this.buffered) this.buffered = this.header ? [this.header] : [];
+            for (const row of rows) this.buffered.push(row);
+            this.rowCount += rows.length;
+            return;
+        }
+
+        if (!this.writer) {
+            fs.mkdirSync(path.dirname(this.filePath), { recursive: true });
+            this.writer = createWorkbookWriter(this.filePath);
+            this.sheet = this.writer.addWorksheet('Unmatched');
+            if (this.header) this.sheet.addRow(this.header).commit();
+        }
+        for (const row of rows) {
+            this.sheet!.addRow(row).commit();
+            if (++this.rowCount % ROWS_PER_FLUSH === 0) await flush();
+        }
+    }
+
+    // Complete the file; false when no row was ever appended (and nothing was written)
+    async finish(): Promise<boolean> {
+        if (this.closed) return this.rowCount > 0;
+        this.closed = true;
+
+        if (this.buffered) {
+            const workbook = XLSX.utils.book_new();
+            XLSX.utils.book_append_sheet(workbook, XLSX.utils.aoa_to_sheet(this.buffered), 'Unmatched');
+            fs.mkdirSync(path.dirname(this.filePath), { recursive: true });
+            XLSX.writeFile(workbook, this.filePath);
+            this.buffered = null;
+            return true;
+        }
+        if (!this.writer) return false;
+        this.sheet!.commit();
+        await this.writer.commit();
+        return true;
+    }
+
+    // Stop writing and remove whatever reached the disk
+    async abort(): Promise<void> {
+        const wasOpen = !this.closed && !!this.writer;
+        this.closed = true;
+        this.buffered = null;
+        if (wasOpen) await this.writer!.commit().catch(() => { });
+        fs.rmSync(this.filePath, { force: true });
+    }
+}
@@ -0,0 +1,247 @@
+import type { Collection } from '../db/log-store';
+import { extractDateString, getTodayString } from '../utils/invoice-utils';
+
+/**
+ * Dashboard totals kept up to date as invoices change.
+ *
+ * Every save or delete moves one invoice's contribution out of the totals it
+ * was in and into the new ones (status, customer, issue month, aging bucket),
+ * so the dashboard reads a handful of numbers instead of scanning the
+ * invoice history. Only a restore or migration rebuilds from scratch.
+ *
+ * Aging is by issue date. Outstanding amounts are also kept per issue day so
+ * that when the date changes the buckets are rebuilt from those day totals,
+ * not from the invoices.
+ */
+
+export type AgingBucket = '0-30' | '31-60' | '61-90' | '90+';
+
+export const AGING_BUCKETS: AgingBucket[] = ['0-30', '31-60', '61-90', '90+'];
+
+export interface AggregateTotals {
+    count: number;
+    amount: number;
+}
+
+export interface CustomerAggregate {
+    customerId: string;
+    name: string;
+    count: number;
+    revenue: number;
+    outstanding: number;
+}
+
+export interface DashboardSummary {
+    invoiceCount: number;
+    revenue: number; // Everything but drafts
+    outstanding: number; // Issued and overdue
+    activeInvoices: number;
+    currentMonthRevenue: number;
+    lastMonthRevenue: number;
+    revenueTrend: number; // Percent, current month against last month
+    byStatus: Record<string, AggregateTotals>;
+    aging: Record<AgingBucket, AggregateTotals>;
+    months: Array<{ month: string } & AggregateTotals>; // Last MONTHS_IN_SUMMARY months, oldest first
+    topCustomers: CustomerAggregate[];
+}
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+const MONTHS_IN_SUMMARY = 12;
+const TOP_CUSTOMERS = 5;
+
+const round = (value: number): number => Math.round(value * 100) / 100;
+
+export function agingBucket(ageDays: number): AgingBucket {
+    if (ageDays <= 30) return '0-30';
+    if (ageDays <= 60) return '31-60';
+    if (ageDays <= 90) return '61-90';
+    return '90+'; // Also invoices without a readable date
+}
+
+// Days since the epoch for a YYYY-MM-DD (or ISO) date, NaN when unreadable
+function dayNumber(date: string): number {
+    return Math.floor(Date.parse(`${extractDateString(date)}T00:00:00Z`) / DAY_MS);
+}
+
+// YYYY-MM, offset by whole months
+function shiftMonth(month: string, delta: number): string {
+    const [year, mon] = month.split('-').map(Number);
+    const d = new Date(Date.UTC(year, mon - 1 + delta, 1));
+    return d.toISOString().slice(0, 7);
+}
+
+function isRevenue(inv: any): boolean {
+    return inv.status !== 'draft';
+}
+
+function isOutstanding(inv: any): boolean {
+    return inv.status !== 'paid' && inv.status !== 'draft';
+}
+
+function addTo(map: Map<any, AggregateTotals>, key: any, amount: number, sign: 1 | -1) {
+    let entry = map.get(key);
+    if (!entry) {
+        entry = { count: 0, amount: 0 };
+        map.set(key, entry);
+    }
+    entry.count += sign;
+    entry.amount += sign * amount;
+    if (entry.count === 0) map.delete(key);
+}
+
+function emptyAging(): Record<AgingBucket, AggregateTotals> {
+    return {
+        '0-30': { count: 0, amount: 0 },
+        '31-60': { count: 0, amount: 0 },
+        '61-90': { count: 0, amount: 0 },
+        '90+': { count: 0, amount: 0 }
+    };
+}
+
+export class InvoiceAggregates {
+    private collection: Collection;
+    private invoiceCount = 0;
+    private revenue = 0;
+    private outstanding = 0;
+    private activeInvoices = 0;
+    private byStatus = new Map<string, AggregateTotals>();
+    private byMonth = new Map<string, AggregateTotals>();
+    private byCustomer = new Map<string, CustomerAggregate>();
+    private outstandingByDay = new Map<number, AggregateTotals>();
+    private aging = emptyAging();
+    private agingDay = NaN; // Day the aging buckets are relative to
+
+    constructor(collection: Collection) {
+        this.collection = collection;
+        this.rebuild();
+        collection.observe((previous, next) => {
+            if (previous) this.track(previous, -1);
+            if (next) this.track(next, 1);
+        });
+    }
+
+    // Full recompute, for bulk replacement (restore, migration)
+    rebuild() {
+        this.invoiceCount = 0;
+        this.revenue = 0;
+        this.outstanding = 0;
+        this.activeInvoices = 0;
+        this.byStatus.clear();
+        this.byMonth.clear();
+        this.byCustomer.clear();
+        this.outstandingByDay.clear();
+        this.aging = emptyAging();
+        this.agingDay = dayNumber(getTodayString());
+        for (const inv of this.collection.all()) this.track(inv, 1);
+    }
+
+    customer(customerId: string): CustomerAggregate | undefined {
+        const entry = this.byCustomer.get(customerId);
+        return entry ? { ...entry, revenue: round(entry.revenue), outstanding: round(entry.outstanding) } : undefined;
+    }
+
+    summary(today: string = getTodayString()): DashboardSummary {
+        this.ageTo(dayNumber(today));
+
+        const currentMonth = today.slice(0, 7);
+        const currentMonthRevenue = this.byMonth.get(currentMonth)?.amount ?? 0;
+        const lastMonthRevenue = this.byMonth.get(shiftMonth(currentMonth, -1))?.amount ?? 0;
+        const revenueTrend = lastMonthRevenue === 0
+            ? (currentMonthRevenue > 0 ? 100 : 0)
+            : ((currentMonthRevenue - lastMonthRevenue) / lastMonthRevenue) * 100;
+
+        const months: DashboardSummary['months'] = [];
+        for (let i = MONTHS_IN_SUMMARY - 1; i >= 0; i--) {
+            const month = shiftMonth(currentMonth, -i);
+            const entry = this.byMonth.get(month);
+            months.push({ month, count: entry?.count ?? 0, amount: round(entry?.amount ?? 0) });
+        }
+
+        const byStatus: Record<string, AggregateTotals> = {};
+        for (const [status, entry] of this.byStatus) byStatus[status] = { count: entry.count, amount: round(entry.amount) };
+
+        const aging = emptyAging();
+        for (const bucket of AGING_BUCKETS) {
+            aging[bucket] = { count: this.aging[bucket].count, amount: round(this.aging[bucket].amount) };
+        }
+
+        // Few customers next to invoices, so a sort here stays cheap
+        const topCustomers = Array.from(this.byCustomer.values())
+            .sort((a, b) => b.revenue - a.revenue)
+            .slice(0, TOP_CUSTOMERS)
+            .map(entry => ({ ...entry, revenue: round(entry.revenue), outstanding: round(entry.outstanding) }));
+
+        return {
+            invoiceCount: this.invoiceCount,
+            revenue: round(this.revenue),
+            outstanding: round(this.outstanding),
+            activeInvoices: this.activeInvoices,
+            currentMonthRevenue: round(currentMonthRevenue),
+            lastMonthRevenue: round(lastMonthRevenue),
+            revenueTrend,
+            byStatus,
+            aging,
+            months,
+            topCustomers
+        };
+    }
+
+    private track(inv: any, sign: 1 | -1) {
+        const amount = Number(inv.total) || 0;
+        this.invoiceCount += sign;
+        addTo(this.byStatus, inv.status || 'draft', amount, sign);
+
+        const customerId = inv.to?.customerId || inv.to?.name || '';
+        let customer = this.byCustomer.get(customerId);
+        if (!customer) {
+            customer = { customerId, name: inv.to?.name || '', count: 0, revenue: 0, outstanding: 0 };
+            this.byCustomer.set(customerId, customer);
+        }
+        customer.count += sign;
+        if (sign > 0 && inv.to?.name) customer.name = inv.to.name;
+
+        if (isRevenue(inv)) {
+            this.revenue += sign * amount;
+            customer.revenue += sign * amount;
+            addTo(this.byMonth, extractDateString(String(inv.date || inv.createdAt || '')).slice(0, 7), amount, sign);
+        }
+
+        if (isOutstanding(inv)) {
+            this.outstanding += sign * amount;
+            this.activeInvoices += sign;
+            customer.outstanding += sign * amount;
+
+            const day = dayNumber(String(inv.date || ''));
+            addTo(this.outstandingByDay, day, amount, sign);
+            const bucket = this.aging[agingBucket(this.agingDay - day)];
+            bucket.count += sign;
+            bucket.amount += sign * amount;
+        }
+
+        if (customer.count === 0) this.byCustomer.delete(customerId);
+    }
+
+    // Move the aging buckets to a new day from the per-day outstanding totals
+    private ageTo(day: number) {
+        if (day === this.agingDay) return;
+        this.agingDay = day;
+        this.aging = emptyAging();
+        for (const [issueDay, entry] of this.outstandingByDay) {
+            const bucket = this.aging[agingBucket(day - issueDay)];
+            bucket.count += entry.count;
+            bucket.amount += entry.amount;
+        }
+    }
+}
+
+const aggregates = new WeakMap<Collection, InvoiceAggregates>();
+
+// One aggregate set per invoices collection, built on first use and kept up to date by the store
+export function getInvoiceAggregates(collection: Collection): InvoiceAggregates {
+    let instance = aggregates.get(collection);
+    if (!instance) {
+        instance = new InvoiceAggregates(collection);
+        aggregates.set(collection, instance);
+    }
+    return instance;
+}
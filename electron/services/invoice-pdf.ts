@@ -0,0 +1,212 @@
+import fs from 'fs';
+import path from 'path';
+import type { Writable } from 'stream';
+import { aggregateInvoiceItems } from '../utils/invoice-utils';
+
+/**
+ * pdfmake rendering for invoices.
+ *
+ * One printer is created per process with the Roboto files read once into
+ * memory, and each document is piped straight into its destination stream
+ * instead of being collected into a buffer first.
+ */
+
+const FONT_FILES = {
+    normal: 'Roboto-Regular.ttf',
+    bold: 'Roboto-Medium.ttf',
+    italics: 'Roboto-Italic.ttf',
+    bolditalics: 'Roboto-MediumItalic.ttf'
+};
+
+let printer: any = null;
+
+function loadFonts() {
+    const fontDir = path.join(__dirname, '../../node_modules/pdfmake/fonts');
+    const roboto: Record<string, Buffer | string> = {};
+    for (const [style, file] of Object.entries(FONT_FILES)) {
+        const fontPath = path.join(fontDir, file);
+        // pdfmake takes font data or a path; a missing file keeps the path so the error names it
+        roboto[style] = fs.existsSync(fontPath) ? fs.readFileSync(fontPath) : fontPath;
+    }
+    return { Roboto: roboto };
+}
+
+export function getPdfPrinter() {
+    if (!printer) {
+        // Use require for CommonJS
+        const PdfPrinter = require('pdfmake');
+        printer = new PdfPrinter(loadFonts());
+    }
+    return printer;
+}
+
+export function buildInvoiceDocDefinition(invoice: any, banking: any) {
+    const safeItems = Array.isArray(invoice.items) ? invoice.items : [];
+    const aggregatedItems = aggregateInvoiceItems(safeItems);
+    const totalQty = aggregatedItems.reduce((acc: number, item: any) => acc + item.quantity, 0);
+    const itemRows = aggregatedItems.map((item: any) => {
+        const amount = typeof item.amount === 'number'
+            ? item.amount
+            : item.quantity * item.unitPrice;
+        return [
+            { text: item.description, style: 'tableCell' },
+            { text: item.quantity.toLocaleString(undefined, { maximumFractionDigits: 2 }), style: 'tableCell', alignment: 'right' },
+            { text: totalQty > 0 ? ((item.quantity / totalQty) * 100).toFixed(1) + '%' : '-', style: 'tableCell', alignment: 'right' },
+            { text: item.unitPrice.toFixed(2), style: 'tableCell', alignment: 'right' },
+            { text: amount.toLocaleString(undefined, { minimumFractionDigits: 2, maximumFractionDigits: 2 }), style: 'tableCell', alignment: 'right' }
+        ];
+    });
+
+    return {
+        content: [
+            // Header: Title + Invoice Info
+            {
+                columns: [
+                    {
+                        width: '*',
+                        stack: [
+                            { text: 'INVOICE', style: 'header' },
+                            { text: `Invoice #: ${invoice.number || invoice.invoiceNumber}`, style: 'label' },
+                            { text: `Date: ${new Date(invoice.createdAt).toLocaleDateString()}`, style: 'label' },
+                            invoice.dueDate ? { text: `Due Date: ${new Date(invoice.dueDate).toLocaleDateString()}`, style: 'label' } : '',
+                            { text: `Status: ${invoice.status.toUpperCase()}`, style: 'label', color: invoice.status === 'paid' ? 'green' : 'gray' }
+                        ]
+                    },
+                    {
+                        width: 'auto',
+                        stack: [
+                            { text: invoice.to.name, style: 'valueBold' },
+                            { text: invoice.to.address || '', style: 'small' },
+                            invoice.to.phone ? { text: invoice.to.phone, style: 'small' } : '',
+                            invoice.to.email ? { text: invoice.to.email, style: 'small' } : ''
+                        ],
+                        alignment: 'right'
+                    }
+                ]
+            },
+            { text: '\n' },
+
+            // Payment Terms & Banking Details (Top Section)
+            {
+                columns: [
+                    {
+                        width: '*',
+                        stack: [
+                            { text: 'PAYMENT TERMS', style: 'labelBold' },
+                            { text: invoice.paymentTerms || 'Net 30', style: 'value' }
+                        ]
+                    },
+                    banking ? {
+                        width: 'auto',
+                        stack: [
+                            { text: 'BENEFICIARY DETAILS', style: 'labelBold' },
+                            { text: banking.beneficiaryName, style: 'valueBold' },
+                            { text: banking.beneficiaryBank, style: 'small' },
+                            { text: `Branch: ${banking.branch}`, style: 'small' },
+                            { text: `IBAN: ${banking.ibanNo}`, style: 'smallMono' },
+                            { text: `SWIFT: ${banking.swiftCode}`, style: 'smallMono' }
+                        ],
+                        alignment: 'right'
+                    } : {}
+                ]
+            },
+            { text: '\n\n' },
+
+            // Reference Details Grid
+            {
+                table: {
+                    widths: ['*', '*', '*', '*'],
+                    body: [
+                        [
+                            { text: 'LPO NO', style: 'tableHeaderSmall' },
+                            { text: 'LPO DATE', style: 'tableHeaderSmall' },
+                            { text: 'OFFER REF', style: 'tableHeaderSmall' },
+                            { text: 'OFFER DATE', style: 'tableHeaderSmall' }
+                        ],
+                        [
+                            { text: invoice.lpoNo || '-', style: 'tableCell' },
+                            { text: invoice.lpoDate || '-', style: 'tableCell' },
+                            { text: invoice.commercialOfferRef || '-', style: 'tableCell' },
+                            { text: invoice.commercialOfferDate || '-', style: 'tableCell' }
+                        ]
+                    ]
+                },
+                layout: 'lightHorizontalLines'
+            },
+            { text: '\n' },
+
+            // Items Table
+            {
+                table: {
+                    headerRows: 1,
+                    widths: ['*', 'auto', 'auto', 'auto', 'auto'],
+                    body: [
+                        [
+                            { text: 'DESCRIPTION', style: 'tableHeader' },
+                            { text: 'QTY (TONS)', style: 'tableHeader', alignment: 'right' },
+                            { text: 'MIX %', style: 'tableHeader', alignment: 'right' },
+                            { text: 'RATE', style: 'tableHeader', alignment: 'right' },
+                            { text: 'AMOUNT', style: 'tableHeader', alignment: 'right' }
+                        ],
+                        ...itemRows
+                    ]
+                },
+            },
+
+            // Total Section (Outside Table)
+            { text: '\n' },
+            {
+                columns: [
+                    { width: '*', text: '' },
+                    {
+                        width: 'auto',
+                        table: {
+                            widths: ['auto', 'auto'],
+                            body: [
+                                [
+                                    { text: 'TOTAL DUE', style: 'totalLabel', alignment: 'right', margin: [0, 5] },
+                                    {
+                                        text: invoice.total.toLocaleString(undefined, { minimumFractionDigits: 2, maximumFractionDigits: 2 }) + ' ' + invoice.currency, style: 'totalValue', alignment: 'right', margin: [0, 5]
+                                    }
+                                ]
+                            ]
+                        },
+                        layout: 'noBorders'
+                    }
+                ]
+            }
+        ],
+        styles: {
+            header: { fontSize: 26, bold: true, margin: [0, 0, 0, 5] },
+            label: { fontSize: 11, color: '#666666', margin: [0, 2] },
+            labelBold: { fontSize: 10, bold: true, color: '#999999', margin: [0, 2] },
+            value: { fontSize: 12, color: '#333333', margin: [0, 2] },
+            valueBold: { fontSize: 12, bold: true, color: '#333333', margin: [0, 2] },
+            small: { fontSize: 10, color: '#666666', margin: [0, 1] },
+            smallMono: { fontSize: 10, font: 'Roboto', color: '#666666', margin: [0, 1] }, // using default font as mono proxy
+            tableHeader: { fontSize: 11, bold: true, color: '#333333', margin: [0, 5] },
+            tableHeaderSmall: { fontSize: 9, bold: true, color: '#999999' },
+            tableCell: { fontSize: 11, color: '#333333', margin: [0, 5] },
+            totalLabel: { fontSize: 13, bold: true, margin: [0, 10] },
+            totalValue: { fontSize: 16, bold: true, margin: [0, 10] }
+        },
+        defaultStyle: {
+            font: 'Roboto'
+        }
+    };
+}
+
+// Render the invoice into destination; resolves once the stream has flushed.
+// A destination factory is only called once the document is built, so a failed build opens nothing.
+export async function writeInvoicePdf(invoice: any, banking: any, destination: Writable | (() => Writable)): Promise<void> {
+    const pdfDoc = await getPdfPrinter().createPdfKitDocument(buildInvoiceDocDefinition(invoice, banking));
+    const output = typeof destination === 'function' ? destination() : destination;
+
+    await new Promise<void>((resolve, reject) => {
+        pdfDoc.on('error', reject);
+        output.on('error', reject);
+        output.on('finish', () => resolve());
+        pdfDoc.pipe(output);
+        pdfDoc.end();
+    });
+}
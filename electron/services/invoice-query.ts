@@ -0,0 +1,252 @@
+import type { Collection } from '../db/log-store';
+import { extractDateString } from '../utils/invoice-utils';
+
+/**
+ * Paged invoice queries for the list views.
+ *
+ * Sort orders are kept sorted as invoices are saved and deleted (binary
+ * search insert/remove), and status/customer filters come from the store's
+ * secondary indexes, so an unfiltered page is a slice of an existing order
+ * and a filtered one only touches the matching invoices.
+ */
+
+export type InvoiceSortField = 'createdAt' | 'date' | 'dueDate' | 'number' | 'total' | 'customer';
+
+export interface InvoiceQuery {
+    status?: string | string[];
+    customerId?: string;
+    dateRange?: { from?: string; to?: string }; // YYYY-MM-DD, inclusive, on the invoice date
+    search?: string; // Invoice number or client name
+    sort?: { field: InvoiceSortField; direction?: 'asc' | 'desc' };
+    offset?: number;
+    limit?: number;
+}
+
+export interface InvoicePage {
+    invoices: any[];
+    total: number;
+    offset: number;
+    limit: number;
+}
+
+export interface InvoiceOverview {
+    count: number;
+    totalAmount: number;
+    byStatus: Record<string, { count: number; amount: number }>;
+}
+
+export const DEFAULT_PAGE_SIZE = 50;
+
+type SortKey = number | string;
+
+const SORT_KEYS: Record<InvoiceSortField, (inv: any) => SortKey> = {
+    createdAt: inv => Date.parse(inv.createdAt) || 0,
+    date: inv => Date.parse(inv.date || inv.createdAt) || 0,
+    dueDate: inv => inv.dueDate ? extractDateString(String(inv.dueDate)) : '',
+    number: inv => {
+        const n = Number(inv.number);
+        return Number.isFinite(n) ? n : Number.MAX_SAFE_INTEGER; // DRAFT / INV-xxx after numbered invoices
+    },
+    total: inv => Number(inv.total) || 0,
+    customer: inv => String(inv.to?.name || '').toLowerCase()
+};
+
+// Ascending by key, then id, so every order is total and stable
+class SortedOrder {
+    ids: string[] = [];
+    private keys = new Map<string, SortKey>();
+    private keyOf: (inv: any) => SortKey;
+
+    constructor(keyOf: (inv: any) => SortKey) {
+        this.keyOf = keyOf;
+    }
+
+    compare(a: string, b: string): number {
+        const ka = this.keys.get(a)!;
+        const kb = this.keys.get(b)!;
+        if (ka < kb) return -1;
+        if (ka > kb) return 1;
+        return a < b ? -1 : a > b ? 1 : 0;
+    }
+
+    insert(inv: any) {
+        this.keys.set(inv.id, this.keyOf(inv));
+        this.ids.splice(this.position(inv.id), 0, inv.id);
+    }
+
+    remove(id: string) {
+        if (!this.keys.has(id)) return;
+        const pos = this.position(id);
+        if (this.ids[pos] === id) this.ids.splice(pos, 1);
+        this.keys.delete(id);
+    }
+
+    // Bulk load: one sort instead of n inserts
+    load(invoices: any[]) {
+        for (const inv of invoices) this.keys.set(inv.id, this.keyOf(inv));
+        this.ids = invoices.map(inv => inv.id).sort((a, b) => this.compare(a, b));
+    }
+
+    private position(id: string): number {
+        let lo = 0;
+        let hi = this.ids.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >>> 1;
+            if (this.compare(this.ids[mid], id) < 0) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    }
+}
+
+export class InvoiceQueryIndex {
+    private collection: Collection;
+    private orders = new Map<InvoiceSortField, SortedOrder>();
+    private dates = new Map<string, string>();
+    private searchText = new Map<string, string>();
+    private totals: InvoiceOverview = { count: 0, totalAmount: 0, byStatus: {} };
+
+    constructor(collection: Collection) {
+        this.collection = collection;
+        const invoices = collection.all();
+        for (const field of Object.keys(SORT_KEYS) as InvoiceSortField[]) {
+            const order = new SortedOrder(SORT_KEYS[field]);
+            order.load(invoices);
+            this.orders.set(field, order);
+        }
+        for (const inv of invoices) this.track(inv, 1);
+
+        collection.observe((previous, next) => {
+            if (previous) {
+                for (const order of this.orders.values()) order.remove(previous.id);
+                this.track(previous, -1);
+            }
+            if (next) {
+                for (const order of this.orders.values()) order.insert(next);
+                this.track(next, 1);
+            }
+        });
+    }
+
+    overview(): InvoiceOverview {
+        const byStatus: InvoiceOverview['byStatus'] = {};
+        for (const [status, entry] of Object.entries(this.totals.byStatus)) byStatus[status] = { ...entry };
+        return { count: this.totals.count, totalAmount: this.totals.totalAmount, byStatus };
+    }
+
+    query(params: InvoiceQuery = {}): InvoicePage {
+        const offset = Math.max(0, Math.floor(params.offset ?? 0) || 0);
+        const limit = Math.max(0, params.limit ?? DEFAULT_PAGE_SIZE);
+        const order = this.orders.get(params.sort?.field ?? 'createdAt') ?? this.orders.get('createdAt')!;
+        const descending = (params.sort?.direction ?? 'desc') === 'desc';
+
+        const candidates = this.candidates(params);
+        const predicate = this.predicate(params);
+
+        // Unfiltered: the page is a slice of the maintained order
+        if (!candidates && !predicate) {
+            const total = order.ids.length;
+            const from = descending ? Math.max(0, total - offset - limit) : offset;
+            const to = descending ? Math.max(0, total - offset) : Math.min(total, offset + limit);
+            const ids = order.ids.slice(from, to);
+            if (descending) ids.reverse();
+            return { invoices: ids.map(id => this.collection.get(id)), total, offset, limit };
+        }
+
+        if (candidates && candidates.size === 0) return { invoices: [], total: 0, offset, limit };
+
+        // A small candidate set is cheaper to sort on its own than to find in the full order
+        let ids: Iterable<string>;
+        if (candidates && candidates.size * 8 < order.ids.length) {
+            const sorted = Array.from(candidates).sort((a, b) => order.compare(a, b));
+            ids = descending ? sorted.reverse() : sorted;
+        } else {
+            ids = descending ? reverseIterate(order.ids) : order.ids;
+        }
+
+        const page: any[] = [];
+        let total = 0;
+        for (const id of ids) {
+            if (candidates && !candidates.has(id)) continue;
+            if (predicate && !predicate(id)) continue;
+            if (total >= offset && page.length < limit) page.push(this.collection.get(id));
+            total++;
+        }
+        return { invoices: page, total, offset, limit };
+    }
+
+    // Ids allowed by the indexed filters (status, customer), or null when there are none
+    private candidates(params: InvoiceQuery): Set<string> | null {
+        let result: Set<string> | null = null;
+
+        const statuses = params.status === undefined ? [] : Array.isArray(params.status) ? params.status : [params.status];
+        if (statuses.length > 0) {
+            result = new Set();
+            for (const status of statuses) {
+                for (const id of this.collection.ids('status', status) ?? []) result.add(id);
+            }
+        }
+
+        if (params.customerId) {
+            const customerIds = this.collection.ids('customer', params.customerId) ?? new Set<string>();
+            if (result) {
+                for (const id of result) if (!customerIds.has(id)) result.delete(id);
+            } else {
+                result = new Set(customerIds);
+            }
+        }
+
+        return result;
+    }
+
+    private predicate(params: InvoiceQuery): ((id: string) => boolean) | null {
+        const from = params.dateRange?.from || '';
+        const to = params.dateRange?.to || '';
+        const search = (params.search || '').trim().toLowerCase();
+        if (!from && !to && !search) return null;
+
+        return id => {
+            if (from || to) {
+                const date = this.dates.get(id) || '';
+                if (from && date < from) return false;
+                if (to && date > to) return false;
+            }
+            return !search || (this.searchText.get(id) || '').includes(search);
+        };
+    }
+
+    private track(inv: any, sign: 1 | -1) {
+        const amount = Number(inv.total) || 0;
+        const status = inv.status || 'draft';
+        const entry = this.totals.byStatus[status] ?? (this.totals.byStatus[status] = { count: 0, amount: 0 });
+        entry.count += sign;
+        entry.amount += sign * amount;
+        if (entry.count === 0) delete this.totals.byStatus[status];
+        this.totals.count += sign;
+        this.totals.totalAmount += sign * amount;
+
+        if (sign > 0) {
+            this.dates.set(inv.id, extractDateString(String(inv.date || inv.createdAt || '')));
+            this.searchText.set(inv.id, `${inv.number ?? ''}\u0000${inv.to?.name ?? ''}`.toLowerCase());
+        } else {
+            this.dates.delete(inv.id);
+            this.searchText.delete(inv.id);
+        }
+    }
+}
+
+function* reverseIterate(ids: string[]): Iterable<string> {
+    for (let i = ids.length - 1; i >= 0; i--) yield ids[i];
+}
+
+const indexes = new WeakMap<Collection, InvoiceQueryIndex>();
+
+// One query index per invoices collection, built on first use and kept up to date by the store
+export function getInvoiceQueryIndex(collection: Collection): InvoiceQueryIndex {
+    let index = indexes.get(collection);
+    if (!index) {
+        index = new InvoiceQueryIndex(collection);
+        indexes.set(collection, index);
+    }
+    return index;
+}
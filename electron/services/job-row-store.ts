@@ -0,0 +1,75 @@
+import crypto from 'crypto';
+import { findHeaderRow, findFooterStartRow } from '../utils/excel-utils';
+
+/**
+ * Output rows of recent processExcelJob runs kept in main-process memory, so
+ * the renderer can read the updated master in windows without re-reading the
+ * file that was just written.
+ *
+ * Only the last few jobs are kept; the renderer releases its store as soon as
+ * it has read the rows.
+ */
+
+export interface JobOutputModel {
+    storeId: string;
+    headers: Array<{ index: number; name: string }>;
+    headerRowIndex: number; // 1-indexed
+    footerStartRow: number; // 1-indexed
+    rowCount: number;
+    colCount: number;
+    matchedRowCount: number;
+}
+
+const MAX_STORES = 3;
+
+export class JobRowStore {
+    private stores = new Map<string, any[][]>();
+
+    put(rows: any[][]): string {
+        const storeId = crypto.randomUUID();
+        this.stores.set(storeId, rows);
+        while (this.stores.size > MAX_STORES) {
+            this.stores.delete(this.stores.keys().next().value as string);
+        }
+        return storeId;
+    }
+
+    getRows(storeId: string, start: number, count: number): { rows: any[][]; start: number; totalRows: number } | null {
+        const rows = this.stores.get(storeId);
+        if (!rows) return null;
+        const { from, to } = clampWindow(start, count, rows.length);
+        return { rows: rows.slice(from, to), start: from, totalRows: rows.length };
+    }
+
+    release(storeId: string): boolean {
+        return this.stores.delete(storeId);
+    }
+}
+
+function clampWindow(start: number, count: number, length: number): { from: number; to: number } {
+    const from = Math.min(Math.max(0, Math.floor(start) || 0), length);
+    const to = Math.min(length, from + Math.max(0, Math.floor(count) || 0));
+    return { from, to };
+}
+
+// Header/footer layout of the output rows, matching what analyzeExcelFile reports for the written file
+export function buildOutputModel(storeId: string, rows: any[][], matchedRowCount: number): JobOutputModel {
+    const headerRowIndex = findHeaderRow(rows);
+    const headers = rows[headerRowIndex] || [];
+    let colCount = 0;
+    for (const row of rows) {
+        if (Array.isArray(row) && row.length > colCount) colCount = row.length;
+    }
+
+    return {
+        storeId,
+        headers: headers.map((h: any, i: number) => ({ index: i, name: String(h || `Column ${i + 1}`) })),
+        headerRowIndex: headerRowIndex + 1,
+        footerStartRow: findFooterStartRow(rows) + 1,
+        rowCount: rows.length,
+        colCount,
+        matchedRowCount
+    };
+}
+
+export const jobRowStore = new JobRowStore();
@@ -0,0 +1,124 @@
+import crypto from 'crypto';
+import fs from 'fs';
+import type { IndexMasterResult } from './excel-tasks';
+import type { RowRange, TargetMatchResult } from './excel-matching';
+
+/**
+ * Match sessions reused across excel:process runs.
+ *
+ * A session remembers which master it indexed (by content hash and column
+ * config) and the match result of every target it has seen, keyed by the
+ * target's content hash and column config. Reprocessing after adding,
+ * removing or remapping one target then only reads and matches that target;
+ * the master index stays loaded in the excel workers under the session id.
+ *
+ * Sessions live for the app lifetime, at most MAX_SESSIONS of them; the least
+ * recently used one is evicted and its worker state released.
+ */
+
+const MAX_SESSIONS = 2;
+
+export interface MasterConfig {
+    masterPath: string;
+    masterSheetName?: string;
+    masterColIndices: number[];
+    masterRowRange?: RowRange;
+}
+
+export interface TargetConfig {
+    fileName: string; // Unmatched rows carry it, so it is part of the key
+    sheetName?: string;
+    colIndices: number[];
+    rowRange?: RowRange;
+    nearMatchDistance?: number;
+}
+
+export class MatchSession {
+    readonly id: string;
+    masterKey = '';
+    master: IndexMasterResult | null = null;
+    busy = false;
+    private targets = new Map<string, TargetMatchResult>();
+
+    constructor(id: string) {
+        this.id = id;
+    }
+
+    getTarget(key: string): TargetMatchResult | undefined {
+        return this.targets.get(key);
+    }
+
+    setTarget(key: string, result: TargetMatchResult) {
+        this.targets.set(key, result);
+    }
+
+    // Drop results of targets that are no longer part of the job
+    retainTargets(keys: Set<string>) {
+        for (const key of Array.from(this.targets.keys())) {
+            if (!keys.has(key)) this.targets.delete(key);
+        }
+    }
+
+    // Forget the master, and with it every target result matched against it
+    reset() {
+        this.masterKey = '';
+        this.master = null;
+        this.targets.clear();
+    }
+}
+
+const sessions = new Map<string, MatchSession>(); // Least recently used first
+
+// Get or create a session; also returns the sessions evicted to make room for it
+export function acquireMatchSession(id: string): { session: MatchSession; evicted: MatchSession[] } {
+    let session = sessions.get(id);
+    if (session) {
+        sessions.delete(id);
+    } else {
+        session = new MatchSession(id);
+    }
+    sessions.set(id, session);
+
+    const evicted: MatchSession[] = [];
+    for (const [key, candidate] of sessions) {
+        if (sessions.size <= MAX_SESSIONS) break;
+        if (candidate.busy || candidate === session) continue;
+        sessions.delete(key);
+        evicted.push(candidate);
+    }
+    return { session, evicted };
+}
+
+export function releaseMatchSession(id: string): MatchSession | undefined {
+    const session = sessions.get(id);
+    sessions.delete(id);
+    return session;
+}
+
+const hashes = new Map<string, { fingerprint: string; hash: string }>();
+
+// SHA-1 of a file's content, recomputed only when its size or mtime changes
+export async function hashFile(filePath: string): Promise<string> {
+    const stat = await fs.promises.stat(filePath);
+    const fingerprint = `${stat.size}:${stat.mtimeMs}`;
+    const cached = hashes.get(filePath);
+    if (cached && cached.fingerprint === fingerprint) return cached.hash;
+
+    const hash = await new Promise<string>((resolve, reject) => {
+        const digest = crypto.createHash('sha1');
+        fs.createReadStream(filePath)
+            .on('data', chunk => digest.update(chunk))
+            .on('end', () => resolve(digest.digest('hex')))
+            .on('error', reject);
+    });
+    hashes.set(filePath, { fingerprint, hash });
+    return hash;
+}
+
+export function masterKeyFor(contentHash: string, config: MasterConfig): string {
+    return JSON.stringify([contentHash, config.masterPath, config.masterSheetName ?? null, config.masterColIndices, config.masterRowRange ?? null]);
+}
+
+export function targetKeyFor(contentHash: string, config: TargetConfig): string {
+    return JSON.stringify([contentHash, config.fileName, config.sheetName ?? null, config.colIndices, config.rowRange ?? null, config.nearMatchDistance ?? 0]);
+}
@@ -0,0 +1,165 @@
+/**
+ * Near-match lookup for keys that failed the exact master lookup.
+ *
+ * A symmetric deletion-neighbourhood index: every master key is stored under
+ * itself and each string obtained by deleting up to maxDistance characters.
+ * A query probes its own deletion neighbourhood, and only the keys that
+ * share a variant are compared with a real edit distance (optimal string
+ * alignment, so a transposed pair of digits costs 1). A 10-digit ticket
+ * index with maxDistance 1 takes 11 probes per query, whatever the master size.
+ *
+ * Variants are kept as 32-bit hashes packed with the key number into one
+ * sorted Float64Array, which keeps a 200k-key index at a few tens of MB.
+ * Hash collisions only add candidates; the distance check filters them.
+ * maxDistance 2 is supported but costs much more: 56 variants per ticket,
+ * and dense ticket ranges give each query many candidates to verify.
+ */
+
+export interface NearMatchOptions {
+    maxDistance?: number; // Edit distance still reported as a near match, 1 or 2 (default 1)
+    label?: string; // Result label prefix for near-matched master rows
+}
+
+export interface NearMatch {
+    key: string; // Master key
+    distance: number;
+}
+
+export const DEFAULT_NEAR_MATCH_LABEL = 'Near match';
+
+// Larger distances grow the index quadratically with the key length
+export function clampNearMatchDistance(maxDistance: number | undefined): number {
+    return Math.max(1, Math.min(2, Math.floor(maxDistance ?? 1)));
+}
+
+// Key numbers take the low 21 bits of each entry, the variant hash the 32 bits above
+const KEY_SLOTS = 2 ** 21;
+export const MAX_NEAR_MATCH_KEYS = KEY_SLOTS;
+
+function hashString(value: string): number {
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < value.length; i++) {
+        hash ^= value.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+    }
+    return hash >>> 0;
+}
+
+// The string itself and everything reachable by deleting up to `depth` characters
+function deletionVariants(value: string, depth: number): Set<string> {
+    const variants = new Set<string>([value]);
+    let frontier = [value];
+    for (let d = 0; d < depth; d++) {
+        const next: string[] = [];
+        for (const current of frontier) {
+            for (let i = 0; i < current.length; i++) {
+                const variant = current.slice(0, i) + current.slice(i + 1);
+                if (!variants.has(variant)) {
+                    variants.add(variant);
+                    next.push(variant);
+                }
+            }
+        }
+        frontier = next;
+    }
+    return variants;
+}
+
+// Optimal string alignment distance, or limit + 1 once it is known to exceed limit
+export function editDistance(a: string, b: string, limit: number = Infinity): number {
+    if (Math.abs(a.length - b.length) > limit) return limit + 1;
+    const cols = b.length + 1;
+    let before = new Array<number>(cols).fill(0);
+    let previous = Array.from({ length: cols }, (_, j) => j);
+    let current = new Array<number>(cols).fill(0);
+
+    for (let i = 1; i <= a.length; i++) {
+        current[0] = i;
+        let rowMin = i;
+        for (let j = 1; j <= b.length; j++) {
+            const cost = a[i - 1] === b[j - 1] ? 0 : 1;
+            let value = Math.min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost);
+            if (i > 1 && j > 1 && a[i - 1] === b[j - 2] && a[i - 2] === b[j - 1]) {
+                value = Math.min(value, before[j - 2] + 1);
+            }
+            current[j] = value;
+            if (value < rowMin) rowMin = value;
+        }
+        if (rowMin > limit) return limit + 1;
+        [before, previous, current] = [previous, current, before];
+    }
+    return Math.min(previous[b.length], limit + 1);
+}
+
+export class NearMatchIndex {
+    readonly maxDistance: number;
+    private keys: string[];
+    private entries: Float64Array;
+
+    constructor(keys: Iterable<string>, maxDistance: number = 1) {
+        this.maxDistance = clampNearMatchDistance(maxDistance);
+        this.keys = Array.from(keys);
+        if (this.keys.length > MAX_NEAR_MATCH_KEYS) {
+            throw new Error(`Near matching supports up to ${MAX_NEAR_MATCH_KEYS} master keys`);
+        }
+
+        let capacity = 0;
+        for (const key of this.keys) {
+            const n = key.length;
+            capacity += this.maxDistance === 1 ? n + 1 : 1 + n + (n * (n - 1)) / 2;
+        }
+        const entries = new Float64Array(capacity);
+        let size = 0;
+        this.keys.forEach((key, keyIndex) => {
+            for (const variant of deletionVariants(key, this.maxDistance)) {
+                entries[size++] = hashString(variant) * KEY_SLOTS + keyIndex;
+            }
+        });
+        this.entries = entries.subarray(0, size).sort();
+    }
+
+    get size(): number {
+        return this.keys.length;
+    }
+
+    /**
+     * Closest master key within maxDistance. Null when there is none, or when
+     * several keys are equally close: an ambiguous near match is not reported.
+     */
+    find(query: string): NearMatch | null {
+        const candidates = new Set<number>();
+        for (const variant of deletionVariants(query, this.maxDistance)) {
+            this.collect(hashString(variant), candidates);
+        }
+
+        let best: NearMatch | null = null;
+        let ties = 0;
+        for (const keyIndex of candidates) {
+            const key = this.keys[keyIndex];
+            const distance = editDistance(query, key, this.maxDistance);
+            if (distance === 0 || distance > this.maxDistance) continue;
+            if (!best || distance < best.distance) {
+                best = { key, distance };
+                ties = 0;
+            } else if (distance === best.distance) {
+                ties++;
+            }
+        }
+        return ties === 0 ? best : null;
+    }
+
+    private collect(hash: number, into: Set<number>) {
+        const entries = this.entries;
+        const lowest = hash * KEY_SLOTS;
+        let lo = 0;
+        let hi = entries.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >>> 1;
+            if (entries[mid] < lowest) lo = mid + 1;
+            else hi = mid;
+        }
+        for (let i = lo; i < entries.length && entries[i] < lowest + KEY_SLOTS; i++) {
+            into.add(entries[i] - lowest);
+        }
+    }
+}
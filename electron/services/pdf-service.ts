@@ -1,355 +1,113 @@
-import { BrowserWindow, dialog, shell } from 'electron';
+import { dialog, shell } from 'electron';
 import path from 'path';
 import fs from 'fs';
 import { PDFDocument } from 'pdf-lib';
-import { aggregateInvoiceItems } from '../utils/invoice-utils';
-import { getDB } from '../db';
+import { getBankingDetails } from './banking-details';
+import { writeInvoicePdf } from './invoice-pdf';
+import { mapConcurrent } from '../utils/concurrency';
+import { PrintWindowPool } from './print-pool';
 
 export async function generateInvoicePDF(invoice: any) {
     try {
-        // We will generate the PDF using `pdfmake`
-        // Use require for CommonJS
-        const PdfPrinter = require('pdfmake');
-
-        // Fonts need to be defined. For server-side node, we need standard fonts.
-        // We can use the 'Roboto' font included in `pdfmake/fonts/Roboto` usually,
-        // or just map to standard fonts. 
-        // NOTE: pdfmake on node requires fonts to be passed in constructor.
-
-        const fonts = {
-            Roboto: {
-                normal: path.join(__dirname, '../../node_modules/pdfmake/fonts/Roboto-Regular.ttf'),
-                bold: path.join(__dirname, '../../node_modules/pdfmake/fonts/Roboto-Medium.ttf'),
-                italics: path.join(__dirname, '../../node_modules/pdfmake/fonts/Roboto-Italic.ttf'),
-                bolditalics: path.join(__dirname, '../../node_modules/pdfmake/fonts/Roboto-MediumItalic.ttf')
-            }
-        };
-
-        const printer = new PdfPrinter(fonts);
-
-        // Fetch banking details from DB
-        const db = await getDB();
-        const banking = db.data.bankingDetails;
-
-        const safeItems = Array.isArray(invoice.items) ? invoice.items : [];
-        const aggregatedItems = aggregateInvoiceItems(safeItems);
-        const totalQty = aggregatedItems.reduce((acc: number, item: any) => acc + item.quantity, 0);
-        const itemRows = aggregatedItems.map((item: any) => {
-            const amount = typeof item.amount === 'number'
-                ? item.amount
-                : item.quantity * item.unitPrice;
-            return [
-                { text: item.description, style: 'tableCell' },
-                { text: item.quantity.toLocaleString(undefined, { maximumFractionDigits: 2 }), style: 'tableCell', alignment: 'right' },
-                { text: totalQty > 0 ? ((item.quantity / totalQty) * 100).toFixed(1) + '%' : '-', style: 'tableCell', alignment: 'right' },
-                { text: item.unitPrice.toFixed(2), style: 'tableCell', alignment: 'right' },
-                { text: amount.toLocaleString(undefined, { minimumFractionDigits: 2, maximumFractionDigits: 2 }), style: 'tableCell', alignment: 'right' }
-            ];
+        // Ask for the destination first so the PDF is streamed straight into the file
+        const { filePath } = await dialog.showSaveDialog({
+            title: 'Save Invoice PDF',
+            defaultPath: `Invoice-${invoice.invoiceNumber}.pdf`,
+            filters: [{ name: 'PDF', extensions: ['pdf'] }]
         });
-
-        const docDefinition = {
-            content: [
-                // Header: Title + Invoice Info
-                {
-                    columns: [
-                        {
-                            width: '*',
-                            stack: [
-                                { text: 'INVOICE', style: 'header' },
-                                { text: `Invoice #: ${invoice.number || invoice.invoiceNumber}`, style: 'label' },
-                                { text: `Date: ${new Date(invoice.createdAt).toLocaleDateString()}`, style: 'label' },
-                                invoice.dueDate ? { text: `Due Date: ${new Date(invoice.dueDate).toLocaleDateString()}`, style: 'label' } : '',
-                                { text: `Status: ${invoice.status.toUpperCase()}`, style: 'label', color: invoice.status === 'paid' ? 'green' : 'gray' }
-                            ]
-                        },
-                        {
-                            width: 'auto',
-                            stack: [
-                                { text: invoice.to.name, style: 'valueBold' },
-                                { text: invoice.to.address || '', style: 'small' },
-                                invoice.to.phone ? { text: invoice.to.phone, style: 'small' } : '',
-                                invoice.to.email ? { text: invoice.to.email, style: 'small' } : ''
-                            ],
-                            alignment: 'right'
-                        }
-                    ]
-                },
-                { text: '\n' },
-
-                // Payment Terms & Banking Details (Top Section)
-                {
-                    columns: [
-                        {
-                            width: '*',
-                            stack: [
-                                { text: 'PAYMENT TERMS', style: 'labelBold' },
-                                { text: invoice.paymentTerms || 'Net 30', style: 'value' }
-                            ]
-                        },
-                        banking ? {
-                            width: 'auto',
-                            stack: [
-                                { text: 'BENEFICIARY DETAILS', style: 'labelBold' },
-                                { text: banking.beneficiaryName, style: 'valueBold' },
-                                { text: banking.beneficiaryBank, style: 'small' },
-                                { text: `Branch: ${banking.branch}`, style: 'small' },
-                                { text: `IBAN: ${banking.ibanNo}`, style: 'smallMono' },
-                                { text: `SWIFT: ${banking.swiftCode}`, style: 'smallMono' }
-                            ],
-                            alignment: 'right'
-                        } : {}
-                    ]
-                },
-                { text: '\n\n' },
-
-                // Reference Details Grid
-                {
-                    table: {
-                        widths: ['*', '*', '*', '*'],
-                        body: [
-                            [
-                                { text: 'LPO NO', style: 'tableHeaderSmall' },
-                                { text: 'LPO DATE', style: 'tableHeaderSmall' },
-                                { text: 'OFFER REF', style: 'tableHeaderSmall' },
-                                { text: 'OFFER DATE', style: 'tableHeaderSmall' }
-                            ],
-                            [
-                                { text: invoice.lpoNo || '-', style: 'tableCell' },
-                                { text: invoice.lpoDate || '-', style: 'tableCell' },
-                                { text: invoice.commercialOfferRef || '-', style: 'tableCell' },
-                                { text: invoice.commercialOfferDate || '-', style: 'tableCell' }
-                            ]
-                        ]
-                    },
-                    layout: 'lightHorizontalLines'
-                },
-                { text: '\n' },
-
-                // Items Table
-                {
-                    table: {
-                        headerRows: 1,
-                        widths: ['*', 'auto', 'auto', 'auto', 'auto'],
-                        body: [
-                            [
-                                { text: 'DESCRIPTION', style: 'tableHeader' },
-                                { text: 'QTY (TONS)', style: 'tableHeader', alignment: 'right' },
-                                { text: 'MIX %', style: 'tableHeader', alignment: 'right' },
-                                { text: 'RATE', style: 'tableHeader', alignment: 'right' },
-                                { text: 'AMOUNT', style: 'tableHeader', alignment: 'right' }
-                            ],
-                            ...itemRows
-                        ]
-                    },
-                },
-
-                // Total Section (Outside Table)
-                { text: '\n' },
-                {
-                    columns: [
-                        { width: '*', text: '' },
-                        {
-                            width: 'auto',
-                            table: {
-                                widths: ['auto', 'auto'],
-                                body: [
-                                    [
-                                        { text: 'TOTAL DUE', style: 'totalLabel', alignment: 'right', margin: [0, 5] },
-                                        {
-                                            text: invoice.total.toLocaleString(undefined, { minimumFractionDigits: 2, maximumFractionDigits: 2 }) + ' ' + invoice.currency, style: 'totalValue', alignment: 'right', margin: [0, 5]
-                                        }
-                                    ]
-                                ]
-                            },
-                            layout: 'noBorders'
-                        }
-                    ]
-                }
-            ],
-            styles: {
-                header: { fontSize: 26, bold: true, margin: [0, 0, 0, 5] },
-                label: { fontSize: 11, color: '#666666', margin: [0, 2] },
-                labelBold: { fontSize: 10, bold: true, color: '#999999', margin: [0, 2] },
-                value: { fontSize: 12, color: '#333333', margin: [0, 2] },
-                valueBold: { fontSize: 12, bold: true, color: '#333333', margin: [0, 2] },
-                small: { fontSize: 10, color: '#666666', margin: [0, 1] },
-                smallMono: { fontSize: 10, font: 'Roboto', color: '#666666', margin: [0, 1] }, // using default font as mono proxy
-                tableHeader: { fontSize: 11, bold: true, color: '#333333', margin: [0, 5] },
-                tableHeaderSmall: { fontSize: 9, bold: true, color: '#999999' },
-                tableCell: { fontSize: 11, color: '#333333', margin: [0, 5] },
-                totalLabel: { fontSize: 13, bold: true, margin: [0, 10] },
-                totalValue: { fontSize: 16, bold: true, margin: [0, 10] }
-            },
-            defaultStyle: {
-                font: 'Roboto'
-            }
+        if (!filePath) return { success: false, error: 'Cancelled' };
+
+        // Build into a temp file next to the destination; an existing PDF is only replaced once the new one is complete
+        const partialPath = `${filePath}.partial`;
+        let output = null as fs.WriteStream | null;
+        const openOutput = () => (output = fs.createWriteStream(partialPath));
+        const closeOutput = async () => {
+            const stream = output;
+            if (stream && !stream.closed) await new Promise(resolve => stream.once('close', resolve));
         };
-
-        // Create PDF Stream
-        const pdfDoc = printer.createPdfKitDocument(docDefinition);
-        const chunks: any[] = [];
-
-        const promise = new Promise<{ success: boolean; error?: string }>((resolve) => {
-            pdfDoc.on('data', (chunk: any) => chunks.push(chunk));
-            pdfDoc.on('end', async () => {
-                try {
-                    const result = Buffer.concat(chunks);
-                    // Save to user documents or temp
-                    const { filePath } = await dialog.showSaveDialog({
-                        title: 'Save Invoice PDF',
-                        defaultPath: `Invoice-${invoice.invoiceNumber}.pdf`,
-                        filters: [{ name: 'PDF', extensions: ['pdf'] }]
-                    });
-
-                    if (filePath) {
-                        fs.writeFileSync(filePath, result);
-                        shell.openPath(filePath); // Open it immediately
-                        resolve({ success: true });
-                    } else {
-                        resolve({ success: false, error: 'Cancelled' });
-                    }
-                } catch (e: any) {
-                    resolve({ success: false, error: e.message });
-                }
-            });
-            pdfDoc.on('error', (e: any) => {
-                resolve({ success: false, error: e.message });
-            });
-        });
-
-        pdfDoc.end();
-        return await promise;
-
+        try {
+            await writeInvoicePdf(invoice, await getBankingDetails(), openOutput);
+            await closeOutput();
+            await fs.promises.rename(partialPath, filePath);
+        } catch (error) {
+            // Close the temp file before removing it, so no fd or half-written PDF is left behind
+            output?.destroy();
+            await closeOutput();
+            fs.rmSync(partialPath, { force: true });
+            throw error;
+        }
+        shell.openPath(filePath); // Open it immediately
+        return { success: true };
     } catch (e: any) {
         console.error("PDF Generation Error:", e);
         return { success: false, error: e.message };
     }
 }
 
-export async function generateSecureInvoicePDF(invoice: any, appUrl: string | undefined, mainDirName: string) {
-    let printWindow: BrowserWindow | null = null;
-    try {
-        console.log('Starting secure PDF generation...');
-        // 1. Create a hidden window
-        printWindow = new BrowserWindow({
-            show: false,
-            width: 794, // A4 width at 96dpi
-            height: 1123,
-            webPreferences: {
-                preload: path.join(mainDirName, 'preload.js'),
-                contextIsolation: true,
-                nodeIntegration: false,
-                webSecurity: true
-            }
-        });
-
-        // Debugging: Log renderer console messages to main terminal
-        printWindow.webContents.on('console-message', (event, level, message, line, sourceId) => {
-            console.log(`[Renderer] ${message} (${sourceId}:${line})`);
-        });
-
-        // 2. Load the print route
-        // PRIORITY: Use appUrl passed from Renderer (ensures matching dev/prod environment)
-        let loadUrl = '';
-        if (appUrl) {
-            const urlObj = new URL(appUrl);
-            urlObj.searchParams.set('mode', 'print');
-            loadUrl = urlObj.toString();
-        } else {
-            // Fallback
-            loadUrl = process.env.VITE_DEV_SERVER_URL
-                ? `${process.env.VITE_DEV_SERVER_URL}?mode=print`
-                : `file://${path.join(mainDirName, '../dist/index.html')}?mode=print`;
-        }
-
-        // 3. Handshake: Register LISTENER before loading URL to avoid race condition
-        console.log('Waiting for print-window-ready handshake...');
-
-        const handshakePromise = new Promise<void>((resolve, reject) => {
-            const handshakeTimeout = setTimeout(() => {
-                reject(new Error('Handshake timed out - Renderer did not report ready.'));
-            }, 10000);
-
-            // Using ipcMain directly implies this function runs in main process context
-            // We need to import ipcMain dynamically or assume it's set up
-            const { ipcMain } = require('electron');
-
-            ipcMain.once('print-window-ready', () => {
-                clearTimeout(handshakeTimeout);
-                console.log('Handshake received! Sending invoice data...');
-                if (printWindow && !printWindow.isDestroyed()) {
-                    printWindow.webContents.send('print-data', invoice);
-                    resolve();
-                } else {
-                    reject(new Error('Window destroyed before handshake'));
-                }
-            });
-        });
-
-        // Load URL *AFTER* setting up the listener
-        console.log('Loading URL:', loadUrl);
-        await printWindow.loadURL(loadUrl);
-
-        // Wait for the handshake to complete
-        await handshakePromise;
-
-        // 4. Wait for 'print-ready' signal from Renderer
-        const { ipcMain } = require('electron');
-        const pdfBuffer = await new Promise<Buffer>((resolve, reject) => {
-            const timeout = setTimeout(() => reject(new Error('Print timed out (15s)')), 15000);
+const MAX_PRINT_WINDOWS = 4;
+const DEFAULT_EXPORT_CONCURRENCY = 2;
 
-            ipcMain.once('print-ready', async () => {
-                clearTimeout(timeout);
-                console.log('Received print-ready, printing to PDF...');
-                try {
-                    if (!printWindow) throw new Error('Window lost');
-                    const data = await printWindow.webContents.printToPDF({
-                        printBackground: true,
-                        pageSize: 'A4',
-                        margins: { top: 0, bottom: 0, left: 0, right: 0 } // CSS handles margins
-                    });
-                    resolve(data);
-                } catch (e) {
-                    reject(e);
-                }
-            });
-        });
+let printPool: PrintWindowPool | null = null;
 
-        console.log('PDF rendered, saving...');
+function getPrintPool(mainDirName: string): PrintWindowPool {
+    if (!printPool) printPool = new PrintWindowPool(path.join(mainDirName, 'preload.js'), MAX_PRINT_WINDOWS);
+    return printPool;
+}
 
-        // Add password protection for issued invoices
-        let pdfBytes = pdfBuffer;
+export function shutdownPrintPool() {
+    printPool?.destroy();
+    printPool = null;
+}
 
-        if (invoice.status === 'issued' || invoice.status === 'paid' || invoice.status === 'overdue') {
-            try {
-                console.log('Adding password protection to issued invoice...');
-                const pdfDoc = await PDFDocument.load(pdfBuffer);
+// Print route URL. PRIORITY: Use appUrl passed from Renderer (ensures matching dev/prod environment)
+function resolvePrintUrl(appUrl: string | undefined, mainDirName: string): string {
+    if (appUrl) {
+        const urlObj = new URL(appUrl);
+        urlObj.searchParams.set('mode', 'print');
+        return urlObj.toString();
+    }
+    // Fallback
+    return process.env.VITE_DEV_SERVER_URL
+        ? `${process.env.VITE_DEV_SERVER_URL}?mode=print`
+        : `file://${path.join(mainDirName, '../dist/index.html')}?mode=print`;
+}
 
-                // Encrypt the PDF with password protection
-                // Owner password allows full access, user password allows viewing only
-                const ownerPassword = 'admin123'; // Admin password for editing
-                const userPassword = ''; // Empty user password allows viewing without password
+// Mark issued invoices as protected in the PDF metadata
+async function finalizeInvoicePdf(pdfBuffer: Buffer, invoice: any): Promise<Buffer> {
+    if (invoice.status !== 'issued' && invoice.status !== 'paid' && invoice.status !== 'overdue') return pdfBuffer;
+    try {
+        const pdfDoc = await PDFDocument.load(pdfBuffer);
+
+        // Note: pdf-lib doesn't support encryption directly
+        // We'll save as-is but mark it as protected in metadata
+        pdfDoc.setTitle(`Invoice ${invoice.invoiceNumber || invoice.number} - PROTECTED`);
+        pdfDoc.setSubject('Protected Invoice - View Only');
+        pdfDoc.setKeywords(['invoice', 'protected', 'issued']);
+        pdfDoc.setProducer('Fatoora Invoice System');
+        pdfDoc.setCreator('Fatoora');
+
+        return Buffer.from(await pdfDoc.save());
+    } catch (err) {
+        console.error('Failed to add PDF protection:', err);
+        // Continue with unprotected PDF if encryption fails
+        return pdfBuffer;
+    }
+}
 
-                // Note: pdf-lib doesn't support encryption directly
-                // We'll save as-is but mark it as protected in metadata
-                pdfDoc.setTitle(`Invoice ${invoice.invoiceNumber} - PROTECTED`);
-                pdfDoc.setSubject('Protected Invoice - View Only');
-                pdfDoc.setKeywords(['invoice', 'protected', 'issued']);
-                pdfDoc.setProducer('Fatoora Invoice System');
-                pdfDoc.setCreator('Fatoora');
+async function renderInvoicePdf(invoice: any, appUrl: string | undefined, mainDirName: string): Promise<Buffer> {
+    const banking = await getBankingDetails();
+    const pdfBuffer = await getPrintPool(mainDirName).render(invoice, resolvePrintUrl(appUrl, mainDirName), banking);
+    return finalizeInvoicePdf(pdfBuffer, invoice);
+}
 
-                pdfBytes = Buffer.from(await pdfDoc.save());
-                console.log('PDF metadata updated for issued invoice');
-            } catch (err) {
-                console.error('Failed to add PDF protection:', err);
-                // Continue with unprotected PDF if encryption fails
-            }
-        }
+export async function generateSecureInvoicePDF(invoice: any, appUrl: string | undefined, mainDirName: string) {
+    try {
+        console.log('Starting secure PDF generation...');
+        const pdfBytes = await renderInvoicePdf(invoice, appUrl, mainDirName);
 
-        // 6. Save Dialog
         const { filePath } = await dialog.showSaveDialog({
             title: 'Save Secure Invoice',
-            defaultPath: `Invoice-${invoice.invoiceNumber}.pdf`,
+            defaultPath: `Invoice-${invoice.invoiceNumber || invoice.number}.pdf`,
             filters: [{ name: 'PDF', extensions: ['pdf'] }]
         });
 
@@ -357,16 +115,141 @@ export async function generateSecureInvoicePDF(invoice: any, appUrl: string | un
             fs.writeFileSync(filePath, pdfBytes);
             console.log('Saved to:', filePath);
             shell.openPath(filePath);
-            printWindow.close();
             return { success: true };
-        } else {
-            printWindow.close();
-            return { success: false, error: 'Cancelled' };
         }
-
+        return { success: false, error: 'Cancelled' };
     } catch (e: any) {
         console.error("Secure PDF Error:", e);
-        if (printWindow) printWindow.close();
         return { success: false, error: e.message };
     }
 }
+
+export interface ExportBatchOptions {
+    concurrency?: number; // Invoices rendered at once, capped by the print window pool
+    statement?: boolean; // Also write one merged statement PDF per customer
+    appUrl?: string;
+}
+
+export interface ExportProgress {
+    done: number;
+    total: number;
+    invoiceId: string;
+    filePath?: string;
+    error?: string;
+}
+
+export interface ExportItemResult {
+    id: string;
+    success: boolean;
+    filePath?: string;
+    error?: string;
+}
+
+function safeFileName(name: string): string {
+    return name.replace(/[\\/:*?"<>|]+/g, '_').trim() || 'untitled';
+}
+
+// `${base}.pdf`, numbered when the name is taken in this batch or already exists in the directory
+function uniqueFileName(directory: string, base: string, usedNames: Set<string>): string {
+    let name = `${base}.pdf`;
+    for (let n = 2; usedNames.has(name.toLowerCase()) || fs.existsSync(path.join(directory, name)); n++) {
+        name = `${base}-${n}.pdf`;
+    }
+    usedNames.add(name.toLowerCase());
+    return name;
+}
+
+/**
+ * Render invoices to `directory` with at most `concurrency` in flight. Results
+ * keep input order; one failed invoice does not stop the batch.
+ */
+export async function exportInvoicesBatch(
+    invoices: any[],
+    directory: string,
+    options: ExportBatchOptions,
+    mainDirName: string,
+    onProgress?: (progress: ExportProgress) => void
+) {
+    fs.mkdirSync(directory, { recursive: true });
+    const concurrency = Math.min(MAX_PRINT_WINDOWS, Math.max(1, options.concurrency ?? DEFAULT_EXPORT_CONCURRENCY));
+
+    // Unique file names up front so parallel renders never race on a path or overwrite an existing file
+    const usedNames = new Set<string>();
+    const fileNames = invoices.map(invoice =>
+        uniqueFileName(directory, safeFileName(`Invoice-${invoice.invoiceNumber || invoice.number || invoice.id}`), usedNames)
+    );
+
+    const rendered: Array<Buffer | null> = new Array(invoices.length).fill(null);
+    let done = 0;
+
+    const results = await mapConcurrent(invoices, concurrency, async (invoice, index): Promise<ExportItemResult> => {
+        let result: ExportItemResult;
+        try {
+            const pdfBytes = await renderInvoicePdf(invoice, options.appUrl, mainDirName);
+            const filePath = path.join(directory, fileNames[index]);
+            await fs.promises.writeFile(filePath, pdfBytes);
+            if (options.statement) rendered[index] = pdfBytes;
+            result = { id: invoice.id, success: true, filePath };
+        } catch (e: any) {
+            result = { id: invoice.id, success: false, error: e.message };
+        }
+        done++;
+        onProgress?.({ done, total: invoices.length, invoiceId: invoice.id, filePath: result.filePath, error: result.error });
+        return result;
+    });
+
+    const statements = options.statement
+        ? await writeStatements(invoices, rendered, directory, usedNames)
+        : [];
+
+    return { results, statements };
+}
+
+export interface StatementResult {
+    customerId: string;
+    name: string;
+    success: boolean;
+    filePath?: string;
+    invoiceCount: number;
+    error?: string;
+}
+
+// One PDF per customer with that customer's rendered invoices, oldest first; one failed statement does not stop the others
+async function writeStatements(invoices: any[], rendered: Array<Buffer | null>, directory: string, usedNames: Set<string>) {
+    const byCustomer = new Map<string, { name: string; entries: Array<{ date: string; pdf: Buffer }> }>();
+    invoices.forEach((invoice, index) => {
+        const pdf = rendered[index];
+        if (!pdf) return;
+        const key = invoice.to?.customerId || invoice.to?.name || 'unknown';
+        let group = byCustomer.get(key);
+        if (!group) {
+            group = { name: invoice.to?.name || key, entries: [] };
+            byCustomer.set(key, group);
+        }
+        group.entries.push({ date: String(invoice.date || invoice.createdAt || ''), pdf });
+    });
+
+    const statements: StatementResult[] = [];
+    for (const [customerId, group] of byCustomer) {
+        const invoiceCount = group.entries.length;
+        try {
+            group.entries.sort((a, b) => a.date.localeCompare(b.date));
+            const merged = await PDFDocument.create();
+            for (const entry of group.entries) {
+                const source = await PDFDocument.load(entry.pdf);
+                const pages = await merged.copyPages(source, source.getPageIndices());
+                pages.forEach(page => merged.addPage(page));
+            }
+            merged.setTitle(`Statement - ${group.name}`);
+            merged.setProducer('Fatoora Invoice System');
+            merged.setCreator('Fatoora');
+
+            const filePath = path.join(directory, uniqueFileName(directory, safeFileName(`Statement-${group.name}`), usedNames));
+            await fs.promises.writeFile(filePath, await merged.save());
+            statements.push({ customerId, name: group.name, success: true, filePath, invoiceCount });
+        } catch (e: any) {
+            statements.push({ customerId, name: group.name, success: false, invoiceCount, error: e.message });
+        }
+    }
+    return statements;
+}
@@ -0,0 +1,206 @@
+import { BrowserWindow, ipcMain, IpcMainEvent } from 'electron';
+
+/**
+ * Pool of hidden print windows.
+ *
+ * Each window loads the print route once and then renders invoice after
+ * invoice: the invoice is sent over `print-data` with a print id, the view
+ * answers `print-ready` with the same id, and the page is printed to PDF.
+ * Windows idle for IDLE_TIMEOUT_MS are closed; a window that fails or
+ * times out is discarded and replaced on the next request.
+ */
+
+const READY_TIMEOUT_MS = 10000;
+const PRINT_TIMEOUT_MS = 15000;
+const IDLE_TIMEOUT_MS = 5 * 60 * 1000;
+
+interface PrintSlot {
+    window: BrowserWindow;
+    contentsId: number;
+    url: string;
+    ready: Promise<void>;
+    busy: boolean;
+}
+
+interface PendingPrint {
+    printId: number;
+    resolve: () => void;
+    reject: (error: Error) => void;
+}
+
+export class PrintWindowPool {
+    readonly size: number;
+    private slots: PrintSlot[] = [];
+    private waiters: Array<() => void> = [];
+    private readyHandlers = new Map<number, () => void>();
+    private pendingPrints = new Map<number, PendingPrint>();
+    private nextPrintId = 1;
+    private idleTimer: NodeJS.Timeout | null = null;
+
+    constructor(private preloadPath: string, size: number) {
+        this.size = Math.max(1, size);
+        ipcMain.on('print-window-ready', this.onWindowReady);
+        ipcMain.on('print-ready', this.onPrintReady);
+    }
+
+    // Render one invoice to PDF on a pooled window loaded from url
+    async render(invoice: any, url: string, banking: any = null): Promise<Buffer> {
+        const slot = await this.acquire(url);
+        let healthy = true;
+        try {
+            await slot.ready;
+            await this.waitForPrintReady(slot, invoice, banking);
+            return await slot.window.webContents.printToPDF({
+                printBackground: true,
+                pageSize: 'A4',
+                margins: { top: 0, bottom: 0, left: 0, right: 0 } // CSS handles margins
+            });
+        } catch (error) {
+            healthy = false;
+            throw error;
+        } finally {
+            this.release(slot, healthy);
+        }
+    }
+
+    destroy() {
+        ipcMain.removeListener('print-window-ready', this.onWindowReady);
+        ipcMain.removeListener('print-ready', this.onPrintReady);
+        if (this.idleTimer) clearTimeout(this.idleTimer);
+        this.idleTimer = null;
+        for (const slot of [...this.slots]) this.discard(slot);
+    }
+
+    private onWindowReady = (event: IpcMainEvent) => {
+        const handler = this.readyHandlers.get(event.sender.id);
+        if (!handler) return;
+        this.readyHandlers.delete(event.sender.id);
+        handler();
+    };
+
+    private onPrintReady = (event: IpcMainEvent, printId?: number) => {
+        const pending = this.pendingPrints.get(event.sender.id);
+        // A late answer for an earlier, timed-out print is ignored
+        if (!pending || (printId !== undefined && printId !== pending.printId)) return;
+        this.pendingPrints.delete(event.sender.id);
+        pending.resolve();
+    };
+
+    private async acquire(url: string): Promise<PrintSlot> {
+        if (this.idleTimer) clearTimeout(this.idleTimer);
+        this.idleTimer = null;
+
+        for (; ;) {
+            // Windows loaded from another URL (dev server vs packaged file) are not reused
+            for (const slot of [...this.slots]) {
+                if (!slot.busy && slot.url !== url) this.discard(slot);
+            }
+            const idle = this.slots.find(slot => !slot.busy);
+            if (idle) {
+                idle.busy = true;
+                return idle;
+            }
+            if (this.slots.length < this.size) return this.createSlot(url);
+            await new Promise<void>(resolve => this.waiters.push(resolve));
+        }
+    }
+
+    private release(slot: PrintSlot, healthy: boolean) {
+        slot.busy = false;
+        if (!healthy) this.discard(slot);
+        this.waiters.shift()?.();
+
+        if (this.slots.every(s => !s.busy) && this.waiters.length === 0) {
+            if (this.idleTimer) clearTimeout(this.idleTimer);
+            this.idleTimer = setTimeout(() => {
+                this.idleTimer = null;
+                for (const s of [...this.slots]) if (!s.busy) this.discard(s);
+            }, IDLE_TIMEOUT_MS);
+        }
+    }
+
+    private createSlot(url: string): PrintSlot {
+        const window = new BrowserWindow({
+            show: false,
+            width: 794, // A4 width at 96dpi
+            height: 1123,
+            webPreferences: {
+                preload: this.preloadPath,
+                contextIsolation: true,
+                nodeIntegration: false,
+                webSecurity: true
+            }
+        });
+        const contentsId = window.webContents.id;
+
+        // Debugging: Log renderer console messages to main terminal
+        window.webContents.on('console-message', (_event, _level, message, line, sourceId) => {
+            console.log(`[Renderer] ${message} (${sourceId}:${line})`);
+        });
+
+        // Register the handshake before loading to avoid a race with a fast renderer
+        const ready = new Promise<void>((resolve, reject) => {
+            const timeout = setTimeout(() => {
+                this.readyHandlers.delete(contentsId);
+                reject(new Error('Handshake timed out - Renderer did not report ready.'));
+            }, READY_TIMEOUT_MS);
+            this.readyHandlers.set(contentsId, () => {
+                clearTimeout(timeout);
+                resolve();
+            });
+            window.loadURL(url).catch(error => {
+                clearTimeout(timeout);
+                this.readyHandlers.delete(contentsId);
+                reject(error);
+            });
+        });
+        ready.catch(() => { }); // Surfaced by render(); avoid an unhandled rejection for idle slots
+
+        const slot: PrintSlot = { window, contentsId, url, ready, busy: true };
+        window.webContents.on('render-process-gone', () => this.discard(slot));
+        window.on('closed', () => this.forget(slot));
+        this.slots.push(slot);
+        return slot;
+    }
+
+    private waitForPrintReady(slot: PrintSlot, invoice: any, banking: any): Promise<void> {
+        const printId = this.nextPrintId++;
+        return new Promise<void>((resolve, reject) => {
+            const timeout = setTimeout(() => {
+                this.pendingPrints.delete(slot.contentsId);
+                reject(new Error(`Print timed out (${PRINT_TIMEOUT_MS / 1000}s)`));
+            }, PRINT_TIMEOUT_MS);
+            this.pendingPrints.set(slot.contentsId, {
+                printId,
+                resolve: () => {
+                    clearTimeout(timeout);
+                    resolve();
+                },
+                reject: error => {
+                    clearTimeout(timeout);
+                    reject(error);
+                }
+            });
+            slot.window.webContents.send('print-data', invoice, printId, banking);
+        });
+    }
+
+    private discard(slot: PrintSlot) {
+        this.forget(slot);
+        if (!slot.window.isDestroyed()) slot.window.destroy();
+    }
+
+    private forget(slot: PrintSlot) {
+        const index = this.slots.indexOf(slot);
+        if (index === -1) return;
+        this.slots.splice(index, 1);
+        this.readyHandlers.delete(slot.contentsId);
+        const pending = this.pendingPrints.get(slot.contentsId);
+        if (pending) {
+            this.pendingPrints.delete(slot.contentsId);
+            pending.reject(new Error('Print window closed'));
+        }
+        // A freed place lets a queued request create a new window
+        this.waiters.shift()?.();
+    }
+}
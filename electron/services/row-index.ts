@@ -0,0 +1,47 @@
+import { workbookCache } from './workbook-cache';
+import { WORKBOOK_READ_OPTIONS } from '../utils/excel-utils';
+
+/**
+ * Windowed access to sheet rows for the renderer.
+ *
+ * Rows come from the shared workbook cache (parsed once per file version) and
+ * the widest row is computed once per parsed sheet, so any window is a slice
+ * with the total row/column counts known up front. Only the requested window
+ * crosses IPC.
+ */
+
+export interface RowWindow {
+    rows: any[][];
+    start: number; // 0-indexed position of rows[0]
+    totalRows: number;
+    totalCols: number;
+    sheetName: string;
+}
+
+const columnCounts = new WeakMap<any[][], number>();
+
+export function getColumnCount(rows: any[][]): number {
+    let count = columnCounts.get(rows);
+    if (count === undefined) {
+        count = 0;
+        for (const row of rows) {
+            if (Array.isArray(row) && row.length > count) count = row.length;
+        }
+        columnCounts.set(rows, count);
+    }
+    return count;
+}
+
+export function readRowWindow(filePath: string, sheetName: string | undefined, start: number, count: number): RowWindow {
+    const { rows, sheetName: resolvedSheet } = workbookCache.getScopedSheetRows(filePath, sheetName, WORKBOOK_READ_OPTIONS);
+    const from = Math.min(Math.max(0, Math.floor(start) || 0), rows.length);
+    const to = Math.min(rows.length, from + Math.max(0, Math.floor(count) || 0));
+
+    return {
+        rows: rows.slice(from, to),
+        start: from,
+        totalRows: rows.length,
+        totalCols: getColumnCount(rows),
+        sheetName: resolvedSheet
+    };
+}
@@ -1,62 +1,228 @@
 import { BrowserWindow } from 'electron';
-import { getDB } from '../db';
-import { getTodayString, extractDateString, isInvoiceOverdue } from '../utils/invoice-utils';
+import { getDB, AppDatabase } from '../db';
+import { extractDateString, isInvoiceOverdue } from '../utils/invoice-utils';
 
-let overdueCheckInterval: NodeJS.Timeout | null = null;
+/**
+ * Background service that marks issued invoices overdue.
+ *
+ * Issued invoices sit in a min-heap on due date. The service sleeps until the
+ * earliest due date has passed, flips the invoices that crossed it in one
+ * transaction and sends one invoices-updated notification. Saves push new
+ * entries; entries for invoices that were paid, deleted or re-dated since are
+ * dropped when they reach the top.
+ */
 
-// Background service to automatically check and update overdue invoices
-export async function checkAndUpdateOverdueInvoices(mainWindow: BrowserWindow | null) {
-    try {
-        const db = await getDB();
-        const todayStr = getTodayString();
-        let hasUpdates = false;
-
-        db.data.invoices.forEach((inv: any) => {
-            // Only check issued invoices with a due date
-            if (inv.status === 'issued' && inv.dueDate) {
-                const dueDateStr = extractDateString(String(inv.dueDate));
-
-                if (isInvoiceOverdue(dueDateStr, todayStr)) {
-                    console.log(`[Background Service] Marking invoice ${inv.number} as OVERDUE (Due: ${dueDateStr}, Today: ${todayStr})`);
-                    inv.status = 'overdue';
-                    inv.updatedAt = new Date().toISOString();
-                    hasUpdates = true;
-                }
+const DAY_MS = 24 * 60 * 60 * 1000;
+// Wake at least this often, so a suspended machine or clock change is caught up
+const MAX_SLEEP_MS = 60 * 60 * 1000;
+
+interface DueEntry {
+    dueDate: string; // YYYY-MM-DD
+    id: string;
+}
+
+export class DueDateHeap {
+    private items: DueEntry[] = [];
+
+    get size(): number {
+        return this.items.length;
+    }
+
+    peek(): DueEntry | undefined {
+        return this.items[0];
+    }
+
+    push(entry: DueEntry) {
+        const items = this.items;
+        items.push(entry);
+        let i = items.length - 1;
+        while (i > 0) {
+            const parent = (i - 1) >> 1;
+            if (!this.less(items[i], items[parent])) break;
+            [items[i], items[parent]] = [items[parent], items[i]];
+            i = parent;
+        }
+    }
+
+    pop(): DueEntry | undefined {
+        const items = this.items;
+        const top = items[0];
+        const last = items.pop();
+        if (items.length > 0 && last) {
+            items[0] = last;
+            let i = 0;
+            for (;;) {
+                const left = 2 * i + 1;
+                const right = left + 1;
+                let smallest = i;
+                if (left < items.length && this.less(items[left], items[smallest])) smallest = left;
+                if (right < items.length && this.less(items[right], items[smallest])) smallest = right;
+                if (smallest === i) break;
+                [items[i], items[smallest]] = [items[smallest], items[i]];
+                i = smallest;
             }
+        }
+        return top;
+    }
+
+    clear() {
+        this.items = [];
+    }
+
+    private less(a: DueEntry, b: DueEntry): boolean {
+        return a.dueDate < b.dueDate || (a.dueDate === b.dueDate && a.id < b.id);
+    }
+}
+
+export interface OverdueSchedulerOptions {
+    now?: () => number;
+    onUpdated?: (ids: string[]) => void;
+}
+
+export class OverdueScheduler {
+    private db: AppDatabase;
+    private heap = new DueDateHeap();
+    private timer: NodeJS.Timeout | null = null;
+    private wakeAt = Infinity;
+    private unobserve: (() => void) | null = null;
+    private now: () => number;
+    private onUpdated: (ids: string[]) => void;
+
+    constructor(db: AppDatabase, options: OverdueSchedulerOptions = {}) {
+        this.db = db;
+        this.now = options.now ?? Date.now;
+        this.onUpdated = options.onUpdated ?? (() => { });
+    }
+
+    start() {
+        this.reload();
+        this.unobserve = this.db.invoices.observe((_, next) => {
+            if (next && this.track(next)) this.arm();
         });
+        this.run();
+    }
+
+    stop() {
+        if (this.timer) clearTimeout(this.timer);
+        this.timer = null;
+        this.wakeAt = Infinity;
+        this.unobserve?.();
+        this.unobserve = null;
+        this.heap.clear();
+    }
+
+    // Next time the scheduler will wake, in ms since the epoch
+    get nextWake(): number {
+        return this.wakeAt;
+    }
+
+    // Flip every issued invoice whose due date has passed: one write, one notification
+    run(): number {
+        const todayStr = new Date(this.now()).toISOString().split('T')[0];
+        const updatedAt = new Date(this.now()).toISOString();
+        const overdue: any[] = [];
+        const flipped: DueEntry[] = [];
+        const seen = new Set<string>();
 
-        if (hasUpdates) {
-            await db.write();
-            console.log('[Background Service] Overdue invoices updated');
+        for (let entry = this.heap.peek(); entry && isInvoiceOverdue(entry.dueDate, todayStr); entry = this.heap.peek()) {
+            this.heap.pop();
+            const inv = this.db.invoices.get(entry.id);
+            // Stale entry: paid, deleted or re-dated since it was pushed
+            if (!inv || inv.status !== 'issued' || !inv.dueDate || seen.has(inv.id)) continue;
+            if (extractDateString(String(inv.dueDate)) !== entry.dueDate) continue;
 
-            // Notify renderer if window exists
-            if (mainWindow && !mainWindow.isDestroyed()) {
-                mainWindow.webContents.send('invoices-updated');
+            seen.add(inv.id);
+            flipped.push(entry);
+            console.log(`[Background Service] Marking invoice ${inv.number} as OVERDUE (Due: ${entry.dueDate}, Today: ${todayStr})`);
+            overdue.push({ ...inv, status: 'overdue', updatedAt });
+        }
+
+        if (overdue.length > 0) {
+            try {
+                this.db.transaction(tx => overdue.forEach(inv => tx.put('invoices', inv)));
+            } catch (error) {
+                flipped.forEach(entry => this.heap.push(entry));
+                throw error;
             }
+            console.log(`[Background Service] ${overdue.length} overdue invoice(s) updated`);
+            this.onUpdated(overdue.map(inv => inv.id));
         }
-    } catch (error) {
-        console.error('[Background Service] Error checking overdue invoices:', error);
+
+        this.arm();
+        return overdue.length;
     }
-}
 
-// Start the background service
-export function startOverdueCheckService(mainWindow: BrowserWindow | null) {
-    // Run immediately on start
-    checkAndUpdateOverdueInvoices(mainWindow);
+    // Push an issued invoice; true when it is now the earliest entry
+    private track(inv: any): boolean {
+        if (inv.status !== 'issued' || !inv.dueDate) return false;
+        const entry = { dueDate: extractDateString(String(inv.dueDate)), id: inv.id };
+        this.heap.push(entry);
 
-    // Then run every hour (3600000 ms)
-    overdueCheckInterval = setInterval(() => {
-        checkAndUpdateOverdueInvoices(mainWindow);
-    }, 3600000); // Check every hour
+        // Re-saves leave stale entries behind; start over from the index once they dominate
+        if (this.heap.size > 2 * this.db.invoices.count('status', 'issued') + 64) {
+            this.reload();
+            return true;
+        }
+        return this.heap.peek() === entry;
+    }
+
+    private reload() {
+        this.heap.clear();
+        for (const inv of this.db.invoices.find('status', 'issued')) {
+            if (inv.dueDate) this.heap.push({ dueDate: extractDateString(String(inv.dueDate)), id: inv.id });
+        }
+    }
 
-    console.log('[Background Service] Overdue invoice checker started (runs every hour)');
+    // Sleep until the earliest due date has passed (start of the next UTC day), capped at MAX_SLEEP_MS
+    private arm(retry = false) {
+        const next = this.heap.peek();
+        const boundary = next && !retry ? Date.parse(`${next.dueDate}T00:00:00Z`) + DAY_MS : Infinity;
+        const wakeAt = Math.min(Number.isFinite(boundary) ? boundary : Infinity, this.now() + MAX_SLEEP_MS);
+        if (this.timer && wakeAt >= this.wakeAt) return;
+
+        if (this.timer) clearTimeout(this.timer);
+        this.wakeAt = wakeAt;
+        this.timer = setTimeout(() => {
+            this.timer = null;
+            this.wakeAt = Infinity;
+            try {
+                this.run();
+            } catch (error) {
+                console.error('[Background Service] Error checking overdue invoices:', error);
+                this.arm(true);
+            }
+        }, Math.max(0, wakeAt - this.now()));
+    }
+}
+
+let scheduler: OverdueScheduler | null = null;
+
+// Start the background service
+export async function startOverdueCheckService(mainWindowGetter: () => BrowserWindow | null) {
+    if (scheduler) return;
+    try {
+        const db = await getDB();
+        scheduler = new OverdueScheduler(db, {
+            onUpdated: () => {
+                // Notify renderer if window exists
+                const mainWindow = mainWindowGetter();
+                if (mainWindow && !mainWindow.isDestroyed()) {
+                    mainWindow.webContents.send('invoices-updated');
+                }
+            }
+        });
+        scheduler.start();
+        console.log('[Background Service] Overdue invoice scheduler started');
+    } catch (error) {
+        console.error('[Background Service] Error starting overdue scheduler:', error);
+    }
 }
 
 // Stop the background service
 export function stopOverdueCheckService() {
-    if (overdueCheckInterval) {
-        clearInterval(overdueCheckInterval);
-        overdueCheckInterval = null;
-        console.log('[Background Service] Overdue invoice checker stopped');
+    if (scheduler) {
+        scheduler.stop();
+        scheduler = null;
+        console.log('[Background Service] Overdue invoice scheduler stopped');
     }
 }
@@ -0,0 +1,50 @@
+import { performance } from 'perf_hooks';
+import { recordSpans, TraceSpan } from './tracing';
+
+/**
+ * Main-process startup phases, in milliseconds since the process started.
+ *
+ * main.ts marks each phase as it is reached; reportStartup logs them once
+ * the first window is shown and the deferred startup work has run, and adds
+ * them to the recorded trace spans (category 'startup') so they show up in
+ * the diagnostics panel and in exported traces.
+ */
+
+export interface StartupPhase {
+    name: string;
+    at: number; // ms since process start
+}
+
+const phases: StartupPhase[] = [];
+let reported = false;
+
+export function markStartup(name: string): void {
+    phases.push({ name, at: Math.round(performance.now()) });
+}
+
+export function startupPhases(): StartupPhase[] {
+    return phases.slice();
+}
+
+// Each phase as a span from the previous mark (or process start) to its own
+export function startupSpans(): TraceSpan[] {
+    const origin = performance.timeOrigin;
+    return phases.map((phase, i) => {
+        const from = i > 0 ? phases[i - 1].at : 0;
+        return {
+            name: phase.name,
+            cat: 'startup',
+            ts: Math.round((origin + from) * 1000),
+            dur: Math.round((phase.at - from) * 1000),
+            tid: 0,
+            args: { at: phase.at }
+        };
+    });
+}
+
+export function reportStartup(): void {
+    if (reported) return;
+    reported = true;
+    console.log(`[Startup] ${phases.map(phase => `${phase.name} ${phase.at}ms`).join(', ')}`);
+    recordSpans(startupSpans());
+}
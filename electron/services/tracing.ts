@@ -0,0 +1,285 @@
+import { performance } from 'perf_hooks';
+import { isMainThread, threadId } from 'worker_threads';
+
+/**
+ * Opt-in timing and memory spans for matcher jobs and IPC handlers.
+ *
+ * A Tracer collects spans for one unit of work (a job, an analysis, one
+ * worker task). Worker tasks get `trace: true` in their payload and send
+ * their spans back with the task result, so a job result carries the spans
+ * of every thread that worked on it. Finished spans are kept in a bounded
+ * buffer in the main process for the Settings diagnostics panel and can be
+ * exported as a Chrome trace (chrome://tracing, Perfetto).
+ *
+ * Tracing is off unless FATOORA_TRACE=1 is set or it is switched on from the
+ * diagnostics panel. A disabled tracer only runs the traced function, without
+ * reading the clock or the heap.
+ */
+
+export interface TraceSpan {
+    name: string;
+    cat: string; // 'excel' | 'ipc'
+    ts: number; // Start, microseconds since the epoch (comparable across threads)
+    dur: number; // Microseconds
+    tid: number; // Thread id, 0 for the main thread
+    args?: Record<string, string | number | boolean>;
+}
+
+export type SpanArgs = Record<string, string | number | boolean>;
+
+// Spans kept for the diagnostics panel, oldest dropped first
+const MAX_RECORDED_SPANS = 20_000;
+
+let enabled = process.env.FATOORA_TRACE === '1';
+let recorded: TraceSpan[] = [];
+
+export function isTracingEnabled(): boolean {
+    return enabled;
+}
+
+export function setTracingEnabled(value: boolean): void {
+    enabled = value;
+}
+
+function nowMicros(): number {
+    return Math.round((performance.timeOrigin + performance.now()) * 1000);
+}
+
+function heapUsed(): number {
+    return process.memoryUsage().heapUsed;
+}
+
+export class Tracer {
+    readonly enabled: boolean;
+    readonly spans: TraceSpan[] = [];
+    private cat: string;
+
+    constructor(cat: string, on: boolean = enabled) {
+        this.cat = cat;
+        this.enabled = on;
+    }
+
+    /**
+     * Run `fn` as a span. `fn` may add attributes (row counts, file names)
+     * to the args it receives; the duration and heap delta are added here.
+     */
+    span<T>(name: string, fn: (args: SpanArgs) => T, args?: SpanArgs): T {
+        if (!this.enabled) return fn(NO_ARGS);
+        const end = this.begin(name, args);
+        const spanArgs: SpanArgs = {};
+        try {
+            return fn(spanArgs);
+        } finally {
+            end(spanArgs);
+        }
+    }
+
+    async spanAsync<T>(name: string, fn: (args: SpanArgs) => Promise<T>, args?: SpanArgs): Promise<T> {
+        if (!this.enabled) return fn(NO_ARGS);
+        const end = this.begin(name, args);
+        const spanArgs: SpanArgs = {};
+        try {
+            return await fn(spanArgs);
+        } finally {
+            end(spanArgs);
+        }
+    }
+
+    // Start a span that ends when the returned function is called, for work that does not fit a callback
+    begin(name: string, args?: SpanArgs): (extra?: SpanArgs) => void {
+        if (!this.enabled) return endNothing;
+        const ts = nowMicros();
+        const heapBefore = heapUsed();
+        return (extra?: SpanArgs) => {
+            this.spans.push({
+                name,
+                cat: this.cat,
+                ts,
+                dur: nowMicros() - ts,
+                tid: threadId,
+                args: { ...args, ...extra, heapDelta: heapUsed() - heapBefore }
+            });
+        };
+    }
+
+    // Take over spans recorded elsewhere, e.g. sent back by a worker task
+    add(spans: TraceSpan[] | undefined): void {
+        if (this.enabled && spans) this.spans.push(...spans);
+    }
+}
+
+// Handed to traced functions while tracing is off; whatever they write there is ignored
+const NO_ARGS: SpanArgs = {};
+const endNothing = () => { };
+
+export const disabledTracer = new Tracer('', false);
+
+// Tracer of the synchronous work currently running on this thread, see withTracer
+let active: Tracer = disabledTracer;
+
+export function activeTracer(): Tracer {
+    return active;
+}
+
+/**
+ * Make `tracer` the active tracer while `fn` runs, so shared code such as
+ * the workbook cache can add spans without a tracer being passed down.
+ * Synchronous only: an await inside `fn` would leak the tracer to other tasks.
+ */
+export function withTracer<T>(tracer: Tracer, fn: () => T): T {
+    if (!tracer.enabled) return fn();
+    const previous = active;
+    active = tracer;
+    try {
+        return fn();
+    } finally {
+        active = previous;
+    }
+}
+
+// Keep spans for the diagnostics panel (main process only; workers send theirs back with results)
+export function recordSpans(spans: TraceSpan[] | undefined): void {
+    if (!isMainThread || !spans || spans.length === 0) return;
+    recorded.push(...spans);
+    if (recorded.length > MAX_RECORDED_SPANS) {
+        recorded = recorded.slice(recorded.length - MAX_RECORDED_SPANS);
+    }
+}
+
+export function recordedSpans(): TraceSpan[] {
+    return recorded.slice();
+}
+
+export function clearRecordedSpans(): void {
+    recorded = [];
+}
+
+// Arrays longer than this are sized from their first PAYLOAD_SAMPLE elements
+const PAYLOAD_SAMPLE = 100;
+
+/**
+ * Rough size of an IPC argument or result, close to its JSON length but
+ * without serializing it: binary data counts its byteLength and long arrays
+ * (sheet rows) are extrapolated from a sample, so tracing stays cheap.
+ */
+export function payloadBytes(value: unknown): number {
+    if (value === undefined) return 0;
+    try {
+        return estimateJsonLength(value, new Set());
+    } catch {
+        return -1; // Not serializable as JSON (cyclic, BigInt)
+    }
+}
+
+function estimateJsonLength(value: unknown, ancestors: Set<object>): number {
+    switch (typeof value) {
+        case 'string':
+            return value.length + 2;
+        case 'number':
+            return Number.isFinite(value) ? String(value).length : 4;
+        case 'boolean':
+            return value ? 4 : 5;
+        case 'bigint':
+            throw new TypeError('BigInt payload');
+        case 'object':
+            break;
+        default:
+            return 4; // undefined, functions and symbols become null in arrays
+    }
+    if (value === null) return 4;
+    if (ArrayBuffer.isView(value) || value instanceof ArrayBuffer) return value.byteLength;
+    if (value instanceof Date) return 26;
+    if (ancestors.has(value)) throw new TypeError('Cyclic payload');
+
+    ancestors.add(value);
+    try {
+        if (Array.isArray(value)) {
+            const sampled = Math.min(value.length, PAYLOAD_SAMPLE);
+            let bytes = 0;
+            for (let i = 0; i < sampled; i++) bytes += estimateJsonLength(value[i], ancestors);
+            if (sampled < value.length) bytes = Math.round(bytes / sampled * value.length);
+            return bytes + Math.max(0, value.length - 1) + 2;
+        }
+        let bytes = 2;
+        let fields = 0;
+        for (const [key, field] of Object.entries(value)) {
+            if (field === undefined || typeof field === 'function' || typeof field === 'symbol') continue;
+            bytes += key.length + 3 + estimateJsonLength(field, ancestors);
+            fields++;
+        }
+        return bytes + Math.max(0, fields - 1);
+    } finally {
+        ancestors.delete(value);
+    }
+}
+
+/**
+ * Wrap `target.handle` so that every handler registered through it afterwards
+ * records a span with its latency and payload sizes while tracing is on.
+ * Channels starting with one of `skipPrefixes` are registered untouched.
+ */
+export function traceIpcHandlers(
+    target: { handle(channel: string, listener: (...args: any[]) => any): void },
+    skipPrefixes: string[] = []
+): void {
+    const handle = target.handle.bind(target);
+    target.handle = (channel: string, listener: (...args: any[]) => any) => {
+        if (skipPrefixes.some(prefix => channel.startsWith(prefix))) {
+            handle(channel, listener);
+            return;
+        }
+        handle(channel, async (event: unknown, ...args: any[]) => {
+            if (!enabled) return listener(event, ...args);
+            const ts = nowMicros();
+            let ok = true;
+            let result: unknown;
+            try {
+                result = await listener(event, ...args);
+                return result;
+            } catch (e) {
+                ok = false;
+                throw e;
+            } finally {
+                const dur = nowMicros() - ts;
+                recordSpans([{
+                    name: channel,
+                    cat: 'ipc',
+                    ts,
+                    dur,
+                    tid: threadId,
+                    args: { argBytes: payloadBytes(args), resultBytes: ok ? payloadBytes(result) : 0, ok }
+                }]);
+            }
+        });
+    };
+}
+
+/**
+ * Spans as a Chrome trace event file (the JSON object format), loadable in
+ * chrome://tracing and ui.perfetto.dev.
+ */
+export function toChromeTrace(spans: TraceSpan[]) {
+    const threads = new Set(spans.map(span => span.tid));
+    return {
+        displayTimeUnit: 'ms',
+        traceEvents: [
+            ...Array.from(threads, tid => ({
+                name: 'thread_name',
+                ph: 'M',
+                pid: process.pid,
+                tid,
+                args: { name: tid === 0 ? 'main' : `excel worker ${tid}` }
+            })),
+            ...spans.map(span => ({
+                name: span.name,
+                cat: span.cat,
+                ph: 'X',
+                ts: span.ts,
+                dur: span.dur,
+                pid: process.pid,
+                tid: span.tid,
+                args: span.args || {}
+            }))
+        ]
+    };
+}
@@ -0,0 +1,315 @@
+import fs from 'fs';
+import path from 'path';
+import * as XLSX from 'xlsx';
+import { activeTracer } from './tracing';
+
+/**
+ * Main-process cache of parsed workbooks.
+ *
+ * Entries are keyed by resolved path + parse options and fingerprinted with the
+ * file's size and mtime, so a file that changes on disk is re-parsed on next access.
+ * Each entry also memoizes the `sheet_to_json` arrays derived from its sheets.
+ *
+ * Everything returned from the cache is shared: callers must treat workbooks and
+ * row arrays as read-only (or restore any cells they touch, see processExcelJob).
+ *
+ * Read paths that only need one sheet use the scoped accessors, which parse just
+ * that sheet (SheetJS `sheets` option) unless the whole workbook is already cached.
+ *
+ * Reads, parses and `sheet_to_json` calls that miss the cache are recorded as
+ * spans of the active tracer (see tracing.withTracer).
+ */
+
+export interface WorkbookCacheStats {
+    hits: number;
+    misses: number;
+    rowHits: number;
+    rowMisses: number;
+    evictions: number;
+    invalidations: number;
+    entries: number;
+    bytes: number;
+    budgetBytes: number;
+}
+
+interface CacheEntry {
+    filePath: string;
+    fingerprint: string;
+    workbook: XLSX.WorkBook;
+    workbookBytes: number;
+    rows: Map<string, any[][]>;
+    rowBytes: number;
+}
+
+const DEFAULT_BUDGET_MB = 512;
+
+// Parsed SheetJS workbooks are typically 6-10x the size of the zipped .xlsx on disk
+const WORKBOOK_EXPANSION_FACTOR = 8;
+// A `bookSheets` parse only holds the sheet names
+const SHEET_LIST_BYTES = 1024;
+const SHEET_LIST_OPTIONS: XLSX.ParsingOptions = { bookSheets: true };
+
+function resolveDefaultBudget(): number {
+    const fromEnv = Number(process.env.FATOORA_WORKBOOK_CACHE_MB);
+    const mb = Number.isFinite(fromEnv) && fromEnv >= 0 ? fromEnv : DEFAULT_BUDGET_MB;
+    return mb * 1024 * 1024;
+}
+
+// Stable string for an options object (keys sorted, functions ignored)
+function optionsKey(options: Record<string, any> | undefined): string {
+    if (!options) return '';
+    return Object.keys(options)
+        .sort()
+        .filter(k => typeof options[k] !== 'function' && options[k] !== undefined)
+        .map(k => `${k}=${JSON.stringify(options[k])}`)
+        .join('&');
+}
+
+// Rough heap footprint of an array-of-arrays; cheap compared to sheet_to_json itself
+export function estimateRowsBytes(rows: any[][]): number {
+    let bytes = rows.length * 48;
+    for (let i = 0; i < rows.length; i++) {
+        const row = rows[i];
+        if (!row) continue;
+        for (let c = 0; c < row.length; c++) {
+            const v = row[c];
+            bytes += typeof v === 'string' ? 16 + v.length * 2 : 16;
+        }
+    }
+    return bytes;
+}
+
+export class WorkbookCache {
+    private entries = new Map<string, CacheEntry>();
+    private bytes = 0;
+    private budgetBytes: number;
+    private stats = { hits: 0, misses: 0, rowHits: 0, rowMisses: 0, evictions: 0, invalidations: 0 };
+
+    constructor(budgetBytes: number = resolveDefaultBudget()) {
+        this.budgetBytes = budgetBytes;
+    }
+
+    /**
+     * Get a parsed workbook, reading from disk only when the file is not cached
+     * or has changed since it was parsed.
+     */
+    getWorkbook(filePath: string, parseOptions?: XLSX.ParsingOptions): XLSX.WorkBook {
+        return this.getEntry(filePath, parseOptions).workbook;
+    }
+
+    /**
+     * Get `sheet_to_json(sheet, { header: 1, ...jsonOptions })` for a sheet,
+     * memoized alongside the workbook it was derived from.
+     */
+    getSheetRows(
+        filePath: string,
+        sheetName: string | undefined,
+        parseOptions?: XLSX.ParsingOptions,
+        jsonOptions?: XLSX.Sheet2JSONOpts
+    ): { rows: any[][]; sheetName: string; workbook: XLSX.WorkBook } {
+        const entry = this.getEntry(filePath, parseOptions);
+        const workbook = entry.workbook;
+        const name = sheetName && workbook.SheetNames.includes(sheetName) ? sheetName : workbook.SheetNames[0];
+        const rowKey = `${name}|${optionsKey(jsonOptions as Record<string, any>)}`;
+
+        const cached = entry.rows.get(rowKey);
+        if (cached) {
+            this.stats.rowHits++;
+            return { rows: cached, sheetName: name, workbook };
+        }
+
+        this.stats.rowMisses++;
+        const sheet = workbook.Sheets[name];
+        const rows = sheet
+            ? activeTracer().span('sheet_to_json', args => {
+                const json = XLSX.utils.sheet_to_json(sheet, { ...jsonOptions, header: 1 }) as any[][];
+                args.file = path.basename(filePath);
+                args.rows = json.length;
+                return json;
+            })
+            : [];
+
+        const rowBytes = estimateRowsBytes(rows);
+        const key = this.keyFor(filePath, parseOptions);
+        if (this.entries.get(key) === entry) {
+            entry.rows.set(rowKey, rows);
+            entry.rowBytes += rowBytes;
+            this.bytes += rowBytes;
+            this.evictToBudget(key);
+        }
+
+        return { rows, sheetName: name, workbook };
+    }
+
+    /**
+     * Sheet names of a workbook without parsing any sheet (or from a cached full parse).
+     */
+    getSheetNames(filePath: string): string[] {
+        for (const entry of this.freshEntries(filePath)) {
+            if (entry.workbook.SheetNames.length > 0) return entry.workbook.SheetNames;
+        }
+        return this.getEntry(filePath, SHEET_LIST_OPTIONS).workbook.SheetNames;
+    }
+
+    /**
+     * Like getWorkbook + sheet lookup, but parses only the requested sheet
+     * (defaulting to the first) when the full workbook is not cached.
+     */
+    getScopedSheet(
+        filePath: string,
+        sheetName: string | undefined,
+        parseOptions?: XLSX.ParsingOptions
+    ): { sheet: XLSX.WorkSheet | undefined; sheetName: string; sheetNames: string[] } {
+        const { name, options } = this.scope(filePath, sheetName, parseOptions);
+        const workbook = this.getWorkbook(filePath, options);
+        return { sheet: workbook.Sheets[name], sheetName: name, sheetNames: workbook.SheetNames };
+    }
+
+    /** Sheet-scoped variant of getSheetRows, see getScopedSheet. */
+    getScopedSheetRows(
+        filePath: string,
+        sheetName: string | undefined,
+        parseOptions?: XLSX.ParsingOptions,
+        jsonOptions?: XLSX.Sheet2JSONOpts
+    ): { rows: any[][]; sheetName: string; workbook: XLSX.WorkBook } {
+        const { name, options } = this.scope(filePath, sheetName, parseOptions);
+        return this.getSheetRows(filePath, name, options, jsonOptions);
+    }
+
+    /** Drop every cached parse of a file (all option variants). */
+    invalidate(filePath: string): void {
+        const resolved = path.resolve(filePath);
+        for (const [key, entry] of this.entries) {
+            if (entry.filePath === resolved) {
+                this.remove(key);
+                this.stats.invalidations++;
+            }
+        }
+    }
+
+    clear(): void {
+        this.entries.clear();
+        this.bytes = 0;
+    }
+
+    setBudget(budgetBytes: number): void {
+        this.budgetBytes = Math.max(0, budgetBytes);
+        this.evictToBudget();
+    }
+
+    getStats(): WorkbookCacheStats {
+        return {
+            ...this.stats,
+            entries: this.entries.size,
+            bytes: this.bytes,
+            budgetBytes: this.budgetBytes,
+        };
+    }
+
+    // Resolve the sheet to read and the parse options to read it with
+    private scope(
+        filePath: string,
+        sheetName: string | undefined,
+        parseOptions?: XLSX.ParsingOptions
+    ): { name: string; options: XLSX.ParsingOptions | undefined } {
+        const names = this.getSheetNames(filePath);
+        const name = sheetName && names.includes(sheetName) ? sheetName : names[0];
+
+        // Reuse a cached full parse with the same options rather than parsing the sheet again
+        const fullKey = this.keyFor(filePath, parseOptions);
+        const full = this.entries.get(fullKey);
+        if (full && this.freshEntries(filePath).includes(full)) {
+            return { name, options: parseOptions };
+        }
+        return { name, options: { ...parseOptions, sheets: name } };
+    }
+
+    // Cached entries of a file whose fingerprint still matches the file on disk
+    private freshEntries(filePath: string): CacheEntry[] {
+        const resolved = path.resolve(filePath);
+        let fingerprint: string;
+        try {
+            const stat = fs.statSync(resolved);
+            fingerprint = `${stat.size}:${stat.mtimeMs}`;
+        } catch {
+            return [];
+        }
+        return Array.from(this.entries.values())
+            .filter(entry => entry.filePath === resolved && entry.fingerprint === fingerprint);
+    }
+
+    private keyFor(filePath: string, parseOptions?: XLSX.ParsingOptions): string {
+        return `${path.resolve(filePath)}::${optionsKey(parseOptions as Record<string, any>)}`;
+    }
+
+    private getEntry(filePath: string, parseOptions?: XLSX.ParsingOptions): CacheEntry {
+        const resolved = path.resolve(filePath);
+        const stat = fs.statSync(resolved);
+        const fingerprint = `${stat.size}:${stat.mtimeMs}`;
+        const key = this.keyFor(resolved, parseOptions);
+
+        const existing = this.entries.get(key);
+        if (existing && existing.fingerprint === fingerprint) {
+            // Refresh LRU position
+            this.entries.delete(key);
+            this.entries.set(key, existing);
+            this.stats.hits++;
+            return existing;
+        }
+
+        if (existing) {
+            // File changed on disk: every variant of it is stale
+            this.invalidate(resolved);
+        }
+
+        this.stats.misses++;
+        const tracer = activeTracer();
+        const file = path.basename(resolved);
+        const buffer = tracer.span('read file', args => {
+            args.bytes = stat.size;
+            return fs.readFileSync(resolved);
+        }, { file });
+        const workbook = tracer.span('parse workbook', () =>
+            XLSX.read(buffer, { ...parseOptions, type: 'buffer' }), { file, sheets: parseOptions?.bookSheets ? 'names only' : String(parseOptions?.sheets ?? 'all') });
+        const entry: CacheEntry = {
+            filePath: resolved,
+            fingerprint,
+            workbook,
+            workbookBytes: parseOptions?.bookSheets ? SHEET_LIST_BYTES : stat.size * WORKBOOK_EXPANSION_FACTOR,
+            rows: new Map(),
+            rowBytes: 0,
+        };
+
+        if (entry.workbookBytes <= this.budgetBytes) {
+            this.entries.set(key, entry);
+            this.bytes += entry.workbookBytes;
+            this.evictToBudget(key);
+        }
+
+        return entry;
+    }
+
+    private remove(key: string): void {
+        const entry = this.entries.get(key);
+        if (!entry) return;
+        this.bytes -= entry.workbookBytes + entry.rowBytes;
+        this.entries.delete(key);
+    }
+
+    // Evict least recently used entries until under budget, never evicting `keep`
+    private evictToBudget(keep?: string): void {
+        for (const key of this.entries.keys()) {
+            if (this.bytes <= this.budgetBytes) break;
+            if (key === keep) continue;
+            this.remove(key);
+            this.stats.evictions++;
+        }
+        // The kept entry alone may exceed the budget once its rows are added
+        if (keep && this.bytes > this.budgetBytes && this.entries.has(keep)) {
+            this.remove(keep);
+            this.stats.evictions++;
+        }
+    }
+}
+
+export const workbookCache = new WorkbookCache();
@@ -0,0 +1,176 @@
+import { Worker, parentPort } from 'worker_threads';
+
+/**
+ * Minimal worker_threads pool.
+ *
+ * Each worker runs the task handlers registered in its entry script and answers
+ * `{ id, type, payload }` messages with `{ id, ok, result | error }`, optionally
+ * preceded by `{ id, progress }` updates. Tasks are dispatched to the least busy
+ * worker unless pinned to one with `worker`.
+ */
+
+export interface RunOptions {
+    worker?: number; // Pin the task to a specific worker (for job state kept in that worker)
+    transferList?: ReadonlyArray<any>;
+    onProgress?: (progress: any) => void; // Receives TaskContext.progress() updates from the handler
+}
+
+export interface TaskPool {
+    readonly size: number;
+    run<T = any>(type: string, payload: any, options?: RunOptions): Promise<T>;
+    broadcast(type: string, payload: any, options?: BroadcastOptions): Promise<void>;
+    destroy(): Promise<void>;
+}
+
+export interface BroadcastOptions {
+    liveOnly?: boolean; // Skip workers that have not been started yet
+}
+
+export interface TaskContext {
+    progress(data: any): void;
+}
+
+export type TaskHandler = (payload: any, context: TaskContext) => any;
+
+const NO_PROGRESS: TaskContext = { progress: () => { } };
+
+interface PendingTask {
+    resolve: (value: any) => void;
+    reject: (error: Error) => void;
+    onProgress?: (progress: any) => void;
+}
+
+interface PoolWorker {
+    worker: Worker;
+    pending: Map<number, PendingTask>;
+}
+
+export class WorkerPool implements TaskPool {
+    readonly size: number;
+    private workers: Array<PoolWorker | null>;
+    private nextId = 1;
+
+    constructor(private scriptPath: string, size: number, private workerData?: any) {
+        this.size = Math.max(1, size);
+        this.workers = new Array(this.size).fill(null);
+    }
+
+    run<T = any>(type: string, payload: any, options: RunOptions = {}): Promise<T> {
+        const index = options.worker !== undefined
+            ? options.worker % this.size
+            : this.leastBusy();
+        const poolWorker = this.ensureWorker(index);
+        const id = this.nextId++;
+
+        return new Promise<T>((resolve, reject) => {
+            poolWorker.pending.set(id, { resolve, reject, onProgress: options.onProgress });
+            poolWorker.worker.postMessage({ id, type, payload }, options.transferList as any);
+        });
+    }
+
+    async broadcast(type: string, payload: any, options: BroadcastOptions = {}): Promise<void> {
+        const targets = Array.from({ length: this.size }, (_, i) => i)
+            .filter(i => !options.liveOnly || this.workers[i] !== null);
+        await Promise.all(targets.map(i => this.run(type, payload, { worker: i })));
+    }
+
+    async destroy(): Promise<void> {
+        const workers = this.workers;
+        this.workers = new Array(this.size).fill(null);
+        await Promise.all(workers.map(w => w?.worker.terminate()));
+    }
+
+    private leastBusy(): number {
+        let best = 0;
+        let bestLoad = Infinity;
+        for (let i = 0; i < this.size; i++) {
+            const load = this.workers[i]?.pending.size ?? 0;
+            if (load < bestLoad) {
+                best = i;
+                bestLoad = load;
+            }
+        }
+        return best;
+    }
+
+    private ensureWorker(index: number): PoolWorker {
+        const existing = this.workers[index];
+        if (existing) return existing;
+
+        const worker = new Worker(this.scriptPath, { workerData: this.workerData });
+        const poolWorker: PoolWorker = { worker, pending: new Map() };
+
+        worker.on('message', (msg: { id: number; ok?: boolean; result?: any; error?: string; progress?: any }) => {
+            const task = poolWorker.pending.get(msg.id);
+            if (!task) return;
+            if (msg.progress !== undefined) {
+                task.onProgress?.(msg.progress);
+                return;
+            }
+            poolWorker.pending.delete(msg.id);
+            if (msg.ok) task.resolve(msg.result);
+            else task.reject(new Error(msg.error));
+        });
+
+        const fail = (error: Error) => {
+            poolWorker.pending.forEach(task => task.reject(error));
+            poolWorker.pending.clear();
+            if (this.workers[index] === poolWorker) this.workers[index] = null;
+        };
+        worker.on('error', fail);
+        worker.on('exit', code => {
+            if (code !== 0) fail(new Error(`Worker exited with code ${code}`));
+            else if (this.workers[index] === poolWorker) this.workers[index] = null;
+        });
+
+        this.workers[index] = poolWorker;
+        return poolWorker;
+    }
+}
+
+/**
+ * Runs the same task handlers on the calling thread. Used when worker scripts
+ * are unavailable (tests, unbundled runs) or workers are disabled.
+ */
+export class InlinePool implements TaskPool {
+    readonly size = 1;
+
+    constructor(private handlers: Record<string, TaskHandler>) { }
+
+    async run<T = any>(type: string, payload: any, options: RunOptions = {}): Promise<T> {
+        const handler = this.handlers[type];
+        if (!handler) throw new Error(`Unknown task: ${type}`);
+        // Yield first so callers see the same async ordering as with real workers
+        await Promise.resolve();
+        const onProgress = options.onProgress;
+        return await handler(payload, onProgress ? { progress: onProgress } : NO_PROGRESS);
+    }
+
+    async broadcast(type: string, payload: any): Promise<void> {
+        await this.run(type, payload);
+    }
+
+    async destroy(): Promise<void> { }
+}
+
+/**
+ * Worker-side counterpart of WorkerPool: answer task messages with the given handlers.
+ */
+export function serveTasks(handlers: Record<string, TaskHandler>): void {
+    if (!parentPort) throw new Error('serveTasks must be called from a worker thread');
+    const port = parentPort;
+
+    port.on('message', async (msg: { id: number; type: string; payload: any }) => {
+        try {
+            const handler = handlers[msg.type];
+            if (!handler) throw new Error(`Unknown task: ${msg.type}`);
+            const context: TaskContext = {
+                progress: data => port.postMessage({ id: msg.id, progress: data })
+            };
+            const result = await handler(msg.payload, context);
+            port.postMessage({ id: msg.id, ok: true, result });
+        } catch (e: any) {
+            port.postMessage({ id: msg.id, ok: false, error: e?.message || String(e) });
+        }
+    });
+}
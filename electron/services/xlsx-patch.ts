@@ -0,0 +1,494 @@
+import fs from 'fs';
+import path from 'path';
+import zlib from 'zlib';
+
+/**
+ * In-place patch writer for the master result column.
+ *
+ * The source .xlsx is copied to the output zip entry by entry: every entry
+ * is copied as raw compressed bytes, except the target worksheet and the
+ * shared strings table. In those two, only the result-column cells (and the
+ * sheet dimension) are rewritten, so styles, conditional formats, drawings and
+ * anything else SheetJS does not model are kept exactly as they were.
+ *
+ * Layouts the patcher does not handle (zip64, prefixed SpreadsheetML,
+ * cells without references, formulas in the result column) raise
+ * XlsxPatchUnsupportedError. The caller then uses the full writer instead.
+ */
+
+export class XlsxPatchUnsupportedError extends Error {
+    constructor(message: string) {
+        super(message);
+        this.name = 'XlsxPatchUnsupportedError';
+    }
+}
+
+export interface PatchColumn {
+    sheetName: string;
+    colIndex: number;
+    cells: Array<[number, string]>; // [row index, value], as computed by computeResultColumn
+}
+
+export interface PatchResult {
+    changedCells: number;
+    patchedEntries: string[]; // Zip entries that were rewritten; everything else is a raw copy
+}
+
+export interface ZipEntry {
+    name: string;
+    flags: number;
+    method: number;
+    crc: number;
+    compressedSize: number;
+    size: number;
+    localOffset: number;
+    central: Buffer; // Raw central directory record
+}
+
+const EOCD_SIGNATURE = 0x06054b50;
+const CENTRAL_SIGNATURE = 0x02014b50;
+const LOCAL_SIGNATURE = 0x04034b50;
+const DESCRIPTOR_SIGNATURE = 0x08074b50;
+const COPY_CHUNK = 1024 * 1024;
+
+let crcTable: Int32Array | null = null;
+
+function crc32(data: Buffer): number {
+    if (!crcTable) {
+        crcTable = new Int32Array(256);
+        for (let n = 0; n < 256; n++) {
+            let c = n;
+            for (let k = 0; k < 8; k++) c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1;
+            crcTable[n] = c;
+        }
+    }
+    let crc = -1;
+    for (let i = 0; i < data.length; i++) crc = crcTable[(crc ^ data[i]) & 0xff] ^ (crc >>> 8);
+    return (crc ^ -1) >>> 0;
+}
+
+function readAt(fd: number, position: number, length: number): Buffer {
+    const buffer = Buffer.alloc(length);
+    let read = 0;
+    while (read < length) {
+        const n = fs.readSync(fd, buffer, read, length - read, position + read);
+        if (n === 0) throw new Error('Unexpected end of zip file');
+        read += n;
+    }
+    return buffer;
+}
+
+export function readZipEntries(fd: number): ZipEntry[] {
+    const fileSize = fs.fstatSync(fd).size;
+    const tailLength = Math.min(fileSize, 22 + 0xffff);
+    const tail = readAt(fd, fileSize - tailLength, tailLength);
+
+    let eocd = -1;
+    for (let i = tail.length - 22; i >= 0; i--) {
+        if (tail.readUInt32LE(i) === EOCD_SIGNATURE) {
+            eocd = i;
+            break;
+        }
+    }
+    if (eocd === -1) throw new Error('Not a zip file');
+
+    const count = tail.readUInt16LE(eocd + 10);
+    const directorySize = tail.readUInt32LE(eocd + 12);
+    const directoryOffset = tail.readUInt32LE(eocd + 16);
+    if (count === 0xffff || directorySize === 0xffffffff || directoryOffset === 0xffffffff) {
+        throw new XlsxPatchUnsupportedError('zip64 archives are not patched');
+    }
+
+    const directory = readAt(fd, directoryOffset, directorySize);
+    const entries: ZipEntry[] = [];
+    let pos = 0;
+    for (let i = 0; i < count; i++) {
+        if (directory.readUInt32LE(pos) !== CENTRAL_SIGNATURE) throw new Error('Corrupt zip central directory');
+        const nameLength = directory.readUInt16LE(pos + 28);
+        const recordLength = 46 + nameLength + directory.readUInt16LE(pos + 30) + directory.readUInt16LE(pos + 32);
+        entries.push({
+            name: directory.toString('utf8', pos + 46, pos + 46 + nameLength),
+            flags: directory.readUInt16LE(pos + 8),
+            method: directory.readUInt16LE(pos + 10),
+            crc: directory.readUInt32LE(pos + 16),
+            compressedSize: directory.readUInt32LE(pos + 20),
+            size: directory.readUInt32LE(pos + 24),
+            localOffset: directory.readUInt32LE(pos + 42),
+            central: directory.subarray(pos, pos + recordLength)
+        });
+        pos += recordLength;
+    }
+    return entries;
+}
+
+// Offset of the entry's compressed data
+function dataOffset(fd: number, entry: ZipEntry): number {
+    const header = readAt(fd, entry.localOffset, 30);
+    if (header.readUInt32LE(0) !== LOCAL_SIGNATURE) throw new Error(`Corrupt zip entry: ${entry.name}`);
+    return entry.localOffset + 30 + header.readUInt16LE(26) + header.readUInt16LE(28);
+}
+
+export function readZipEntry(fd: number, entry: ZipEntry): Buffer {
+    const data = readAt(fd, dataOffset(fd, entry), entry.compressedSize);
+    if (entry.method === 0) return data;
+    if (entry.method === 8) return zlib.inflateRawSync(data);
+    throw new XlsxPatchUnsupportedError(`Unsupported compression for ${entry.name}`);
+}
+
+// Raw bytes of an entry: local header, data and data descriptor
+function entrySpan(fd: number, entry: ZipEntry): number {
+    const end = dataOffset(fd, entry) + entry.compressedSize;
+    if (!(entry.flags & 0x8)) return end - entry.localOffset;
+    const signature = readAt(fd, end, 4).readUInt32LE(0);
+    return end + (signature === DESCRIPTOR_SIGNATURE ? 16 : 12) - entry.localOffset;
+}
+
+class ZipOutput {
+    private fd: number;
+    private offset = 0;
+    private directory: Buffer[] = [];
+
+    constructor(fd: number) {
+        this.fd = fd;
+    }
+
+    private write(buffer: Buffer) {
+        let written = 0;
+        while (written < buffer.length) written += fs.writeSync(this.fd, buffer, written, buffer.length - written);
+        this.offset += buffer.length;
+    }
+
+    copy(sourceFd: number, entry: ZipEntry) {
+        const central = Buffer.from(entry.central);
+        central.writeUInt32LE(this.offset, 42);
+        this.directory.push(central);
+
+        const span = entrySpan(sourceFd, entry);
+        for (let done = 0; done < span; done += COPY_CHUNK) {
+            this.write(readAt(sourceFd, entry.localOffset + done, Math.min(COPY_CHUNK, span - done)));
+        }
+    }
+
+    add(entry: ZipEntry, content: Buffer) {
+        const compressed = zlib.deflateRawSync(content);
+        const crc = crc32(content);
+        const flags = entry.flags & 0x0800; // Keep the UTF-8 name flag, drop the data descriptor
+        const name = entry.central.subarray(46, 46 + entry.central.readUInt16LE(28));
+
+        const local = Buffer.alloc(30);
+        local.writeUInt32LE(LOCAL_SIGNATURE, 0);
+        local.writeUInt16LE(20, 4);
+        local.writeUInt16LE(flags, 6);
+        local.writeUInt16LE(8, 8);
+        entry.central.copy(local, 10, 12, 16); // Modification time and date
+        local.writeUInt32LE(crc, 14);
+        local.writeUInt32LE(compressed.length, 18);
+        local.writeUInt32LE(content.length, 22);
+        local.writeUInt16LE(name.length, 26);
+        local.writeUInt16LE(0, 28);
+
+        const central = Buffer.from(entry.central);
+        central.writeUInt16LE(flags, 8);
+        central.writeUInt16LE(8, 10);
+        central.writeUInt32LE(crc, 16);
+        central.writeUInt32LE(compressed.length, 20);
+        central.writeUInt32LE(content.length, 24);
+        central.writeUInt32LE(this.offset, 42);
+        this.directory.push(central);
+
+        this.write(local);
+        this.write(name);
+        this.write(compressed);
+    }
+
+    finish() {
+        const directoryOffset = this.offset;
+        for (const record of this.directory) this.write(record);
+        const eocd = Buffer.alloc(22);
+        eocd.writeUInt32LE(EOCD_SIGNATURE, 0);
+        eocd.writeUInt16LE(this.directory.length, 8);
+        eocd.writeUInt16LE(this.directory.length, 10);
+        eocd.writeUInt32LE(this.offset - directoryOffset, 12);
+        eocd.writeUInt32LE(directoryOffset, 16);
+        this.write(eocd);
+    }
+}
+
+function escapeXml(value: string): string {
+    return value.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+}
+
+function unescapeXml(value: string): string {
+    return value.replace(/&(lt|gt|quot|apos|amp);/g, (_, name) => ({ lt: '<', gt: '>', quot: '"', apos: "'", amp: '&' } as any)[name]);
+}
+
+function attribute(attrs: string, name: string): string | undefined {
+    const match = new RegExp(`\\s${name}="([^"]*)"`).exec(attrs);
+    return match ? unescapeXml(match[1]) : undefined;
+}
+
+function columnNumber(letters: string): number {
+    let n = 0;
+    for (let i = 0; i < letters.length; i++) n = n * 26 + letters.charCodeAt(i) - 64;
+    return n - 1;
+}
+
+function columnLetters(index: number): string {
+    let letters = '';
+    for (let n = index + 1; n > 0; n = Math.floor((n - 1) / 26)) letters = String.fromCharCode(65 + ((n - 1) % 26)) + letters;
+    return letters;
+}
+
+function resolvePart(baseDir: string, target: string): string {
+    return target.startsWith('/') ? target.slice(1) : path.posix.normalize(path.posix.join(baseDir, target));
+}
+
+// Relationships of a part, as [type suffix, resolved target] pairs keyed by id
+function readRelationships(xml: string, baseDir: string): Map<string, { type: string; target: string }> {
+    const rels = new Map<string, { type: string; target: string }>();
+    for (const match of xml.matchAll(/<Relationship\b([^>]*?)\/?>/g)) {
+        const id = attribute(match[1], 'Id');
+        const target = attribute(match[1], 'Target');
+        if (!id || !target || attribute(match[1], 'TargetMode') === 'External') continue;
+        rels.set(id, { type: attribute(match[1], 'Type') || '', target: resolvePart(baseDir, target) });
+    }
+    return rels;
+}
+
+function relsPathFor(part: string): string {
+    return path.posix.join(path.posix.dirname(part), '_rels', `${path.posix.basename(part)}.rels`);
+}
+
+interface SheetParts {
+    sheet: string;
+    sharedStrings?: string;
+}
+
+function locateSheet(read: (name: string) => string, sheetName: string): SheetParts {
+    const rootRels = readRelationships(read('_rels/.rels'), '');
+    const workbookPart = Array.from(rootRels.values()).find(rel => rel.type.endsWith('/officeDocument'))?.target;
+    if (!workbookPart) throw new XlsxPatchUnsupportedError('Workbook part not found');
+
+    const workbookXml = read(workbookPart);
+    if (!/<workbook\b/.test(workbookXml)) throw new XlsxPatchUnsupportedError('Prefixed SpreadsheetML is not patched');
+    const rels = readRelationships(read(relsPathFor(workbookPart)), path.posix.dirname(workbookPart));
+
+    let relId: string | undefined;
+    for (const match of workbookXml.matchAll(/<sheet\b([^>]*?)\/?>/g)) {
+        if (attribute(match[1], 'name') === sheetName) {
+            relId = /\s[\w]+:id="([^"]*)"/.exec(match[1])?.[1];
+            break;
+        }
+    }
+    const sheet = relId ? rels.get(relId)?.target : undefined;
+    if (!sheet) throw new XlsxPatchUnsupportedError(`Sheet not found: ${sheetName}`);
+
+    const sharedStrings = Array.from(rels.values()).find(rel => rel.type.endsWith('/sharedStrings'))?.target;
+    return { sheet, sharedStrings };
+}
+
+/**
+ * Shared strings table with only new strings appended. Existing plain-text
+ * items are reused, so re-running a job does not grow the table.
+ */
+class SharedStrings {
+    private xml: string;
+    private indexes = new Map<string, number>();
+    private added: string[] = [];
+    private count: number;
+    private references = 0;
+
+    constructor(xml: string) {
+        this.xml = xml;
+        let index = 0;
+        for (const match of xml.matchAll(/<si>(?:<t>([^<]*)<\/t>|<t xml:space="preserve">([^<]*)<\/t>)?/g)) {
+            const text = match[1] ?? match[2];
+            if (text !== undefined && xml.startsWith('</si>', match.index! + match[0].length)) {
+                const value = unescapeXml(text);
+                if (!this.indexes.has(value)) this.indexes.set(value, index);
+            }
+            index++;
+        }
+        this.count = index;
+    }
+
+    indexOf(value: string): number {
+        this.references++;
+        let index = this.indexes.get(value);
+        if (index === undefined) {
+            index = this.count++;
+            this.indexes.set(value, index);
+            this.added.push(value);
+        }
+        return index;
+    }
+
+    get changed(): boolean {
+        return this.added.length > 0;
+    }
+
+    toXml(): string {
+        const items = this.added.map(value => `<si><t xml:space="preserve">${escapeXml(value)}</t></si>`).join('');
+        let xml = this.xml.replace(/<sst\b([^>]*?)\s*\/>/, '<sst$1></sst>');
+        xml = xml.replace(/<\/sst>\s*$/, `${items}</sst>`);
+        return xml.replace(/<sst\b[^>]*>/, tag => {
+            let updated = tag.replace(/\suniqueCount="\d+"/, ` uniqueCount="${this.count}"`);
+            updated = updated.replace(/\scount="(\d+)"/, (_, n) => ` count="${Number(n) + this.references}"`);
+            return updated;
+        });
+    }
+}
+
+function cellXml(ref: string, style: string, value: string, strings?: SharedStrings): string {
+    return strings
+        ? `<c r="${ref}"${style} t="s"><v>${strings.indexOf(value)}</v></c>`
+        : `<c r="${ref}"${style} t="inlineStr"><is><t xml:space="preserve">${escapeXml(value)}</t></is></c>`;
+}
+
+// Insert or replace the result cell of one row; rowXml is the whole <row> element
+function patchRow(rowXml: string, rowNumber: number, colIndex: number, value: string, strings?: SharedStrings): string {
+    const open = /^<row\b([^>]*?)(\/?)>/.exec(rowXml)!;
+    let attrs = open[1];
+    const spans = /\sspans="(\d+):(\d+)"/.exec(attrs);
+    if (spans) {
+        const from = Math.min(Number(spans[1]), colIndex + 1);
+        const to = Math.max(Number(spans[2]), colIndex + 1);
+        attrs = attrs.replace(spans[0], ` spans="${from}:${to}"`);
+    }
+
+    const ref = `${columnLetters(colIndex)}${rowNumber}`;
+    if (open[2]) return `<row${attrs}>${cellXml(ref, '', value, strings)}</row>`;
+
+    const body = rowXml.slice(open[0].length, rowXml.length - '</row>'.length);
+    const cellPattern = /<c\b([^>]*?)(\/?)>/g;
+    for (let match = cellPattern.exec(body); match; match = cellPattern.exec(body)) {
+        const cellRef = /\sr="([A-Z]+)\d+"/.exec(match[1]);
+        if (!cellRef) throw new XlsxPatchUnsupportedError('Cells without references are not patched');
+        const end = match[2] ? cellPattern.lastIndex : body.indexOf('</c>', cellPattern.lastIndex) + '</c>'.length;
+        const col = columnNumber(cellRef[1]);
+        if (col < colIndex) {
+            cellPattern.lastIndex = end;
+            continue;
+        }
+        if (col > colIndex) {
+            return `<row${attrs}>${body.slice(0, match.index)}${cellXml(ref, '', value, strings)}${body.slice(match.index)}</row>`;
+        }
+        // Replace the existing cell, keeping its style
+        const existing = body.slice(match.index, end);
+        if (/<f\b/.test(existing)) throw new XlsxPatchUnsupportedError(`Result cell ${ref} holds a formula`);
+        const style = /\ss="\d+"/.exec(match[1])?.[0] || '';
+        return `<row${attrs}>${body.slice(0, match.index)}${cellXml(ref, style, value, strings)}${body.slice(end)}</row>`;
+    }
+    return `<row${attrs}>${body}${cellXml(ref, '', value, strings)}</row>`;
+}
+
+function newRow(rowNumber: number, colIndex: number, value: string, strings?: SharedStrings): string {
+    return `<row r="${rowNumber}">${cellXml(`${columnLetters(colIndex)}${rowNumber}`, '', value, strings)}</row>`;
+}
+
+// Widen <dimension ref> to cover the result column and rows
+function patchDimension(xml: string, colIndex: number, maxRow: number): string {
+    return xml.replace(/<dimension ref="([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?"\s*\/>/, (tag, c1, r1, c2, r2) => {
+        const endCol = Math.max(columnNumber(c2 || c1), colIndex);
+        const endRow = Math.max(Number(r2 || r1), maxRow);
+        return `<dimension ref="${c1}${r1}:${columnLetters(endCol)}${endRow}"/>`;
+    });
+}
+
+/**
+ * Rewrite the result cells of a worksheet. Rows are scanned but only rows
+ * with a change are re-serialized; everything in between is sliced through.
+ */
+function patchSheetXml(xml: string, column: Omit<PatchColumn, 'sheetName'>, strings?: SharedStrings): string {
+    if (!/<worksheet\b/.test(xml)) throw new XlsxPatchUnsupportedError('Prefixed SpreadsheetML is not patched');
+    const changes = column.cells
+        .map(([rowIndex, value]) => [rowIndex + 1, value] as [number, string])
+        .sort((a, b) => a[0] - b[0]);
+    if (changes.length === 0) return xml;
+
+    let source = xml.replace(/<sheetData\s*\/>/, '<sheetData></sheetData>');
+    const dataStart = source.indexOf('<sheetData>');
+    if (dataStart === -1) throw new XlsxPatchUnsupportedError('Sheet data not found');
+    const contentStart = dataStart + '<sheetData>'.length;
+    const contentEnd = source.indexOf('</sheetData>', contentStart);
+
+    const parts: string[] = [source.slice(0, contentStart)];
+    let copiedTo = contentStart;
+    let next = 0;
+    let rowNumber = 0;
+    const rowPattern = /<row\b([^>]*?)(\/?)>/g;
+    rowPattern.lastIndex = contentStart;
+
+    for (let match = rowPattern.exec(source); match && match.index < contentEnd; match = rowPattern.exec(source)) {
+        const r = /\sr="(\d+)"/.exec(match[1]);
+        rowNumber = r ? Number(r[1]) : rowNumber + 1;
+        const end = match[2] ? rowPattern.lastIndex : source.indexOf('</row>', rowPattern.lastIndex) + '</row>'.length;
+        rowPattern.lastIndex = end;
+
+        // Rows that do not exist yet go in front of the first row after them
+        while (next < changes.length && changes[next][0] < rowNumber) {
+            parts.push(source.slice(copiedTo, match.index), newRow(changes[next][0], column.colIndex, changes[next][1], strings));
+            copiedTo = match.index;
+            next++;
+        }
+        if (next < changes.length && changes[next][0] === rowNumber) {
+            let rowXml = source.slice(match.index, end);
+            // A row listed twice keeps the last value, as with cell assignment
+            while (next < changes.length && changes[next][0] === rowNumber) {
+                rowXml = patchRow(rowXml, rowNumber, column.colIndex, changes[next][1], strings);
+                next++;
+            }
+            parts.push(source.slice(copiedTo, match.index), rowXml);
+            copiedTo = end;
+        }
+    }
+    parts.push(source.slice(copiedTo, contentEnd));
+    for (; next < changes.length; next++) parts.push(newRow(changes[next][0], column.colIndex, changes[next][1], strings));
+    parts.push(source.slice(contentEnd));
+
+    source = parts.join('');
+    return patchDimension(source, column.colIndex, changes[changes.length - 1][0]);
+}
+
+/**
+ * Copy sourcePath to outputPath with the result column written into the
+ * named sheet. Only the worksheet and the shared strings entries change.
+ */
+export function patchResultColumn(sourcePath: string, outputPath: string, column: PatchColumn): PatchResult {
+    const sourceFd = fs.openSync(sourcePath, 'r');
+    try {
+        const entries = readZipEntries(sourceFd);
+        const byName = new Map(entries.map(entry => [entry.name, entry]));
+        const read = (name: string): string => {
+            const entry = byName.get(name);
+            if (!entry) throw new XlsxPatchUnsupportedError(`Missing zip entry: ${name}`);
+            return readZipEntry(sourceFd, entry).toString('utf8');
+        };
+
+        const parts = locateSheet(read, column.sheetName);
+        const strings = parts.sharedStrings && byName.has(parts.sharedStrings)
+            ? new SharedStrings(read(parts.sharedStrings))
+            : undefined; // Without a table, cells are written as inline strings
+        const sheetXml = patchSheetXml(read(parts.sheet), column, strings);
+
+        const replaced = new Map<string, string>([[parts.sheet, sheetXml]]);
+        if (strings?.changed) replaced.set(parts.sharedStrings!, strings.toXml());
+
+        const outputFd = fs.openSync(outputPath, 'w');
+        try {
+            const zip = new ZipOutput(outputFd);
+            for (const entry of entries) {
+                const content = replaced.get(entry.name);
+                if (content === undefined) zip.copy(sourceFd, entry);
+                else zip.add(entry, Buffer.from(content, 'utf8'));
+            }
+            zip.finish();
+        } finally {
+            fs.closeSync(outputFd);
+        }
+
+        return { changedCells: column.cells.length, patchedEntries: Array.from(replaced.keys()) };
+    } finally {
+        fs.closeSync(sourceFd);
+    }
+}
@@ -0,0 +1,25 @@
+import { describe, it, expect } from 'vitest';
+import { mapConcurrent } from '../concurrency';
+
+describe('mapConcurrent', () => {
+    it('keeps input order and never exceeds the limit', async () => {
+        let inFlight = 0;
+        let peak = 0;
+        const delays = [30, 5, 20, 1, 10, 2];
+
+        const results = await mapConcurrent(delays, 2, async (delay, index) => {
+            inFlight++;
+            peak = Math.max(peak, inFlight);
+            await new Promise(resolve => setTimeout(resolve, delay));
+            inFlight--;
+            return index;
+        });
+
+        expect(results).toEqual([0, 1, 2, 3, 4, 5]);
+        expect(peak).toBe(2);
+    });
+
+    it('handles an empty list', async () => {
+        expect(await mapConcurrent([], 4, async () => 1)).toEqual([]);
+    });
+});
@@ -0,0 +1,56 @@
+import { describe, it, expect } from 'vitest';
+import * as XLSX from 'xlsx';
+import { sampleSheetRows, readSheetRows, findHeaderRow, findFooterStartRow } from '../excel-utils';
+
+function sheetOf(rowCount: number) {
+    const rows: any[][] = [['Title'], [], ['Ticket No', 'Qty']];
+    for (let i = 3; i < rowCount - 1; i++) rows.push([String(1000000000 + i), i]);
+    rows.push(['Grand Total', 0]);
+    return { rows, sheet: XLSX.utils.aoa_to_sheet(rows) };
+}
+
+describe('sampleSheetRows', () => {
+    it('samples head, tail and strided middle rows with sheet_to_json indexing', () => {
+        const { rows, sheet } = sheetOf(5000);
+        const sample = sampleSheetRows(sheet, { head: 20, tail: 20, middle: 10 });
+
+        expect(sample.rowCount).toBe(5000);
+        expect(sample.indices.length).toBeLessThanOrEqual(50);
+        for (const i of sample.indices) {
+            expect(sample.rows[i]).toEqual(rows[i]);
+        }
+        expect(sample.runs[0]).toEqual([0, 20]);
+        expect(sample.runs[sample.runs.length - 1]).toEqual([4980, 5000]);
+    });
+
+    it('gives the same header and footer as the full rows', () => {
+        const { rows, sheet } = sheetOf(800);
+        const sample = sampleSheetRows(sheet);
+
+        expect(findHeaderRow(sample.rows)).toBe(findHeaderRow(rows));
+        expect(findFooterStartRow(sample.rows)).toBe(findFooterStartRow(rows));
+    });
+
+    it('counts columns of unsampled rows', () => {
+        const { rows } = sheetOf(5000);
+        rows[2501] = ['x', 1, '', 'note'];
+        const sample = sampleSheetRows(XLSX.utils.aoa_to_sheet(rows), { head: 20, tail: 20, middle: 10 });
+
+        expect(sample.indices).not.toContain(2501);
+        expect(sample.colCount).toBe(4);
+    });
+
+    it('returns an empty sample for a sheet without a range', () => {
+        expect(sampleSheetRows({} as XLSX.WorkSheet).rowCount).toBe(0);
+    });
+});
+
+describe('readSheetRows', () => {
+    it('reads a window of rows with sheet_to_json indexing', () => {
+        const { rows, sheet } = sheetOf(300);
+
+        expect(readSheetRows(sheet, 0, 200)).toEqual(rows.slice(0, 200));
+        expect(readSheetRows(sheet, 290, 200)).toEqual(rows.slice(290));
+        expect(readSheetRows(sheet, 300, 10)).toEqual([]);
+    });
+});
@@ -0,0 +1,70 @@
+// @vitest-environment node
+import { describe, it, expect, vi } from 'vitest';
+import { lazyModule, registerLazyHandlers } from '../lazy-module';
+
+vi.mock('electron', () => ({
+    app: { getPath: () => '' },
+    ipcMain: { handle: vi.fn(), removeHandler: vi.fn() },
+    BrowserWindow: { getAllWindows: () => [] },
+    dialog: {},
+    shell: {}
+}));
+
+function fakeIpc() {
+    const handlers = new Map<string, (...args: any[]) => any>();
+    return {
+        handlers,
+        handle: (channel: string, listener: (...args: any[]) => any) => {
+            if (handlers.has(channel)) throw new Error(`Attempted to register a second handler for '${channel}'`);
+            handlers.set(channel, listener);
+        },
+        removeHandler: (channel: string) => { handlers.delete(channel); }
+    };
+}
+
+describe('lazyModule', () => {
+    it('loads once and retries after a failed load', async () => {
+        const load = vi.fn()
+            .mockRejectedValueOnce(new Error('not yet'))
+            .mockResolvedValue({ answer: 42 });
+        const mod = lazyModule(load);
+
+        expect(mod.loaded()).toBeUndefined();
+        await expect(mod.get()).rejects.toThrow('not yet');
+        expect(await mod.get()).toEqual({ answer: 42 });
+        await mod.get();
+
+        expect(load).toHaveBeenCalledTimes(2);
+        expect(mod.loaded()).toEqual({ answer: 42 });
+    });
+});
+
+describe('registerLazyHandlers', () => {
+    it('loads the module on first call and swaps the stubs for the real handlers', async () => {
+        const ipc = fakeIpc();
+        const load = vi.fn(async () => ({
+            register(registry: { handle: (channel: string, listener: (...args: any[]) => any) => void }) {
+                registry.handle('demo:echo', async (_event, value) => `echo ${value}`);
+                registry.handle('demo:ping', () => 'pong');
+            }
+        }));
+        registerLazyHandlers(ipc, ['demo:echo', 'demo:ping'], lazyModule(load), (mod, registry) => mod.register(registry));
+        const stub = ipc.handlers.get('demo:echo')!;
+
+        expect(load).not.toHaveBeenCalled();
+        expect(await stub({}, 'a')).toBe('echo a');
+        expect(ipc.handlers.get('demo:echo')).not.toBe(stub);
+        expect(await ipc.handlers.get('demo:ping')!({})).toBe('pong');
+        expect(await stub({}, 'b')).toBe('echo b'); // A call that reached the stub before the swap
+        expect(load).toHaveBeenCalledTimes(1);
+    });
+
+    it('stubs every channel the excel handlers register', async () => {
+        const { EXCEL_CHANNELS } = await import('../../handlers');
+        const { registerExcelHandlers } = await import('../../handlers/excel');
+        const channels: string[] = [];
+        registerExcelHandlers({ handle: channel => { channels.push(channel); } });
+
+        expect([...channels].sort()).toEqual([...EXCEL_CHANNELS].sort());
+    });
+});
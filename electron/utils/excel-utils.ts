@@ -23,6 +23,12 @@ export const RESULT_COLUMN_PATTERNS = [
     { pattern: /payment.*status/i, priority: 90 },
 ];
 
+// Parse options shared by every read-only consumer so they hit the same workbook cache entry
+export const WORKBOOK_READ_OPTIONS: XLSX.ParsingOptions = { cellDates: false, raw: true };
+
+// Keep number formats and styles (dates, colors) for workbooks that are written back out
+export const WORKBOOK_WRITE_OPTIONS: XLSX.ParsingOptions = { cellDates: false, cellNF: true, cellStyles: true };
+
 // Helper: Get sheet by name or default to first
 export function getSheet(workbook: XLSX.WorkBook, sheetName?: string): { sheet: XLSX.WorkSheet, name: string } {
     const name = sheetName && workbook.SheetNames.includes(sheetName)
@@ -159,7 +165,12 @@ export function analyzeColumnQuality(
     };
 }
 
-export function detectFileIssues(data: any[][], headerRow: number, footerRow: number): { type: 'warning' | 'error', message: string }[] {
+export function detectFileIssues(
+    data: any[][],
+    headerRow: number,
+    footerRow: number,
+    scanRanges?: Array<[number, number]> // Contiguous [start, end) runs to check for gaps; defaults to all data rows
+): { type: 'warning' | 'error', message: string }[] {
     const issues: { type: 'warning' | 'error', message: string }[] = [];
     const totalRows = footerRow - headerRow - 1;
 
@@ -173,16 +184,19 @@ export function detectFileIssues(data: any[][], headerRow: number, footerRow: nu
     }
 
     // Check for empty rows in the middle of data
-    let consecutiveEmpty = 0;
-    for (let i = headerRow + 1; i < footerRow; i++) {
-        const row = data[i];
-        const isEmpty = !row || row.filter((c: any) => c !== undefined && c !== '').length === 0;
-        if (isEmpty) consecutiveEmpty++;
-        else consecutiveEmpty = 0;
-
-        if (consecutiveEmpty > 5) {
-            issues.push({ type: 'warning', message: 'Found large block of empty rows. Data might be fragmented.' });
-            break;
+    const ranges = scanRanges || [[headerRow + 1, footerRow]];
+    for (const [rangeStart, rangeEnd] of ranges) {
+        let consecutiveEmpty = 0;
+        for (let i = Math.max(rangeStart, headerRow + 1); i < Math.min(rangeEnd, footerRow); i++) {
+            const row = data[i];
+            const isEmpty = !row || row.filter((c: any) => c !== undefined && c !== '').length === 0;
+            if (isEmpty) consecutiveEmpty++;
+            else consecutiveEmpty = 0;
+
+            if (consecutiveEmpty > 5) {
+                issues.push({ type: 'warning', message: 'Found large block of empty rows. Data might be fragmented.' });
+                return issues;
+            }
         }
     }
 
@@ -252,3 +266,79 @@ export function findFooterStartRow(data: any[][]): number {
 
     return data.length; // No footer found, use end of data
 }
+
+/**
+ * Bounded row sample of a sheet for fast analysis.
+ *
+ * Rows are indexed exactly like `sheet_to_json(sheet, { header: 1 })`, but only the
+ * head, the tail and evenly strided rows in between are materialised. `rows` is a
+ * sparse array of length `rowCount`; `indices` lists the sampled positions in order.
+ */
+export interface SheetSample {
+    rows: any[][];
+    indices: number[];
+    rowCount: number;
+    colCount: number; // Columns of the sheet's used range, sampled or not
+    runs: Array<[number, number]>; // Contiguous sampled [start, end) runs
+}
+
+export const ANALYSIS_SAMPLE = { head: 50, tail: 50, middle: 400 };
+
+// Rows [start, start + count) of a sheet, indexed like sheet_to_json(sheet, { header: 1 })
+export function readSheetRows(sheet: XLSX.WorkSheet | undefined, start: number, count: number): any[][] {
+    if (!sheet || !sheet['!ref']) return [];
+    const range = XLSX.utils.decode_range(sheet['!ref']);
+    const end = Math.min(range.e.r - range.s.r + 1, start + count);
+    if (end <= start) return [];
+    const block = XLSX.utils.sheet_to_json(sheet, {
+        header: 1,
+        range: { s: { r: range.s.r + start, c: range.s.c }, e: { r: range.s.r + end - 1, c: range.e.c } }
+    }) as any[][];
+    return Array.from({ length: end - start }, (_, i) => block[i] || []);
+}
+
+export function sampleSheetRows(sheet: XLSX.WorkSheet | undefined, limits = ANALYSIS_SAMPLE): SheetSample {
+    const empty: SheetSample = { rows: [], indices: [], rowCount: 0, colCount: 0, runs: [] };
+    if (!sheet || !sheet['!ref']) return empty;
+
+    const range = XLSX.utils.decode_range(sheet['!ref']);
+    const rowCount = range.e.r - range.s.r + 1;
+    const rows: any[][] = [];
+    rows.length = rowCount;
+    const indices: number[] = [];
+    const runs: Array<[number, number]> = [];
+
+    // Materialise rows [start, end) with the same value semantics as sheet_to_json
+    const readRun = (start: number, end: number) => {
+        if (end <= start) return;
+        const block = XLSX.utils.sheet_to_json(sheet, {
+            header: 1,
+            range: { s: { r: range.s.r + start, c: range.s.c }, e: { r: range.s.r + end - 1, c: range.e.c } }
+        }) as any[][];
+        for (let i = start; i < end; i++) {
+            rows[i] = block[i - start] || [];
+            indices.push(i);
+        }
+        const last = runs[runs.length - 1];
+        if (last && last[1] === start) last[1] = end;
+        else runs.push([start, end]);
+    };
+
+    const headEnd = Math.min(rowCount, limits.head);
+    const tailStart = Math.max(headEnd, rowCount - limits.tail);
+    readRun(0, headEnd);
+
+    const middleCount = tailStart - headEnd;
+    if (middleCount > 0) {
+        const stride = Math.max(1, Math.ceil(middleCount / limits.middle));
+        for (let i = headEnd; i < tailStart; i += stride) {
+            readRun(i, i + 1);
+        }
+    }
+    readRun(tailStart, rowCount);
+
+    // Width of the whole used range, so an unsampled wider row is still counted
+    const colCount = range.e.c - range.s.c + 1;
+
+    return { rows, indices, rowCount, colCount, runs };
+}
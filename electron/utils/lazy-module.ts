@@ -0,0 +1,85 @@
+/**
+ * Deferred loading for main-process modules that pull in heavy dependencies
+ * (xlsx, pdf-lib). esbuild keeps a module that is only reached through
+ * `import()` out of the startup path, so it and its dependencies are first
+ * evaluated when `get()` is called.
+ */
+
+export interface LazyModule<T> {
+    get(): Promise<T>;
+    loaded(): T | undefined; // The module if it has been loaded, without loading it
+}
+
+export function lazyModule<T>(load: () => Promise<T>): LazyModule<T> {
+    let pending: Promise<T> | null = null;
+    let value: T | undefined;
+    return {
+        get() {
+            if (!pending) {
+                pending = load().then(mod => {
+                    value = mod;
+                    return mod;
+                }, error => {
+                    pending = null; // Let the next call try again
+                    throw error;
+                });
+            }
+            return pending;
+        },
+        loaded: () => value
+    };
+}
+
+type Listener = (event: any, ...args: any[]) => any;
+
+export interface HandlerRegistry {
+    handle(channel: string, listener: Listener): void;
+}
+
+export interface IpcHandlerTarget extends HandlerRegistry {
+    removeHandler(channel: string): void;
+}
+
+/**
+ * Register stubs for `channels` that load a handler module on first use.
+ *
+ * The first call to any of the channels loads the module and runs its
+ * register function against a collecting registry; the real handlers then
+ * replace the stubs on `ipc` and the call is forwarded. Later calls go
+ * straight to the real handlers. Every channel the module registers has to
+ * be listed, a missing one is only registered once the module is loaded.
+ */
+export function registerLazyHandlers<T>(
+    ipc: IpcHandlerTarget,
+    channels: readonly string[],
+    mod: LazyModule<T>,
+    register: (mod: T, registry: HandlerRegistry) => void
+): void {
+    let installed: Promise<Map<string, Listener>> | null = null;
+    const install = () => {
+        if (!installed) {
+            installed = mod.get().then(loaded => {
+                const handlers = new Map<string, Listener>();
+                register(loaded, { handle: (channel, listener) => { handlers.set(channel, listener); } });
+                handlers.forEach((listener, channel) => {
+                    if (channels.includes(channel)) ipc.removeHandler(channel);
+                    else console.warn(`[Startup] ${channel} is not listed as a lazy channel`);
+                    ipc.handle(channel, listener);
+                });
+                return handlers;
+            }, error => {
+                installed = null;
+                throw error;
+            });
+        }
+        return installed;
+    };
+
+    for (const channel of channels) {
+        ipc.handle(channel, async (event: any, ...args: any[]) => {
+            const listener = (await install()).get(channel);
+            if (!listener) throw new Error(`No handler registered for '${channel}'`);
+            return listener(event, ...args);
+        });
+    }
+}
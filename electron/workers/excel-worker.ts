@@ -0,0 +1,16 @@
+import { workerData } from 'worker_threads';
+import { serveTasks } from '../services/worker-pool';
+import { excelTaskHandlers } from '../services/excel-tasks';
+import { workbookCache } from '../services/workbook-cache';
+
+// Entry point of the excel worker pool (bundled to dist-electron/workers/excel-worker.js)
+//
+// Each worker has its own workbookCache, used by the matching tasks (analyzeFile, indexMaster,
+// matchTarget...). The main-process cache is separate and serves excel:readHeaders,
+// excel:readPreview and excel:readRows, whose row windows are read on every scroll and are not
+// worth a thread hop. A file previewed and then matched is therefore parsed once on each side.
+if (typeof workerData?.cacheBudgetBytes === 'number') {
+    workbookCache.setBudget(workerData.cacheBudgetBytes);
+}
+
+serveTasks(excelTaskHandlers);
@@ -0,0 +1,76 @@
+import fs from 'fs';
+import path from 'path';
+
+/**
+ * Compare two `vitest bench --outputJson` reports.
+ *
+ *   node scripts/bench-compare.mjs <baseline.json> <results.json> [--threshold 10]
+ *
+ * Prints the mean time of every benchmark in both reports and the change in
+ * percent, and exits with 1 when any benchmark got slower than the threshold
+ * (default 10%). A benchmark whose relative margin of error is larger than
+ * the threshold is reported but never fails the run.
+ */
+
+const args = process.argv.slice(2);
+const thresholdAt = args.indexOf('--threshold');
+const threshold = thresholdAt >= 0 ? Number(args[thresholdAt + 1]) : 10;
+const [baselinePath, resultsPath] = args.filter((_, i) => thresholdAt < 0 || (i !== thresholdAt && i !== thresholdAt + 1));
+
+if (!baselinePath || !resultsPath || !Number.isFinite(threshold)) {
+    console.error('Usage: node scripts/bench-compare.mjs <baseline.json> <results.json> [--threshold 10]');
+    process.exit(2);
+}
+
+// "file > group > bench" -> { mean (ms), rme (%) }; group names already start with the file
+function readReport(filePath) {
+    const report = JSON.parse(fs.readFileSync(filePath, 'utf8'));
+    const benchmarks = new Map();
+    for (const file of report.files || []) {
+        for (const group of file.groups || []) {
+            const groupName = group.fullName || path.basename(file.filepath || '');
+            for (const bench of group.benchmarks || []) {
+                benchmarks.set(`${groupName} > ${bench.name}`, { mean: bench.mean, rme: bench.rme || 0 });
+            }
+        }
+    }
+    return benchmarks;
+}
+
+const baseline = readReport(baselinePath);
+const results = readReport(resultsPath);
+const formatMs = ms => (ms >= 1000 ? `${(ms / 1000).toFixed(2)}s` : `${ms.toFixed(ms < 1 ? 3 : 1)}ms`);
+
+let regressions = 0;
+const rows = [];
+for (const [name, current] of results) {
+    const before = baseline.get(name);
+    if (!before) {
+        rows.push([name, '-', formatMs(current.mean), 'new']);
+        continue;
+    }
+    const change = ((current.mean - before.mean) / before.mean) * 100;
+    const noisy = Math.max(current.rme, before.rme) > threshold;
+    let verdict = '';
+    if (change > threshold) {
+        verdict = noisy ? 'slower (noisy)' : 'REGRESSION';
+        if (!noisy) regressions++;
+    } else if (change < -threshold) {
+        verdict = 'faster';
+    }
+    rows.push([name, formatMs(before.mean), formatMs(current.mean), `${change >= 0 ? '+' : ''}${change.toFixed(1)}% ${verdict}`.trim()]);
+}
+for (const name of baseline.keys()) {
+    if (!results.has(name)) rows.push([name, formatMs(baseline.get(name).mean), '-', 'missing']);
+}
+
+const widths = [0, 1, 2].map(col => Math.max(...rows.map(row => row[col].length), 8));
+console.log(['benchmark'.padEnd(widths[0]), 'baseline'.padStart(widths[1]), 'current'.padStart(widths[2]), 'change'].join('  '));
+for (const row of rows) {
+    console.log([row[0].padEnd(widths[0]), row[1].padStart(widths[1]), row[2].padStart(widths[2]), row[3]].join('  '));
+}
+
+if (regressions > 0) {
+    console.error(`\n${regressions} benchmark(s) slower than the baseline by more than ${threshold}%`);
+    process.exit(1);
+}
@@ -6,8 +6,11 @@ const __dirname = dirname(fileURLToPath(import.meta.url));
 const projectRoot = resolve(__dirname, '..');
 
 const entryPoints = [
+  resolve(projectRoot, 'electron/bootstrap.ts'),
   resolve(projectRoot, 'electron/main.ts'),
   resolve(projectRoot, 'electron/preload.ts'),
+  resolve(projectRoot, 'electron/workers/excel-worker.ts'),
+  resolve(projectRoot, 'electron/batch.ts'),
 ];
 
 await build({
@@ -16,12 +19,12 @@ await build({
   platform: 'node',
   target: 'node20',
   outdir: resolve(projectRoot, 'dist-electron'),
+  outbase: resolve(projectRoot, 'electron'),
   format: 'cjs',
   sourcemap: true,
   external: [
     'electron',
     'better-sqlite3',
-    'lowdb/node',
     'xlsx',
     'pdfmake',
     'pdf-lib',
@@ -1,9 +1,27 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { cn } from "@/lib/utils";
-import { ScrollArea } from "@/components/ui/scroll-area";
 import { Badge } from "@/components/ui/badge";
 import { Button } from "@/components/ui/button";
 import { Loader2, AlertCircle } from "lucide-react";
+import { useSheetRows } from "@/hooks/useSheetRows";
+import type { ElectronAPI, FileAnalysis } from "@/types";
+
+// Rows are virtualized: only those near the viewport are rendered and kept in memory
+const ROW_HEIGHT = 29;
+const OVERSCAN_ROWS = 20;
+
+type SheetLayout = Awaited<ReturnType<ElectronAPI['readExcelPreview']>>;
+
+// Layout hints the file's analysis already has for the sheet it analyzed
+function layoutFromAnalysis(analysis: FileAnalysis): SheetLayout {
+    return {
+        success: true,
+        headerRow: analysis.headerRowIndex,
+        footerStartRow: analysis.footerStartRow,
+        suggestedColumn: analysis.idColumn?.index,
+        suggestedRowRange: analysis.suggestedRowRange
+    };
+}
 
 interface SheetPreviewProps {
     filePath: string | null;
@@ -17,6 +35,7 @@ interface SheetPreviewProps {
     sheets?: string[];  // List of all sheets in the file
     selectedSheet?: string;  // Currently selected sheet
     onSheetChange?: (sheetName: string) => void;  // Callback when sheet changes
+    analysis?: FileAnalysis;  // Layout and first rows of the analyzed sheet, shown without re-reading the file
 }
 
 export function SheetPreview({
@@ -30,59 +49,98 @@ export function SheetPreview({
     selectionMode = 'range',
     sheets = [],
     selectedSheet,
-    onSheetChange
+    onSheetChange,
+    analysis
 }: SheetPreviewProps) {
-    const [data, setData] = useState<any[][]>([]);
-    const [rowCount, setRowCount] = useState(0);
-    const [loading, setLoading] = useState(false);
-    const [error, setError] = useState<string | null>(null);
+    const [metaLoading, setMetaLoading] = useState(false);
+    const [metaError, setMetaError] = useState<string | null>(null);
     const [rangeStart, setRangeStart] = useState<number | null>(null);
     const [isDragging, setIsDragging] = useState(false);
     const [rowRangeStart, setRowRangeStart] = useState<number | null>(null);
     const [headerRow, setHeaderRow] = useState<number | null>(null);
     const [footerStartRow, setFooterStartRow] = useState<number | null>(null);
+    const [scrollTop, setScrollTop] = useState(0);
+    const [viewportHeight, setViewportHeight] = useState(600);
+    const scrollRef = useRef<HTMLDivElement>(null);
+
+    // The analysis only describes the sheet it analyzed; other sheets are read from the main process
+    const analyzed = analysis?.success && analysis.filePath === filePath && analysis.selectedSheet === selectedSheet
+        ? analysis
+        : undefined;
+    const { totalRows: rowCount, totalCols: maxCols, loading: rowsLoading, error: rowsError, getRow, ensureRange } =
+        useSheetRows(filePath, selectedSheet, analyzed?.rowWindow);
 
+    // Latest selection props, so suggestions are applied once per file/sheet rather than on every change
+    const selectionRef = useRef({ selectedCols, selectedRowRange, onColumnSelect, onRowRangeSelect });
     useEffect(() => {
-        if (!filePath) {
-            setData([]);
-            setRowCount(0);
-            return;
-        }
+        selectionRef.current = { selectedCols, selectedRowRange, onColumnSelect, onRowRangeSelect };
+    });
 
-        const loadData = async () => {
-            setLoading(true);
-            setError(null);
+    // Layout hints (header/footer rows, suggested column and range) without any row data
+    useEffect(() => {
+        if (!filePath) return;
+        let cancelled = false;
+
+        const loadMeta = async () => {
+            setMetaLoading(true);
+            setMetaError(null);
             try {
-                const res = await window.electron.readExcelPreview(filePath, selectedSheet);
-                if (res.success && res.data) {
-                    setData(res.data);
-                    setRowCount(res.rowCount || res.data.length);
+                const res = analyzed ? layoutFromAnalysis(analyzed) : await window.electron.readExcelPreview(filePath, selectedSheet, 0);
+                if (cancelled) return;
+                if (res.success) {
                     setHeaderRow(res.headerRow || null);
                     setFooterStartRow(res.footerStartRow || null);
 
-                    if (res.suggestedColumn !== undefined && (!selectedCols || selectedCols.length === 0)) {
-                        onColumnSelect([res.suggestedColumn]);
+                    const current = selectionRef.current;
+                    if (res.suggestedColumn !== undefined && (!current.selectedCols || current.selectedCols.length === 0)) {
+                        current.onColumnSelect([res.suggestedColumn]);
                     }
 
-                    if (onRowRangeSelect && res.suggestedRowRange) {
-                        if (!selectedRowRange || selectedRowRange.start === 0) {
-                            onRowRangeSelect(res.suggestedRowRange);
+                    if (current.onRowRangeSelect && res.suggestedRowRange) {
+                        if (!current.selectedRowRange || current.selectedRowRange.start === 0) {
+                            current.onRowRangeSelect(res.suggestedRowRange);
                         }
                     }
                 } else {
-                    setError(res.error || "Failed to load preview");
+                    setMetaError(res.error || "Failed to load preview");
                 }
             } catch (err: any) {
-                setError(err.message);
+                if (!cancelled) setMetaError(err.message);
             } finally {
-                setLoading(false);
+                if (!cancelled) setMetaLoading(false);
             }
         };
 
-        loadData();
-    }, [filePath, selectedSheet, selectedCols, selectedRowRange, onColumnSelect, onRowRangeSelect]);
+        loadMeta();
+        return () => {
+            cancelled = true;
+        };
+    }, [filePath, selectedSheet, analyzed]);
+
+    // Back to the top when the sheet changes
+    useEffect(() => {
+        setScrollTop(0);
+        if (scrollRef.current) scrollRef.current.scrollTop = 0;
+    }, [filePath, selectedSheet]);
+
+    const loading = metaLoading || rowsLoading;
+    const error = metaError || rowsError;
+
+    const firstVisible = Math.max(0, Math.floor(scrollTop / ROW_HEIGHT) - OVERSCAN_ROWS);
+    const lastVisible = Math.min(rowCount, Math.ceil((scrollTop + viewportHeight) / ROW_HEIGHT) + OVERSCAN_ROWS);
+
+    useEffect(() => {
+        ensureRange(firstVisible, lastVisible);
+    }, [firstVisible, lastVisible, ensureRange]);
+
+    useEffect(() => {
+        const el = scrollRef.current;
+        if (!el) return;
+        const observer = new ResizeObserver(() => setViewportHeight(el.clientHeight));
+        observer.observe(el);
+        return () => observer.disconnect();
+    }, [loading, error]);
 
-    const maxCols = data.length > 0 ? Math.max(...data.map(r => r.length)) : 0;
     const displayCols = allowNewColumn ? maxCols + 1 : maxCols;
 
     if (!filePath) return null;
@@ -248,7 +306,11 @@ export function SheetPreview({
                     </div>
                 </div>
             ) : (
-                <ScrollArea className="flex-1">
+                <div
+                    ref={scrollRef}
+                    className="flex-1 overflow-auto"
+                    onScroll={(e) => setScrollTop(e.currentTarget.scrollTop)}
+                >
                     <table className="w-full text-sm">
                         <thead className="sticky top-0 z-10">
                             <tr className="bg-secondary">
@@ -277,7 +339,11 @@ export function SheetPreview({
                             </tr>
                         </thead>
                         <tbody>
-                            {data.map((row, rIndex) => {
+                            {firstVisible > 0 && (
+                                <tr style={{ height: firstVisible * ROW_HEIGHT }} aria-hidden />
+                            )}
+                            {Array.from({ length: lastVisible - firstVisible }, (_, i) => firstVisible + i).map(rIndex => {
+                                const row = getRow(rIndex) || [];
                                 const inRange = isRowInRange(rIndex);
                                 const rowNumber = rIndex + 1;
                                 const isHeader = rowNumber === headerRow;
@@ -286,6 +352,7 @@ export function SheetPreview({
                                 return (
                                     <tr
                                         key={rIndex}
+                                        style={{ height: ROW_HEIGHT }}
                                         className={cn(
                                             "transition-colors",
                                             inRange && "bg-success/10"
@@ -334,7 +401,10 @@ export function SheetPreview({
                                     </tr>
                                 );
                             })}
-                            {data.length === 0 && (
+                            {lastVisible < rowCount && (
+                                <tr style={{ height: (rowCount - lastVisible) * ROW_HEIGHT }} aria-hidden />
+                            )}
+                            {rowCount === 0 && (
                                 <tr>
                                     <td colSpan={displayCols + 1} className="py-12 text-center text-muted-foreground">
                                         No data found
@@ -343,7 +413,7 @@ export function SheetPreview({
                             )}
                         </tbody>
                     </table>
-                </ScrollArea>
+                </div>
             )}
         </div>
     );
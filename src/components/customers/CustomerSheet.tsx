@@ -25,9 +25,11 @@ interface CustomerSheetProps {
     onSave: (customer: Customer) => void;
     onDelete: (id: string) => void;
     invoices: Invoice[];
+    invoiceTotal: number; // All invoices of the customer; `invoices` may hold only the first pages
+    onLoadMoreInvoices: () => void;
 }
 
-export function CustomerSheet({ isOpen, onClose, customer, onSave, onDelete, invoices }: CustomerSheetProps) {
+export function CustomerSheet({ isOpen, onClose, customer, onSave, onDelete, invoices, invoiceTotal, onLoadMoreInvoices }: CustomerSheetProps) {
     const [formData, setFormData] = useState<Customer | null>(null);
 
     useEffect(() => {
@@ -108,9 +110,9 @@ export function CustomerSheet({ isOpen, onClose, customer, onSave, onDelete, inv
                                 <TabsTrigger value="stats" disabled={!formData.id}>Stats</TabsTrigger>
                                 <TabsTrigger value="history" disabled={!formData.id}>
                                     History
-                                    {invoices.length > 0 && (
+                                    {invoiceTotal > 0 && (
                                         <span className="ml-2 text-xs bg-primary/10 text-primary px-1.5 py-0.5 rounded-full">
-                                            {invoices.length}
+                                            {invoiceTotal}
                                         </span>
                                     )}
                                 </TabsTrigger>
@@ -274,6 +276,12 @@ export function CustomerSheet({ isOpen, onClose, customer, onSave, onDelete, inv
                                                 ))}
                                             </TableBody>
                                         </Table>
+                                        {invoices.length < invoiceTotal && (
+                                            <div className="flex items-center justify-between border-t px-4 py-2 text-xs text-muted-foreground">
+                                                <span>Showing {invoices.length} of {invoiceTotal}</span>
+                                                <Button variant="ghost" size="sm" onClick={onLoadMoreInvoices}>Load more</Button>
+                                            </div>
+                                        )}
                                     </div>
                                 )}
                             </TabsContent>
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
@@ -18,7 +18,8 @@ import {
     TableRow,
 } from "@/components/ui/table";
 
-
+// Invoices fetched per page of a customer's history
+const CUSTOMER_INVOICE_PAGE = 200;
 
 export function CustomerWorkspace() {
     const [customers, setCustomers] = useState<Customer[]>([]);
@@ -26,6 +27,8 @@ export function CustomerWorkspace() {
     const [isSheetOpen, setIsSheetOpen] = useState(false);
     const [isLoading, setIsLoading] = useState(true);
     const [customerInvoices, setCustomerInvoices] = useState<Invoice[]>([]);
+    const [customerInvoiceTotal, setCustomerInvoiceTotal] = useState(0);
+    const invoiceRequestRef = useRef(0);
     const [searchQuery, setSearchQuery] = useState('');
 
 
@@ -51,11 +54,15 @@ export function CustomerWorkspace() {
         setIsLoading(false);
     };
 
-    const loadCustomerInvoices = async (customerId: string) => {
-        const result = await window.electron.getInvoices();
+    const loadCustomerInvoices = async (customerId: string, offset = 0) => {
+        // Customer index lookup in the main process; newest first, one page at a time
+        const requestId = ++invoiceRequestRef.current;
+        const result = await window.electron.queryInvoices({ customerId, offset, limit: CUSTOMER_INVOICE_PAGE });
+        if (requestId !== invoiceRequestRef.current) return; // Another customer or page was requested since
         if (result.success && result.invoices) {
-            const related = result.invoices.filter(inv => inv.to.customerId === customerId);
-            setCustomerInvoices(related);
+            const page = result.invoices;
+            setCustomerInvoices(prev => offset === 0 ? page : [...prev, ...page]);
+            setCustomerInvoiceTotal(result.total ?? offset + page.length);
         }
     };
 
@@ -232,6 +239,8 @@ export function CustomerWorkspace() {
                     isOpen={isSheetOpen}
                     customer={selectedCustomer}
                     invoices={customerInvoices}
+                    invoiceTotal={customerInvoiceTotal}
+                    onLoadMoreInvoices={() => selectedCustomer?.id && loadCustomerInvoices(selectedCustomer.id, customerInvoices.length)}
                     onClose={() => {
                         setIsSheetOpen(false);
                         setSelectedCustomer(null);
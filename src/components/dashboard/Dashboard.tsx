@@ -3,7 +3,7 @@ import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import { Users, Receipt, CalendarClock, TrendingUp, Clock, CheckCircle2, ArrowUpRight, LayoutDashboard } from 'lucide-react';
 import { TopBar } from '@/components/layout/TopBar';
-import type { Invoice } from '@/types';
+import type { AgingBucket, DashboardSummary, Invoice } from '@/types';
 import { format } from 'date-fns';
 
 export function Dashboard() {
@@ -16,7 +16,7 @@ export function Dashboard() {
         trendingUp: true
     });
     const [recentInvoices, setRecentInvoices] = useState<Invoice[]>([]);
-    const [allInvoices, setAllInvoices] = useState<Invoice[]>([]);
+    const [aging, setAging] = useState<DashboardSummary['aging'] | null>(null);
     const [isLoading, setIsLoading] = useState(true);
 
     useEffect(() => {
@@ -26,82 +26,22 @@ export function Dashboard() {
     const loadData = async () => {
         setIsLoading(true);
         try {
-            const [invResult, custResult] = await Promise.all([
-                window.electron.getInvoices(),
-                window.electron.getCustomers()
-            ]);
-
-            if (invResult.success && invResult.invoices) {
-                const invoices = invResult.invoices;
-                setAllInvoices(invoices);
-
-                // --- Metric Calculations ---
-                const validInvoices = invoices.filter(inv => inv.status !== 'draft');
-
-                // 1. Total Revenue (All time or this year? Usually total for dashboard, or YTD. Let's stick to Total for now as per previous dummy)
-                // Actually, "Total Revenue" usually implies all time.
-                const revenue = validInvoices.reduce((acc, inv) => acc + inv.total, 0);
-
-                // 2. Outstanding
-                const outstanding = invoices
-                    .filter(inv => inv.status !== 'paid' && inv.status !== 'draft')
-                    .reduce((acc, inv) => acc + inv.total, 0);
-
-                // 3. Active Invoices Count
-                const activeInvoices = invoices.filter(inv => inv.status !== 'paid' && inv.status !== 'draft').length;
-
-                // 4. Revenue Trend (Current Month vs Last Month)
-                const now = new Date();
-                const currentMonth = now.getMonth();
-                const currentYear = now.getFullYear();
-
-                const lastMonthDate = new Date(now.getFullYear(), now.getMonth() - 1, 1);
-                const lastMonth = lastMonthDate.getMonth();
-                const lastMonthYear = lastMonthDate.getFullYear();
-
-                let currentMonthRevenue = 0;
-                let lastMonthRevenue = 0;
-
-                validInvoices.forEach(inv => {
-                    const d = new Date(inv.date || inv.createdAt); // prefer issue date
-                    if (d.getMonth() === currentMonth && d.getFullYear() === currentYear) {
-                        currentMonthRevenue += inv.total;
-                    } else if (d.getMonth() === lastMonth && d.getFullYear() === lastMonthYear) {
-                        lastMonthRevenue += inv.total;
-                    }
+            // Totals are maintained in the main process; this is one small payload
+            const result = await window.electron.getDashboardSummary();
+
+            if (result.success && result.summary) {
+                const summary = result.summary;
+                setRecentInvoices(summary.recentInvoices);
+                setAging(summary.aging);
+                setStats({
+                    revenue: summary.revenue,
+                    customers: summary.customerCount,
+                    outstanding: summary.outstanding,
+                    activeInvoices: summary.activeInvoices,
+                    revenueTrend: summary.revenueTrend,
+                    trendingUp: summary.revenueTrend >= 0
                 });
-
-                let revenueTrend = 0;
-                let trendingUp = true;
-
-                if (lastMonthRevenue === 0) {
-                    revenueTrend = currentMonthRevenue > 0 ? 100 : 0;
-                } else {
-                    revenueTrend = ((currentMonthRevenue - lastMonthRevenue) / lastMonthRevenue) * 100;
-                }
-
-                trendingUp = revenueTrend >= 0;
-
-                const sorted = [...invoices].sort((a, b) => new Date(b.createdAt || b.date).getTime() - new Date(a.createdAt || a.date).getTime());
-                setRecentInvoices(sorted.slice(0, 5));
-
-                setStats(prev => ({
-                    ...prev,
-                    revenue,
-                    outstanding,
-                    activeInvoices,
-                    revenueTrend,
-                    trendingUp
-                }));
             }
-
-            if (custResult.success && custResult.customers) {
-                setStats(prev => ({
-                    ...prev,
-                    customers: custResult.customers?.length || 0
-                }));
-            }
-
         } catch (error) {
             console.error("Failed to load dashboard data", error);
         } finally {
@@ -306,23 +246,7 @@ export function Dashboard() {
                                         </div>
                                     </div>
                                 ) : (() => {
-                                    const getBucket = (days: number) => {
-                                        if (days <= 30) return '0-30';
-                                        if (days <= 60) return '31-60';
-                                        if (days <= 90) return '61-90';
-                                        return '90+';
-                                    };
-
-                                    const agingInvoices = allInvoices
-                                        .filter(inv => inv.status !== 'paid' && inv.status !== 'draft')
-                                        .map(inv => {
-                                            const issueDate = new Date(inv.date);
-                                            const diffTime = new Date().getTime() - issueDate.getTime();
-                                            const ageDays = Math.floor(diffTime / (1000 * 60 * 60 * 24));
-                                            return { ...inv, daysOverdue: ageDays, bucket: getBucket(ageDays) };
-                                        });
-
-                                    const bucketConfig = [
+                                    const bucketConfig: { key: AgingBucket; label: string; color: string; bg: string; text: string }[] = [
                                         { key: '0-30', label: '0-30 Days', color: 'from-indigo-500 to-indigo-600', bg: 'bg-indigo-50', text: 'text-indigo-600' },
                                         { key: '31-60', label: '31-60 Days', color: 'from-amber-500 to-amber-600', bg: 'bg-amber-50', text: 'text-amber-600' },
                                         { key: '61-90', label: '61-90 Days', color: 'from-orange-500 to-orange-600', bg: 'bg-orange-50', text: 'text-orange-600' },
@@ -332,18 +256,17 @@ export function Dashboard() {
                                     return (
                                         <div className="space-y-3">
                                             {bucketConfig.map(({ key, label, bg, text }) => {
-                                                const bucketInvoices = agingInvoices.filter(inv => inv.bucket === key);
-                                                const total = bucketInvoices.reduce((acc, inv) => acc + inv.total, 0);
-                                                if (bucketInvoices.length === 0) return null;
+                                                const bucket = aging?.[key];
+                                                if (!bucket || bucket.count === 0) return null;
 
                                                 return (
                                                     <div key={key} className={`${bg} rounded-xl p-4`}>
                                                         <div className="flex items-center justify-between mb-2">
                                                             <span className={`text-sm font-semibold ${text}`}>{label}</span>
-                                                            <span className={`text-xs font-medium ${text}`}>{bucketInvoices.length} invoice{bucketInvoices.length > 1 ? 's' : ''}</span>
+                                                            <span className={`text-xs font-medium ${text}`}>{bucket.count} invoice{bucket.count > 1 ? 's' : ''}</span>
                                                         </div>
                                                         <div className={`text-lg font-bold ${text}`}>
-                                                            {total.toLocaleString()} <span className="text-sm font-medium">QAR</span>
+                                                            {bucket.amount.toLocaleString()} <span className="text-sm font-medium">QAR</span>
                                                         </div>
                                                     </div>
                                                 );
@@ -60,12 +60,14 @@ export function InvoicePrintView() {
             (window.electron as any).sendPrintWindowReady();
         }
 
-        const handleData = (_: any, invoice: InvoiceData) => {
+        // Pooled print windows are reused, so each invoice arrives with its print id and current banking details
+        const handleData = (_: any, invoice: InvoiceData, printId?: number, banking?: BankingDetails | null) => {
             console.log('[PrintView] Received invoice data');
+            if (banking !== undefined) setBankingDetails(banking);
             setData(invoice);
             setTimeout(() => {
                 console.log('[PrintView] Sending print-ready signal...');
-                window.electron.sendPrintReady();
+                window.electron.sendPrintReady(printId);
             }, 400);
         };
 
@@ -1,14 +1,15 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { Button } from '@/components/ui/button';
 import { Badge } from '@/components/ui/badge';
 import { Card, CardContent } from '@/components/ui/card';
-import { Receipt, ArrowLeft, Calendar, TrendingUp, Clock, AlertCircle, ChevronDown, Plus } from 'lucide-react';
+import { Receipt, ArrowLeft, Calendar, TrendingUp, Clock, AlertCircle, ChevronDown, Plus, Download } from 'lucide-react';
 import { TopBar } from '@/components/layout/TopBar';
 import { toast } from 'sonner';
 import { GlassAlertDialog } from '@/components/ui/glass-alert-dialog';
 import { EmptyState } from '@/components/ui/EmptyState';
 import { LoadingState } from '@/components/ui/LoadingState';
-import type { Invoice } from '@/types';
+import type { Invoice, InvoiceExportProgress, InvoiceOverview } from '@/types';
+import { useDebounce } from '@/hooks/useDebounce';
 import { InvoiceEditor } from './InvoiceEditor';
 import { format } from 'date-fns';
 import {
@@ -24,28 +25,62 @@ interface InvoiceWorkspaceProps {
     onNavigate?: (module: string) => void;
 }
 
+// Invoices per page; filtering, sorting and paging run in the main process
+const PAGE_SIZE = 50;
+
 export function InvoiceWorkspace({ onNavigate }: InvoiceWorkspaceProps) {
     const [invoices, setInvoices] = useState<Invoice[]>([]);
+    const [totalMatches, setTotalMatches] = useState(0);
+    const [overview, setOverview] = useState<InvoiceOverview | null>(null);
+    const [page, setPage] = useState(0);
     const [isEditorOpen, setIsEditorOpen] = useState(false);
     const [selectedInvoice, setSelectedInvoice] = useState<Invoice | null>(null);
     const [invoiceToDelete, setInvoiceToDelete] = useState<string | null>(null);
     const [isLoading, setIsLoading] = useState(true);
+    const [isExporting, setIsExporting] = useState(false);
     const [searchQuery, setSearchQuery] = useState('');
-
-    // Load invoices on mount
-    useEffect(() => {
-        loadInvoices();
-    }, []);
-
-    const loadInvoices = async () => {
-        setIsLoading(true);
-        const result = await window.electron.getInvoices();
+    const [statusFilter, setStatusFilter] = useState('all');
+    const debouncedSearch = useDebounce(searchQuery, 250);
+    const requestRef = useRef(0);
+
+    const loadInvoices = useCallback(async () => {
+        const requestId = ++requestRef.current;
+        const result = await window.electron.queryInvoices({
+            status: statusFilter === 'all' ? undefined : statusFilter,
+            search: debouncedSearch || undefined,
+            offset: page * PAGE_SIZE,
+            limit: PAGE_SIZE,
+        });
+        if (requestId !== requestRef.current) return; // A newer query was sent; its response wins
         if (result.success && result.invoices) {
             setInvoices(result.invoices);
+            setTotalMatches(result.total ?? result.invoices.length);
+            setOverview(result.overview ?? null);
         } else {
             toast.error('Failed to load invoices');
         }
         setIsLoading(false);
+    }, [statusFilter, debouncedSearch, page]);
+
+    // Load the current page whenever filters or the page change
+    useEffect(() => {
+        loadInvoices();
+
+        // The overdue scheduler flips statuses in the background
+        const handleInvoicesUpdated = () => loadInvoices();
+        window.electron.on('invoices-updated', handleInvoicesUpdated);
+        return () => window.electron.removeListener('invoices-updated', handleInvoicesUpdated);
+    }, [loadInvoices]);
+
+    // New filters start from the first page
+    const handleSearchChange = (value: string) => {
+        setSearchQuery(value);
+        setPage(0);
+    };
+
+    const handleStatusFilterChange = (value: string) => {
+        setStatusFilter(value);
+        setPage(0);
     };
 
 
@@ -131,22 +166,58 @@ export function InvoiceWorkspace({ onNavigate }: InvoiceWorkspaceProps) {
         }
     };
 
+    // Export the listed invoices to a folder, plus one statement per customer
+    const handleExportPDFs = async () => {
+        if (invoices.length === 0) return;
+        const folder = await window.electron.openDirectoryDialog();
+        if (folder.canceled || folder.filePaths.length === 0) return;
+
+        const exportId = crypto.randomUUID();
+        const toastId = toast.loading(`Exporting 0 of ${invoices.length} invoices...`);
+        const handleProgress = (_: any, progress: InvoiceExportProgress) => {
+            if (progress.exportId !== exportId) return;
+            toast.loading(`Exporting ${progress.done} of ${progress.total} invoices...`, { id: toastId });
+        };
 
+        setIsExporting(true);
+        window.electron.on('invoice:exportProgress', handleProgress);
+        try {
+            const appUrl = window.location.origin + window.location.pathname;
+            const result = await window.electron.exportInvoices(
+                invoices.map(inv => inv.id),
+                folder.filePaths[0],
+                { appUrl, statement: true, exportId }
+            );
+            const failed = result.results?.filter(r => !r.success).length ?? 0;
+            const failedStatements = result.statements?.filter(s => !s.success).length ?? 0;
+            if (!result.success) {
+                toast.error(`Export failed: ${result.error}`, { id: toastId });
+            } else if (failed > 0) {
+                toast.warning(`Exported ${invoices.length - failed} invoices, ${failed} failed`, { id: toastId });
+            } else if (failedStatements > 0) {
+                toast.warning(`Exported ${invoices.length} invoices, ${failedStatements} statement(s) failed`, { id: toastId });
+            } else {
+                toast.success(`Exported ${invoices.length} invoices`, { id: toastId });
+            }
+        } catch (err) {
+            console.error(err);
+            toast.error('Unexpected error occurred', { id: toastId });
+        } finally {
+            window.electron.removeListener('invoice:exportProgress', handleProgress);
+            setIsExporting(false);
+        }
+    };
 
-    const [statusFilter, setStatusFilter] = useState('all');
-
-    const filteredInvoices = invoices.filter(inv => {
-        const matchesSearch = inv.number.toLowerCase().includes(searchQuery.toLowerCase()) ||
-            inv.to.name.toLowerCase().includes(searchQuery.toLowerCase());
 
-        if (statusFilter === 'all') return matchesSearch;
-        return matchesSearch && inv.status === statusFilter;
-    });
 
-    const totalRevenue = invoices.reduce((acc, inv) => acc + (inv.total || 0), 0);
+    // Card stats cover all invoices, not just the current page
+    const totalRevenue = overview?.totalAmount ?? 0;
+    const overdueInvoices = overview?.byStatus.overdue?.count ?? 0;
+    const pendingInvoices = (overview?.count ?? 0) - (overview?.byStatus.paid?.count ?? 0) - overdueInvoices;
 
-    const pendingInvoices = invoices.filter(i => i.status !== 'paid' && i.status !== 'overdue').length;
-    const overdueInvoices = invoices.filter(i => i.status === 'overdue').length;
+    const pageCount = Math.max(1, Math.ceil(totalMatches / PAGE_SIZE));
+    const pageStart = totalMatches === 0 ? 0 : page * PAGE_SIZE + 1;
+    const pageEnd = Math.min(totalMatches, (page + 1) * PAGE_SIZE);
 
     // EDITOR MODE
     if (isEditorOpen && selectedInvoice) {
@@ -182,7 +253,7 @@ export function InvoiceWorkspace({ onNavigate }: InvoiceWorkspaceProps) {
                     iconColor="from-indigo-500 to-indigo-600"
                     searchProps={{
                         value: searchQuery,
-                        onChange: (e) => setSearchQuery(e.target.value),
+                        onChange: (e) => handleSearchChange(e.target.value),
                         placeholder: "Search invoice # or client..."
                     }}
                     actions={
@@ -191,7 +262,7 @@ export function InvoiceWorkspace({ onNavigate }: InvoiceWorkspaceProps) {
                                 <select
                                     className="h-9 rounded-md border border-input bg-background px-3 py-1 text-sm shadow-sm transition-colors focus-visible:outline-none focus-visible:ring-1 focus-visible:ring-ring disabled:cursor-not-allowed disabled:opacity-50 appearance-none pr-8 cursor-pointer hover:bg-accent hover:text-accent-foreground"
                                     value={statusFilter}
-                                    onChange={(e) => setStatusFilter(e.target.value)}
+                                    onChange={(e) => handleStatusFilterChange(e.target.value)}
                                 >
                                     <option value="all">All Statuses</option>
                                     <option value="paid">Paid</option>
@@ -201,6 +272,10 @@ export function InvoiceWorkspace({ onNavigate }: InvoiceWorkspaceProps) {
                                 </select>
                                 <ChevronDown className="absolute right-2.5 top-2.5 h-4 w-4 opacity-50 pointer-events-none" />
                             </div>
+                            <Button variant="outline" onClick={handleExportPDFs} disabled={isExporting || invoices.length === 0} className="gap-2">
+                                <Download className="w-4 h-4" />
+                                Export PDFs
+                            </Button>
                             <Button onClick={handleCreateNew} className="gap-2">
                                 <Plus className="w-4 h-4" />
                                 New Invoice
@@ -300,7 +375,7 @@ export function InvoiceWorkspace({ onNavigate }: InvoiceWorkspaceProps) {
                         <CardContent className="p-0">
                             {isLoading ? (
                                 <LoadingState label="Loading invoices…" />
-                            ) : filteredInvoices.length === 0 ? (
+                            ) : invoices.length === 0 ? (
                                 <EmptyState
                                     title="No invoices yet"
                                     description="Use Process Files to generate invoices"
@@ -325,7 +400,7 @@ export function InvoiceWorkspace({ onNavigate }: InvoiceWorkspaceProps) {
                                         </TableRow>
                                     </TableHeader>
                                     <TableBody>
-                                        {filteredInvoices.map((inv) => (
+                                        {invoices.map((inv) => (
                                             <TableRow
                                                 key={inv.id}
                                                 className="cursor-pointer hover:bg-muted/50"
@@ -363,6 +438,31 @@ export function InvoiceWorkspace({ onNavigate }: InvoiceWorkspaceProps) {
                                     </TableBody>
                                 </Table>
                             )}
+                            {totalMatches > PAGE_SIZE && (
+                                <div className="flex items-center justify-between border-t border-border/40 px-4 py-3 text-sm text-muted-foreground">
+                                    <span>
+                                        {pageStart}–{pageEnd} of {totalMatches.toLocaleString()}
+                                    </span>
+                                    <div className="flex items-center gap-2">
+                                        <Button
+                                            variant="outline"
+                                            size="sm"
+                                            disabled={page === 0}
+                                            onClick={() => setPage(p => Math.max(0, p - 1))}
+                                        >
+                                            Previous
+                                        </Button>
+                                        <Button
+                                            variant="outline"
+                                            size="sm"
+                                            disabled={page + 1 >= pageCount}
+                                            onClick={() => setPage(p => Math.min(pageCount - 1, p + 1))}
+                                        >
+                                            Next
+                                        </Button>
+                                    </div>
+                                </div>
+                            )}
                         </CardContent>
                     </Card>
                 </div>
@@ -1,5 +1,6 @@
 import type { Customer } from '../../types.d';
 import { useState, useEffect } from 'react';
+import { useSheetRows } from '@/hooks/useSheetRows';
 import { GlassDialog } from '@/components/ui/glass-dialog';
 import { Button } from '@/components/ui/button';
 import { TableBody, TableCell, TableHead, TableHeader, TableRow } from '@/components/ui/table';
@@ -13,7 +14,8 @@ interface ColumnMapperProps {
     fileType: 'master' | 'target'; // 'master' = Site Log, 'target' = Delivery Note
     fileName: string;
     headers: { index: number; name: string }[];
-    previewData: any[][];
+    filePath: string | null;
+    sheetName?: string;
 
     // Customers for dropdown
     customers?: Customer[];
@@ -26,13 +28,16 @@ interface ColumnMapperProps {
     onConfirm: (idCol: number, resultCol?: number, matchLabel?: string) => void;
 }
 
+const PREVIEW_ROWS = 20;
+
 export function ColumnMapper({
     open,
     onOpenChange,
     fileType,
     fileName,
     headers,
-    previewData,
+    filePath,
+    sheetName,
     customers = [],
     initialIdCol = -1,
     initialResultCol = -1,
@@ -42,6 +47,12 @@ export function ColumnMapper({
     const [idCol, setIdCol] = useState<number>(initialIdCol);
     const [resultCol, setResultCol] = useState<number>(initialResultCol);
     const [matchLabel, setMatchLabel] = useState<string>(initialMatchLabel);
+    const { totalRows, getRow, ensureRange } = useSheetRows(open ? filePath : null, sheetName);
+    const previewRowCount = Math.min(PREVIEW_ROWS, totalRows);
+
+    useEffect(() => {
+        ensureRange(0, PREVIEW_ROWS);
+    }, [ensureRange]);
 
     // Reset state when dialog opens with new props
     useEffect(() => {
@@ -180,7 +191,7 @@ export function ColumnMapper({
                                     </TableRow>
                                 </TableHeader>
                                 <TableBody>
-                                    {previewData.slice(0, 20).map((row, rIdx) => (
+                                    {Array.from({ length: previewRowCount }, (_, rIdx) => [rIdx, getRow(rIdx) || []] as const).map(([rIdx, row]) => (
                                         <TableRow key={rIdx} className="hover:bg-muted/50 border-b border-border last:border-0 transition-colors">
                                             {headers.slice(0, 20).map(h => (
                                                 <TableCell key={h.index} className={cn(
@@ -4,11 +4,18 @@ import { Button } from '@/components/ui/button';
 import { Card, CardContent } from '@/components/ui/card';
 import { Input } from '@/components/ui/input';
 import { Loader2, AlertCircle, Sparkles, ArrowLeft, Database, Wand2, CheckCircle2, Settings2, ArrowRight, User } from 'lucide-react';
-import type { FileAnalysis, Customer } from '../../types.d';
+import type { FileAnalysis, Customer, ExcelJobProgress } from '../../types.d';
 import { GlassDialog } from '@/components/ui/glass-dialog';
 import { SheetPreview } from '@/components/SheetPreview';
 import { FileConfigurationCard } from './FileConfigurationCard';
 import { guessCustomer } from '@/utils/customer-matching';
+import { CustomSelect } from '@/components/ui/custom-native-select';
+
+const NEAR_MATCH_OPTIONS = [
+    { value: 0, label: 'Off' },
+    { value: 1, label: 'Flag tickets 1 typo away' },
+    { value: 2, label: 'Flag tickets up to 2 typos away' },
+];
 
 interface FileConfig extends FileAnalysis {
     matchLabel?: string;
@@ -20,29 +27,70 @@ interface MatcherConfigureViewProps {
     masterConfig: FileConfig | null;
     targetConfigs: FileConfig[];
     noMatchLabel: string;
+    nearMatchDistance: number;
     isProcessing: boolean;
+    processProgress?: ExcelJobProgress | null;
     isReady: boolean;
     customers: Customer[];
     setNoMatchLabel: (label: string) => void;
+    setNearMatchDistance: (distance: number) => void;
     setMasterConfig: React.Dispatch<React.SetStateAction<FileConfig | null>>;
     setTargetConfigs: React.Dispatch<React.SetStateAction<FileConfig[]>>;
     removeTarget: (index: number) => void;
     handleProcess: () => void;
+    handleCancelProcess?: () => void;
     onBack: () => void;
 }
 
+const STAGE_LABELS: Record<ExcelJobProgress['stage'], string> = {
+    indexing: 'Reading main file',
+    matching: 'Matching customer files',
+    writing: 'Writing output',
+    done: 'Finishing',
+    cancelled: 'Cancelling',
+    failed: 'Stopping',
+};
+
+function ProcessProgress({ progress, onCancel }: { progress?: ExcelJobProgress | null; onCancel?: () => void }) {
+    return (
+        <div className="space-y-1 text-xs text-muted-foreground">
+            {progress && (
+                <>
+                    <p className="font-medium text-foreground truncate">
+                        {STAGE_LABELS[progress.stage]}{progress.currentFile ? ` · ${progress.currentFile}` : ''}
+                    </p>
+                    <p>
+                        {progress.rowsScanned.toLocaleString()} rows scanned · {progress.rowsMatched.toLocaleString()} matched
+                        {progress.filesTotal > 0 && ` · ${progress.filesDone}/${progress.filesTotal} files`}
+                        {progress.bytesWritten > 0 && ` · ${(progress.bytesWritten / 1024 / 1024).toFixed(1)} MB written`}
+                    </p>
+                </>
+            )}
+            {onCancel && (
+                <Button variant="outline" size="sm" className="w-full" onClick={onCancel}>
+                    Cancel
+                </Button>
+            )}
+        </div>
+    );
+}
+
 export default function MatcherConfigureView({
     masterConfig,
     targetConfigs,
     noMatchLabel,
+    nearMatchDistance,
     isProcessing,
+    processProgress,
     isReady,
     customers,
     setNoMatchLabel,
+    setNearMatchDistance,
     setMasterConfig,
     setTargetConfigs,
     removeTarget,
     handleProcess,
+    handleCancelProcess,
     onBack,
 }: MatcherConfigureViewProps) {
     // Preview dialog state
@@ -51,10 +99,12 @@ export default function MatcherConfigureView({
     const [previewSheets, setPreviewSheets] = useState<string[]>([]);
     const [previewSelectedSheet, setPreviewSelectedSheet] = useState<string | undefined>();
     const [previewLabel, setPreviewLabel] = useState('');
+    const [previewAnalysis, setPreviewAnalysis] = useState<FileAnalysis | undefined>();
     const [showAdvanced, setShowAdvanced] = useState(false);
 
-    const openPreview = (filePath: string, fileName: string, sheets: string[] = [], selectedSheet: string = '') => {
+    const openPreview = (filePath: string, fileName: string, sheets: string[] = [], selectedSheet: string = '', analysis?: FileAnalysis) => {
         setPreviewFilePath(filePath);
+        setPreviewAnalysis(analysis);
         setPreviewLabel(fileName);
         setPreviewSheets(sheets);
         setPreviewSelectedSheet(selectedSheet || sheets[0]);
@@ -172,6 +222,9 @@ export default function MatcherConfigureView({
                                         </>
                                     )}
                                 </Button>
+                                {isProcessing && (
+                                    <ProcessProgress progress={processProgress} onCancel={handleCancelProcess} />
+                                )}
                             </CardContent>
                         </Card>
 
@@ -220,7 +273,8 @@ export default function MatcherConfigureView({
                                         masterConfig.filePath,
                                         masterConfig.fileName || 'Master File',
                                         masterConfig.sheets || [],
-                                        masterConfig.selectedSheet || ''
+                                        masterConfig.selectedSheet || '',
+                                        masterConfig
                                     )}
                                 />
                             </div>
@@ -249,7 +303,8 @@ export default function MatcherConfigureView({
                                                 target.filePath,
                                                 target.fileName || 'Customer File',
                                                 target.sheets || [],
-                                                target.selectedSheet || ''
+                                                target.selectedSheet || '',
+                                                target
                                             )}
                                         />
                                     ))}
@@ -272,6 +327,20 @@ export default function MatcherConfigureView({
                                                     placeholder="e.g., Not Matched"
                                                 />
                                             </div>
+                                            <div className="space-y-2">
+                                                <label className="text-xs font-semibold text-muted-foreground">Near Matches</label>
+                                                <CustomSelect
+                                                    className="h-9"
+                                                    value={nearMatchDistance}
+                                                    onChange={(value) => setNearMatchDistance(Number(value))}
+                                                    options={NEAR_MATCH_OPTIONS}
+                                                />
+                                                {nearMatchDistance > 0 && (
+                                                    <p className="text-xs text-muted-foreground">
+                                                        Unmatched tickets that differ from a main file ticket by a typo are labelled "Near match" for review.
+                                                    </p>
+                                                )}
+                                            </div>
                                         </div>
 
                                         <Button
@@ -297,6 +366,9 @@ export default function MatcherConfigureView({
                                                 </>
                                             )}
                                         </Button>
+                                        {isProcessing && (
+                                            <ProcessProgress progress={processProgress} onCancel={handleCancelProcess} />
+                                        )}
 
                                         {!isReady && (
                                             <div className="p-3 rounded-lg bg-amber-500/10 border border-amber-500/20 text-amber-600 text-xs flex gap-2">
@@ -335,6 +407,7 @@ export default function MatcherConfigureView({
                         sheets={previewSheets}
                         selectedSheet={previewSelectedSheet}
                         onSheetChange={(sheetName) => setPreviewSelectedSheet(sheetName)}
+                        analysis={previewAnalysis}
                     />
                 </div>
             </GlassDialog>
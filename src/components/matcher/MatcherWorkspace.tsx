@@ -133,14 +133,18 @@ export function MatcherWorkspace({ currentStep, onStepChange }: MatcherWorkspace
                                     masterConfig={masterConfig}
                                     targetConfigs={targetConfigs}
                                     noMatchLabel={noMatchLabel}
+                                    nearMatchDistance={state.nearMatchDistance}
                                     isProcessing={ui.isProcessing}
+                                    processProgress={ui.processProgress}
                                     isReady={isReady}
                                     customers={customers}
                                     setNoMatchLabel={state.setNoMatchLabel}
+                                    setNearMatchDistance={state.setNearMatchDistance}
                                     setMasterConfig={state.setMasterConfig}
                                     setTargetConfigs={state.setTargetConfigs}
                                     removeTarget={actions.removeTarget}
                                     handleProcess={actions.handleProcess}
+                                    handleCancelProcess={actions.handleCancelProcess}
                                     onBack={() => onStepChange('upload')}
                                 />
                             </Suspense>
@@ -22,10 +22,11 @@ export function useMatcherController(params: {
         setFileGenConfigs,
         outputFileHeaders,
         setOutputFileHeaders,
-        outputFileData,
-        setOutputFileData,
+        outputDataset,
+        setOutputDataset,
         reset,
         noMatchLabel,
+        nearMatchDistance,
         setOutputFilePath,
     } = matcherState;
 
@@ -46,7 +47,7 @@ export function useMatcherController(params: {
 
     const reconciliation = useReconciliation({
         outputFileHeaders,
-        outputFileData,
+        outputDataset,
         fileGenConfigs,
         noMatchLabel,
         customers: customerMgmt.customers,
@@ -79,6 +80,7 @@ export function useMatcherController(params: {
             customers: customerMgmt.customers,
             fileGenConfigs,
             noMatchLabel,
+            nearMatch: nearMatchDistance > 0 ? { maxDistance: nearMatchDistance } : undefined,
             onStatsUpdate: (stats, perFileStats) => {
                 setStats(stats);
                 setPerFileStats(perFileStats);
@@ -87,7 +89,7 @@ export function useMatcherController(params: {
                 onStepChange('done');
             }
         });
-    }, [fileSelection.isReady, fileSelection.masterConfig, fileSelection.targetConfigs, customerMgmt.customers, fileGenConfigs, noMatchLabel, processExec, setStats, setPerFileStats, onStepChange]);
+    }, [fileSelection.isReady, fileSelection.masterConfig, fileSelection.targetConfigs, customerMgmt.customers, fileGenConfigs, noMatchLabel, nearMatchDistance, processExec, setStats, setPerFileStats, onStepChange]);
 
     const handleGenerateSummary = useCallback(async () => {
         if (!reconciliationResult) return;
@@ -112,8 +114,8 @@ export function useMatcherController(params: {
     if (processExec.outputFileHeaders.length > 0 && matcherState.outputFileHeaders.length === 0) {
         setOutputFileHeaders(processExec.outputFileHeaders);
     }
-    if (processExec.outputFileData.length > 0 && matcherState.outputFileData.length === 0) {
-        setOutputFileData(processExec.outputFileData);
+    if (processExec.outputDataset && !matcherState.outputDataset) {
+        setOutputDataset(processExec.outputDataset);
     }
     // Sync output file path
     if (processExec.outputFilePath && !matcherState.outputFilePath) {
@@ -134,7 +136,6 @@ export function useMatcherController(params: {
     const handleConfirmGeneration = useCallback(async () => {
         await invoiceGen.generateInvoices({
             outputFileHeaders,
-            outputFileData,
             fileGenConfigs,
             reconciliationResult,
             noMatchLabel,
@@ -144,12 +145,12 @@ export function useMatcherController(params: {
                 customerMgmt.setIsCustomerDialogOpen(false);
             }
         });
-    }, [invoiceGen, outputFileHeaders, outputFileData, fileGenConfigs, reconciliationResult, noMatchLabel, customerMgmt]);
+    }, [invoiceGen, outputFileHeaders, fileGenConfigs, reconciliationResult, noMatchLabel, customerMgmt]);
 
     const handleReset = useCallback(() => {
         reset();
         processExec.setUnmatchedPath(null);
-        processExec.setMatchedRows([]);
+        processExec.resetOutput();
         onStepChange('configure');
     }, [reset, processExec, onStepChange]);
 
@@ -166,6 +167,7 @@ export function useMatcherController(params: {
 
             // Process UI
             isProcessing: processExec.isProcessing,
+            processProgress: processExec.progress,
             unmatchedPath: processExec.unmatchedPath, // or from processExec
             isGeneratingInvoices: invoiceGen.isGeneratingInvoices,
 
@@ -188,6 +190,7 @@ export function useMatcherController(params: {
             removeTarget: fileSelection.removeTarget,
             updateTargetLabel: fileSelection.updateTargetLabel,
             handleProcess,
+            handleCancelProcess: processExec.cancelMatching,
             handleCreateCustomer: (data: CustomerData) => customerMgmt.handleCreateCustomer(data),
             handlePrepareGeneration,
             updateFileConfig: (path: string, updates: Partial<FileGenConfig>) => setFileGenConfigs(prev => ({ ...prev, [path]: { ...prev[path], ...updates } })),
@@ -6,7 +6,6 @@ import type { ReconciliationResult } from '@/utils/reconciliation-engine';
 
 export function useMatcherInvoiceGeneration(params: {
     outputFileHeaders: Array<{ name: string; index: number }>;
-    outputFileData: any[][];
     fileGenConfigs: Record<string, FileGenConfig>;
     setFileGenConfigs: (configs: Record<string, FileGenConfig>) => void;
     reconciliationResult: ReconciliationResult | null;
@@ -19,7 +18,6 @@ export function useMatcherInvoiceGeneration(params: {
 }) {
     const {
         outputFileHeaders,
-        outputFileData,
         fileGenConfigs,
         setFileGenConfigs,
         reconciliationResult,
@@ -122,15 +120,13 @@ export function useMatcherInvoiceGeneration(params: {
             const result = await generateInvoicesFromReconciliation(
                 {
                     outputFileHeaders,
-                    outputFileData,
                     fileGenConfigs,
                     reconciliationResult,
                     matchValues: Object.keys(reconciliationResult.groupStats),
                     noMatchLabel,
                     customers,
                 },
-                window.electron.saveInvoice,
-                window.electron.saveCustomer
+                window.electron.generateInvoiceBatch
             );
 
             if (result.successCount > 0) {
@@ -155,7 +151,7 @@ export function useMatcherInvoiceGeneration(params: {
         } finally {
             setIsGeneratingInvoices(false);
         }
-    }, [customers, executiveSummaryReady, fileGenConfigs, onAutoExportSummary, onInvoicesGenerated, outputFileData, outputFileHeaders, reconciliationResult]);
+    }, [customers, executiveSummaryReady, fileGenConfigs, onAutoExportSummary, onInvoicesGenerated, outputFileHeaders, reconciliationResult]);
 
     return {
         isCustomerDialogOpen,
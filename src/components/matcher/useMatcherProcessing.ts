@@ -1,6 +1,9 @@
 import { useCallback, useState } from 'react';
 import { toast } from 'sonner';
-import { parseQuantitySafe } from '@/utils/quantity-parser';
+import { indexReconciliationRows } from '@/utils/reconciliation-engine';
+import { readJobOutputDataset } from '@/hooks/matcher/useProcessExecution';
+import type { OutputDataset } from '@/utils/output-dataset';
+import type { ExcelJobOutput } from '../../types.d';
 import type { MatcherFileConfig } from './matcher-types';
 
 export function useMatcherProcessing(params: {
@@ -10,11 +13,11 @@ export function useMatcherProcessing(params: {
     onProcessed: (result: {
         stats?: any;
         perFileStats?: any;
-        matchedRows?: any;
+        output?: ExcelJobOutput;
         unmatchedPath?: string;
         outputPath: string;
         outputHeaders: Array<{ name: string; index: number }>;
-        outputData: any[][];
+        outputDataset: OutputDataset | null;
     }) => void;
 }) {
     const { masterConfig, targetConfigs, noMatchLabel, onProcessed } = params;
@@ -43,6 +46,7 @@ export function useMatcherProcessing(params: {
             outputPath: saveResult.filePath,
             masterRowRange: masterConfig.suggestedRowRange,
             targetRowRanges: Object.fromEntries(targetConfigs.filter(t => t.suggestedRowRange).map(t => [t.filePath!, t.suggestedRowRange!])),
+            keepOutput: true,
         });
 
         setIsProcessing(false);
@@ -54,20 +58,20 @@ export function useMatcherProcessing(params: {
 
         if (res.unmatchedPath) setUnmatchedPath(res.unmatchedPath);
 
-        const outputAnalysis = await window.electron.analyzeExcelFile(saveResult.filePath);
-        const outputPreview = await window.electron.readExcelPreview(saveResult.filePath);
-
-        const outputHeaders = outputAnalysis.success && outputAnalysis.headers ? outputAnalysis.headers : [];
-        const outputData = outputPreview.success && outputPreview.data ? outputPreview.data : [];
+        // Headers and rows come from the job's output store rather than re-reading the saved file
+        const outputHeaders = res.output ? res.output.headers : [];
+        const outputDataset = res.output
+            ? await readJobOutputDataset(res.output.storeId, res.output.rowCount).catch(() => null)
+            : null;
 
         onProcessed({
             stats: res.stats,
             perFileStats: res.perFileStats,
-            matchedRows: res.matchedRows,
+            output: res.output,
             unmatchedPath: res.unmatchedPath,
             outputPath: saveResult.filePath,
             outputHeaders,
-            outputData,
+            outputDataset,
         });
 
         toast.success('Files processed successfully');
@@ -81,39 +85,30 @@ export function useMatcherProcessing(params: {
 
     const recalcGroupTotals = useCallback((params: {
         outputFileHeaders: Array<{ name: string; index: number }>;
-        outputFileData: any[][];
+        outputDataset: OutputDataset | null;
         resultColIdx: number;
         quantityColIdx: number;
     }) => {
-        const { outputFileHeaders, outputFileData, resultColIdx, quantityColIdx } = params;
+        const { outputFileHeaders, outputDataset, resultColIdx, quantityColIdx } = params;
 
-        if (resultColIdx === -1 || outputFileData.length === 0) {
+        if (resultColIdx === -1 || !outputDataset || outputDataset.rowCount === 0) {
             return { totals: {}, uniqueValues: [] };
         }
 
         const headerName = outputFileHeaders.find(h => h.index === resultColIdx)?.name || '';
+        const index = indexReconciliationRows(
+            outputDataset,
+            { resultColIdx, qtyIdx: quantityColIdx, descIdx: 0 },
+            headerName,
+            ''
+        );
 
         const totals: Record<string, { total: number; t10: number; t20: number }> = {};
-        const unique = new Set<string>();
-
-        outputFileData.slice(1).forEach(row => {
-            const val = String(row[resultColIdx] || '').trim();
-            if (!val || val.toLowerCase() === 'not matched' || val === headerName) return;
-
-            unique.add(val);
-
-            const quantity = quantityColIdx !== -1 && quantityColIdx < row.length ? parseQuantitySafe(row[quantityColIdx]) : 0;
-            const fullRow = row.join(' ').toLowerCase();
-            const is20 = fullRow.includes('20mm');
-            const is10 = fullRow.includes('10mm');
-
-            if (!totals[val]) totals[val] = { total: 0, t10: 0, t20: 0 };
-            totals[val].total += quantity;
-            if (is10) totals[val].t10 += quantity;
-            if (is20) totals[val].t20 += quantity;
-        });
+        for (const group of index.groups) {
+            totals[group.name] = { total: group.totalQuantity, t10: group.total10mm, t20: group.total20mm };
+        }
 
-        return { totals, uniqueValues: Array.from(unique).sort() };
+        return { totals, uniqueValues: Array.from(index.groupIds.keys()).sort() };
     }, []);
 
     return {
@@ -0,0 +1,130 @@
+import { useState, useEffect, useMemo } from 'react';
+import { Button } from '@/components/ui/button';
+import { Switch } from '@/components/ui/switch';
+import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
+import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '@/components/ui/table';
+import { toast } from 'sonner';
+import { Activity, RefreshCw, Trash2, FileDown } from 'lucide-react';
+import { summarizeTrace, formatBytes } from '@/utils/trace-summary';
+import type { TraceSpan } from '@/types';
+
+// Per-stage timings of matcher jobs and IPC calls recorded while tracing is on
+export function DiagnosticsPanel() {
+    const [enabled, setEnabled] = useState(false);
+    const [spans, setSpans] = useState<TraceSpan[]>([]);
+    const [startup, setStartup] = useState<Array<{ name: string; at: number }>>([]);
+
+    const stages = useMemo(() => summarizeTrace(spans), [spans]);
+
+    const loadTrace = async () => {
+        try {
+            const result = await window.electron.getTrace();
+            if (result.success) {
+                setEnabled(result.enabled);
+                setSpans(result.spans);
+                setStartup(result.startup);
+            }
+        } catch (error) {
+            console.error('Failed to load trace:', error);
+        }
+    };
+
+    useEffect(() => {
+        loadTrace();
+    }, []);
+
+    const handleToggle = async (checked: boolean) => {
+        const result = await window.electron.setTracing(checked);
+        if (result.success) setEnabled(result.enabled);
+    };
+
+    const handleClear = async () => {
+        await window.electron.clearTrace();
+        setSpans([]);
+    };
+
+    const handleExport = async () => {
+        const result = await window.electron.exportTrace();
+        if (result.success) {
+            toast.success('Trace exported. Open it in chrome://tracing or ui.perfetto.dev');
+        } else if (result.error !== 'Cancelled') {
+            toast.error(result.error || 'Export failed');
+        }
+    };
+
+    return (
+        <Card>
+            <CardHeader>
+                <div className="flex items-center gap-3">
+                    <div className="w-8 h-8 rounded-lg bg-gradient-to-br from-indigo-500 to-indigo-600 flex items-center justify-center">
+                        <Activity className="w-4 h-4 text-white" />
+                    </div>
+                    <div className="flex-1">
+                        <CardTitle>Diagnostics</CardTitle>
+                        <p className="text-sm text-muted-foreground">Timing and memory of matching jobs and app calls</p>
+                    </div>
+                    <Switch checked={enabled} onCheckedChange={handleToggle} aria-label="Record traces" />
+                </div>
+            </CardHeader>
+            <CardContent className="space-y-4">
+                <p className="text-sm text-muted-foreground">
+                    {enabled
+                        ? 'Tracing is on until the app restarts. Run a job, then refresh to see where the time went.'
+                        : 'Turn tracing on to record how long each stage of a job takes. It stays off after a restart.'}
+                </p>
+
+                {startup.length > 0 && (
+                    <p className="text-xs text-muted-foreground font-mono">
+                        Startup: {startup.map(phase => `${phase.name} ${phase.at} ms`).join(' · ')}
+                    </p>
+                )}
+
+                {stages.length > 0 && (
+                    <Table>
+                        <TableHeader>
+                            <TableRow>
+                                <TableHead>Stage</TableHead>
+                                <TableHead className="text-right">Calls</TableHead>
+                                <TableHead className="text-right">Total</TableHead>
+                                <TableHead className="text-right">Mean</TableHead>
+                                <TableHead className="text-right">Max</TableHead>
+                                <TableHead className="text-right">Rows</TableHead>
+                                <TableHead className="text-right">Heap</TableHead>
+                                <TableHead className="text-right">Payload</TableHead>
+                            </TableRow>
+                        </TableHeader>
+                        <TableBody>
+                            {stages.map(stage => (
+                                <TableRow key={`${stage.cat}:${stage.name}`}>
+                                    <TableCell className="font-mono text-xs">{stage.name}</TableCell>
+                                    <TableCell className="text-right tabular-nums">{stage.count}</TableCell>
+                                    <TableCell className="text-right tabular-nums">{stage.totalMs.toFixed(1)} ms</TableCell>
+                                    <TableCell className="text-right tabular-nums">{stage.meanMs.toFixed(1)} ms</TableCell>
+                                    <TableCell className="text-right tabular-nums">{stage.maxMs.toFixed(1)} ms</TableCell>
+                                    <TableCell className="text-right tabular-nums">{stage.rows > 0 ? stage.rows.toLocaleString() : '-'}</TableCell>
+                                    <TableCell className="text-right tabular-nums">{formatBytes(stage.heapDelta)}</TableCell>
+                                    <TableCell className="text-right tabular-nums">{stage.bytes > 0 ? formatBytes(stage.bytes) : '-'}</TableCell>
+                                </TableRow>
+                            ))}
+                        </TableBody>
+                    </Table>
+                )}
+
+                <div className="flex gap-3">
+                    <Button variant="outline" onClick={loadTrace} className="gap-2">
+                        <RefreshCw className="h-4 w-4" />
+                        Refresh
+                    </Button>
+                    <Button variant="outline" onClick={handleExport} disabled={spans.length === 0} className="gap-2">
+                        <FileDown className="h-4 w-4" />
+                        Export Chrome Trace
+                    </Button>
+                    <Button variant="ghost" onClick={handleClear} disabled={spans.length === 0} className="gap-2">
+                        <Trash2 className="h-4 w-4" />
+                        Clear
+                    </Button>
+                </div>
+            </CardContent>
+        </Card>
+    );
+}
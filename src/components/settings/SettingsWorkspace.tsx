@@ -6,6 +6,7 @@ import { LoadingState } from '@/components/ui/LoadingState';
 import { toast } from 'sonner';
 import { Save, Loader2, Building2, Database, Download, Upload, AlertTriangle, Settings } from 'lucide-react';
 import { TopBar } from '@/components/layout/TopBar';
+import { DiagnosticsPanel } from './DiagnosticsPanel';
 import type { BankingDetails } from '@/types';
 
 export function SettingsWorkspace() {
@@ -241,6 +242,9 @@ export function SettingsWorkspace() {
                             </CardContent>
                         </Card>
 
+                        {/* Diagnostics */}
+                        <DiagnosticsPanel />
+
                         {/* Danger Zone */}
                         <Card className="border-rose-200 bg-rose-50/50">
                             <CardHeader>
@@ -8,3 +8,4 @@ export { useInvoiceState, type Invoice } from './useInvoiceState';
 export { useCustomers } from './useCustomers';
 export { useDebounce } from './useDebounce';
 export { useLocalStorage } from './useLocalStorage';
+export { useSheetRows } from './useSheetRows';
@@ -2,7 +2,7 @@ import { useEffect } from 'react';
 import type { Customer } from '../../types.d';
 import type { FileConfig } from './useFileSelection'; // Assuming FileConfig is exported or shared
 import { detectColumns } from '@/utils/column-detection';
-import { guessCustomer } from '@/utils/customer-matching';
+import { guessCustomers } from '@/utils/customer-matching';
 
 export function useAutoDetection(params: {
     masterConfig: FileConfig | null;
@@ -43,6 +43,10 @@ export function useAutoDetection(params: {
         if (targetConfigs.length > 0) {
             setTargetConfigs(prev => {
                 let anyChanges = false;
+                // One batch over the cached customer index for every file still missing a label
+                const unlabelled = customers.length > 0 ? prev.filter(config => !config.matchLabel) : [];
+                const results = guessCustomers(unlabelled.map(config => config.fileName || ''), customers, 1);
+                const guessed = new Map(unlabelled.map((config, i) => [config, results[i].customerName]));
                 const newConfigs = prev.map(config => {
                     const updates: Partial<FileConfig> = {};
                     let hasUpdates = false;
@@ -62,12 +66,10 @@ export function useAutoDetection(params: {
                     }
 
                     // 2. Auto-detect Customer from Filename
-                    if (!config.matchLabel && customers.length > 0) {
-                        const guessedCustomer = guessCustomer(config.fileName || '', customers);
-                        if (guessedCustomer) {
-                            updates.matchLabel = guessedCustomer;
-                            hasUpdates = true;
-                        }
+                    const guessedCustomer = guessed.get(config);
+                    if (guessedCustomer) {
+                        updates.matchLabel = guessedCustomer;
+                        hasUpdates = true;
                     }
 
                     if (hasUpdates) {
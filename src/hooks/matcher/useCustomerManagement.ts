@@ -2,6 +2,7 @@ import { useState, useCallback, useEffect } from 'react';
 import { toast } from 'sonner';
 import type { Customer } from '../../types.d';
 import type { CustomerData } from '@/components/customers/CustomerCreationDialog';
+import { invalidateCustomerIndex } from '@/utils/customer-index';
 
 export function useCustomerManagement() {
     const [customers, setCustomers] = useState<Customer[]>([]);
@@ -27,6 +28,16 @@ export function useCustomerManagement() {
         loadCustomers();
     }, [loadCustomers]);
 
+    // Customers saved, deleted, restored or cleared anywhere in the app: reload them, and file name guesses use a fresh index
+    useEffect(() => {
+        const handleChanged = () => {
+            invalidateCustomerIndex();
+            loadCustomers();
+        };
+        window.electron.on('customer:changed', handleChanged);
+        return () => window.electron.removeListener('customer:changed', handleChanged);
+    }, [loadCustomers]);
+
     const handleCreateCustomer = useCallback(
         async (data: CustomerData, onSuccess?: (newCustomer: Customer) => void) => {
             if (!data.name.trim()) {
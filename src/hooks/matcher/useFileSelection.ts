@@ -1,6 +1,6 @@
 import { useState, useCallback } from 'react';
 import { toast } from 'sonner';
-import type { FileAnalysis } from '../../types.d';
+import type { FileAnalysis, ExcelAnalysisResult } from '../../types.d';
 
 export interface FileConfig extends FileAnalysis {
     matchLabel?: string;
@@ -25,13 +25,11 @@ export function useFileSelection() {
             return null;
         }
 
-        const previewRes = await window.electron.readExcelPreview(filePath);
-
+        // Rows are not copied into the config; previews fetch windows through excel:readRows
         return {
             ...result,
             ...result, // Intentionally spreading twice? (from original code)
             matchLabel: undefined,
-            preview: previewRes.success ? previewRes.data : undefined,
             // Initialize overrides
             overrideIdColumn: undefined,
             overrideResultColumn: undefined,
@@ -63,24 +61,56 @@ export function useFileSelection() {
         });
         if (!res.canceled && res.filePaths.length > 0) {
             setIsAnalyzing(true);
-            const configs: FileConfig[] = [];
-            for (const filePath of res.filePaths) {
-                // Ensure duplicate files aren't added? Logic not present in original, kept simple
-                const config = await analyzeFile(filePath);
-                if (config) configs.push(config);
-            }
-
+            const batchId = crypto.randomUUID();
             const startIndex = targetConfigs.length;
-            setTargetConfigs(prev => [...prev, ...configs]); // Append new files
-            setIsAnalyzing(false);
+            let added = 0;
+
+            // Files are analyzed concurrently in the main process. Results are kept by index and
+            // appended in selection order as soon as all earlier files are in, so target (and
+            // therefore label and merge) order never depends on which analysis finished first.
+            // The mapper opens on the first file while the rest are still running.
+            const settled: Array<FileConfig | null | undefined> = new Array(res.filePaths.length);
+            let nextToAppend = 0;
+            const handleResult = (_event: any, update: ExcelAnalysisResult) => {
+                if (update.batchId !== batchId) return;
+                if (!update.result.success) {
+                    toast.error(`Failed to analyze: ${update.result.error}`);
+                    settled[update.index] = null;
+                } else {
+                    settled[update.index] = {
+                        ...update.result,
+                        matchLabel: undefined,
+                        overrideIdColumn: undefined,
+                        overrideResultColumn: undefined,
+                    } as FileConfig;
+                }
 
-            if (configs.length > 0) {
-                // Trigger mapping for first new file
-                setMappingTarget({ type: 'target', index: startIndex });
-                setMapperOpen(true);
+                const ready: FileConfig[] = [];
+                for (; nextToAppend < settled.length && settled[nextToAppend] !== undefined; nextToAppend++) {
+                    const config = settled[nextToAppend];
+                    if (config) ready.push(config);
+                }
+                if (ready.length === 0) return;
+                setTargetConfigs(prev => [...prev, ...ready]);
+
+                if (added === 0) {
+                    // Trigger mapping for first new file
+                    setMappingTarget({ type: 'target', index: startIndex });
+                    setMapperOpen(true);
+                }
+                added += ready.length;
+            };
+
+            window.electron.on('excel:analysisResult', handleResult);
+            try {
+                const batch = await window.electron.analyzeExcelFiles(res.filePaths, { batchId });
+                if (!batch.success) toast.error(`Failed to analyze: ${batch.error}`);
+            } finally {
+                window.electron.removeListener('excel:analysisResult', handleResult);
+                setIsAnalyzing(false);
             }
         }
-    }, [analyzeFile, targetConfigs.length]); // Dependencies
+    }, [targetConfigs.length]); // Dependencies
 
     const removeTarget = useCallback((index: number) => {
         setTargetConfigs(prev => prev.filter((_, i) => i !== index));
@@ -9,14 +9,13 @@ export function useInvoiceGeneration() {
     // This hook mainly wraps the logic to call the utility, managing the loading state
     const generateInvoices = useCallback(async (params: {
         outputFileHeaders: any[];
-        outputFileData: any[];
         fileGenConfigs: Record<string, FileGenConfig>;
         reconciliationResult: any;
         noMatchLabel: string;
         customers: Customer[];
         onSuccess: () => void;
     }) => {
-        const { outputFileHeaders, outputFileData, fileGenConfigs, reconciliationResult, noMatchLabel, customers, onSuccess } = params;
+        const { outputFileHeaders, fileGenConfigs, reconciliationResult, noMatchLabel, customers, onSuccess } = params;
 
         const outputConfig = fileGenConfigs['output'];
         if (!outputConfig) {
@@ -41,15 +40,13 @@ export function useInvoiceGeneration() {
             const result = await generateInvoicesFromReconciliation(
                 {
                     outputFileHeaders,
-                    outputFileData,
                     fileGenConfigs,
                     reconciliationResult,
                     matchValues: Object.keys(reconciliationResult.groupStats),
                     noMatchLabel,
                     customers,
                 },
-                window.electron.saveInvoice,
-                window.electron.saveCustomer
+                window.electron.generateInvoiceBatch
             );
 
             const { successCount, failCount } = result;
@@ -1,16 +1,45 @@
-import { useState, useCallback } from 'react';
+import { useState, useCallback, useRef } from 'react';
 import { toast } from 'sonner';
-import type { Customer } from '../../types.d';
+import type { Customer, ExcelJobProgress } from '../../types.d';
 import type { FileConfig } from '@/hooks/matcher/useFileSelection';
 import type { FileGenConfig } from '@/hooks/useMatcherState';
+import { OutputDatasetBuilder, type OutputDataset } from '@/utils/output-dataset';
+
+const OUTPUT_ROW_WINDOW = 5000;
+
+// Interns a finished job's output rows window by window, then releases the main-process store.
+// The renderer keeps only the columnar dataset, never the row arrays.
+export async function readJobOutputDataset(storeId: string, rowCount: number): Promise<OutputDataset> {
+    const builder = new OutputDatasetBuilder(Math.max(0, rowCount - 1));
+    try {
+        for (let start = 0; start < rowCount; start += OUTPUT_ROW_WINDOW) {
+            const block = await window.electron.readJobRows(storeId, start, OUTPUT_ROW_WINDOW);
+            if (!block.success || !block.rows) throw new Error(block.error || 'Job output is no longer available');
+            builder.append(block.rows, start === 0 ? 1 : 0); // Row 0 is the header row
+        }
+    } finally {
+        window.electron.releaseJobRows(storeId);
+    }
+    return builder.finish();
+}
 
 export function useProcessExecution() {
     const [isProcessing, setIsProcessing] = useState(false);
     const [unmatchedPath, setUnmatchedPath] = useState<string | null>(null);
     const [outputFilePath, setOutputFilePath] = useState<string | null>(null);
-    const [matchedRows, setMatchedRows] = useState<Array<{ sourceFile: string; data: any[]; rowNumber: number }>>([]);
+    const [matchedRowCount, setMatchedRowCount] = useState(0);
     const [outputFileHeaders, setOutputFileHeaders] = useState<any[]>([]);
-    const [outputFileData, setOutputFileData] = useState<any[]>([]);
+    const [outputDataset, setOutputDataset] = useState<OutputDataset | null>(null);
+    const [progress, setProgress] = useState<ExcelJobProgress | null>(null);
+    const jobIdRef = useRef<string | null>(null);
+    // Re-runs reuse the main-process master index and the results of unchanged targets
+    const sessionIdRef = useRef<string>(crypto.randomUUID());
+
+    const resetOutput = useCallback(() => {
+        setMatchedRowCount(0);
+        setOutputFileHeaders([]);
+        setOutputDataset(null);
+    }, []);
 
     const executeMatching = useCallback(async (params: {
         masterConfig: FileConfig;
@@ -18,10 +47,11 @@ export function useProcessExecution() {
         customers: Customer[];
         fileGenConfigs: Record<string, FileGenConfig>;
         noMatchLabel: string;
+        nearMatch?: { maxDistance?: number; label?: string }; // Opt-in typo matching of unmatched tickets
         onStatsUpdate: (stats: any, perFileStats: any) => void;
         onSuccess: () => void;
     }) => {
-        const { masterConfig, targetConfigs, customers, fileGenConfigs, noMatchLabel, onStatsUpdate, onSuccess } = params;
+        const { masterConfig, targetConfigs, customers, fileGenConfigs, noMatchLabel, nearMatch, onStatsUpdate, onSuccess } = params;
 
         if (!masterConfig.filePath) return;
 
@@ -36,9 +66,19 @@ export function useProcessExecution() {
         const savePath = `${matchedDir}/${defaultName}_${timestamp}.xlsx`;
 
         setIsProcessing(true);
+        resetOutput();
+
+        const jobId = crypto.randomUUID();
+        jobIdRef.current = jobId;
+        const handleProgress = (_event: any, update: ExcelJobProgress) => {
+            if (update.jobId === jobId) setProgress(update);
+        };
+        window.electron.on('excel:progress', handleProgress);
 
         try {
             const res = await window.electron.processExcelFiles({
+                jobId,
+                sessionId: sessionIdRef.current,
                 masterPath: masterConfig.filePath,
                 targetPaths: targetConfigs.map(t => t.filePath!),
                 masterColIndices: [masterConfig.overrideIdColumn!],
@@ -60,28 +100,30 @@ export function useProcessExecution() {
                 outputPath: savePath,
                 masterRowRange: masterConfig.suggestedRowRange,
                 targetRowRanges: Object.fromEntries(targetConfigs.filter(t => t.suggestedRowRange).map(t => [t.filePath!, t.suggestedRowRange!])),
+                keepOutput: true,
+                nearMatch,
             });
 
             if (res.success) {
                 onStatsUpdate(res.stats, res.perFileStats);
-                if (res.matchedRows) setMatchedRows(res.matchedRows);
                 if (res.unmatchedPath) setUnmatchedPath(res.unmatchedPath);
+                if (res.nearMatches && res.nearMatches.length > 0) {
+                    toast.info(`${res.nearMatches.length} ticket(s) near-matched, review the "${nearMatch?.label || 'Near match'}" rows`);
+                }
 
                 setOutputFilePath(savePath);
 
-                // Analyze output file immediately
-                const outputAnalysis = await window.electron.analyzeExcelFile(savePath);
-                if (outputAnalysis.success && outputAnalysis.headers) {
-                    setOutputFileHeaders(outputAnalysis.headers);
-                }
-
-                const outputPreview = await window.electron.readExcelPreview(savePath);
-                if (outputPreview.success && outputPreview.data) {
-                    setOutputFileData(outputPreview.data);
+                // The job returns the output model directly; nothing is re-read from disk
+                if (res.output) {
+                    setMatchedRowCount(res.output.matchedRowCount);
+                    setOutputFileHeaders(res.output.headers);
+                    setOutputDataset(await readJobOutputDataset(res.output.storeId, res.output.rowCount));
                 }
 
                 toast.success('Matching completed!');
                 onSuccess();
+            } else if (res.cancelled) {
+                toast.info('Processing cancelled');
             } else {
                 toast.error(res.error || 'Processing failed');
             }
@@ -89,8 +131,17 @@ export function useProcessExecution() {
             console.error('Processing error:', error);
             toast.error('An unexpected error occurred during processing.');
         } finally {
+            window.electron.removeListener('excel:progress', handleProgress);
+            jobIdRef.current = null;
+            setProgress(null);
             setIsProcessing(false);
         }
+    }, [resetOutput]);
+
+    const cancelMatching = useCallback(() => {
+        if (jobIdRef.current) {
+            window.electron.cancelExcelJob(jobIdRef.current);
+        }
     }, []);
 
     const handleOpenUnmatched = useCallback(() => {
@@ -101,14 +152,16 @@ export function useProcessExecution() {
 
     return {
         isProcessing,
+        progress,
         unmatchedPath,
         setUnmatchedPath,
         outputFilePath,
-        matchedRows,
-        setMatchedRows,
+        matchedRowCount,
+        resetOutput,
         outputFileHeaders,
-        outputFileData,
+        outputDataset,
         executeMatching,
+        cancelMatching,
         handleOpenUnmatched
     };
 }
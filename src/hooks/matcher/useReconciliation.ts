@@ -1,30 +1,34 @@
 import { useMemo, useEffect, useState } from 'react';
 import type { Customer } from '../../types.d';
 import type { FileGenConfig } from '@/hooks/useMatcherState';
-import { calculateReconciliationStats } from '@/utils/reconciliation-engine';
+import { ReconciliationEngine } from '@/utils/reconciliation-engine';
+import type { OutputDataset } from '@/utils/output-dataset';
 
 export function useReconciliation(params: {
     outputFileHeaders: any[];
-    outputFileData: any[];
+    outputDataset: OutputDataset | null; // Built once per processed output
     fileGenConfigs: Record<string, FileGenConfig>;
     noMatchLabel: string;
     customers: Customer[];
     targetConfigs: { fileName?: string; filePath?: string }[];
     setFileGenConfigs: React.Dispatch<React.SetStateAction<Record<string, FileGenConfig>>>;
 }) {
-    const { outputFileHeaders, outputFileData, fileGenConfigs, noMatchLabel, customers, targetConfigs, setFileGenConfigs } = params;
+    const { outputFileHeaders, outputDataset, fileGenConfigs, noMatchLabel, customers, targetConfigs, setFileGenConfigs } = params;
 
     const [customerProjections, setCustomerProjections] = useState<Record<string, { t10: number; t20: number }>>({});
 
+    // The engine keeps its row index between renders; config changes only recompute the affected groups
+    const [engine] = useState(() => new ReconciliationEngine());
+
     const reconciliationResult = useMemo(() => {
-        return calculateReconciliationStats({
+        return engine.update({
             outputFileHeaders,
-            outputFileData,
+            outputDataset,
             fileGenConfigs,
             noMatchLabel,
             customers
         });
-    }, [outputFileHeaders, outputFileData, fileGenConfigs, noMatchLabel, customers]);
+    }, [engine, outputFileHeaders, outputDataset, fileGenConfigs, noMatchLabel, customers]);
 
     // Calculate customer projections
     useEffect(() => {
@@ -5,6 +5,7 @@
 
 import { useState, useEffect } from 'react';
 import type { FileAnalysis } from '../types.d';
+import { OutputDataset, buildOutputDataset, type OutputDatasetJSON } from '@/utils/output-dataset';
 
 
 interface FileConfig extends FileAnalysis {
@@ -25,6 +26,7 @@ interface MatcherState {
     targetConfigs: FileConfig[];
     outputFilePath: string | null;
     noMatchLabel: string;
+    nearMatchDistance: number; // Typos still flagged as near matches, 0 = off
     stats: {
         totalMasterRows: number;
         matchedMasterRows: number;
@@ -40,22 +42,30 @@ interface MatcherState {
     }> | null;
     fileGenConfigs: Record<string, FileGenConfig>;
     outputFileHeaders: { name: string; index: number }[];
-    outputFileData: any[][];
+    outputDataset: OutputDatasetJSON | null;
 
 }
 
 const STORAGE_KEY = 'fatoora_matcher_state';
 
+// Analysis row windows are only kept in memory; they would fill localStorage with sheet rows
+function withoutRowWindow(config: FileConfig): FileConfig {
+    const saved = { ...config };
+    delete saved.rowWindow;
+    return saved;
+}
+
 export function useMatcherState(onStepChange: (step: 'upload' | 'configure' | 'done') => void) {
     const [masterConfig, setMasterConfig] = useState<FileConfig | null>(null);
     const [targetConfigs, setTargetConfigs] = useState<FileConfig[]>([]);
     const [outputFilePath, setOutputFilePath] = useState<string | null>(null);
     const [noMatchLabel, setNoMatchLabel] = useState('Not Matched');
+    const [nearMatchDistance, setNearMatchDistance] = useState(0);
     const [stats, setStats] = useState<MatcherState['stats']>(null);
     const [perFileStats, setPerFileStats] = useState<MatcherState['perFileStats']>(null);
     const [fileGenConfigs, setFileGenConfigs] = useState<Record<string, FileGenConfig>>({});
     const [outputFileHeaders, setOutputFileHeaders] = useState<{ name: string; index: number }[]>([]);
-    const [outputFileData, setOutputFileData] = useState<any[][]>([]);
+    const [outputDataset, setOutputDataset] = useState<OutputDataset | null>(null);
 
     const [isHydrated, setIsHydrated] = useState(false);
 
@@ -70,11 +80,13 @@ export function useMatcherState(onStepChange: (step: 'upload' | 'configure' | 'd
                 if (data.targetConfigs) setTargetConfigs(data.targetConfigs);
                 if (data.outputFilePath) setOutputFilePath(data.outputFilePath);
                 if (data.noMatchLabel) setNoMatchLabel(data.noMatchLabel);
+                if (data.nearMatchDistance) setNearMatchDistance(data.nearMatchDistance);
                 if (data.stats) setStats(data.stats);
                 if (data.perFileStats) setPerFileStats(data.perFileStats);
                 if (data.fileGenConfigs) setFileGenConfigs(data.fileGenConfigs);
                 if (data.outputFileHeaders) setOutputFileHeaders(data.outputFileHeaders);
-                if (data.outputFileData) setOutputFileData(data.outputFileData);
+                if (data.outputDataset) setOutputDataset(OutputDataset.fromJSON(data.outputDataset));
+                else if (data.outputFileData?.length) setOutputDataset(buildOutputDataset(data.outputFileData)); // Saved by older versions
 
 
                 if (data.stats && data.stats.totalMasterRows > 0) {
@@ -95,18 +107,19 @@ export function useMatcherState(onStepChange: (step: 'upload' | 'configure' | 'd
         if (!isHydrated) return;
 
         try {
-            const safeOutputData = (outputFileData && outputFileData.length > 5000) ? [] : outputFileData;
+            const safeOutputDataset = outputDataset && outputDataset.rowCount <= 5000 ? outputDataset.toJSON() : null;
 
             const stateToSave: Partial<MatcherState> = {
-                masterConfig,
-                targetConfigs,
+                masterConfig: masterConfig && withoutRowWindow(masterConfig),
+                targetConfigs: targetConfigs.map(withoutRowWindow),
                 outputFilePath,
                 noMatchLabel,
+                nearMatchDistance,
                 stats,
                 perFileStats,
                 fileGenConfigs,
                 outputFileHeaders,
-                outputFileData: safeOutputData,
+                outputDataset: safeOutputDataset,
 
             };
             localStorage.setItem(STORAGE_KEY, JSON.stringify(stateToSave));
@@ -119,11 +132,12 @@ export function useMatcherState(onStepChange: (step: 'upload' | 'configure' | 'd
         targetConfigs,
         outputFilePath,
         noMatchLabel,
+        nearMatchDistance,
         stats,
         perFileStats,
         fileGenConfigs,
         outputFileHeaders,
-        outputFileData,
+        outputDataset,
 
     ]);
 
@@ -132,11 +146,12 @@ export function useMatcherState(onStepChange: (step: 'upload' | 'configure' | 'd
         setMasterConfig(null);
         setTargetConfigs([]);
         setNoMatchLabel('Not Matched');
+        setNearMatchDistance(0);
         setStats(null);
         setPerFileStats(null);
         setOutputFilePath(null);
         setOutputFileHeaders([]);
-        setOutputFileData([]);
+        setOutputDataset(null);
         setFileGenConfigs({});
 
     };
@@ -150,6 +165,8 @@ export function useMatcherState(onStepChange: (step: 'upload' | 'configure' | 'd
         setOutputFilePath,
         noMatchLabel,
         setNoMatchLabel,
+        nearMatchDistance,
+        setNearMatchDistance,
         stats,
         setStats,
         perFileStats,
@@ -158,8 +175,8 @@ export function useMatcherState(onStepChange: (step: 'upload' | 'configure' | 'd
         setFileGenConfigs,
         outputFileHeaders,
         setOutputFileHeaders,
-        outputFileData,
-        setOutputFileData,
+        outputDataset,
+        setOutputDataset,
 
         isHydrated,
         reset,
@@ -0,0 +1,83 @@
+/**
+ * Windowed access to a sheet's rows in the main process.
+ * Call ensureRange with the visible rows; getRow returns undefined until its block arrives.
+ * An initial window (e.g. FileAnalysis.rowWindow) fills the first block, so a preview of a
+ * freshly analyzed file needs no excel:readRows call until it is scrolled past that block.
+ */
+
+import { useState, useEffect, useCallback, useRef } from 'react';
+import { RowBlockCache } from '@/utils/row-block-cache';
+import type { ExcelRowWindow } from '../types.d';
+
+export function useSheetRows(filePath: string | null, sheetName?: string, initialWindow?: ExcelRowWindow) {
+    const [cache] = useState(() => new RowBlockCache());
+    const [pending] = useState(() => new Set<number>());
+    const generationRef = useRef(0);
+    const [totals, setTotals] = useState<{ totalRows: number; totalCols: number } | null>(null);
+    const [error, setError] = useState<string | null>(null);
+    const [, setVersion] = useState(0);
+
+    const fetchBlock = useCallback(async (block: number) => {
+        if (!filePath) return;
+        const generation = generationRef.current;
+        pending.add(block);
+
+        try {
+            const res = await window.electron.readExcelRows(filePath, sheetName, block * cache.blockSize, cache.blockSize);
+            if (generation !== generationRef.current) return;
+
+            if (res.success && res.rows) {
+                cache.set(block, res.rows);
+                const totalRows = res.totalRows ?? 0;
+                const totalCols = res.totalCols ?? 0;
+                setTotals(prev => prev && prev.totalRows === totalRows && prev.totalCols === totalCols
+                    ? prev
+                    : { totalRows, totalCols });
+                setVersion(v => v + 1);
+            } else {
+                setError(res.error || 'Failed to load rows');
+            }
+        } catch (err: any) {
+            if (generation === generationRef.current) setError(err.message);
+        } finally {
+            if (generation === generationRef.current) pending.delete(block);
+        }
+    }, [cache, pending, filePath, sheetName]);
+
+    // Start over (and fetch the first block for the totals) when the file or sheet changes
+    useEffect(() => {
+        generationRef.current++;
+        cache.clear();
+        pending.clear();
+        setError(null);
+
+        const seed = initialWindow;
+        const seedsFirstBlock = !!filePath && !!seed && seed.start === 0 &&
+            (sheetName === undefined || seed.sheetName === sheetName) &&
+            (seed.rows.length >= cache.blockSize || seed.rows.length === seed.totalRows);
+        if (seed && seedsFirstBlock) {
+            cache.set(0, seed.rows.slice(0, cache.blockSize));
+            setTotals({ totalRows: seed.totalRows, totalCols: seed.totalCols });
+        } else {
+            setTotals(null);
+            fetchBlock(0);
+        }
+    }, [cache, pending, fetchBlock, filePath, sheetName, initialWindow]);
+
+    const ensureRange = useCallback((start: number, end: number) => {
+        for (const block of cache.missingBlocks(start, end)) {
+            if (!pending.has(block)) fetchBlock(block);
+        }
+    }, [cache, pending, fetchBlock]);
+
+    const getRow = useCallback((rowIndex: number) => cache.getRow(rowIndex), [cache]);
+
+    return {
+        totalRows: totals?.totalRows ?? 0,
+        totalCols: totals?.totalCols ?? 0,
+        loading: !!filePath && totals === null && !error,
+        error,
+        getRow,
+        ensureRange
+    };
+}
@@ -26,12 +26,155 @@ export interface FileAnalysis {
     };
     suggestedRowRange?: { start: number; end: number };
     suggestedMatchLabel?: string;
-    preview?: any[][];
+    sampled?: boolean; // Detection ran on a head/tail/strided sample rather than every row
+    rowWindow?: ExcelRowWindow; // First rows of selectedSheet, as excel:readRows returns them
     error?: string;
     analysisReport?: {
         qualityScore: number;
         issues: { type: 'warning' | 'error', message: string }[];
     };
+    trace?: TraceSpan[]; // Only while tracing is on
+}
+
+// Pushed on excel:analysisResult for each file of an excel:analyzeMany batch
+export interface ExcelAnalysisResult {
+    batchId?: string;
+    index: number;
+    filePath: string;
+    result: FileAnalysis;
+}
+
+// A window of sheet rows from excel:readRows
+export interface ExcelRowWindow {
+    rows: any[][];
+    start: number; // 0-indexed position of rows[0]
+    totalRows: number;
+    totalCols: number;
+    sheetName: string;
+}
+
+// Filters, sort and page for invoice:query
+export interface InvoiceQuery {
+    status?: string | string[];
+    customerId?: string;
+    dateRange?: { from?: string; to?: string }; // YYYY-MM-DD, inclusive
+    search?: string;
+    sort?: { field: 'createdAt' | 'date' | 'dueDate' | 'number' | 'total' | 'customer'; direction?: 'asc' | 'desc' };
+    offset?: number;
+    limit?: number;
+}
+
+// Counts and amounts over all invoices, returned with every invoice:query page
+export interface InvoiceOverview {
+    count: number;
+    totalAmount: number;
+    byStatus: Record<string, { count: number; amount: number }>;
+}
+
+export interface InvoiceExportOptions {
+    concurrency?: number;
+    statement?: boolean; // Also write one merged statement PDF per customer
+    appUrl?: string;
+    exportId?: string; // Echoed on progress events
+}
+
+// Pushed on invoice:exportProgress as each invoice of an export finishes
+export interface InvoiceExportProgress {
+    exportId?: string;
+    done: number;
+    total: number;
+    invoiceId: string;
+    filePath?: string;
+    error?: string;
+}
+
+// invoice:saveBatch / customer:saveBatch: one result per item, in input order
+export interface BatchSaveResult {
+    success: boolean;
+    results?: Array<{ success: boolean; id?: string; number?: string; error?: string }>;
+    error?: string;
+}
+
+// invoice:generateBatch: invoices and their customers' total increases, saved in one transaction
+export interface GeneratedInvoiceEntry {
+    invoice: Invoice;
+    totals?: { total10mm: number; total20mm: number };
+}
+
+export interface GenerateInvoicesResult extends BatchSaveResult {
+    customers?: Customer[]; // Customers whose totals were raised, as stored
+}
+
+export type AgingBucket = '0-30' | '31-60' | '61-90' | '90+';
+
+// Maintained dashboard totals from dashboard:summary
+export interface DashboardSummary {
+    invoiceCount: number;
+    customerCount: number;
+    revenue: number;
+    outstanding: number;
+    activeInvoices: number;
+    currentMonthRevenue: number;
+    lastMonthRevenue: number;
+    revenueTrend: number;
+    byStatus: Record<string, { count: number; amount: number }>;
+    aging: Record<AgingBucket, { count: number; amount: number }>;
+    months: Array<{ month: string; count: number; amount: number }>;
+    topCustomers: Array<{ customerId: string; name: string; count: number; revenue: number; outstanding: number }>;
+    recentInvoices: Invoice[];
+}
+
+// A matched target row from excel:process
+export interface ExcelMatchedRow {
+    sourceFile: string;
+    data: any[];
+    rowNumber: number;
+}
+
+// Output of an excel:process run kept in the main process (options.keepOutput)
+export interface ExcelJobOutput {
+    storeId: string;
+    headers: Array<{ index: number; name: string }>;
+    headerRowIndex: number; // 1-indexed
+    footerStartRow: number; // 1-indexed
+    rowCount: number;
+    colCount: number;
+    matchedRowCount: number;
+}
+
+// Main-process workbook cache counters from excel:cacheStats
+export interface WorkbookCacheStats {
+    hits: number;
+    misses: number;
+    rowHits: number;
+    rowMisses: number;
+    evictions: number;
+    invalidations: number;
+    entries: number;
+    bytes: number;
+    budgetBytes: number;
+}
+
+// One timed span recorded while tracing is on (times in microseconds), see electron/services/tracing
+export interface TraceSpan {
+    name: string;
+    cat: string;
+    ts: number;
+    dur: number;
+    tid: number;
+    args?: Record<string, string | number | boolean>;
+}
+
+// Pushed on the excel:progress channel while excel:process runs
+export interface ExcelJobProgress {
+    jobId: string;
+    stage: 'indexing' | 'matching' | 'writing' | 'done' | 'cancelled' | 'failed';
+    currentFile?: string;
+    filesDone: number;
+    filesTotal: number;
+    rowsScanned: number;
+    rowsMatched: number;
+    bytesWritten: number;
 }
 
 // Invoicing Types
@@ -119,10 +262,11 @@ export interface ElectronAPI {
     // Legacy Excel & File System
     readExcelHeaders: (filePath: string, sheetName?: string) => Promise<{ success: boolean; headers?: string[]; error?: string }>;
 
-    readExcelPreview: (filePath: string, sheetName?: string) => Promise<{
+    readExcelPreview: (filePath: string, sheetName?: string, limit?: number) => Promise<{
         success: boolean;
-        data?: any[][];
+        data?: any[][]; // First `limit` rows (default 100)
         rowCount?: number;
+        colCount?: number;
         headerRow?: number;
         footerStartRow?: number;
         suggestedColumn?: number;
@@ -130,9 +274,22 @@ export interface ElectronAPI {
         error?: string;
     }>;
 
-    analyzeExcelFile: (filePath: string, sheetName?: string) => Promise<FileAnalysis>;
+    readExcelRows: (filePath: string, sheetName: string | undefined, start: number, count: number) => Promise<{
+        success: boolean;
+        error?: string;
+    } & Partial<ExcelRowWindow>>;
+
+    analyzeExcelFile: (filePath: string, sheetName?: string, options?: { fullScan?: boolean }) => Promise<FileAnalysis>;
+
+    // Results are also pushed on 'excel:analysisResult' as ExcelAnalysisResult events while the batch runs
+    analyzeExcelFiles: (filePaths: string[], options?: { batchId?: string; concurrency?: number; fullScan?: boolean }) =>
+        Promise<{ success: boolean; results?: FileAnalysis[]; error?: string }>;
+
+    getWorkbookCacheStats: () => Promise<{ success: boolean; stats?: WorkbookCacheStats; error?: string }>;
 
     processExcelFiles: (options: {
+        jobId?: string;
+        sessionId?: string; // Reuse the master index and unchanged target results across runs
         masterPath: string;
         targetPaths: string[];
         masterColIndices: number[];
@@ -146,6 +303,9 @@ export interface ElectronAPI {
         targetRowRanges?: Record<string, { start: number; end: number }>;
         masterSheetName?: string;
         targetSheetNames?: Record<string, string>;
+        keepOutput?: boolean;
+        // Report target tickets within maxDistance edits (1 or 2) of a master ticket as near matches
+        nearMatch?: { maxDistance?: number; label?: string };
     }) => Promise<{
         success: boolean;
         results?: any[];
@@ -153,6 +313,7 @@ export interface ElectronAPI {
             totalMasterRows: number;
             matchedMasterRows: number;
             unmatchedMasterRows: number;
+            nearMatchedMasterRows: number;
             matchPercentage: number;
         };
         perFileStats?: Array<{
@@ -160,23 +321,31 @@ export interface ElectronAPI {
             filePath: string;
             total: number;
             matched: number;
+            nearMatched: number;
             percentage: number;
+            reused?: boolean; // Result taken from the match session
         }>;
         unmatchedPath?: string;
+        nearMatches?: Array<{ sourceFile: string; rowNumber: number; key: string; masterKey: string; distance: number }>;
         warnings?: Array<{
             type: string;
             file: string;
             row: number;
             message: string;
         }>;
-        matchedRows?: Array<{
-            sourceFile: string;
-            data: any[];
-            rowNumber: number;
-        }>;
+        matchedRows?: ExcelMatchedRow[];
+        output?: ExcelJobOutput;
+        matchedRowCount?: number;
+        session?: { masterReused: boolean; targetsReused: number; targetsMatched: number };
+        trace?: TraceSpan[]; // Only while tracing is on
+        cancelled?: boolean;
         error?: string;
     }>;
 
+    cancelExcelJob: (jobId: string) => Promise<{ success: boolean }>;
+    readJobRows: (storeId: string, start: number, count: number) => Promise<{ success: boolean; rows?: any[][]; start?: number; totalRows?: number; error?: string }>;
+    releaseJobRows: (storeId: string) => Promise<{ success: boolean }>;
+
     openFile: (filePath: string) => Promise<void>;
     showInFolder: (filePath: string) => Promise<void>;
     saveFileDialog: (defaultPath: string) => Promise<{ canceled: boolean; filePath?: string }>;
@@ -185,18 +354,37 @@ export interface ElectronAPI {
 
     // Invoicing
     saveInvoice: (invoice: Invoice) => Promise<{ success: boolean; id?: string; error?: string }>;
+    saveInvoiceBatch: (invoices: Invoice[]) => Promise<BatchSaveResult>;
+    generateInvoiceBatch: (entries: GeneratedInvoiceEntry[]) => Promise<GenerateInvoicesResult>;
     getInvoices: () => Promise<{ success: boolean; invoices?: Invoice[]; error?: string }>;
+    queryInvoices: (query: InvoiceQuery) => Promise<{
+        success: boolean;
+        invoices?: Invoice[];
+        total?: number;
+        offset?: number;
+        limit?: number;
+        overview?: InvoiceOverview;
+        error?: string;
+    }>;
     deleteInvoice: (id: string) => Promise<{ success: boolean; error?: string }>;
     generateInvoicePDF: (invoice: Invoice) => Promise<{ success: boolean; filePath?: string; error?: string }>;
     generateSecureInvoice: (invoice: Invoice, appUrl?: string) => Promise<{ success: boolean; error?: string }>;
+    // Progress is pushed on 'invoice:exportProgress' as InvoiceExportProgress events
+    exportInvoices: (ids: string[], directory: string, options?: InvoiceExportOptions) => Promise<{
+        success: boolean;
+        results?: Array<{ id: string; success: boolean; filePath?: string; error?: string }>;
+        statements?: Array<{ customerId: string; name: string; success: boolean; filePath?: string; invoiceCount: number; error?: string }>;
+        error?: string;
+    }>;
     onInvoiceData: (callback: (event: any, data: any) => void) => void;
-    sendPrintReady: () => void;
+    sendPrintReady: (printId?: number) => void;
     sendPrintWindowReady: () => void;
     on: (channel: string, callback: (...args: any[]) => void) => void;
     removeListener: (channel: string, callback: (...args: any[]) => void) => void;
 
     // Customers
     saveCustomer: (customer: Customer) => Promise<{ success: boolean; id?: string; error?: string }>;
+    saveCustomerBatch: (customers: Customer[]) => Promise<BatchSaveResult>;
     getCustomers: () => Promise<{ success: boolean; customers?: Customer[]; error?: string }>;
     deleteCustomer: (id: string) => Promise<{ success: boolean; error?: string }>;
     clearData: () => Promise<{ success: boolean; error?: string }>;
@@ -213,6 +401,15 @@ export interface ElectronAPI {
     saveBankingDetails: (details: BankingDetails) => Promise<{ success: boolean; error?: string }>;
     getBankingDetails: () => Promise<{ success: boolean; data?: BankingDetails; error?: string }>;
 
+    // Dashboard
+    getDashboardSummary: () => Promise<{ success: boolean; summary?: DashboardSummary; error?: string }>;
+
+    // Diagnostics
+    getTrace: () => Promise<{ success: boolean; enabled: boolean; spans: TraceSpan[]; startup: Array<{ name: string; at: number }> }>;
+    setTracing: (enabled: boolean) => Promise<{ success: boolean; enabled: boolean }>;
+    clearTrace: () => Promise<{ success: boolean }>;
+    exportTrace: () => Promise<{ success: boolean; filePath?: string; error?: string }>;
+
     // Reports
     generateExecutiveSummary: (payload: { data: any[], filename?: string }) => Promise<{ success: boolean; error?: string }>;
 }
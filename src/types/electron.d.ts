@@ -60,6 +60,7 @@ export interface ProcessExcelResult {
         totalMasterRows: number;
         matchedMasterRows: number;
         unmatchedMasterRows: number;
+        nearMatchedMasterRows?: number;
         matchPercentage: number;
     };
     perFileStats?: Array<{
@@ -67,13 +68,25 @@ export interface ProcessExcelResult {
         filePath: string;
         total: number;
         matched: number;
+        nearMatched?: number;
         percentage: number;
+        reused?: boolean; // Result taken from the match session
     }>;
     matchedRows?: Array<{
         sourceFile: string;
         data: any[];
         rowNumber: number;
     }>;
+    output?: {
+        storeId: string;
+        headers: Array<{ index: number; name: string }>;
+        headerRowIndex: number;
+        footerStartRow: number;
+        rowCount: number;
+        colCount: number;
+        matchedRowCount: number;
+    };
+    matchedRowCount?: number;
     unmatchedPath?: string;
     error?: string;
 }
@@ -0,0 +1,69 @@
+import { describe, it, expect } from 'vitest';
+import { boundedLevenshtein, CustomerIndex, getCustomerIndex, guessCustomers, invalidateCustomerIndex } from '../customer-index';
+import { guessCustomer, levenshtein } from '../customer-matching';
+import { mockCustomer } from './mocks';
+
+const customer = (id: string, name: string) => ({ ...mockCustomer, id, name });
+
+const customers = [
+    customer('1', 'Al'),
+    customer('2', 'Al Kaabi'),
+    customer('3', 'Readymix'),
+    customer('4', 'Gulf Stone'),
+    customer('5', 'Qatar Gulf Trading'),
+];
+
+describe('boundedLevenshtein', () => {
+    it('agrees with levenshtein up to the bound', () => {
+        const words = ['readymix', 'redymix', 'readymixx', 'raedymix', 'ready', 'gulf', 'golf', 'stone', ''];
+        for (const a of words) {
+            for (const b of words) {
+                const full = levenshtein(a, b);
+                expect(boundedLevenshtein(a, b, 2), `${a}/${b}`).toBe(Math.min(full, 3));
+            }
+        }
+    });
+});
+
+describe('CustomerIndex', () => {
+    it('prefers the longest name contained in the file name', () => {
+        const index = new CustomerIndex(customers);
+        expect(index.guess('AL_KAABI-march.xlsx')).toBe('Al Kaabi');
+        expect(index.guess('al-report.xlsx')).toBe('Al');
+    });
+
+    it('falls back to a fuzzy token match', () => {
+        const index = new CustomerIndex(customers);
+        expect(index.guess('Redymix March.xlsx')).toBe('Readymix');
+        expect(index.guess('Unrelated file.xlsx')).toBeUndefined();
+    });
+
+    it('ranks candidates with scores', () => {
+        const [guess] = guessCustomers(['Gulf Stone trading.xlsx'], customers);
+
+        expect(guess.customerName).toBe('Gulf Stone');
+        expect(guess.candidates[0]).toMatchObject({ kind: 'substring', customer: { name: 'Gulf Stone' } });
+        expect(guess.candidates.map(c => c.customer.name)).toContain('Qatar Gulf Trading');
+        const scores = guess.candidates.map(c => c.score);
+        expect(scores).toEqual([...scores].sort((a, b) => b - a));
+    });
+
+    it('keeps guessCustomer behaviour', () => {
+        expect(guessCustomer('', customers)).toBeUndefined();
+        expect(guessCustomer('readymix.xlsx', [])).toBeUndefined();
+        expect(guessCustomer('readymix.xlsx', customers)).toBe('Readymix');
+    });
+});
+
+describe('getCustomerIndex', () => {
+    it('reuses the index until the list changes or is invalidated', () => {
+        const index = getCustomerIndex(customers);
+        expect(getCustomerIndex(customers)).toBe(index);
+        expect(getCustomerIndex([...customers])).not.toBe(index);
+
+        const list = [...customers];
+        const before = getCustomerIndex(list);
+        invalidateCustomerIndex();
+        expect(getCustomerIndex(list)).not.toBe(before);
+    });
+});
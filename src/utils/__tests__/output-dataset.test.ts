@@ -0,0 +1,65 @@
+import { describe, it, expect } from 'vitest';
+import {
+    buildOutputDataset,
+    OutputDataset,
+    OutputDatasetBuilder,
+    EMPTY_STRING_ID,
+    PRODUCT_TYPE_10MM,
+    PRODUCT_TYPE_20MM,
+    PRODUCT_TYPE_OTHER,
+} from '../output-dataset';
+
+const data = [
+    ['Description', 'Net Weight', 'Result'],
+    ['Gabbro 20mm', '1,250.5', 'Alpha'],
+    [],
+    ['Sand', '3', 'Not Matched'],
+    ['Chips', 2, 'Beta', '10mm'],
+    ['Gabbro 20mm', 4, ' Alpha '],
+    ['Description', 'Net Weight', 'Result'],
+];
+
+describe('buildOutputDataset', () => {
+    const dataset = buildOutputDataset(data);
+
+    it('interns every column per row', () => {
+        expect(dataset.rowCount).toBe(6);
+        expect(dataset.colCount).toBe(4);
+        const results = dataset.ids(2);
+        expect(results[0]).toBe(results[4]);
+        expect(results[1]).toBe(EMPTY_STRING_ID);
+        expect(dataset.strings[results[3]]).toBe('Beta');
+        expect(Array.from(dataset.ids(9))).toEqual([0, 0, 0, 0, 0, 0]);
+    });
+
+    it('parses quantities once per column into a typed array', () => {
+        const quantities = dataset.quantities(1);
+        expect(Array.from(quantities.slice(0, 5))).toEqual([1250.5, 0, 3, 2, 4]);
+        expect(dataset.quantities(1)).toBe(quantities);
+    });
+
+    it('codes product types from all cells of a row', () => {
+        expect(dataset.productTypes[0]).toBe(PRODUCT_TYPE_20MM);
+        expect(dataset.productTypes[3]).toBe(PRODUCT_TYPE_10MM);
+        expect(dataset.productTypes[2]).toBe(PRODUCT_TYPE_OTHER);
+    });
+
+    it('decodes string columns lazily', () => {
+        const column = dataset.column(3);
+        expect(column).toBe(dataset.column(3));
+        expect(column.get(3)).toBe('10mm');
+        expect(column.get(1)).toBe('');
+    });
+
+    it('builds the same dataset from row blocks and survives a JSON round trip', () => {
+        const builder = new OutputDatasetBuilder(1);
+        builder.append(data.slice(0, 3), 1);
+        builder.append(data.slice(3));
+        const fromBlocks = builder.finish();
+        expect(fromBlocks.toJSON()).toEqual(dataset.toJSON());
+
+        const revived = OutputDataset.fromJSON(JSON.parse(JSON.stringify(dataset)));
+        expect(Array.from(revived.quantities(1))).toEqual(Array.from(dataset.quantities(1)));
+        expect(revived.column(0).get(4)).toBe('Gabbro 20mm');
+    });
+});
@@ -0,0 +1,95 @@
+import { describe, it, expect } from 'vitest';
+import { ReconciliationEngine, calculateReconciliationStats } from '../reconciliation-engine';
+import { detectProductType, detectRowProductType } from '../product-type-utils';
+import { buildOutputDataset } from '../output-dataset';
+import { mockCustomers } from './mocks';
+
+const headers = [
+    { name: 'Description', index: 0 },
+    { name: 'Net Weight', index: 1 },
+    { name: 'Result', index: 2 },
+];
+
+const data = [
+    ['Description', 'Net Weight', 'Result'],
+    ['Gabbro 20mm', '10.5', 'Alpha'],
+    ['Gabbro 10mm', '4', 'Beta'],
+    ['Gabbro 20mm', '2.25', 'Alpha'],
+    ['Sand', '1', 'Not Matched'],
+    ['Gabbro 10mm', '3', 'Alpha'],
+];
+const dataset = buildOutputDataset(data);
+
+const configs = (alpha: string | null, beta: string | null) => ({
+    output: { customerId: null, descriptionColIdx: 0, quantityColIdx: 1, resultColIdx: 2 },
+    Alpha: { customerId: alpha, descriptionColIdx: -1, quantityColIdx: -1 },
+    Beta: { customerId: beta, descriptionColIdx: -1, quantityColIdx: -1 },
+});
+
+const params = (fileGenConfigs: ReturnType<typeof configs>) => ({
+    outputFileHeaders: headers,
+    outputDataset: dataset,
+    fileGenConfigs,
+    noMatchLabel: 'Not Matched',
+    customers: mockCustomers,
+});
+
+describe('calculateReconciliationStats', () => {
+    it('aggregates groups, customers and invoice items in one pass', () => {
+        const result = calculateReconciliationStats(params(configs('cust-001', null)));
+
+        expect(result.groupStats.Alpha).toMatchObject({ totalQuantity: 15.75, total10mm: 3, total20mm: 12.75 });
+        expect(result.groupStats.Beta.assignedCustomer).toBeNull();
+        expect(result.unmatchedStats).toEqual({ count: 1, rows: [3] });
+        expect(result.groupStats.Alpha.rows).toEqual([0, 2, 4]);
+        expect(result.totalQuantity).toBe(19.75);
+
+        const stat = result.customerStats['cust-001'];
+        expect(stat).toMatchObject({ total10mm: 3, total20mm: 12.75, trips10mm: 1, trips20mm: 2 });
+        expect(stat.items.map(i => [i.description, i.quantity])).toEqual([['Gabbro 20mm', 12.75], ['Gabbro 10mm', 3]]);
+    });
+
+    it('still builds groups and items with quantity 0 when there is no quantity column', () => {
+        const fileGenConfigs = configs('cust-001', null);
+        const result = calculateReconciliationStats({
+            ...params({ ...fileGenConfigs, output: { ...fileGenConfigs.output, quantityColIdx: -1 } }),
+            outputFileHeaders: [headers[0], { name: 'Ticket', index: 1 }, headers[2]],
+        });
+
+        expect(result.groupStats.Alpha).toMatchObject({ totalQuantity: 0, total10mm: 0, total20mm: 0 });
+        expect(result.groupStats.Alpha.rows).toEqual([0, 2, 4]);
+        expect(result.totalQuantity).toBe(0);
+
+        const stat = result.customerStats['cust-001'];
+        expect(stat).toMatchObject({ total10mm: 0, total20mm: 0, trips10mm: 1, trips20mm: 2 });
+        expect(stat.items.map(i => [i.description, i.quantity])).toEqual([['Gabbro 20mm', 0], ['Gabbro 10mm', 0]]);
+    });
+});
+
+describe('ReconciliationEngine', () => {
+    it('only rebuilds the reassigned group and its customers', () => {
+        const engine = new ReconciliationEngine();
+        const first = engine.update(params(configs('cust-001', 'cust-001')));
+        expect(first.customerStats['cust-001'].items.find(i => i.description === 'Gabbro 10mm')?.quantity).toBe(7);
+
+        const second = engine.update(params(configs('cust-001', 'cust-002')));
+        expect(second.groupStats.Alpha).toBe(first.groupStats.Alpha);
+        expect(second.groupStats.Beta.assignedCustomer?.id).toBe('cust-002');
+        expect(second.customerStats['cust-001'].total10mm).toBe(3);
+        expect(second.customerStats['cust-002']).toMatchObject({ total10mm: 4, trips10mm: 1 });
+        expect(second.unmatchedStats).toBe(first.unmatchedStats);
+
+        // Same assignment: the previous result is returned as is
+        expect(engine.update(params(configs('cust-001', 'cust-002')))).toBe(second);
+    });
+});
+
+describe('detectRowProductType', () => {
+    it('matches detectProductType on the joined row text', () => {
+        const rows = [['Gabbro', '10MM chips'], ['x', 'a 20mm b', '10mm'], ['Sand', 5, null]];
+        for (const row of rows) {
+            const joined = row.map(c => String(c || '').trim()).join(' ').toLowerCase();
+            expect(detectRowProductType(String(row[0]), row)).toBe(detectProductType(String(row[0]), joined));
+        }
+    });
+});
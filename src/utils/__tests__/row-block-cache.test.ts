@@ -0,0 +1,35 @@
+import { describe, it, expect } from 'vitest';
+import { RowBlockCache } from '../row-block-cache';
+
+const block = (first: number, size: number) => Array.from({ length: size }, (_, i) => [first + i]);
+
+describe('RowBlockCache', () => {
+    it('lists only the blocks a row range still needs', () => {
+        const cache = new RowBlockCache(10, 4);
+        cache.set(1, block(10, 10));
+
+        expect(cache.missingBlocks(5, 25)).toEqual([0, 2]);
+        expect(cache.missingBlocks(10, 20)).toEqual([]);
+        expect(cache.missingBlocks(7, 7)).toEqual([]);
+    });
+
+    it('serves rows from their block', () => {
+        const cache = new RowBlockCache(10, 4);
+        cache.set(2, block(20, 10));
+
+        expect(cache.getRow(23)).toEqual([23]);
+        expect(cache.getRow(3)).toBeUndefined();
+    });
+
+    it('evicts the least recently used block beyond the limit', () => {
+        const cache = new RowBlockCache(10, 2);
+        cache.set(0, block(0, 10));
+        cache.set(1, block(10, 10));
+        cache.missingBlocks(0, 10); // touch block 0
+        cache.set(2, block(20, 10));
+
+        expect(cache.size).toBe(2);
+        expect(cache.getRow(0)).toEqual([0]);
+        expect(cache.getRow(10)).toBeUndefined();
+    });
+});
@@ -0,0 +1,31 @@
+import { describe, it, expect } from 'vitest';
+import { summarizeTrace, formatBytes } from '../trace-summary';
+
+const span = (name: string, dur: number, args?: Record<string, number | string | boolean>) =>
+    ({ name, cat: name.includes(':') ? 'ipc' : 'excel', ts: 0, dur, tid: 0, args });
+
+describe('summarizeTrace', () => {
+    it('groups spans by stage, slowest stage first', () => {
+        const stages = summarizeTrace([
+            span('match target rows', 2000, { rows: 100, heapDelta: 4096 }),
+            span('excel:process', 9000, { argBytes: 300, resultBytes: 700 }),
+            span('match target rows', 4000, { rows: 50, heapDelta: -1024 })
+        ]);
+
+        expect(stages.map(stage => stage.name)).toEqual(['excel:process', 'match target rows']);
+        expect(stages[0]).toMatchObject({ cat: 'ipc', count: 1, totalMs: 9, bytes: 1000 });
+        expect(stages[1]).toMatchObject({ count: 2, totalMs: 6, meanMs: 3, maxMs: 4, rows: 150, heapDelta: 3072 });
+    });
+
+    it('returns nothing for no spans', () => {
+        expect(summarizeTrace([])).toEqual([]);
+    });
+});
+
+describe('formatBytes', () => {
+    it('scales to the largest whole unit', () => {
+        expect(formatBytes(512)).toBe('512 B');
+        expect(formatBytes(2048)).toBe('2.0 KB');
+        expect(formatBytes(-3 * 1024 * 1024)).toBe('-3.0 MB');
+    });
+});
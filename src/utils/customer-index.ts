@@ -0,0 +1,192 @@
+import type { Customer } from '../types.d';
+
+/**
+ * Customer-name index for guessing customers from file names.
+ *
+ * Built once per customer list: names are normalised up front, and the
+ * index keeps postings from each name's first trigram (substring stage), from
+ * each name token (ranked candidates) and from name length (fuzzy stage),
+ * so a file name only meets the customers that could match it. Fuzzy
+ * distances are banded and stop as soon as the threshold is exceeded.
+ *
+ * getCustomerIndex caches the index for the current customer list;
+ * invalidateCustomerIndex drops it when customers are saved or deleted.
+ */
+
+export type CustomerMatchKind = 'substring' | 'fuzzy' | 'token';
+
+export interface CustomerCandidate {
+    customer: Customer;
+    kind: CustomerMatchKind;
+    score: number; // 0..1, higher is more confident
+    distance?: number; // Edit distance of the closest file name token (fuzzy matches)
+}
+
+export interface CustomerGuess {
+    fileName: string;
+    customerName?: string; // The guess guessCustomer returns
+    candidates: CustomerCandidate[]; // Best first
+}
+
+interface Entry {
+    customer: Customer;
+    name: string; // Normalised
+    tokens: string[]; // Distinct name tokens long enough to rank on
+    rank: number; // Longest raw name first, the order guessCustomer tries customers in
+}
+
+const MIN_FUZZY_LENGTH = 4; // Names and file name tokens of 3 chars or fewer are never fuzzy matched
+const MAX_FUZZY_DISTANCE = 2;
+const DEFAULT_CANDIDATES = 5;
+
+// Lowercase, replace separators with space, remove extra spaces
+export const normalizeName = (str: string) => str.toLowerCase().replace(/[_\-.]/g, ' ').replace(/\s+/g, ' ').trim();
+
+// Allow 1 edit for short names (4-5 chars), 2 edits for longer
+const fuzzyThreshold = (name: string) => (name.length <= 5 ? 1 : 2);
+
+// Levenshtein distance within a band of `max` around the diagonal; max + 1 once it is exceeded
+export function boundedLevenshtein(a: string, b: string, max: number): number {
+    if (Math.abs(a.length - b.length) > max) return max + 1;
+    const over = max + 1;
+    let previous = new Array<number>(b.length + 1);
+    let current = new Array<number>(b.length + 1);
+    for (let j = 0; j <= b.length; j++) previous[j] = j <= max ? j : over;
+
+    for (let i = 1; i <= a.length; i++) {
+        const from = Math.max(1, i - max);
+        const to = Math.min(b.length, i + max);
+        current.fill(over);
+        current[0] = i <= max ? i : over;
+        let rowMin = current[0];
+        for (let j = from; j <= to; j++) {
+            const cost = a.charCodeAt(i - 1) === b.charCodeAt(j - 1) ? 0 : 1;
+            const value = Math.min(previous[j - 1] + cost, previous[j] + 1, current[j - 1] + 1, over);
+            current[j] = value;
+            if (value < rowMin) rowMin = value;
+        }
+        if (rowMin > max) return over;
+        [previous, current] = [current, previous];
+    }
+    return previous[b.length];
+}
+
+export class CustomerIndex {
+    private entries: Entry[];
+    private byTrigram = new Map<string, Entry[]>(); // First trigram of the name
+    private shortNames: Entry[] = []; // Names too short for a trigram
+    private byToken = new Map<string, Entry[]>();
+    private byLength = new Map<number, Entry[]>(); // Fuzzy-eligible names
+
+    constructor(customers: Customer[]) {
+        this.entries = [...customers]
+            .sort((a, b) => b.name.length - a.name.length)
+            .map((customer, rank) => {
+                const name = normalizeName(customer.name);
+                const tokens = Array.from(new Set(name.split(' '))).filter(t => t.length >= MIN_FUZZY_LENGTH);
+                return { customer, name, tokens, rank };
+            });
+
+        for (const entry of this.entries) {
+            if (!entry.name) continue;
+            if (entry.name.length < 3) this.shortNames.push(entry);
+            else push(this.byTrigram, entry.name.slice(0, 3), entry);
+
+            for (const token of entry.tokens) push(this.byToken, token, entry);
+            if (entry.name.length >= MIN_FUZZY_LENGTH) push(this.byLength, entry.name.length, entry);
+        }
+    }
+
+    get size(): number {
+        return this.entries.length;
+    }
+
+    guess(fileName: string): string | undefined {
+        return this.rank(fileName, 1).customerName;
+    }
+
+    rank(fileName: string, limit: number = DEFAULT_CANDIDATES): CustomerGuess {
+        const guess: CustomerGuess = { fileName, candidates: [] };
+        const file = normalizeName(fileName || '');
+        if (!file || this.entries.length === 0) return guess;
+
+        const found = new Map<Entry, CustomerCandidate>();
+        const offer = (entry: Entry, candidate: Omit<CustomerCandidate, 'customer'>) => {
+            const current = found.get(entry);
+            if (!current || candidate.score > current.score) found.set(entry, { customer: entry.customer, ...candidate });
+        };
+
+        // 1. Exact/Substring Match (High Confidence), longest name first
+        let substring: Entry | undefined;
+        const checkSubstring = (entry: Entry) => {
+            if (!file.includes(entry.name)) return;
+            offer(entry, { kind: 'substring', score: 0.9 + 0.1 * (entry.name.length / file.length) });
+            if (!substring || entry.rank < substring.rank) substring = entry;
+        };
+        this.shortNames.forEach(checkSubstring);
+        const seenTrigrams = new Set<string>();
+        for (let i = 0; i + 3 <= file.length; i++) {
+            const trigram = file.slice(i, i + 3);
+            if (seenTrigrams.has(trigram)) continue;
+            seenTrigrams.add(trigram);
+            this.byTrigram.get(trigram)?.forEach(checkSubstring);
+        }
+
+        // 2. Fuzzy Token Match (Medium Confidence): a file name token within a few edits of the whole name
+        let fuzzy: Entry | undefined;
+        const fileTokens = new Set(file.split(' '));
+        const tokens = Array.from(fileTokens).filter(t => t.length >= MIN_FUZZY_LENGTH);
+        for (const token of tokens) {
+            for (let length = token.length - MAX_FUZZY_DISTANCE; length <= token.length + MAX_FUZZY_DISTANCE; length++) {
+                for (const entry of this.byLength.get(length) || []) {
+                    const threshold = fuzzyThreshold(entry.name);
+                    const distance = boundedLevenshtein(token, entry.name, threshold);
+                    if (distance > threshold) continue;
+                    offer(entry, { kind: 'fuzzy', score: 0.8 - 0.1 * distance, distance });
+                    if (!fuzzy || entry.rank < fuzzy.rank) fuzzy = entry;
+                }
+            }
+
+            // 3. Shared name tokens (Low Confidence): only ranked, never picked
+            for (const entry of this.byToken.get(token) || []) {
+                if (found.has(entry)) continue;
+                const shared = entry.tokens.filter(t => fileTokens.has(t)).length;
+                offer(entry, { kind: 'token', score: 0.5 * (shared / entry.tokens.length) });
+            }
+        }
+
+        guess.customerName = (substring || fuzzy)?.customer.name;
+        guess.candidates = Array.from(found.entries())
+            .sort(([a, x], [b, y]) => y.score - x.score || a.rank - b.rank)
+            .slice(0, limit)
+            .map(([, candidate]) => candidate);
+        return guess;
+    }
+}
+
+function push<K>(map: Map<K, Entry[]>, key: K, entry: Entry) {
+    const list = map.get(key);
+    if (list) list.push(entry);
+    else map.set(key, [entry]);
+}
+
+let cached: { customers: Customer[]; index: CustomerIndex } | null = null;
+
+// Index for this customer list; each newly loaded list gets a new one
+export function getCustomerIndex(customers: Customer[]): CustomerIndex {
+    if (!cached || cached.customers !== customers) {
+        cached = { customers, index: new CustomerIndex(customers) };
+    }
+    return cached.index;
+}
+
+// Customers were saved or deleted: the next lookup rebuilds the index
+export function invalidateCustomerIndex(): void {
+    cached = null;
+}
+
+// Ranked customer candidates for a batch of files, sharing one index
+export function guessCustomers(fileNames: string[], customers: Customer[], limit?: number): CustomerGuess[] {
+    const index = getCustomerIndex(customers);
+    return fileNames.map(fileName => index.rank(fileName, limit));
+}
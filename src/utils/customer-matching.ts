@@ -1,4 +1,5 @@
 import type { Customer } from '../types.d';
+import { getCustomerIndex } from './customer-index';
 
 // Helper: Levenshtein distance for fuzzy matching
 export const levenshtein = (a: string, b: string): number => {
@@ -24,45 +25,10 @@ export const levenshtein = (a: string, b: string): number => {
     return matrix[b.length][a.length];
 };
 
-// Helper: Guess customer from filename with fuzzy logic
+// Helper: Guess customer from filename with fuzzy logic (see CustomerIndex)
 export const guessCustomer = (fileName: string, customers: Customer[]): string | undefined => {
     if (!fileName || !customers.length) return undefined;
-
-    // Normalize string: lowercase, replace separators with space, remove extra spaces
-    const normalize = (str: string) => str.toLowerCase().replace(/[_\-.]/g, ' ').replace(/\s+/g, ' ').trim();
-    const normalizedFile = normalize(fileName);
-
-    // 1. Exact/Substring Match (High Confidence)
-    // Sort customers by length desc to match longest first (e.g. "Al Kaabi" before "Al")
-    const sorted = [...customers].sort((a, b) => b.name.length - a.name.length);
-
-    for (const customer of sorted) {
-        const normalizedCustomer = normalize(customer.name);
-        if (normalizedFile.includes(normalizedCustomer)) {
-            return customer.name;
-        }
-    }
-
-    // 2. Fuzzy Token Match (Medium Confidence)
-    // Split filename into tokens
-    const fileTokens = normalizedFile.split(' ').filter(t => t.length > 3); // Ignore short words
-
-    for (const customer of sorted) {
-        const customerName = normalize(customer.name);
-        // If customer name is short (<= 3 chars), skip fuzzy match to avoid false positives
-        if (customerName.length <= 3) continue;
-
-        for (const token of fileTokens) {
-            // Check distance
-            const distance = levenshtein(token, customerName);
-            // Allow 1 edit for short words (4-5 chars), 2 edits for longer
-            const threshold = customerName.length <= 5 ? 1 : 2;
-
-            if (distance <= threshold) {
-                return customer.name;
-            }
-        }
-    }
-
-    return undefined;
+    return getCustomerIndex(customers).guess(fileName);
 };
+
+export { guessCustomers } from './customer-index';
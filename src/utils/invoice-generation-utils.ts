@@ -1,13 +1,9 @@
-import type { Customer } from '@/types';
+import type { Customer, GeneratedInvoiceEntry, GenerateInvoicesResult } from '@/types';
 import type { FileGenConfig } from '@/hooks/useMatcherState';
-import { detectProductType } from './product-type-utils';
-import { parseQuantitySafe } from './quantity-parser';
-
 import type { ReconciliationResult } from './reconciliation-engine';
 
 export interface InvoiceGenerationParams {
     outputFileHeaders: Array<{ name: string; index: number }>;
-    outputFileData: any[][];
     fileGenConfigs: Record<string, FileGenConfig>;
     reconciliationResult: ReconciliationResult;
     matchValues: string[];
@@ -24,95 +20,26 @@ export interface InvoiceGenerationResult {
 
 export async function generateInvoicesFromReconciliation(
     params: InvoiceGenerationParams,
-    saveInvoice: (invoice: any) => Promise<{ success: boolean }>,
-    saveCustomer: (customer: Customer) => Promise<{ success: boolean }>
+    saveGenerated: (entries: GeneratedInvoiceEntry[]) => Promise<GenerateInvoicesResult>
 ): Promise<InvoiceGenerationResult> {
-    const { outputFileHeaders, outputFileData, fileGenConfigs, noMatchLabel, customers } = params;
+    const { fileGenConfigs, reconciliationResult } = params;
 
     const outputConfig = fileGenConfigs['output'];
     if (!outputConfig) {
         throw new Error("Output file configuration missing");
     }
 
-    const invoiceItemsByCustomer: Record<string, Map<string, any>> = {};
-    const customerTotals: Record<string, { t10: number, t20: number }> = {};
-
-    const descIdx = outputConfig.descriptionColIdx ?? 0;
-    const qtyIdx = outputConfig.quantityColIdx ?? -1;
-    const resultIdx = outputConfig.resultColIdx ?? (outputFileHeaders.length > 0 ? outputFileHeaders[outputFileHeaders.length - 1].index : -1);
-
-    const dataRows = outputFileData.slice(1);
-
-    dataRows.forEach((row, idx) => {
-        if (!row || row.length === 0) return;
-
-        const matchValue = String(row[resultIdx] || '').trim();
-        if (!matchValue || matchValue.toLowerCase() === 'not matched' || matchValue === noMatchLabel) return;
-
-        const groupConfig = fileGenConfigs[matchValue];
-        if (!groupConfig || !groupConfig.customerId) return;
-
-        const customerId = groupConfig.customerId;
-        const description = String(row[descIdx] || `Item ${idx + 1}`);
-        const fullRowText = row.map((cell: any) => String(cell || '').trim()).join(' ').toLowerCase();
-        const type = detectProductType(description, fullRowText);
-        const rate = 0;
-
-        const quantity = qtyIdx !== -1 && qtyIdx < row.length
-            ? parseQuantitySafe(row[qtyIdx])
-            : 0;
-
-        if (!invoiceItemsByCustomer[customerId]) {
-            invoiceItemsByCustomer[customerId] = new Map();
-            customerTotals[customerId] = { t10: 0, t20: 0 };
-        }
-
-        const key = description;
-        const customerMap = invoiceItemsByCustomer[customerId];
-
-        if (customerMap.has(key)) {
-            const existing = customerMap.get(key);
-            existing.quantity = Math.round((existing.quantity + quantity) * 100) / 100;
-            existing.amount = Math.round(existing.quantity * existing.unitPrice * 100) / 100;
-        } else {
-            customerMap.set(key, {
-                id: crypto.randomUUID(),
-                description: description,
-                quantity: quantity,
-                unitPrice: rate,
-                amount: Math.round(quantity * rate * 100) / 100,
-                type: type
-            });
-        }
-
-        if (type === '10mm') customerTotals[customerId].t10 += quantity;
-        if (type === '20mm') customerTotals[customerId].t20 += quantity;
-    });
-
     const invoices: any[] = [];
-    const customerUpdates: Array<{ customer: Customer; totals: { t10: number; t20: number } }> = [];
-    let successCount = 0;
-    let failCount = 0;
-
-    for (const [custId, itemMap] of Object.entries(invoiceItemsByCustomer)) {
-        const items = Array.from(itemMap.values());
-        if (items.length === 0) continue;
+    const entries: GeneratedInvoiceEntry[] = [];
 
-        const customer = customers.find(c => c.id === custId);
-        if (!customer) continue;
+    // Items and totals were aggregated by the reconciliation engine; nothing is re-read from the rows.
+    // Groups therefore reach a customer through the same file-name match the matcher screen shows, and
+    // without a quantity column the items are still generated, with quantity 0.
+    for (const stat of Object.values(reconciliationResult.customerStats)) {
+        if (stat.items.length === 0) continue;
+        const customer = stat.customer;
 
-        const totals = customerTotals[custId];
-        if (totals.t10 > 0 || totals.t20 > 0) {
-            const updatedCustomer = {
-                ...customer,
-                total10mm: (customer.total10mm || 0) + totals.t10,
-                total20mm: (customer.total20mm || 0) + totals.t20,
-            };
-            await saveCustomer(updatedCustomer);
-            customerUpdates.push({ customer: updatedCustomer, totals });
-        }
-
-        const finalItems = items;
+        const finalItems = stat.items.map(item => ({ ...item, id: crypto.randomUUID() }));
 
         const subtotal = 0;
         const tax = 0;
@@ -145,10 +72,28 @@ export async function generateInvoicesFromReconciliation(
         };
 
         invoices.push(newInvoice);
-        const result = await saveInvoice(newInvoice);
-        if (result.success) successCount++;
-        else failCount++;
+        const hasTotals = stat.total10mm > 0 || stat.total20mm > 0;
+        entries.push({ invoice: newInvoice, totals: hasTotals ? { total10mm: stat.total10mm, total20mm: stat.total20mm } : undefined });
+    }
+
+    // One round trip: the invoices, their number block and the customer totals are saved in one transaction
+    let successCount = 0;
+    const customerUpdates: InvoiceGenerationResult['customerUpdates'] = [];
+    if (entries.length > 0) {
+        const result = await saveGenerated(entries);
+        if (!result.success) throw new Error(result.error || 'Failed to save invoices');
+        invoices.forEach((invoice, i) => {
+            const itemResult = result.results?.[i];
+            if (!itemResult?.success) return;
+            successCount++;
+            if (itemResult.number) invoice.number = itemResult.number;
+        });
+        for (const customer of result.customers ?? []) {
+            const stat = reconciliationResult.customerStats[customer.id];
+            customerUpdates.push({ customer, totals: { t10: stat?.total10mm ?? 0, t20: stat?.total20mm ?? 0 } });
+        }
     }
+    const failCount = invoices.length - successCount;
 
     return {
         invoices,
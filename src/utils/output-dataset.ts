@@ -0,0 +1,232 @@
+/**
+ * Columnar view of the matched output rows.
+ *
+ * Built once per processed output, block by block, without keeping the rows:
+ * every cell is interned into a Uint32Array of string ids per column, and
+ * every row gets a Uint8Array product-type code (10mm/20mm/other) from its
+ * cells. Quantities are parsed into a Float64Array the first time a column is
+ * used as the quantity column, and string columns are decoded lazily, on
+ * access. Reconciliation (and the executive summary built from it) loops over
+ * these typed arrays instead of row objects, and a different column choice
+ * needs no new pass over the rows.
+ */
+
+import type { ProductType } from './product-type-utils';
+import { parseQuantitySafe } from './quantity-parser';
+
+export const PRODUCT_TYPE_OTHER = 0;
+export const PRODUCT_TYPE_10MM = 1;
+export const PRODUCT_TYPE_20MM = 2;
+
+// Product type by code
+export const PRODUCT_TYPES: ProductType[] = ['other', '10mm', '20mm'];
+
+// String id of empty cells (null, undefined, blank text)
+export const EMPTY_STRING_ID = 0;
+
+const INITIAL_CAPACITY = 1024;
+
+// Same test as detectRowProductType, applied to one cell
+function productTypeOf(text: string): number {
+    const lower = text.toLowerCase();
+    if (lower.includes('20mm')) return PRODUCT_TYPE_20MM;
+    if (lower.includes('10mm')) return PRODUCT_TYPE_10MM;
+    return PRODUCT_TYPE_OTHER;
+}
+
+export class LazyStringColumn {
+    private strings: string[];
+    private ids: Uint32Array;
+
+    constructor(strings: string[], ids: Uint32Array) {
+        this.strings = strings;
+        this.ids = ids;
+    }
+
+    get(rowIndex: number): string {
+        return this.strings[this.ids[rowIndex]] ?? '';
+    }
+}
+
+// Plain form of a dataset, as kept in localStorage
+export interface OutputDatasetJSON {
+    rowCount: number;
+    strings: string[];
+    numeric: number[]; // Ids of strings that came from number cells
+    cells: number[][];
+    productTypes: number[];
+}
+
+export class OutputDataset {
+    readonly rowCount: number; // Data rows, header row excluded
+    readonly strings: string[]; // By string id; strings[EMPTY_STRING_ID] is ''
+    readonly productTypes: Uint8Array; // Product type code per row
+    private cells: Uint32Array[]; // String id per row, by column
+    private numeric: Set<number>;
+    private quantityColumns = new Map<number, Float64Array>();
+    private stringColumns = new Map<number, LazyStringColumn>();
+    private emptyColumn: Uint32Array | null = null;
+
+    constructor(rowCount: number, strings: string[], cells: Uint32Array[], productTypes: Uint8Array, numeric: Set<number>) {
+        this.rowCount = rowCount;
+        this.strings = strings;
+        this.cells = cells;
+        this.productTypes = productTypes;
+        this.numeric = numeric;
+    }
+
+    get colCount(): number {
+        return this.cells.length;
+    }
+
+    // String id of every row's cell in the column (all EMPTY_STRING_ID past the last column)
+    ids(colIdx: number): Uint32Array {
+        const column = this.cells[colIdx];
+        if (column) return column;
+        if (!this.emptyColumn) this.emptyColumn = new Uint32Array(this.rowCount);
+        return this.emptyColumn;
+    }
+
+    // Parsed quantity of every row, computed once per column and per distinct value
+    quantities(colIdx: number): Float64Array {
+        let quantities = this.quantityColumns.get(colIdx);
+        if (!quantities) {
+            const ids = this.ids(colIdx);
+            const parsed = new Map<number, number>();
+            quantities = new Float64Array(this.rowCount);
+            for (let i = 0; i < this.rowCount; i++) {
+                const id = ids[i];
+                if (id === EMPTY_STRING_ID) continue;
+                let quantity = parsed.get(id);
+                if (quantity === undefined) {
+                    const text = this.strings[id];
+                    quantity = parseQuantitySafe(this.numeric.has(id) ? Number(text) : text);
+                    parsed.set(id, quantity);
+                }
+                quantities[i] = quantity;
+            }
+            this.quantityColumns.set(colIdx, quantities);
+        }
+        return quantities;
+    }
+
+    column(colIdx: number): LazyStringColumn {
+        let column = this.stringColumns.get(colIdx);
+        if (!column) {
+            column = new LazyStringColumn(this.strings, this.ids(colIdx));
+            this.stringColumns.set(colIdx, column);
+        }
+        return column;
+    }
+
+    toJSON(): OutputDatasetJSON {
+        return {
+            rowCount: this.rowCount,
+            strings: this.strings,
+            numeric: Array.from(this.numeric),
+            cells: this.cells.map(column => Array.from(column)),
+            productTypes: Array.from(this.productTypes)
+        };
+    }
+
+    static fromJSON(json: OutputDatasetJSON): OutputDataset {
+        return new OutputDataset(
+            json.rowCount,
+            json.strings,
+            json.cells.map(column => Uint32Array.from(column)),
+            Uint8Array.from(json.productTypes),
+            new Set(json.numeric)
+        );
+    }
+}
+
+/**
+ * Interns output rows as they arrive; append the data rows in order (without
+ * the header row) and call finish() once.
+ */
+export class OutputDatasetBuilder {
+    private rowCount = 0;
+    private capacity: number;
+    private strings = [''];
+    private lookup = new Map<string, number>([['', EMPTY_STRING_ID]]);
+    private stringTypes: number[] = [PRODUCT_TYPE_OTHER];
+    private numeric = new Set<number>();
+    private cells: Uint32Array[] = [];
+    private productTypes: Uint8Array;
+
+    // expectedRows sizes the arrays up front when the row count is known
+    constructor(expectedRows: number = INITIAL_CAPACITY) {
+        this.capacity = Math.max(1, expectedRows);
+        this.productTypes = new Uint8Array(this.capacity);
+    }
+
+    append(rows: any[][], from: number = 0): void {
+        for (let r = from; r < rows.length; r++) {
+            if (this.rowCount === this.capacity) this.grow();
+            const i = this.rowCount++;
+            const row = rows[r];
+            if (!row || row.length === 0) continue;
+
+            let type = PRODUCT_TYPE_OTHER;
+            for (let c = 0; c < row.length; c++) {
+                const id = this.intern(row[c]);
+                if (id === EMPTY_STRING_ID) continue;
+                if (c >= this.cells.length) this.addColumns(c + 1);
+                this.cells[c][i] = id;
+                // 20mm anywhere in the row wins over 10mm, as in detectRowProductType
+                if (type !== PRODUCT_TYPE_20MM && this.stringTypes[id] > type) type = this.stringTypes[id];
+            }
+            this.productTypes[i] = type;
+        }
+    }
+
+    finish(): OutputDataset {
+        const n = this.rowCount;
+        return new OutputDataset(
+            n,
+            this.strings,
+            this.cells.map(column => column.slice(0, n)),
+            this.productTypes.slice(0, n),
+            this.numeric
+        );
+    }
+
+    private intern(value: any): number {
+        if (value === null || value === undefined) return EMPTY_STRING_ID;
+        const text = String(value).trim();
+        let id = this.lookup.get(text);
+        if (id === undefined) {
+            id = this.strings.length;
+            this.strings.push(text);
+            this.lookup.set(text, id);
+            this.stringTypes.push(productTypeOf(text));
+            if (typeof value === 'number') this.numeric.add(id);
+        }
+        return id;
+    }
+
+    private addColumns(count: number): void {
+        while (this.cells.length < count) this.cells.push(new Uint32Array(this.capacity));
+    }
+
+    private grow(): void {
+        this.capacity *= 2;
+        const productTypes = new Uint8Array(this.capacity);
+        productTypes.set(this.productTypes);
+        this.productTypes = productTypes;
+        this.cells = this.cells.map(column => {
+            const next = new Uint32Array(this.capacity);
+            next.set(column);
+            return next;
+        });
+    }
+}
+
+/**
+ * One pass over the output rows (outputFileData[0] is the header row).
+ */
+export function buildOutputDataset(outputFileData: any[][]): OutputDataset {
+    const builder = new OutputDatasetBuilder(Math.max(0, outputFileData.length - 1));
+    builder.append(outputFileData, 1);
+    return builder.finish();
+}
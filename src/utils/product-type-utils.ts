@@ -26,6 +26,28 @@ export function detectProductType(description: string, rowData?: string): Produc
     return 'other';
 }
 
+/**
+ * Same result as detectProductType(description, <row cells joined>) without
+ * building the joined row text: cells are checked one by one
+ * @param description - Product description text
+ * @param row - Raw row cells
+ */
+export function detectRowProductType(description: string, row: any[]): ProductType {
+    const descLower = description.toLowerCase();
+    if (descLower.includes('20mm')) return '20mm';
+
+    let has10mm = descLower.includes('10mm');
+    for (let i = 0; i < row.length; i++) {
+        const cell = row[i];
+        if (!cell) continue;
+        const text = String(cell).toLowerCase();
+        if (text.includes('20mm')) return '20mm';
+        if (!has10mm && text.includes('10mm')) has10mm = true;
+    }
+
+    return has10mm ? '10mm' : 'other';
+}
+
 /**
  * Check if a product type is valid (not 'other')
  */
@@ -1,7 +1,13 @@
 import type { Customer } from '@/types';
 import type { FileGenConfig } from '@/hooks/useMatcherState';
-import { detectProductType } from './product-type-utils';
-import { parseQuantitySafe } from './quantity-parser';
+import type { ProductType } from './product-type-utils';
+import {
+    EMPTY_STRING_ID,
+    PRODUCT_TYPE_10MM,
+    PRODUCT_TYPE_20MM,
+    PRODUCT_TYPES,
+    type OutputDataset
+} from './output-dataset';
 
 export interface InvoiceItem {
     id: string;
@@ -31,13 +37,13 @@ export interface ReconciliationResult {
         totalQuantity: number;
         total10mm: number;
         total20mm: number;
-        rows: any[]; // Rows belonging to this group
+        rows: number[]; // Indices of this group's rows in the output dataset
     }>;
 
     // Unmatched data stats
     unmatchedStats: {
         count: number;
-        rows: any[];
+        rows: number[]; // Output dataset row indices
     };
 
     // Global stats
@@ -48,32 +54,65 @@ export interface ReconciliationResult {
 
 export interface CalculationParams {
     outputFileHeaders: Array<{ name: string; index: number }>;
-    outputFileData: any[][];
+    outputDataset: OutputDataset | null;
     fileGenConfigs: Record<string, FileGenConfig>;
     noMatchLabel: string;
     customers: Customer[];
 }
 
-export function calculateReconciliationStats(params: CalculationParams): ReconciliationResult {
-    const { outputFileHeaders, outputFileData, fileGenConfigs, noMatchLabel, customers } = params;
+/**
+ * Reconciliation is split in two layers:
+ *
+ * 1. The row index: one pass over the columnar output dataset (see
+ *    output-dataset.ts) that aggregates quantities, trips and invoice items
+ *    per group. It only depends on the dataset, the column selection and the
+ *    no-match label; the dataset itself is built once per processed output.
+ * 2. The assignment: which customer each group belongs to. Customer stats are
+ *    merged from the group aggregates, so reassigning a group touches that
+ *    group and its old/new customer only, never the rows.
+ */
+
+interface ItemAggregate {
+    description: string;
+    quantity: number;
+    type: ProductType;
+    firstRow: number;
+}
 
-    // Initialize result structure
-    const result: ReconciliationResult = {
-        customerStats: {},
-        groupStats: {},
-        unmatchedStats: { count: 0, rows: [] },
-        totalQuantity: 0,
-        total10mm: 0,
-        total20mm: 0
-    };
+export interface GroupAggregate {
+    id: number;
+    name: string;
+    rows: number[];
+    totalQuantity: number;
+    total10mm: number;
+    total20mm: number;
+    trips10mm: number;
+    trips20mm: number;
+    items: Map<number, ItemAggregate>; // Keyed by description string id, or -(row + 1) for unnamed items
+}
+
+export interface ReconciliationIndex {
+    groups: GroupAggregate[]; // Indexed by group id, in order of first appearance
+    groupIds: Map<string, number>;
+    unmatchedRows: number[];
+    totalQuantity: number;
+    total10mm: number;
+    total20mm: number;
+}
 
-    // 1. Identify Key Columns
-    console.log('--- Calculation Engine Start ---');
-    console.log('Files Config:', fileGenConfigs);
-    console.log('Customers count:', customers.length);
+export interface ReconciliationColumns {
+    resultColIdx: number;
+    qtyIdx: number;
+    descIdx: number;
+}
 
-    const outputConfig = fileGenConfigs['output'];
+const round2 = (value: number) => Math.round(value * 100) / 100;
 
+// Column selection from the output config, falling back to header detection
+export function resolveReconciliationColumns(
+    outputFileHeaders: Array<{ name: string; index: number }>,
+    outputConfig?: FileGenConfig
+): ReconciliationColumns {
     // Result Column (Where "Matched - GroupName" is)
     const resultColIdx = outputConfig?.resultColIdx ??
         (outputFileHeaders.length > 0 ? outputFileHeaders[outputFileHeaders.length - 1].index : -1);
@@ -90,167 +129,313 @@ export function calculateReconciliationStats(params: CalculationParams): Reconci
     // Description Column
     const descIdx = outputConfig?.descriptionColIdx ?? 0;
 
-    // 2. Iterate and Aggregate
-    const dataRows = outputFileData.slice(1); // Skip header
-
-    if (resultColIdx === -1 || qtyIdx === -1) {
-        // If we valid columns aren't found, we can't calculate much, but we return empty result to avoid crash
-        return result;
-    }
-
-    const headerName = outputFileHeaders.find(h => h.index === resultColIdx)?.name || '';
-
-    dataRows.forEach((row, idx) => {
-        if (!row || row.length === 0) return;
-
-        const matchValueOriginal = String(row[resultColIdx] || '').trim();
-        const matchValueLower = matchValueOriginal.toLowerCase();
+    return { resultColIdx, qtyIdx, descIdx };
+}
 
-        // Check if unmatched
-        if (!matchValueOriginal ||
-            matchValueLower === 'not matched' ||
-            matchValueOriginal === noMatchLabel ||
-            matchValueOriginal === headerName) {
+// Group lookup values below 0 for result strings that are not match groups
+const NOT_A_GROUP = -1;
+const UNMATCHED = -2;
+
+/**
+ * Single pass over the dataset's typed columns.
+ * Group totals, trips and invoice items are aggregated per group.
+ */
+export function indexReconciliationRows(
+    dataset: OutputDataset,
+    columns: ReconciliationColumns,
+    headerName: string,
+    noMatchLabel: string
+): ReconciliationIndex {
+    const { resultColIdx, qtyIdx, descIdx } = columns;
+    const { rowCount, strings, productTypes } = dataset;
+    const resultIds = dataset.ids(resultColIdx);
+    const descriptionIds = dataset.ids(descIdx);
+    const quantities = qtyIdx !== -1 ? dataset.quantities(qtyIdx) : null;
+    const index: ReconciliationIndex = {
+        groups: [],
+        groupIds: new Map(),
+        unmatchedRows: [],
+        totalQuantity: 0,
+        total10mm: 0,
+        total20mm: 0
+    };
 
-            // Only count as unmatched if it's explicitly 'not matched' or the label
-            if (matchValueLower === 'not matched' || matchValueOriginal === noMatchLabel) {
-                result.unmatchedStats.count++;
-                result.unmatchedStats.rows.push(row);
+    // Result string id -> group id, resolved once per distinct result value
+    const groupByString = new Map<number, number>();
+
+    for (let i = 0; i < rowCount; i++) {
+        const resultId = resultIds[i];
+        if (resultId === EMPTY_STRING_ID) continue;
+
+        let groupId = groupByString.get(resultId);
+        if (groupId === undefined) {
+            const groupName = strings[resultId];
+            if (groupName === headerName) {
+                groupId = NOT_A_GROUP;
+            } else if (groupName === noMatchLabel || groupName.toLowerCase() === 'not matched') {
+                // Only count as unmatched if it's explicitly 'not matched' or the label
+                groupId = UNMATCHED;
+            } else {
+                groupId = index.groups.length;
+                index.groupIds.set(groupName, groupId);
+                index.groups.push({
+                    id: groupId,
+                    name: groupName,
+                    rows: [],
+                    totalQuantity: 0,
+                    total10mm: 0,
+                    total20mm: 0,
+                    trips10mm: 0,
+                    trips20mm: 0,
+                    items: new Map()
+                });
             }
-            return;
+            groupByString.set(resultId, groupId);
+        }
+        if (groupId === NOT_A_GROUP) continue;
+        if (groupId === UNMATCHED) {
+            index.unmatchedRows.push(i);
+            continue;
         }
 
-        // It is a Matched Row
-        const groupName = matchValueOriginal;
-
-        // --- Group Stats ---
-        if (!result.groupStats[groupName]) {
-            // Find config by checking if the key (file path) contains the group name (filename)
-            // or if the group name contains the key (less likely but possible)
-            let groupConfig = fileGenConfigs[groupName];
-
-            if (!groupConfig) {
-                console.log('Trying to find config for:', groupName);
-                const foundKey = Object.keys(fileGenConfigs).find(key => {
-                    const cleanKey = key.toLowerCase().replace(/\.(xlsx|xls|csv)$/, '').trim();
-                    const cleanGroup = groupName.toLowerCase().replace(/\.(xlsx|xls|csv)$/, '').trim();
-                    const match = cleanKey.includes(cleanGroup) || cleanGroup.includes(cleanKey);
-                    if (match) console.log('MATCH FOUND:', key);
-                    return match;
-                });
-                if (foundKey) {
-                    groupConfig = fileGenConfigs[foundKey];
-                }
+        const group = index.groups[groupId];
+        group.rows.push(i);
+
+        // Without a quantity column rows still become trips and invoice items, with quantity 0
+        const quantity = quantities ? quantities[i] : 0;
+        const type = productTypes[i];
+        if (type === PRODUCT_TYPE_10MM) group.trips10mm++;
+        else if (type === PRODUCT_TYPE_20MM) group.trips20mm++;
+        if (quantities) {
+            group.totalQuantity += quantity;
+            index.totalQuantity += quantity;
+            if (type === PRODUCT_TYPE_10MM) {
+                group.total10mm += quantity;
+                index.total10mm += quantity;
+            } else if (type === PRODUCT_TYPE_20MM) {
+                group.total20mm += quantity;
+                index.total20mm += quantity;
             }
+        }
 
-            if (groupConfig) {
-                console.log('Config Found:', groupConfig);
-            } else {
-                console.log('NO CONFIG FOUND for:', groupName);
-                console.log('Available Config Keys:', Object.keys(fileGenConfigs));
-            }
+        const descriptionId = descriptionIds[i];
+        const key = descriptionId === EMPTY_STRING_ID ? -(i + 1) : descriptionId;
+        const item = group.items.get(key);
+        if (item) {
+            item.quantity = round2(item.quantity + quantity);
+        } else {
+            group.items.set(key, {
+                description: descriptionId === EMPTY_STRING_ID ? `Item ${i + 1}` : strings[descriptionId],
+                quantity,
+                type: PRODUCT_TYPES[type],
+                firstRow: i
+            });
+        }
+    }
 
-            const customer = groupConfig?.customerId ? customers.find(c => c.id === groupConfig.customerId) : null;
+    return index;
+}
 
-            // Fallback: If no customer assigned, DO NOT create a dummy customer with group name.
-            // This prevents "Vessel one 2026" from appearing as a customer name.
-            if (!customer) {
-                // We leave customer as null.
-                // The UI will show "Unassigned" or handle matched groups without customers separately.
-            }
+const cleanGroupKey = (s: string) => s.toLowerCase().replace(/\.(xlsx|xls|csv)$/, '').trim();
+
+/**
+ * Incremental reconciliation. Call update() with the current params; the row
+ * pass only reruns when the dataset, the output columns or the no-match label
+ * change, and customer stats are only rebuilt for customers whose groups were
+ * reassigned. Unchanged group/customer entries keep their identity between
+ * results.
+ */
+export class ReconciliationEngine {
+    private index: ReconciliationIndex | null = null;
+    private indexInputs: unknown[] = [];
+    private result: ReconciliationResult | null = null;
+    private groupCustomers: Array<Customer | null> = [];
+
+    // Group name -> fileGenConfigs key, valid for one set of config keys
+    private configKeySignature = '';
+    private resolvedConfigKeys = new Map<string, string | null>();
+
+    private customersSource: Customer[] | null = null;
+    private customersById = new Map<string, Customer>();
+
+    update(params: CalculationParams): ReconciliationResult {
+        const { outputFileHeaders, outputDataset, fileGenConfigs, noMatchLabel, customers } = params;
+
+        const columns = resolveReconciliationColumns(outputFileHeaders, fileGenConfigs['output']);
+        if (!outputDataset || columns.resultColIdx === -1) {
+            // Without the result column there is nothing to calculate; return an empty result to avoid a crash
+            this.reset();
+            return emptyResult();
+        }
 
-            result.groupStats[groupName] = {
-                groupName,
-                assignedCustomer: customer || null,
-                totalQuantity: 0,
-                total10mm: 0,
-                total20mm: 0,
-                rows: []
+        const headerName = outputFileHeaders.find(h => h.index === columns.resultColIdx)?.name || '';
+        // The dataset is built once per processed output; a reindex is one pass over its typed columns
+        const inputs = [outputDataset, columns.resultColIdx, columns.qtyIdx, columns.descIdx, headerName, noMatchLabel];
+        const reindex = !this.index || inputs.some((value, i) => value !== this.indexInputs[i]);
+        if (reindex) {
+            this.index = indexReconciliationRows(outputDataset, columns, headerName, noMatchLabel);
+            this.indexInputs = inputs;
+            this.result = null;
+        }
+        const index = this.index!;
+
+        const nextCustomers = this.resolveGroupCustomers(index, fileGenConfigs, customers);
+        const changed = this.result
+            ? index.groups.filter(g => nextCustomers[g.id] !== this.groupCustomers[g.id])
+            : index.groups;
+
+        if (this.result && changed.length === 0) return this.result;
+
+        const previous = this.result;
+        const groupStats = previous ? { ...previous.groupStats } : {};
+        const customerStats = previous ? { ...previous.customerStats } : {};
+        const affectedCustomers = new Set<string>();
+
+        for (const group of changed) {
+            const before = previous ? this.groupCustomers[group.id] : null;
+            const after = nextCustomers[group.id];
+            if (before) affectedCustomers.add(before.id);
+            if (after) affectedCustomers.add(after.id);
+            groupStats[group.name] = {
+                groupName: group.name,
+                assignedCustomer: after,
+                totalQuantity: round2(group.totalQuantity),
+                total10mm: round2(group.total10mm),
+                total20mm: round2(group.total20mm),
+                rows: group.rows
             };
         }
 
-        const groupStat = result.groupStats[groupName];
-        groupStat.rows.push(row);
+        // Rebuild only the customers that gained or lost a group, from the group aggregates
+        for (const customerId of affectedCustomers) {
+            delete customerStats[customerId];
+            const groups = index.groups.filter(g => nextCustomers[g.id]?.id === customerId);
+            if (groups.length > 0) {
+                customerStats[customerId] = buildCustomerStat(nextCustomers[groups[0].id]!, groups);
+            }
+        }
 
-        // Extract Data
-        const quantity = qtyIdx !== -1 && qtyIdx < row.length
-            ? parseQuantitySafe(row[qtyIdx])
-            : 0;
+        this.groupCustomers = nextCustomers;
+        this.result = {
+            customerStats,
+            groupStats,
+            unmatchedStats: previous?.unmatchedStats ?? { count: index.unmatchedRows.length, rows: index.unmatchedRows },
+            totalQuantity: index.totalQuantity,
+            total10mm: index.total10mm,
+            total20mm: index.total20mm
+        };
+        return this.result;
+    }
 
-        const description = String(row[descIdx] || `Item ${idx + 1}`);
-        const fullRowText = row.map((cell: any) => String(cell || '').trim()).join(' ').toLowerCase();
-        const type = detectProductType(description, fullRowText);
+    reset() {
+        this.index = null;
+        this.indexInputs = [];
+        this.result = null;
+        this.groupCustomers = [];
+    }
 
-        // Update Group Totals
-        groupStat.totalQuantity += quantity;
-        if (type === '10mm') groupStat.total10mm += quantity;
-        if (type === '20mm') groupStat.total20mm += quantity;
+    private resolveGroupCustomers(
+        index: ReconciliationIndex,
+        fileGenConfigs: Record<string, FileGenConfig>,
+        customers: Customer[]
+    ): Array<Customer | null> {
+        if (customers !== this.customersSource) {
+            this.customersSource = customers;
+            this.customersById = new Map(customers.map(c => [c.id, c]));
+        }
 
-        // --- Customer Stats (if assigned) ---
-        if (groupStat.assignedCustomer) {
-            const customerId = groupStat.assignedCustomer.id;
+        const keys = Object.keys(fileGenConfigs);
+        const signature = keys.join('\u0000');
+        if (signature !== this.configKeySignature) {
+            this.configKeySignature = signature;
+            this.resolvedConfigKeys.clear();
+        }
 
-            if (!result.customerStats[customerId]) {
-                result.customerStats[customerId] = {
-                    customer: groupStat.assignedCustomer,
-                    totalAmount: 0,
-                    total10mm: 0,
-                    total20mm: 0,
-                    trips10mm: 0,
-                    trips20mm: 0,
-                    items: []
-                };
+        return index.groups.map(group => {
+            let key = this.resolvedConfigKeys.get(group.name);
+            if (key === undefined) {
+                key = resolveConfigKey(group.name, keys, fileGenConfigs);
+                this.resolvedConfigKeys.set(group.name, key);
             }
+            const customerId = key ? fileGenConfigs[key]?.customerId : null;
+            return (customerId && this.customersById.get(customerId)) || null;
+        });
+    }
+}
 
-            const custStat = result.customerStats[customerId];
-            const rate = 0; // Default rate, can be enhanced to pull from customer config if needed
-
-            // Aggregating Invoice Items
-            // Check if item with same description already exists to merge
-            const existingItem = custStat.items.find(i => i.description === description);
+// Exact key first, otherwise a key (file name) containing the group name or the other way round
+function resolveConfigKey(groupName: string, keys: string[], fileGenConfigs: Record<string, FileGenConfig>): string | null {
+    if (fileGenConfigs[groupName]) return groupName;
+    const cleanGroup = cleanGroupKey(groupName);
+    const found = keys.find(key => {
+        const cleanKey = cleanGroupKey(key);
+        return cleanKey.includes(cleanGroup) || cleanGroup.includes(cleanKey);
+    });
+    return found ?? null;
+}
 
-            if (existingItem) {
-                existingItem.quantity = Math.round((existingItem.quantity + quantity) * 100) / 100;
-                existingItem.amount = Math.round(existingItem.quantity * existingItem.unitPrice * 100) / 100;
-            } else {
-                custStat.items.push({
-                    id: crypto.randomUUID(),
-                    description: description,
-                    quantity: quantity,
-                    unitPrice: rate,
-                    amount: Math.round(quantity * rate * 100) / 100,
-                    type: type
+function buildCustomerStat(customer: Customer, groups: GroupAggregate[]): ReconciliationResult['customerStats'][string] {
+    const rate = 0; // Default rate, can be enhanced to pull from customer config if needed
+    const merged = new Map<string, ItemAggregate>();
+    let total10mm = 0;
+    let total20mm = 0;
+    let trips10mm = 0;
+    let trips20mm = 0;
+
+    for (const group of groups) {
+        total10mm += group.total10mm;
+        total20mm += group.total20mm;
+        trips10mm += group.trips10mm;
+        trips20mm += group.trips20mm;
+
+        for (const item of group.items.values()) {
+            const existing = merged.get(item.description);
+            if (existing) {
+                merged.set(item.description, {
+                    ...existing,
+                    quantity: round2(existing.quantity + item.quantity),
+                    firstRow: Math.min(existing.firstRow, item.firstRow)
                 });
-            }
-
-            // Update Customer Totals
-            if (type === '10mm') {
-                custStat.total10mm += quantity;
-                custStat.trips10mm += 1;
-            }
-            if (type === '20mm') {
-                custStat.total20mm += quantity;
-                custStat.trips20mm += 1;
+            } else {
+                merged.set(item.description, item);
             }
         }
+    }
 
-        // Update Global Totals
-        result.totalQuantity += quantity;
-        if (type === '10mm') result.total10mm += quantity;
-        if (type === '20mm') result.total20mm += quantity;
-    });
-
-    // Final Rounding for display cleanups
-    Object.values(result.groupStats).forEach(stat => {
-        stat.totalQuantity = Math.round(stat.totalQuantity * 100) / 100;
-        stat.total10mm = Math.round(stat.total10mm * 100) / 100;
-        stat.total20mm = Math.round(stat.total20mm * 100) / 100;
-    });
+    // Items in order of their first row, as a row-by-row merge would produce them
+    const items: InvoiceItem[] = Array.from(merged.values())
+        .sort((a, b) => a.firstRow - b.firstRow)
+        .map(item => ({
+            id: crypto.randomUUID(),
+            description: item.description,
+            quantity: item.quantity,
+            unitPrice: rate,
+            amount: round2(item.quantity * rate),
+            type: item.type
+        }));
+
+    return {
+        customer,
+        totalAmount: items.reduce((sum, item) => sum + item.amount, 0),
+        total10mm: round2(total10mm),
+        total20mm: round2(total20mm),
+        trips10mm,
+        trips20mm,
+        items
+    };
+}
 
-    Object.values(result.customerStats).forEach(stat => {
-        stat.total10mm = Math.round(stat.total10mm * 100) / 100;
-        stat.total20mm = Math.round(stat.total20mm * 100) / 100;
-    });
+function emptyResult(): ReconciliationResult {
+    return {
+        customerStats: {},
+        groupStats: {},
+        unmatchedStats: { count: 0, rows: [] },
+        totalQuantity: 0,
+        total10mm: 0,
+        total20mm: 0
+    };
+}
 
-    return result;
+export function calculateReconciliationStats(params: CalculationParams): ReconciliationResult {
+    return new ReconciliationEngine().update(params);
 }
@@ -0,0 +1,62 @@
+/**
+ * Fixed-size blocks of sheet rows fetched through excel:readRows.
+ *
+ * Views keep only the blocks around what is on screen; the least recently
+ * used block is dropped once `maxBlocks` are held, so renderer memory stays
+ * the same whatever the sheet size.
+ */
+
+export const ROW_BLOCK_SIZE = 200;
+export const MAX_ROW_BLOCKS = 8;
+
+export class RowBlockCache {
+    readonly blockSize: number;
+    readonly maxBlocks: number;
+    private blocks = new Map<number, any[][]>();
+
+    constructor(blockSize: number = ROW_BLOCK_SIZE, maxBlocks: number = MAX_ROW_BLOCKS) {
+        this.blockSize = blockSize;
+        this.maxBlocks = maxBlocks;
+    }
+
+    getRow(rowIndex: number): any[] | undefined {
+        const block = this.blocks.get(Math.floor(rowIndex / this.blockSize));
+        return block ? block[rowIndex % this.blockSize] : undefined;
+    }
+
+    // Blocks covering rows [start, end) that still need fetching; cached ones are marked recently used
+    missingBlocks(start: number, end: number): number[] {
+        const missing: number[] = [];
+        if (end <= start) return missing;
+
+        const first = Math.floor(Math.max(0, start) / this.blockSize);
+        const last = Math.floor((end - 1) / this.blockSize);
+        for (let block = first; block <= last; block++) {
+            const rows = this.blocks.get(block);
+            if (rows) {
+                this.blocks.delete(block);
+                this.blocks.set(block, rows);
+            } else {
+                missing.push(block);
+            }
+        }
+        return missing;
+    }
+
+    set(block: number, rows: any[][]): void {
+        this.blocks.delete(block);
+        this.blocks.set(block, rows);
+        while (this.blocks.size > this.maxBlocks) {
+            const oldest = this.blocks.keys().next().value as number;
+            this.blocks.delete(oldest);
+        }
+    }
+
+    clear(): void {
+        this.blocks.clear();
+    }
+
+    get size(): number {
+        return this.blocks.size;
+    }
+}
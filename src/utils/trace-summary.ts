@@ -0,0 +1,54 @@
+import type { TraceSpan } from '../types.d';
+
+/**
+ * Per-stage totals of recorded trace spans, for the diagnostics panel.
+ * Spans are grouped by category and name; times are in milliseconds.
+ */
+
+export interface TraceStageSummary {
+    cat: string;
+    name: string;
+    count: number;
+    totalMs: number;
+    meanMs: number;
+    maxMs: number;
+    rows: number; // Sum of the `rows` attribute, 0 when the stage does not report rows
+    bytes: number; // Sum of IPC argument and result sizes
+    heapDelta: number; // Sum of heap deltas in bytes, can be negative after a GC
+}
+
+const numberArg = (span: TraceSpan, key: string): number => {
+    const value = span.args?.[key];
+    return typeof value === 'number' && value > 0 ? value : 0;
+};
+
+export function summarizeTrace(spans: TraceSpan[]): TraceStageSummary[] {
+    const stages = new Map<string, TraceStageSummary>();
+    for (const span of spans) {
+        const key = `${span.cat}\u0000${span.name}`;
+        let stage = stages.get(key);
+        if (!stage) {
+            stage = { cat: span.cat, name: span.name, count: 0, totalMs: 0, meanMs: 0, maxMs: 0, rows: 0, bytes: 0, heapDelta: 0 };
+            stages.set(key, stage);
+        }
+        const ms = span.dur / 1000;
+        stage.count++;
+        stage.totalMs += ms;
+        stage.maxMs = Math.max(stage.maxMs, ms);
+        stage.rows += numberArg(span, 'rows');
+        stage.bytes += numberArg(span, 'argBytes') + numberArg(span, 'resultBytes');
+        const heapDelta = span.args?.heapDelta;
+        if (typeof heapDelta === 'number') stage.heapDelta += heapDelta;
+    }
+    return Array.from(stages.values())
+        .map(stage => ({ ...stage, meanMs: stage.totalMs / stage.count }))
+        .sort((a, b) => b.totalMs - a.totalMs);
+}
+
+export function formatBytes(bytes: number): string {
+    const sign = bytes < 0 ? '-' : '';
+    const abs = Math.abs(bytes);
+    if (abs >= 1024 * 1024) return `${sign}${(abs / (1024 * 1024)).toFixed(1)} MB`;
+    if (abs >= 1024) return `${sign}${(abs / 1024).toFixed(1)} KB`;
+    return `${sign}${abs} B`;
+}